@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+bench_l1_async.py - Async query submission vs one query at a time
+
+Runs the L1 collector's sql and batch engines with and without --async
+against a DuckDB stand-in that injects per-query latency, on a single worker
+connection, checks each async run produces the same JSON as the synchronous
+run of its engine, and reports the speedup. The stand-in runs async queries
+on ASYNC_WORKERS threads, like a warehouse running a session's queries
+concurrently.
+
+USAGE:
+    python benchmarks/bench_l1_async.py [--engines sql batch] [--async 4 8] [--latency 0.05]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+from compare import diff_reports
+
+import scripts.collector as collector
+
+
+def run(warehouse, engine: str, async_queries: int, fiscal_quarter: str, run_date):
+    collector.get_connection = warehouse.connect
+    queries, connections = warehouse.queries, warehouse.connections
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = collector.collect_all_data(fiscal_quarter, None, run_date=run_date, engine=engine,
+                                          async_queries=async_queries, checkpoint_dir=None)
+    return {
+        "data": data,
+        "seconds": time.perf_counter() - start,
+        "queries": warehouse.queries - queries,
+        "connections": warehouse.connections - connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark async query submission in the L1 collector")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    parser.add_argument("--engines", nargs="+", choices=["sql", "batch"], default=["sql", "batch"])
+    parser.add_argument("--async", dest="async_queries", type=int, nargs="+", default=[4, 8],
+                        help="Queries in flight per connection to try")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every query")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale, latency=args.latency)
+    run_date = scale.run_dates[-1]
+
+    print(f"{'engine':<8}{'async':>7}{'seconds':>10}{'speedup':>10}{'queries':>10}{'conns':>8}  output")
+    failed = False
+    for engine in args.engines:
+        baseline = run(warehouse, engine, 0, args.fiscal_quarter, run_date)
+        for async_queries in [0] + sorted(set(args.async_queries)):
+            result = baseline if async_queries == 0 else run(
+                warehouse, engine, async_queries, args.fiscal_quarter, run_date)
+            diffs = diff_reports(baseline["data"], result["data"])
+            same_order = list(baseline["data"]["hierarchy"]) == list(result["data"]["hierarchy"])
+            ok = not diffs and same_order
+            failed = failed or not ok
+            print(
+                f"{engine:<8}{async_queries or 'off':>7}{result['seconds']:>10.2f}"
+                f"{baseline['seconds'] / result['seconds']:>9.1f}x"
+                f"{result['queries']:>10}{result['connections']:>8}  {'same' if ok else 'DIFFERENT'}"
+            )
+            for d in diffs:
+                print(f"   {d}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+bench_l1_batch.py - Level-batched analyses vs per-node SQL
+
+Runs the L1 collector with engine='sql' (one query per analysis per node) and
+engine='batch' (one query per analysis per level) against the DuckDB
+stand-in, checks both produce the same v6 JSON in the same hierarchy order,
+and reports wall time and warehouse query counts. --latency models the
+Snowflake round trip that dominates the per-node engine.
+
+USAGE:
+    python benchmarks/bench_l1_batch.py [--scale small|medium] [--latency 0.05]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+from compare import diff_reports
+
+import scripts.collector as collector
+
+
+def run_engine(warehouse, engine: str, fiscal_quarter: str, run_date, filter_category=None):
+    collector.get_connection = warehouse.connect
+    start_queries = warehouse.queries
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = collector.collect_all_data(
+            fiscal_quarter, None, run_date=run_date, engine=engine, filter_category=filter_category
+        )
+    return data, time.perf_counter() - start, warehouse.queries - start_queries
+
+
+def _node_order(data):
+    """Every node path in the hierarchy, in JSON order."""
+    order = []
+
+    def walk(children, prefix):
+        for name, node in children.items():
+            order.append(prefix + (name,))
+            walk(node["children"], prefix + (name,))
+
+    walk(data["hierarchy"], ())
+    return order
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare L1 batch and SQL engines locally")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    parser.add_argument("--category", help="Also check a single-category run")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every query")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale, latency=args.latency)
+    run_date = scale.run_dates[-1]
+
+    results = {}
+    for engine in ("sql", "batch"):
+        results[engine] = run_engine(warehouse, engine, args.fiscal_quarter, run_date, args.category)
+
+    sql_data, batch_data = results["sql"][0], results["batch"][0]
+    diffs = diff_reports(sql_data, batch_data)
+    if _node_order(sql_data) != _node_order(batch_data):
+        diffs.append("hierarchy order differs")
+
+    print(f"{'engine':<8}{'seconds':>10}{'queries':>10}")
+    for engine, (_, seconds, queries) in results.items():
+        print(f"{engine:<8}{seconds:>10.2f}{queries:>10}")
+    print()
+    if diffs:
+        print("❌ Outputs differ:")
+        for d in diffs:
+            print(f"   {d}")
+        sys.exit(1)
+    print("✅ Batch output matches SQL output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+bench_l1_cache_index.py - Indexed, size-capped app cache vs file-system checks
+
+Collects one quarter and caches it sharded under --collections names (as
+the app's quarter x run_date x category paths), with a CacheIndex capped at
+--keep collections' worth of bytes. Times the sidebar's "is it cached?"
+check both ways, for a cached and an uncached path:
+
+    stat    shards.collection_exists (manifest stat + one per report format)
+    index   CacheIndex.lookup (one indexed SELECT)
+
+Then checks the policy: recording more collections than fit evicts the
+least recently opened ones (never the one just recorded), a collection of
+another metadata.version is removed when adopted, raising the index's
+version invalidates everything, entries unopened for the TTL expire, and
+sync() adopts collections written without record().
+
+Fails if any of those do not hold.
+
+USAGE:
+    python benchmarks/bench_l1_cache_index.py [--collections 12] [--keep 5] [--lookups 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+
+import scripts.collector as collector
+from scripts.cache_index import CacheIndex, _disk_bytes
+from scripts.shards import collection_exists, save_collection
+
+
+def per_call_us(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the L1 app cache index")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    parser.add_argument("--collections", type=int, default=12, help="Collections written to the cache")
+    parser.add_argument("--keep", type=int, default=5, help="Collections that fit under the size cap")
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale)
+    collector.get_connection = warehouse.connect
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = collector.collect_all_data(args.fiscal_quarter, None, run_date=scale.run_dates[-1],
+                                          checkpoint_dir=None)
+
+    problems = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, f"l1_{args.fiscal_quarter}_{i:04d}_all") for i in range(args.collections)]
+        save_collection(data, paths[0])
+        size = _disk_bytes(paths[0])
+        index = CacheIndex(directory, max_bytes=int(size * (args.keep + 0.5)))
+
+        # Sidebar check, cached and uncached
+        index.record(paths[0], data["metadata"])
+        missing = os.path.join(directory, "l1_not_cached")
+        print(f"{'check':<8}{'cached us':>11}{'missing us':>12}")
+        for name, check in (("stat", collection_exists), ("index", index.lookup)):
+            hit = per_call_us(lambda: check(paths[0]), args.lookups)
+            miss = per_call_us(lambda: check(missing), args.lookups)
+            print(f"{name:<8}{hit:>11.1f}{miss:>12.1f}")
+            if not check(paths[0]) or check(missing):
+                problems.append(f"{name}: wrong answer")
+
+        # LRU eviction under the size cap; paths[0] is re-opened along the way
+        for i, path in enumerate(paths[1:], 1):
+            save_collection(data, path)
+            index.record(path, data["metadata"])
+            if i % 3 == 0:
+                index.touch(paths[0])
+            time.sleep(0.001)
+        kept = [i for i, path in enumerate(paths) if index.lookup(path)]
+        on_disk = [i for i, path in enumerate(paths) if collection_exists(path)]
+        stats = index.stats()
+        print()
+        print(f"cap {index.max_bytes / 1e6:.2f} MB ({args.keep} collections of {size / 1e6:.2f} MB): "
+              f"{stats['collections']} kept, {stats['bytes'] / 1e6:.2f} MB, indexes {kept}")
+        expected = sorted({0} | set(range(args.collections - args.keep + 1, args.collections)))
+        if kept != expected:
+            problems.append(f"kept {kept}, expected {expected} (recently opened + newest)")
+        if on_disk != kept:
+            problems.append(f"files on disk {on_disk} differ from the index {kept}")
+        if stats["bytes"] > index.max_bytes:
+            problems.append(f"{stats['bytes']} bytes indexed, over the {index.max_bytes} cap")
+
+        # A collection of another version is removed when adopted
+        old = dict(data, metadata=dict(data["metadata"], version="v5"))
+        old_path = os.path.join(directory, "l1_old_version")
+        save_collection(old, old_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            adopted = index.adopt(old_path)
+        if adopted is not None or collection_exists(old_path):
+            problems.append("collection of another version was adopted")
+
+        # A new config version invalidates every collection
+        newer = CacheIndex(directory, max_bytes=index.max_bytes, version="v7")
+        invalidated = sorted(newer.evict()) if not any(newer.lookup(path) for path in paths) else None
+        if invalidated != [os.path.basename(paths[i]) for i in kept]:
+            problems.append("collections of the previous version survived a version change")
+        if any(collection_exists(path) for path in paths):
+            problems.append("files of invalidated collections were not deleted")
+
+        # TTL, then sync() adopting collections written behind the index's back
+        expiring = CacheIndex(directory, ttl_seconds=0.05)
+        save_collection(data, paths[0])
+        expiring.record(paths[0], data["metadata"])
+        time.sleep(0.1)
+        if expiring.lookup(paths[0]) or expiring.evict() != [os.path.basename(paths[0])]:
+            problems.append("collection unopened past the TTL did not expire")
+        for path in paths[:2]:
+            save_collection(data, path)
+        result = index.sync()
+        print(f"sync after writing 2 collections directly: {result}")
+        if result["adopted"] != 2 or not all(index.lookup(path) for path in paths[:2]):
+            problems.append(f"sync() did not adopt the new collections: {result}")
+
+    print()
+    if problems:
+        print(f"❌ {len(problems)} problem(s):")
+        for p in problems[:20]:
+            print(f"   {p}")
+        sys.exit(1)
+    print("✅ Cache stays under its cap (LRU), invalid and expired collections are removed, lookups hit the index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+bench_l1_connection_pool.py - Pooled connections vs a new connection per use
+
+Replays what the app process and a job worker do against a local warehouse
+whose connections take --connect-latency seconds to open (Snowflake's
+connect + USE WAREHOUSE), once opening a connection for every use and once
+through a db.ConnectionPool:
+
+    app     --reruns run-date lookups, a hierarchy fetch, then --fills lazy
+            drill-downs (lazy.open_node)
+    worker  --jobs lazy collections in a row, each with its metadata
+            queries first (as jobs.run_job)
+
+Reports seconds and connections opened for each. Then checks the pool's
+limits: max_size under --threads concurrent borrowers, a connection closed
+behind the pool's back or failing its SELECT 1 health check is replaced,
+and idle connections are closed after idle_timeout.
+
+Fails unless pooled runs return the same results with fewer connections
+and every limit holds.
+
+USAGE:
+    python benchmarks/bench_l1_connection_pool.py [--connect-latency 0.3] [--reruns 5] [--fills 4] [--jobs 3]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+
+import scripts.collector as collector
+from scripts.db import ConnectionPool, get_available_run_dates
+from scripts.fiscal import get_fiscal_dates
+from scripts.hierarchy import fetch_hierarchy
+from scripts.lazy import open_node
+
+
+def app_session(connect, args, fiscal_quarter: str, lazy: dict) -> list:
+    """Run-date lookups, the hierarchy, then lazy drill-downs; returns what they produced."""
+    results = []
+    for _ in range(args.reruns):
+        conn = connect()
+        results.append([str(d) for d in get_available_run_dates(conn)])
+        conn.close()
+    conn = connect()
+    run_date = get_available_run_dates(conn)[0]
+    dates = get_fiscal_dates(conn, fiscal_quarter)
+    results.append(fetch_hierarchy(conn, dates, run_date).counts())
+    conn.close()
+    data = json.loads(json.dumps(lazy))
+    for category in list(data["hierarchy"])[:args.fills]:
+        open_node(data, (category,), None, connect)
+        results.append(data["hierarchy"][category]["analysis"])
+    return results
+
+
+def worker_jobs(connect, args, fiscal_quarter: str) -> list:
+    results = []
+    for _ in range(args.jobs):
+        conn = connect()
+        run_date = get_available_run_dates(conn)[0]
+        dates = get_fiscal_dates(conn, fiscal_quarter)
+        index = fetch_hierarchy(conn, dates, run_date, sizes=False)
+        conn.close()
+        data = collector.collect_all_data(fiscal_quarter, None, run_date=run_date, checkpoint_dir=None,
+                                          hierarchy=index, lazy=True, connect=connect)
+        data["metadata"].pop("generated_at")
+        results.append(data)
+    return results
+
+
+def timed(warehouse, fn):
+    connections = warehouse.connections
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    return result, time.perf_counter() - start, warehouse.connections - connections
+
+
+def check_limits(warehouse, threads: int) -> list:
+    problems = []
+
+    # max_size under concurrent borrowers
+    pool = ConnectionPool(max_size=2, factory=warehouse.connect)
+    in_use, peak, lock = [0], [0], threading.Lock()
+
+    def borrow():
+        with pool.connection() as conn:
+            with lock:
+                in_use[0] += 1
+                peak[0] = max(peak[0], in_use[0])
+            get_available_run_dates(conn)
+            with lock:
+                in_use[0] -= 1
+
+    workers = [threading.Thread(target=borrow) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if peak[0] > 2 or pool.stats()["created"] > 2:
+        problems.append(f"max_size=2 pool lent {peak[0]} at once, created {pool.stats()['created']}")
+    pool.close_all()
+
+    # A connection closed behind the pool's back, then one failing its health check
+    pool = ConnectionPool(max_size=1, factory=warehouse.connect, health_check_after=0)
+    with pool.connection() as conn:
+        first = conn
+    first.close()
+    with pool.connection() as conn:
+        second = conn
+
+    def broken():
+        raise RuntimeError("session expired")
+
+    second.cursor = broken
+    with pool.connection() as conn:
+        third = conn
+    stats = pool.stats()
+    if second is first or third is second or stats["replaced"] != 2:
+        problems.append(f"dead connections were lent again: {stats}")
+    pool.close_all()
+
+    # Idle timeout
+    pool = ConnectionPool(max_size=2, factory=warehouse.connect, idle_timeout=0.05)
+    with pool.connection():
+        pass
+    time.sleep(0.1)
+    with pool.connection():
+        pass
+    stats = pool.stats()
+    if stats["expired"] != 1 or stats["created"] != 2 or stats["open"] != 1:
+        problems.append(f"idle connection was not closed after idle_timeout: {stats}")
+    pool.close_all()
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled L1 connections")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    parser.add_argument("--connect-latency", type=float, default=0.3, help="Seconds to open a connection")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds added to every query")
+    parser.add_argument("--reruns", type=int, default=5, help="Run-date lookups in the app session")
+    parser.add_argument("--fills", type=int, default=4, help="Lazy drill-downs in the app session")
+    parser.add_argument("--jobs", type=int, default=3, help="Collections run by one worker")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent borrowers for the max_size check")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale, latency=args.latency, connect_latency=args.connect_latency)
+    collector.get_connection = warehouse.connect
+    with contextlib.redirect_stdout(io.StringIO()):
+        lazy = collector.collect_all_data(args.fiscal_quarter, None, run_date=scale.run_dates[-1],
+                                          checkpoint_dir=None, lazy=True)
+
+    problems = []
+    print(f"{'replay':<8}{'connections':<14}{'seconds':>9}{'opened':>8}")
+    for name, replay in (("app", lambda connect: app_session(connect, args, args.fiscal_quarter, lazy)),
+                         ("worker", lambda connect: worker_jobs(connect, args, args.fiscal_quarter))):
+        direct, direct_seconds, direct_opened = timed(warehouse, lambda: replay(warehouse.connect))
+        pool = ConnectionPool(max_size=4, factory=warehouse.connect, idle_timeout=1800, health_check_after=60)
+        pooled, pooled_seconds, pooled_opened = timed(warehouse, lambda: replay(pool.connect))
+        pool.close_all()
+        print(f"{name:<8}{'per use':<14}{direct_seconds:>9.2f}{direct_opened:>8}")
+        print(f"{name:<8}{'pooled':<14}{pooled_seconds:>9.2f}{pooled_opened:>8}")
+        if json.dumps(direct, default=str) != json.dumps(pooled, default=str):
+            problems.append(f"{name}: pooled results differ")
+        if pooled_opened >= direct_opened:
+            problems.append(f"{name}: pool opened {pooled_opened} connections, per use {direct_opened}")
+
+    problems += check_limits(warehouse, args.threads)
+
+    print()
+    if problems:
+        print(f"❌ {len(problems)} problem(s):")
+        for p in problems[:20]:
+            print(f"   {p}")
+        sys.exit(1)
+    print("✅ Pooled runs match with fewer connections; max size, health checks and idle timeout hold")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+bench_l1_cube.py - Cube engine vs SQL engine on the local warehouse
+
+Runs the L1 collector twice against the DuckDB stand-in (engine='sql' and
+engine='cube'), checks that both produce the same v6 JSON, and reports wall
+time and warehouse query counts.
+
+USAGE:
+    python benchmarks/bench_l1_cube.py [--scale small|medium]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+from compare import diff_reports
+
+import scripts.collector as collector
+
+
+def run_engine(warehouse, engine: str, fiscal_quarter: str, run_date):
+    collector.get_connection = warehouse.connect
+    start_queries = warehouse.queries
+    start = time.perf_counter()
+    data = collector.collect_all_data(fiscal_quarter, None, run_date=run_date, engine=engine)
+    return data, time.perf_counter() - start, warehouse.queries - start_queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare L1 cube and SQL engines locally")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale)
+    run_date = scale.run_dates[-1]
+
+    results = {}
+    for engine in ("sql", "cube"):
+        results[engine] = run_engine(warehouse, engine, args.fiscal_quarter, run_date)
+
+    diffs = diff_reports(results["sql"][0], results["cube"][0])
+    print()
+    print(f"{'engine':<8}{'seconds':>10}{'queries':>10}")
+    for engine, (_, seconds, queries) in results.items():
+        print(f"{engine:<8}{seconds:>10.2f}{queries:>10}")
+    print()
+    if diffs:
+        print("❌ Outputs differ:")
+        for d in diffs:
+            print(f"   {d}")
+        sys.exit(1)
+    print("✅ Cube output matches SQL output")
+
+
+if __name__ == "__main__":
+    main()
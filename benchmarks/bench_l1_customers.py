@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+bench_l1_customers.py - Cost of the customer tier, and its numbers checked
+
+Runs the L1 collection (batch engine) without the customer tier and with it
+at each max_customers setting, and reports the extra wall time, queries and
+JSON bytes the tier adds. Then re-computes the summary KPIs of a sample of
+tier customers one at a time with analyses.get_summary_kpis (what per-customer
+nodes would run) and fails if any differ, or if a customer's monthly revenue
+does not add up to its QTD revenue.
+
+USAGE:
+    python benchmarks/bench_l1_customers.py [--max-customers 10 25] [--check 50]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+from compare import _close
+
+import scripts.collector as collector
+from scripts.analyses import get_summary_kpis
+from scripts.customers import KPI_COLUMNS, customer_entities
+from scripts.fiscal import get_fiscal_dates
+
+
+def run(warehouse, max_customers: int, fiscal_quarter: str, run_date):
+    collector.get_connection = warehouse.connect
+    queries = warehouse.queries
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = collector.collect_all_data(fiscal_quarter, None, run_date=run_date, engine="batch",
+                                          max_customers=max_customers, checkpoint_dir=None)
+    return {
+        "data": data,
+        "seconds": time.perf_counter() - start,
+        "queries": warehouse.queries - queries,
+        "bytes": len(json.dumps(data, indent=2)),
+    }
+
+
+def feature_nodes(data):
+    """(category, use_case, feature, node) for every feature of a collection."""
+    for category, cat_node in data["hierarchy"].items():
+        for use_case, uc_node in cat_node["children"].items():
+            for feature, node in uc_node["children"].items():
+                yield category, use_case, feature, node
+
+
+def check_customers(warehouse, data, fiscal_quarter: str, run_date, sample: int, seed: int = 0) -> list:
+    """Compare sampled tier customers with per-customer get_summary_kpis."""
+    conn = warehouse.connect()
+    dates = get_fiscal_dates(conn, fiscal_quarter)
+    customers = [
+        (category, use_case, feature, entity)
+        for category, use_case, feature, node in feature_nodes(data)
+        for entity in customer_entities(data, node).values()
+    ]
+    problems = []
+    for category, use_case, feature, entity in random.Random(seed).sample(customers, min(sample, len(customers))):
+        name = entity["name"]
+        kpis = entity["analysis"]["summary_kpis"]
+        expected = get_summary_kpis(conn, dates, run_date, category, use_case, feature, name)
+        for key in KPI_COLUMNS:
+            want = None if expected.get(key) is None else float(expected[key])
+            got = None if kpis[key] is None else float(kpis[key])
+            if not _close(key, want, got):
+                problems.append(f"{feature} / {name}: {key} {got!r} != {want!r}")
+        monthly = sum(m["revenue"] for m in entity["analysis"]["monthly_trends"])
+        if abs(monthly - kpis["qtd_revenue"]) > len(entity["analysis"]["monthly_trends"]):
+            problems.append(f"{feature} / {name}: monthly revenue sums to {monthly}, QTD is {kpis['qtd_revenue']}")
+    conn.close()
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and check the L1 customer tier")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    parser.add_argument("--max-customers", type=int, nargs="+", default=[10, 25],
+                        help="Customer tier sizes to try")
+    parser.add_argument("--check", type=int, default=50, help="Tier customers re-checked one at a time")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale)
+    run_date = scale.run_dates[-1]
+
+    baseline = run(warehouse, 0, args.fiscal_quarter, run_date)
+    print(f"{'customers':>10}{'rows':>8}{'seconds':>10}{'+queries':>10}{'MB':>8}{'+MB':>8}")
+    print(f"{'off':>10}{0:>8}{baseline['seconds']:>10.2f}{0:>10}{baseline['bytes'] / 1e6:>8.2f}{0:>8.2f}")
+    problems = []
+    for max_customers in sorted(set(args.max_customers)):
+        result = run(warehouse, max_customers, args.fiscal_quarter, run_date)
+        rows = sum(len(node.get("customers", [])) for *_, node in feature_nodes(result["data"]))
+        print(f"{max_customers:>10}{rows:>8}{result['seconds']:>10.2f}"
+              f"{result['queries'] - baseline['queries']:>10}{result['bytes'] / 1e6:>8.2f}"
+              f"{(result['bytes'] - baseline['bytes']) / 1e6:>8.2f}")
+        problems.extend(check_customers(warehouse, result["data"], args.fiscal_quarter, run_date, args.check))
+
+    print()
+    if problems:
+        print("❌ Customer tier differs from per-customer queries:")
+        for p in problems[:20]:
+            print(f"   {p}")
+        sys.exit(1)
+    print(f"✅ Sampled customers match per-customer summary KPIs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+bench_l1_incremental.py - Full vs incremental collection of a new snapshot
+
+Builds two run_date snapshots of a completed quarter where the later one
+restates a single category. Collects the first snapshot in full, then the
+second both in full and incrementally from the first's JSON; checks the two
+collections of the second snapshot match, that nodes outside the restated
+category were reused, and reports time, warehouse queries and how many nodes
+were reused.
+
+USAGE:
+    python benchmarks/bench_l1_incremental.py [--engine sql|batch] [--latency 0.05]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+from compare import diff_reports
+
+import scripts.collector as collector
+from scripts.config import ACTUALS_TABLE
+from scripts.db import to_json_safe
+
+RUN_DATES = (date(2026, 2, 2), date(2026, 2, 3))
+RESTATED_CATEGORY = "Category 00"
+
+
+def restate_one_category(warehouse):
+    """Make the later snapshot a copy of the earlier one except for one category."""
+    earlier, later = RUN_DATES
+    warehouse.db.execute(f"""
+        DELETE FROM {ACTUALS_TABLE}
+        WHERE run_date = '{later}' AND product_category IS DISTINCT FROM '{RESTATED_CATEGORY}'
+    """)
+    warehouse.db.execute(f"""
+        INSERT INTO {ACTUALS_TABLE}
+        SELECT * REPLACE (DATE '{later}' AS run_date)
+        FROM {ACTUALS_TABLE}
+        WHERE run_date = '{earlier}' AND product_category IS DISTINCT FROM '{RESTATED_CATEGORY}'
+    """)
+
+
+def _as_written(data):
+    """The report as it reads back from the cache file, without fingerprints."""
+    def strip(value):
+        if isinstance(value, dict):
+            return {k: strip(v) for k, v in value.items() if k != "fingerprint"}
+        if isinstance(value, list):
+            return [strip(v) for v in value]
+        return value
+    return strip(json.loads(json.dumps(to_json_safe(data))))
+
+
+def run(warehouse, engine: str, fiscal_quarter: str, run_date, **kwargs):
+    collector.get_connection = warehouse.connect
+    queries = warehouse.queries
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = collector.collect_all_data(fiscal_quarter, None, run_date=run_date, engine=engine, **kwargs)
+    return data, time.perf_counter() - start, warehouse.queries - queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental L1 collection")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q3", help="A completed quarter")
+    parser.add_argument("--engine", choices=("sql", "batch"), default="sql")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every query")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    scale.run_dates = RUN_DATES
+    warehouse = build_warehouse(scale, latency=args.latency)
+    restate_one_category(warehouse)
+    earlier, later = RUN_DATES
+
+    with tempfile.TemporaryDirectory() as directory:
+        previous_path = os.path.join(directory, f"l1_{args.fiscal_quarter}_{earlier}_all.json")
+        previous, _, _ = run(warehouse, args.engine, args.fiscal_quarter, earlier, incremental=True)
+        with open(previous_path, "w") as f:
+            json.dump(to_json_safe(previous), f)
+
+        full, full_seconds, full_queries = run(warehouse, args.engine, args.fiscal_quarter, later)
+        incremental, inc_seconds, inc_queries = run(
+            warehouse, args.engine, args.fiscal_quarter, later, previous_path=previous_path
+        )
+
+    counts = incremental["metadata"].pop("incremental")
+    print(f"{'run':<13}{'seconds':>10}{'queries':>10}{'recomputed':>12}{'reused':>8}")
+    print(f"{'full':<13}{full_seconds:>10.2f}{full_queries:>10}{'-':>12}{'-':>8}")
+    print(f"{'incremental':<13}{inc_seconds:>10.2f}{inc_queries:>10}"
+          f"{counts['nodes_recomputed']:>12}{counts['nodes_reused']:>8}")
+    print()
+
+    diffs = diff_reports(_as_written(full), _as_written(incremental))
+    if diffs:
+        print("❌ Outputs differ:")
+        for d in diffs:
+            print(f"   {d}")
+        sys.exit(1)
+    # Only one category was restated: the nodes of the others must be copied over
+    if counts["nodes_reused"] == 0:
+        print(f"❌ The {args.engine} engine reused no node")
+        sys.exit(1)
+    print("✅ Incremental output matches a full collection")
+
+
+if __name__ == "__main__":
+    main()
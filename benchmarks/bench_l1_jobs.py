@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+bench_l1_jobs.py - Background collection jobs vs collecting in the session
+
+Collects each quarter directly (as the app used to, blocking the session
+until the JSON is ready), then submits the same collections to a jobs.py
+queue served by a separate worker process and polls them the way the app
+does. Reports how long submit() blocks, when the first category can be
+browsed from partial(), the ETA at half way against the time actually left
+(the later jobs have the earlier ones' timings as history), and how long a
+cancel takes to stop a running job. The cancelled job is then submitted
+again and resumes from its checkpoint journal.
+
+Fails unless every job's output is byte-identical to its direct collection
+(apart from generated_at), a duplicate submit returns the running job (one
+with other options does not), and the cancelled job stops and its
+resubmission completes.
+
+USAGE:
+    python benchmarks/bench_l1_jobs.py [--quarters FY2026-Q2 FY2026-Q3 FY2026-Q4] [--latency 0.01]
+        [--cancel-after 10]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+
+import scripts.collector as collector
+from scripts.jobs import JOB_CANCELLED, JOB_DONE, JobQueue, run_worker
+
+POLL_SECONDS = 0.05
+
+
+def worker(db_path: str, checkpoint_dir: str, scale_name: str, latency: float):
+    """Worker process: its own copy of the warehouse, then the jobs.py worker loop."""
+    warehouse = build_warehouse(getattr(Scale, scale_name)(), latency=latency)
+    collector.get_connection = warehouse.connect
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_worker(db_path, idle_seconds=5, checkpoint_dir=checkpoint_dir)
+
+
+def direct(warehouse, fiscal_quarter: str, run_date):
+    collector.get_connection = warehouse.connect
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = collector.collect_all_data(fiscal_quarter, None, run_date=run_date, checkpoint_dir=None)
+    return data, time.perf_counter() - start
+
+
+def identical(a, b) -> bool:
+    b = dict(b, metadata=dict(b["metadata"], generated_at=a["metadata"]["generated_at"]))
+    return json.dumps(a, indent=2) == json.dumps(b, indent=2)
+
+
+def follow(queue: JobQueue, job_id: int, cancel_after: int = 0):
+    """Poll a job until it ends, like the app; returns its final status and what was seen on the way."""
+    seen = {"first_partial": None, "eta_half": None, "half_at": None, "cancel_seconds": None, "polls": 0}
+    start = time.perf_counter()
+    cancelled_at = None
+    while True:
+        job = queue.status(job_id)
+        seen["polls"] += 1
+        now = time.perf_counter() - start
+        if job["status"] not in ("queued", "running"):
+            seen["seconds"] = now
+            if cancelled_at is not None:
+                seen["cancel_seconds"] = now - cancelled_at
+            return job, seen
+        total = job["nodes_total"] or 0
+        if seen["first_partial"] is None and job["categories_done"]:
+            partial = queue.partial(job_id)
+            if partial and partial["hierarchy"]:
+                seen["first_partial"] = now
+        if seen["eta_half"] is None and total and job["nodes_done"] * 2 >= total and job["eta_seconds"] is not None:
+            seen["eta_half"], seen["half_at"] = job["eta_seconds"], now
+        if cancel_after and cancelled_at is None and job["nodes_done"] >= cancel_after:
+            queue.cancel(job_id)
+            cancelled_at = now
+        time.sleep(POLL_SECONDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark background L1 collection jobs")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--quarters", nargs="+", default=["FY2026-Q2", "FY2026-Q3", "FY2026-Q4"])
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds added to every query")
+    parser.add_argument("--cancel-after", type=int, default=10, help="Nodes done before the last job is cancelled")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale, latency=args.latency)
+    run_date = scale.run_dates[-1]
+    failed = False
+
+    references = {}
+    print(f"{'direct':<12}{'seconds':>9}")
+    for fiscal_quarter in args.quarters:
+        references[fiscal_quarter], seconds = direct(warehouse, fiscal_quarter, run_date)
+        print(f"{fiscal_quarter:<12}{seconds:>9.2f}")
+    print()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "jobs.sqlite")
+        checkpoint_dir = os.path.join(directory, "checkpoints")
+        queue = JobQueue(db_path, checkpoint_dir)
+        process = multiprocessing.get_context("spawn").Process(
+            target=worker, args=(db_path, checkpoint_dir, args.scale, args.latency))
+        process.start()
+
+        print(f"{'job':<12}{'submit ms':>10}{'first cat s':>12}{'done s':>8}{'ETA@50%':>9}{'actual':>8}"
+              f"{'polls':>7}  result")
+        for i, fiscal_quarter in enumerate(args.quarters):
+            output_path = os.path.join(directory, f"{fiscal_quarter}.json")
+            start = time.perf_counter()
+            job_id = queue.submit(fiscal_quarter, run_date, output_path=output_path)
+            submit_ms = (time.perf_counter() - start) * 1000
+            if queue.submit(fiscal_quarter, run_date, output_path=output_path) != job_id:
+                print(f"   ❌ duplicate submit of {fiscal_quarter} queued a second job")
+                failed = True
+            # Other options are another collection, not the running job (cancelled while still queued)
+            other = queue.submit(fiscal_quarter, run_date, output_path=output_path, lazy=True)
+            queue.cancel(other)
+            if other == job_id:
+                print(f"   ❌ lazy submit of {fiscal_quarter} attached to the full job")
+                failed = True
+
+            last = i == len(args.quarters) - 1
+            job, seen = follow(queue, job_id, args.cancel_after if last else 0)
+            if last:
+                ok = job["status"] == JOB_CANCELLED
+                result = f"cancelled in {seen['cancel_seconds']:.2f}s at {job['nodes_done']}/{job['nodes_total']} nodes"
+                print(f"{fiscal_quarter:<12}{submit_ms:>10.1f}{'-':>12}{seen['seconds']:>8.2f}{'-':>9}{'-':>8}"
+                      f"{seen['polls']:>7}  {result if ok else '❌ ' + job['status']}")
+                failed |= not ok
+                job_id = queue.submit(fiscal_quarter, run_date, output_path=output_path)
+                job, seen = follow(queue, job_id)
+                fiscal_label = "  resubmit"
+            else:
+                fiscal_label = fiscal_quarter
+
+            ok = job["status"] == JOB_DONE
+            if ok:
+                with open(output_path) as f:
+                    ok = identical(references[fiscal_quarter], json.load(f))
+            actual = "-" if seen["half_at"] is None else f"{seen['seconds'] - seen['half_at']:.2f}"
+            eta = "-" if seen["eta_half"] is None else f"{seen['eta_half']:.2f}"
+            first = "-" if seen["first_partial"] is None else f"{seen['first_partial']:.2f}"
+            print(f"{fiscal_label:<12}{submit_ms:>10.1f}{first:>12}{seen['seconds']:>8.2f}{eta:>9}{actual:>8}"
+                  f"{seen['polls']:>7}  {'identical' if ok else '❌ ' + (job['error'] or job['status'])}")
+            failed |= not ok
+
+        process.join()
+
+    print()
+    if failed:
+        print("❌ Job results differ from the direct collections")
+        sys.exit(1)
+    print("✅ Every job's output is byte-identical to its direct collection")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+bench_l1_lazy.py - Lazy collection plus on-demand drill-down vs a full collection
+
+Runs a full collection and a lazy one (collect_all_data(lazy=True)) of the
+same quarter, then replays a typical app session on the lazy JSON: Total,
+then --categories categories and --use-cases use cases under the first
+one, each opened with lazy.open_node (which persists into the cache file).
+A second visitor then reloads the cache file and opens the same nodes.
+
+Reports seconds and warehouse queries for each step. Fails unless every
+opened node (and its children's summary_kpis) is identical to the full
+collection's, and the second visitor needs no queries at all.
+
+USAGE:
+    python benchmarks/bench_l1_lazy.py [--fiscal-quarter FY2026-Q4] [--categories 3] [--use-cases 2]
+        [--latency 0.01]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+
+import scripts.collector as collector
+from scripts.lazy import find_node, open_node
+
+
+def timed(warehouse, fn):
+    queries = warehouse.queries
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    return result, time.perf_counter() - start, warehouse.queries - queries
+
+
+def check(full, lazy, path) -> list:
+    """Differences between the opened node (and its children's KPIs) and the full collection's."""
+    problems = []
+    want, got = find_node(full, path), find_node(lazy, path)
+    if json.dumps(want["analysis"]) != json.dumps(got["analysis"]):
+        problems.append(f"{' / '.join(path) or 'Total'}: analyses differ")
+    children = (want.get("children", {}) if path else full["hierarchy"]).keys()
+    for name in children:
+        want_kpis = find_node(full, path + (name,))["analysis"]["summary_kpis"]
+        got_kpis = find_node(lazy, path + (name,))["analysis"].get("summary_kpis")
+        if json.dumps(want_kpis) != json.dumps(got_kpis):
+            problems.append(f"{' / '.join(path + (name,))}: summary_kpis differ")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lazy L1 collection with on-demand drill-down")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    parser.add_argument("--categories", type=int, default=3, help="Categories the session opens")
+    parser.add_argument("--use-cases", type=int, default=2, help="Use cases opened under the first category")
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds added to every query")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale, latency=args.latency)
+    collector.get_connection = warehouse.connect
+    run_date = scale.run_dates[-1]
+
+    def collect(lazy):
+        return collector.collect_all_data(args.fiscal_quarter, None, run_date=run_date, checkpoint_dir=None,
+                                          lazy=lazy)
+
+    full, full_seconds, full_queries = timed(warehouse, lambda: collect(False))
+    lazy, lazy_seconds, lazy_queries = timed(warehouse, lambda: collect(True))
+
+    categories = list(lazy["hierarchy"])[:args.categories]
+    use_cases = list(lazy["hierarchy"][categories[0]]["children"])[:args.use_cases] if categories else []
+    visits = [()] + [(c,) for c in categories] + [(categories[0], u) for u in use_cases]
+
+    print(f"{'step':<40}{'seconds':>9}{'queries':>9}")
+    print(f"{'full collection':<40}{full_seconds:>9.2f}{full_queries:>9}")
+    print(f"{'lazy collection':<40}{lazy_seconds:>9.2f}{lazy_queries:>9}")
+
+    problems = []
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "lazy.json")
+        with open(cache_path, "w") as f:
+            json.dump(lazy, f, indent=2)
+
+        session_seconds, session_queries = lazy_seconds, lazy_queries
+        for path in visits:
+            _, seconds, queries = timed(warehouse, lambda: open_node(lazy, path, cache_path))
+            session_seconds += seconds
+            session_queries += queries
+            print(f"{'  open ' + (' / '.join(path) or 'Total'):<40}{seconds:>9.2f}{queries:>9}")
+            problems += check(full, lazy, path)
+        print(f"{'lazy + session':<40}{session_seconds:>9.2f}{session_queries:>9}")
+
+        with open(cache_path) as f:
+            second = json.load(f)
+        revisit_queries = 0
+        for path in visits:
+            _, _, queries = timed(warehouse, lambda: open_node(second, path, cache_path))
+            revisit_queries += queries
+            problems += check(full, second, path)
+        print(f"{'second visitor, same nodes':<40}{'':>9}{revisit_queries:>9}")
+        if revisit_queries:
+            problems.append(f"second visitor ran {revisit_queries} queries")
+
+    print()
+    if problems:
+        print(f"❌ {len(problems)} problem(s):")
+        for p in problems[:20]:
+            print(f"   {p}")
+        sys.exit(1)
+    print(f"✅ {len(visits)} opened nodes identical to the full collection; cached for the next visitor")
+
+
+if __name__ == "__main__":
+    main()
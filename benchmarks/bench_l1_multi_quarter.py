@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+bench_l1_multi_quarter.py - Several quarters from one scan vs one run each
+
+Collects a list of fiscal quarters (x snapshots) once with one cube-engine
+collect_all_data run per quarter and once with multi_quarter.collect_quarters,
+which scans the union of the quarters' windows in a single query. Checks
+every quarter's JSON matches its separate run and reports seconds, queries
+and the actuals rows each approach reads (overlapping PQ/PY windows are read
+once per quarter by separate runs, once in total by the shared scan).
+
+USAGE:
+    python benchmarks/bench_l1_multi_quarter.py [--quarters FY2026-Q1 FY2026-Q2 FY2026-Q3 FY2026-Q4]
+        [--run-dates 2026-02-03] [--latency 0.0]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+from compare import diff_reports
+
+import scripts.collector as collector
+from scripts.config import ACTUALS_TABLE, RUN_DATE_COLUMN
+from scripts.fiscal import get_fiscal_dates
+from scripts.multi_quarter import collect_quarters, quarter_windows, merge_windows
+
+
+def actuals_rows(conn, windows, run_dates) -> int:
+    """Actuals rows of the given snapshots inside the given windows."""
+    if not windows:
+        return 0
+    in_window = " OR ".join(f"ds BETWEEN '{s}' AND '{e}'" for s, e in windows)
+    run_date_list = ", ".join(f"'{d}'" for d in run_dates)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {ACTUALS_TABLE} "
+                   f"WHERE {RUN_DATE_COLUMN} IN ({run_date_list}) AND ({in_window})")
+    return cursor.fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-quarter collection against one run per quarter")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--quarters", nargs="+", default=["FY2026-Q1", "FY2026-Q2", "FY2026-Q3", "FY2026-Q4"])
+    parser.add_argument("--run-dates", type=date.fromisoformat, nargs="+", default=[date(2026, 2, 3)])
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every query")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    scale.run_dates = tuple(sorted(set(args.run_dates)))
+    warehouse = build_warehouse(scale, latency=args.latency)
+    collector.get_connection = warehouse.connect
+
+    queries = warehouse.queries
+    start = time.perf_counter()
+    separate = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for fiscal_quarter in args.quarters:
+            for run_date in scale.run_dates:
+                separate[(fiscal_quarter, str(run_date))] = collector.collect_all_data(
+                    fiscal_quarter, None, run_date=run_date, engine="cube", checkpoint_dir=None)
+    separate_seconds, separate_queries = time.perf_counter() - start, warehouse.queries - queries
+
+    queries = warehouse.queries
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        combined = collect_quarters(args.quarters, list(scale.run_dates), checkpoint_dir=None)
+    combined_seconds, combined_queries = time.perf_counter() - start, warehouse.queries - queries
+
+    conn = warehouse.connect()
+    windows = [w for q in args.quarters for w in quarter_windows(get_fiscal_dates(conn, q)).values()]
+    separate_rows = sum(actuals_rows(conn, [w], scale.run_dates) for w in windows)
+    combined_rows = actuals_rows(conn, merge_windows(windows), scale.run_dates)
+    conn.close()
+
+    print(f"{len(args.quarters)} quarter(s) x {len(scale.run_dates)} snapshot(s)")
+    print(f"{'mode':<12}{'seconds':>10}{'queries':>10}{'rows read':>12}")
+    print(f"{'separate':<12}{separate_seconds:>10.2f}{separate_queries:>10}{separate_rows:>12,}")
+    print(f"{'shared scan':<12}{combined_seconds:>10.2f}{combined_queries:>10}{combined_rows:>12,}")
+    print(f"speedup {separate_seconds / combined_seconds:.1f}x, "
+          f"{1 - combined_rows / separate_rows:.0%} fewer actuals rows read")
+
+    failed = False
+    for key, data in separate.items():
+        diffs = diff_reports(data, combined.get(key, {}))
+        same_order = list(data["hierarchy"]) == list(combined.get(key, {}).get("hierarchy", {}))
+        ok = not diffs and same_order
+        failed = failed or not ok
+        print(f"   {key[0]} @ {key[1]}: {'same' if ok else 'DIFFERENT'}")
+        for d in diffs[:20]:
+            print(f"      {d}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
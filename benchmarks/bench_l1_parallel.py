@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+bench_l1_parallel.py - Parallel hierarchy traversal vs serial
+
+Runs the SQL engine of the L1 collector at several --workers settings against
+a DuckDB stand-in that injects per-query and per-connect latency (DuckDB
+answers in microseconds; Snowflake round trips do not), checks every run
+produces the same JSON as workers=1, and reports the speedup.
+
+USAGE:
+    python benchmarks/bench_l1_parallel.py [--workers 1 4 8] [--latency 0.05]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+from compare import diff_reports
+
+import scripts.collector as collector
+
+
+def run(warehouse, workers: int, fiscal_quarter: str, run_date):
+    collector.get_connection = warehouse.connect
+    queries, connections = warehouse.queries, warehouse.connections
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = collector.collect_all_data(fiscal_quarter, None, run_date=run_date, workers=workers)
+    return {
+        "data": data,
+        "seconds": time.perf_counter() - start,
+        "queries": warehouse.queries - queries,
+        "connections": warehouse.connections - connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel L1 hierarchy traversal")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every query")
+    parser.add_argument("--connect-latency", type=float, default=0.5, help="Seconds added to every connect")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale, latency=args.latency, connect_latency=args.connect_latency)
+    run_date = scale.run_dates[-1]
+
+    runs = {w: run(warehouse, w, args.fiscal_quarter, run_date) for w in sorted(set([1] + args.workers))}
+    baseline = runs[1]
+
+    print(f"{'workers':<9}{'seconds':>10}{'speedup':>10}{'queries':>10}{'conns':>8}  output")
+    failed = False
+    for workers, result in runs.items():
+        diffs = diff_reports(baseline["data"], result["data"])
+        same_order = list(baseline["data"]["hierarchy"]) == list(result["data"]["hierarchy"])
+        ok = not diffs and same_order
+        failed = failed or not ok
+        print(
+            f"{workers:<9}{result['seconds']:>10.2f}{baseline['seconds'] / result['seconds']:>9.1f}x"
+            f"{result['queries']:>10}{result['connections']:>8}  {'same' if ok else 'DIFFERENT'}"
+        )
+        for d in diffs:
+            print(f"   {d}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
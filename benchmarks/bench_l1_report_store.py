@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+bench_l1_report_store.py - Report file formats: indent=2 JSON vs packed + compressed
+
+Collects one quarter and, for each --replicate size (categories repeated up
+to production hierarchy size, as in bench_l1_snapshot_diff.py), saves and
+loads it in every report_store.py format. Reports save and load seconds,
+MB on disk and the load speedup over indent=2 JSON. Then converts the
+.json file to each other format with convert_report, as the converter CLI
+does for existing caches.
+
+Fails unless every load, and every converted file, returns exactly the
+collected dict.
+
+USAGE:
+    python benchmarks/bench_l1_report_store.py [--fiscal-quarter FY2026-Q4] [--replicate 1 50] [--repeat 3]
+"""
+
+import argparse
+import contextlib
+import copy
+import gc
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+
+import scripts.collector as collector
+from scripts.report_store import FORMATS, convert_report, load_report, save_report
+
+
+def replicate(data, copies: int):
+    """The collection with its categories repeated `copies` times under new names."""
+    if copies <= 1:
+        return data
+    data = copy.deepcopy(data)
+    categories = list(data["hierarchy"].items())
+    for i in range(1, copies):
+        for name, node in categories:
+            data["hierarchy"][f"{name} #{i}"] = node
+    return data
+
+
+def timed(fn, repeat: int):
+    """(last result, median seconds) of fn() over `repeat` runs."""
+    timings = []
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark L1 report file formats")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    parser.add_argument("--replicate", type=int, nargs="+", default=[1, 50],
+                        help="Copies of every category (50: production node count)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale)
+    collector.get_connection = warehouse.connect
+    with contextlib.redirect_stdout(io.StringIO()):
+        collected = collector.collect_all_data(args.fiscal_quarter, None, run_date=scale.run_dates[-1],
+                                               engine="batch", checkpoint_dir=None)
+
+    problems = []
+    print(f"{'copies':>7} {'format':<11}{'save s':>8}{'MB':>9}{'load s':>8}{'load x':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for copies in sorted(set(args.replicate)):
+            data = json.loads(json.dumps(replicate(collected, copies)))
+            json_load = None
+            for suffix in sorted(FORMATS, key=lambda s: s != ".json"):
+                path = os.path.join(directory, f"x{copies}{suffix}")
+                _, save = timed(lambda: save_report(data, path), args.repeat)
+                loaded, load = timed(lambda: load_report(path), args.repeat)
+                json_load = json_load or load
+                print(f"{copies:>7} {suffix:<11}{save:>8.2f}{os.path.getsize(path) / 1e6:>9.2f}{load:>8.2f}"
+                      f"{json_load / load:>7.1f}x")
+                if loaded != data:
+                    problems.append(f"{suffix} x{copies}: load differs from the collection")
+                del loaded
+
+            source = os.path.join(directory, f"x{copies}.json")
+            for suffix in FORMATS:
+                if suffix != ".json":
+                    target = os.path.join(directory, f"converted{copies}{suffix}")
+                    convert_report(source, target)
+                    if load_report(target) != data:
+                        problems.append(f"{suffix} x{copies}: converted file differs from the collection")
+
+    print()
+    if problems:
+        print(f"❌ {len(problems)} problem(s):")
+        for p in problems[:20]:
+            print(f"   {p}")
+        sys.exit(1)
+    print("✅ Every format and converted file loads back identical to the collection")
+
+
+if __name__ == "__main__":
+    main()
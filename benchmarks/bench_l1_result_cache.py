@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+bench_l1_result_cache.py - Cold vs warm collection with the SQL result cache
+
+Runs the L1 collector twice against the DuckDB stand-in with the on-disk
+result cache enabled in a temporary directory: the first run fills the cache,
+the second should answer everything but the uncacheable queries from disk.
+Checks both runs produce the same JSON and reports time, warehouse queries
+and cache counters.
+
+USAGE:
+    python benchmarks/bench_l1_result_cache.py [--engine sql|batch|cube] [--latency 0.05]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+from compare import diff_reports
+
+import scripts.collector as collector
+from scripts.db import enable_result_cache, disable_result_cache
+
+
+def run(warehouse, cache, engine: str, fiscal_quarter: str, run_date):
+    collector.get_connection = warehouse.connect
+    queries = warehouse.queries
+    before = cache.stats()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = collector.collect_all_data(fiscal_quarter, None, run_date=run_date, engine=engine)
+    after = cache.stats()
+    return {
+        "data": data,
+        "seconds": time.perf_counter() - start,
+        "queries": warehouse.queries - queries,
+        "hits": after["hits"] - before["hits"],
+        "misses": after["misses"] - before["misses"],
+        "bytes": after["bytes"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the L1 SQL result cache")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    parser.add_argument("--engine", choices=collector.ENGINES, default="sql")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every query")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale, latency=args.latency)
+    run_date = scale.run_dates[-1]
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = enable_result_cache(directory, newest_run_date=run_date)
+        try:
+            cold = run(warehouse, cache, args.engine, args.fiscal_quarter, run_date)
+            warm = run(warehouse, cache, args.engine, args.fiscal_quarter, run_date)
+        finally:
+            disable_result_cache()
+
+    print(f"{'run':<6}{'seconds':>10}{'queries':>10}{'hits':>8}{'misses':>8}{'MB':>8}")
+    for name, result in (("cold", cold), ("warm", warm)):
+        print(f"{name:<6}{result['seconds']:>10.2f}{result['queries']:>10}"
+              f"{result['hits']:>8}{result['misses']:>8}{result['bytes'] / 1e6:>8.1f}")
+    print()
+
+    diffs = diff_reports(cold["data"], warm["data"])
+    if diffs:
+        print("❌ Outputs differ:")
+        for d in diffs:
+            print(f"   {d}")
+        sys.exit(1)
+    print("✅ Cached output matches uncached output")
+
+
+if __name__ == "__main__":
+    main()
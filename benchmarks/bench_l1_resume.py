@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+bench_l1_resume.py - Interrupted and resumed collection vs an uninterrupted one
+
+Runs the L1 collector once to completion, then again with a failure injected
+after --fail-after node collections (one level for engine='batch'), and
+finally resumes the interrupted run from its checkpoint journal. Checks the
+resumed JSON is byte-identical to the uninterrupted one (apart from
+generated_at) and reports the warehouse queries each run needed.
+
+USAGE:
+    python benchmarks/bench_l1_resume.py [--engine sql|batch|cube] [--fail-after 20]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+
+import scripts.collector as collector
+
+
+class Interrupted(Exception):
+    """Stands in for a warehouse timeout or a sleeping laptop."""
+
+
+@contextlib.contextmanager
+def fail_after(engine: str, calls: int):
+    """Make the collector's per-node (per-level for batch) step raise after `calls` calls."""
+    name = "_collect_level_batch" if engine == "batch" else "_collect_node"
+    original = getattr(collector, name)
+    remaining = [calls]
+
+    def failing(*args, **kwargs):
+        remaining[0] -= 1
+        if remaining[0] < 0:
+            raise Interrupted()
+        return original(*args, **kwargs)
+
+    setattr(collector, name, failing)
+    try:
+        yield
+    finally:
+        setattr(collector, name, original)
+
+
+def run(warehouse, engine: str, fiscal_quarter: str, run_date, checkpoint_dir: str, resume: bool = False):
+    collector.get_connection = warehouse.connect
+    queries = warehouse.queries
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = collector.collect_all_data(
+            fiscal_quarter, None, run_date=run_date, engine=engine,
+            resume=resume, checkpoint_dir=checkpoint_dir,
+        )
+    return data, time.perf_counter() - start, warehouse.queries - queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resuming an interrupted L1 collection")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    parser.add_argument("--engine", choices=collector.ENGINES, default="sql")
+    parser.add_argument("--fail-after", type=int, default=20,
+                        help="Node collections (levels for batch) that succeed before the failure")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale)
+    run_date = scale.run_dates[-1]
+
+    with tempfile.TemporaryDirectory() as directory:
+        full, full_seconds, full_queries = run(warehouse, args.engine, args.fiscal_quarter, run_date, directory)
+
+        queries = warehouse.queries
+        try:
+            with fail_after(args.engine, args.fail_after):
+                run(warehouse, args.engine, args.fiscal_quarter, run_date, directory)
+        except Interrupted:
+            pass
+        else:
+            print(f"❌ --fail-after {args.fail_after} did not interrupt the collection")
+            sys.exit(1)
+        interrupted_queries = warehouse.queries - queries
+
+        resumed, resumed_seconds, resumed_queries = run(
+            warehouse, args.engine, args.fiscal_quarter, run_date, directory, resume=True
+        )
+        leftover = os.listdir(directory)
+
+    print(f"{'run':<13}{'seconds':>10}{'queries':>10}")
+    print(f"{'full':<13}{full_seconds:>10.2f}{full_queries:>10}")
+    print(f"{'interrupted':<13}{'-':>10}{interrupted_queries:>10}")
+    print(f"{'resumed':<13}{resumed_seconds:>10.2f}{resumed_queries:>10}")
+    print()
+
+    resumed["metadata"]["generated_at"] = full["metadata"]["generated_at"]
+    if json.dumps(full, indent=2) != json.dumps(resumed, indent=2):
+        print("❌ Resumed output is not byte-identical to the uninterrupted output")
+        sys.exit(1)
+    if leftover:
+        print(f"❌ Checkpoint journal left behind: {leftover}")
+        sys.exit(1)
+    print("✅ Resumed output is byte-identical to the uninterrupted output")
+
+
+if __name__ == "__main__":
+    main()
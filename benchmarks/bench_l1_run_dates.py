@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+bench_l1_run_dates.py - Snapshot catalog vs SELECT DISTINCT run_date
+
+Builds a warehouse with --snapshots run_dates (each a full copy of history
+up to its date, as the real snapshot table), then times how the app gets
+its date picker:
+
+    distinct      db.get_available_run_dates (scans every snapshot)
+    cold          load_run_dates with no catalog yet (one full GROUP BY)
+    memory        load_run_dates again in the same process
+    disk          load_run_dates in a "new process" (in-memory copy dropped)
+    incremental   refresh once the catalog is stale (run_date >= newest known)
+    new snapshot  the same after another snapshot lands in the table
+
+Fails unless the catalog lists exactly the DISTINCT run_dates (including
+the new snapshot), its rows and day ranges match a direct GROUP BY, the
+memory and disk loads run no query and open no connection, and a snapshot taken before a quarter
+ends is reported as not covering it.
+
+USAGE:
+    python benchmarks/bench_l1_run_dates.py [--snapshots 12] [--scale small] [--latency 0.0]
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+
+import scripts.run_dates as run_dates
+from scripts.config import ACTUALS_TABLE
+from scripts.db import get_available_run_dates
+from scripts.fiscal import get_fiscal_dates
+
+
+def timed(warehouse, fn):
+    queries, connections = warehouse.queries, warehouse.connections
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    return result, time.perf_counter() - start, (warehouse.queries - queries, warehouse.connections - connections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the L1 run_date catalog")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--snapshots", type=int, default=12, help="run_dates in the actuals table")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every query")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    last = scale.run_dates[-1]
+    snapshots = tuple(sorted(last - timedelta(days=7 * i) for i in range(args.snapshots)))
+    scale = dataclasses.replace(scale, run_dates=snapshots)
+    warehouse = build_warehouse(scale, latency=args.latency)
+    conn = warehouse.connect()
+    run_dates.RUN_DATE_CATALOG_DIR = tempfile.mkdtemp(prefix="bench_run_dates_")
+    table_rows = conn.cursor().execute(f"SELECT COUNT(*) FROM {ACTUALS_TABLE}").fetchone()[0]
+    print(f"{len(snapshots)} snapshots, {table_rows:,} rows")
+    print()
+
+    steps = []
+    distinct, seconds, counts = timed(warehouse, lambda: get_available_run_dates(conn))
+    steps.append(("distinct", seconds, counts))
+    catalog, seconds, counts = timed(warehouse, lambda: run_dates.load_run_dates(warehouse.connect))
+    steps.append(("cold", seconds, counts))
+    _, seconds, memory_counts = timed(warehouse, lambda: run_dates.load_run_dates(warehouse.connect))
+    steps.append(("memory", seconds, memory_counts))
+    run_dates._loaded.clear()
+    from_disk, seconds, disk_counts = timed(warehouse, lambda: run_dates.load_run_dates(warehouse.connect))
+    steps.append(("disk", seconds, disk_counts))
+    _, seconds, counts = timed(warehouse, lambda: run_dates.load_run_dates(warehouse.connect, max_age=0))
+    steps.append(("incremental", seconds, counts))
+
+    # Another snapshot lands: a copy of the newest one a week later
+    new_date = last + timedelta(days=7)
+    conn.cursor().execute(
+        f"INSERT INTO {ACTUALS_TABLE} SELECT * REPLACE (DATE '{new_date}' AS run_date) "
+        f"FROM {ACTUALS_TABLE} WHERE run_date = DATE '{last}'"
+    )
+    refreshed, seconds, counts = timed(warehouse, lambda: run_dates.load_run_dates(warehouse.connect, max_age=0))
+    steps.append(("new snapshot", seconds, counts))
+
+    print(f"{'step':<14}{'ms':>10}{'queries':>9}{'connects':>10}")
+    for name, seconds, (queries, connections) in steps:
+        print(f"{name:<14}{seconds * 1000:>10.2f}{queries:>9}{connections:>10}")
+
+    problems = []
+    if catalog.run_dates() != distinct:
+        problems.append("catalog run_dates differ from SELECT DISTINCT")
+    if from_disk.run_dates() != catalog.run_dates():
+        problems.append("catalog read from disk differs")
+    if any(memory_counts) or any(disk_counts):
+        problems.append(f"memory/disk loads ran {memory_counts[0]}/{disk_counts[0]} queries "
+                        f"and opened {memory_counts[1]}/{disk_counts[1]} connections")
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected_dates = get_available_run_dates(conn)
+    if refreshed.run_dates() != expected_dates or refreshed.newest() != new_date:
+        problems.append(f"incremental refresh missed the new snapshot {new_date}")
+
+    expected = {row[0]: row[1:] for row in conn.cursor().execute(
+        f"SELECT run_date, COUNT(*), MIN(ds), MAX(ds) FROM {ACTUALS_TABLE} GROUP BY 1").fetchall()}
+    for snapshot in refreshed.snapshots:
+        if (snapshot.rows, snapshot.first_day, snapshot.last_day) != tuple(expected[snapshot.run_date]):
+            problems.append(f"{snapshot.run_date}: rows/day range differ from a direct GROUP BY")
+            break
+
+    # The oldest snapshot stops before FY2026-Q4 ends; the newest one reaches its end
+    with contextlib.redirect_stdout(io.StringIO()):
+        dates = get_fiscal_dates(conn, "FY2026-Q4")
+    oldest, newest = refreshed.get(snapshots[0]), refreshed.get(snapshots[-1])
+    print()
+    print(f"FY2026-Q4 ({dates.q_start} to {dates.q_end}): {oldest.run_date} covers it: "
+          f"{oldest.covers(dates.q_start, dates.q_end)}, {newest.run_date}: {newest.covers(dates.q_start, dates.q_end)}")
+    if oldest.covers(dates.q_start, dates.q_end) or not newest.covers(dates.q_start, dates.q_end):
+        problems.append("quarter coverage is wrong")
+
+    print()
+    if problems:
+        print(f"❌ {len(problems)} problem(s):")
+        for p in problems[:20]:
+            print(f"   {p}")
+        sys.exit(1)
+    print("✅ Catalog matches SELECT DISTINCT, loads without queries or connections and picks up new snapshots incrementally")
+
+
+if __name__ == "__main__":
+    main()
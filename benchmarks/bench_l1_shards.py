@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+bench_l1_shards.py - Sharded cache directory vs one indent=2 JSON file
+
+Collects one quarter, then for each --replicate size (categories repeated
+up to production hierarchy size, as in bench_l1_snapshot_diff.py) writes it
+both ways and times what the app does with it: save, open the report
+(whole JSON vs manifest only), open the first category (nothing vs one
+shard) and read everything (load_all, as the snapshot diff does). Also
+reports bytes on disk.
+
+Then rewrites one category with ShardedCollection.update (as lazy.py does
+when it fills a node in) while a reader that opened the manifest earlier
+still has the other categories to read.
+
+Fails unless load_all() returns exactly the collected dict, the update
+rewrote only its own shard, and the earlier reader still reads every
+category (the updated one with the new content).
+
+USAGE:
+    python benchmarks/bench_l1_shards.py [--fiscal-quarter FY2026-Q4] [--replicate 1 50] [--repeat 3]
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+
+import scripts.collector as collector
+from scripts.shards import ShardedCollection, open_collection, save_collection
+
+
+def replicate(data, copies: int):
+    """The collection with its categories repeated `copies` times under new names."""
+    if copies <= 1:
+        return data
+    data = copy.deepcopy(data)
+    categories = list(data["hierarchy"].items())
+    for i in range(1, copies):
+        for name, node in categories:
+            data["hierarchy"][f"{name} #{i}"] = node
+    return data
+
+
+def timed(fn, repeat: int):
+    """(last result, median seconds) of fn() over `repeat` runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+
+def disk_bytes(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def check_update(data, directory: str) -> list:
+    """Rewrite one category behind an earlier reader's back; what went wrong, if anything."""
+    problems = []
+    reader = open_collection(directory)
+    category = list(data["hierarchy"])[0]
+    before = set(os.listdir(directory))
+
+    def merge(path, node):
+        node["analysis"]["bench_marker"] = True
+
+    ShardedCollection.open(directory).update([(category,)], merge)
+    changed = set(os.listdir(directory)) ^ before
+    if len(changed) != 2:
+        problems.append(f"update changed {sorted(changed)}, expected one shard replaced")
+
+    full = reader.load_all()
+    if not full["hierarchy"][category]["analysis"].get("bench_marker"):
+        problems.append(f"earlier reader did not see the updated {category}")
+    for name, node in data["hierarchy"].items():
+        if name != category and json.dumps(full["hierarchy"][name]) != json.dumps(node):
+            problems.append(f"earlier reader read a different {name}")
+            break
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sharded L1 cache format")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    parser.add_argument("--replicate", type=int, nargs="+", default=[1, 50],
+                        help="Copies of every category (50: production node count)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale)
+    collector.get_connection = warehouse.connect
+    with contextlib.redirect_stdout(io.StringIO()):
+        collected = collector.collect_all_data(args.fiscal_quarter, None, run_date=scale.run_dates[-1],
+                                               engine="batch", checkpoint_dir=None)
+
+    problems = []
+    print(f"{'copies':>7} {'format':<8}{'save s':>8}{'MB':>8}{'open ms':>9}{'category ms':>12}{'all s':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for copies in sorted(set(args.replicate)):
+            data = json.loads(json.dumps(replicate(collected, copies)))
+            expected = json.dumps(data)
+            category = list(data["hierarchy"])[0]
+            for fmt, path in (("json", os.path.join(directory, f"x{copies}.json")),
+                              ("sharded", os.path.join(directory, f"x{copies}"))):
+                _, save = timed(lambda: save_collection(data, path), args.repeat)
+                store, open_seconds = timed(lambda: open_collection(path), args.repeat)
+                _, ensure = timed(lambda: open_collection(path).ensure(category), args.repeat)
+                ensure = max(ensure - open_seconds, 0.0)
+                full, load_all = timed(lambda: open_collection(path).load_all(), args.repeat)
+                print(f"{copies:>7} {fmt:<8}{save:>8.2f}{disk_bytes(path) / 1e6:>8.2f}{open_seconds * 1000:>9.1f}"
+                      f"{ensure * 1000:>12.1f}{load_all:>8.2f}")
+                if json.dumps(full) != expected:
+                    problems.append(f"{fmt} x{copies}: load_all() differs from the collection")
+            problems += check_update(data, os.path.join(directory, f"x{copies}"))
+
+    print()
+    if problems:
+        print(f"❌ {len(problems)} problem(s):")
+        for p in problems[:20]:
+            print(f"   {p}")
+        sys.exit(1)
+    print("✅ Sharded collections read back identical; updates rewrite one shard and stay readable")
+
+
+if __name__ == "__main__":
+    main()
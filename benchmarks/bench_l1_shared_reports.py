@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+bench_l1_shared_reports.py - One shared report store vs a copy per session
+
+Collects one quarter (categories repeated --replicate times, as in
+bench_l1_shards.py), caches it sharded, then simulates N concurrent app
+sessions that each open the report and browse --browse categories:
+
+    per-session   every session opens its own collection (open_collection)
+                  and reads the shards it browses, as the app did before
+    shared        every session asks one SharedReports for the same path
+
+and reports the Python heap held by all sessions together (tracemalloc)
+and the shard reads. Then N threads open the same node of a lazy
+collection at once through SharedReports.open_node and the warehouse
+queries are compared with a single session filling it alone.
+
+Fails unless the shared sessions see exactly the per-session data, shared
+memory stays within 10% of one session's whatever N is, the concurrent
+fill runs no more queries than one fill, and a collection rewritten on
+disk is re-opened on the next request.
+
+USAGE:
+    python benchmarks/bench_l1_shared_reports.py [--sessions 1 5 10 20] [--replicate 10] [--browse 3]
+        [--latency 0.01]
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+
+import scripts.collector as collector
+import scripts.shards as shards
+from scripts.lazy import find_node, open_node
+from scripts.shards import open_collection, save_collection
+from scripts.shared_reports import SharedReports
+
+
+def replicate(data, copies: int):
+    """The collection with its categories repeated `copies` times under new names."""
+    if copies <= 1:
+        return data
+    data = copy.deepcopy(data)
+    categories = list(data["hierarchy"].items())
+    for i in range(1, copies):
+        for name, node in categories:
+            data["hierarchy"][f"{name} #{i}"] = node
+    return data
+
+
+class ShardReads:
+    """Counts shard files read through shards.load_report."""
+
+    def __init__(self):
+        self.count = 0
+        self._load = shards.load_report
+
+    def __enter__(self):
+        def counted(path):
+            self.count += 1
+            return self._load(path)
+        shards.load_report = counted
+        return self
+
+    def __exit__(self, *exc):
+        shards.load_report = self._load
+
+
+def held_bytes(fn):
+    """(result, bytes still allocated once fn() returns while its result is alive)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def per_session(path: str, sessions: int, browse: list):
+    def run():
+        held = []
+        for _ in range(sessions):
+            collection = open_collection(path)
+            for category in browse:
+                collection.ensure_path([category])
+            held.append(collection)
+        return held
+    return run
+
+
+def shared_sessions(path: str, sessions: int, browse: list):
+    def run():
+        reports = SharedReports()
+        held = [path for _ in range(sessions)]
+        for report_path in held:
+            for category in browse:
+                reports.ensure(report_path, [category])
+        return reports, held
+    return run
+
+
+def concurrent_fill(warehouse, path: str, node_path: tuple, threads: int) -> int:
+    """Warehouse queries when `threads` sessions open node_path of the lazy collection at once."""
+    reports = SharedReports()
+    reports.ensure(path, list(node_path))
+    start = threading.Barrier(threads)
+    queries = warehouse.queries
+
+    def session():
+        start.wait()
+        reports.open_node(path, list(node_path), connect=warehouse.connect)
+
+    workers = [threading.Thread(target=session) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return warehouse.queries - queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared L1 report store")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--replicate", type=int, default=10, help="Copies of every category")
+    parser.add_argument("--browse", type=int, default=3, help="Categories each session opens")
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds added to every query")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale, latency=args.latency)
+    collector.get_connection = warehouse.connect
+    run_date = scale.run_dates[-1]
+
+    def collect(lazy):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return collector.collect_all_data(args.fiscal_quarter, None, run_date=run_date, checkpoint_dir=None,
+                                              lazy=lazy)
+
+    full = replicate(collect(False), args.replicate)
+    browse = list(full["hierarchy"])[:args.browse]
+    problems = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "report")
+        save_collection(full, path)
+
+        print(f"{'sessions':>9} {'store':<12}{'held MB':>9}{'shard reads':>13}")
+        shared_one = None
+        for sessions in sorted(set(args.sessions)):
+            for store, run in (("per-session", per_session(path, sessions, browse)),
+                               ("shared", shared_sessions(path, sessions, browse))):
+                with ShardReads() as reads:
+                    result, held = held_bytes(run)
+                print(f"{sessions:>9} {store:<12}{held / 1e6:>9.2f}{reads.count:>13}")
+                if store == "per-session":
+                    expected = json.dumps(result[0].data)
+                    del result
+                    continue
+                reports, held_paths = result
+                if json.dumps(reports.get(held_paths[0]).data) != expected:
+                    problems.append(f"{sessions} sessions: shared data differs from a session's own copy")
+                shared_one = shared_one or held
+                if held > shared_one * 1.1:
+                    problems.append(f"{sessions} sessions: shared store grew to {held / 1e6:.2f} MB "
+                                    f"from {shared_one / 1e6:.2f} MB")
+                del result, reports
+
+        # A collection rewritten on disk (a newer collection for the same path) is picked up
+        reports = SharedReports()
+        first = reports.get(path)
+        rewritten = copy.deepcopy(full)
+        rewritten["metadata"]["bench_marker"] = True
+        save_collection(rewritten, path)
+        if not reports.get(path).data["metadata"].get("bench_marker"):
+            problems.append("rewritten collection was not re-opened")
+        if reports.get(path) is first or reports.stats()["reopens"] != 1:
+            problems.append(f"unexpected store stats after rewrite: {reports.stats()}")
+
+        # Concurrent sessions opening the same node of a lazy collection share one fill
+        lazy = collect(True)
+        category = list(lazy["hierarchy"])[0]
+        node_path = (category,)
+        lazy_path = os.path.join(directory, "lazy")
+        save_collection(lazy, lazy_path)
+        alone_path = os.path.join(directory, "lazy_alone")
+        shutil.copytree(lazy_path, alone_path)
+        alone = open_collection(alone_path)
+        alone.ensure(category)
+        queries = warehouse.queries
+        with contextlib.redirect_stdout(io.StringIO()):
+            open_node(alone.data, node_path, alone_path, warehouse.connect)
+        alone_queries = warehouse.queries - queries
+
+        print()
+        print(f"{'node fill':<28}{'queries':>9}")
+        print(f"{'one session':<28}{alone_queries:>9}")
+        for threads in sorted(set(args.sessions)):
+            shutil.rmtree(lazy_path)
+            save_collection(lazy, lazy_path)
+            with contextlib.redirect_stdout(io.StringIO()):
+                queries = concurrent_fill(warehouse, lazy_path, node_path, threads)
+            print(f"{f'{threads} sessions at once':<28}{queries:>9}")
+            if queries > alone_queries:
+                problems.append(f"{threads} concurrent sessions ran {queries} queries, one fill needs {alone_queries}")
+            filled = open_collection(lazy_path)
+            filled.ensure(category)
+            if json.dumps(find_node(filled.data, node_path)["analysis"]) != \
+                    json.dumps(find_node(alone.data, node_path)["analysis"]):
+                problems.append(f"{threads} sessions: persisted node differs from a single fill")
+
+    print()
+    if problems:
+        print(f"❌ {len(problems)} problem(s):")
+        for p in problems[:20]:
+            print(f"   {p}")
+        sys.exit(1)
+    print("✅ Shared sessions see the same report; memory stays flat and concurrent fills run once")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+bench_l1_single_flight.py - Concurrent users asking for the same collection
+
+Simulates app users (threads) requesting uncached collections at the same
+time. First every user calls collect_all_data directly for one quarter, as
+app.load_data used to, and counts who got nothing back because the
+collection was already running. Then the same users go through
+single_flight.SingleFlight: one collection must run and every user must get
+its result. Last, users spread over several quarters check that different
+keys run side by side but never more than --max-concurrent at once.
+
+USAGE:
+    python benchmarks/bench_l1_single_flight.py [--users 6] [--quarters FY2026-Q2 FY2026-Q3 FY2026-Q4]
+        [--max-concurrent 2] [--latency 0.02]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+
+import scripts.collector as collector
+from scripts.single_flight import SingleFlight
+
+
+class Collections:
+    """collect_all_data for the benchmark, counting runs and how many overlap."""
+
+    def __init__(self, warehouse, run_date):
+        self.warehouse = warehouse
+        self.run_date = run_date
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.runs = 0
+
+    def collect(self, fiscal_quarter: str):
+        with self.lock:
+            self.runs += 1
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            return collector.collect_all_data(fiscal_quarter, None, run_date=self.run_date, engine="batch",
+                                              max_customers=0, checkpoint_dir=None)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+def run_users(requests, request):
+    """Start one thread per request at the same moment; results in request order."""
+    results = [None] * len(requests)
+    barrier = threading.Barrier(len(requests))
+
+    def user(i, fiscal_quarter):
+        barrier.wait()
+        results[i] = request(fiscal_quarter)
+
+    threads = [threading.Thread(target=user, args=(i, fq)) for i, fq in enumerate(requests)]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-flight coalescing of app collections")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--users", type=int, default=6, help="Concurrent users per scenario")
+    parser.add_argument("--quarters", nargs="+", default=["FY2026-Q2", "FY2026-Q3", "FY2026-Q4"])
+    parser.add_argument("--max-concurrent", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every query")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale, latency=args.latency)
+    collector.get_connection = warehouse.connect
+    run_date = scale.run_dates[-1]
+    same = [args.quarters[-1]] * args.users
+    spread = [args.quarters[i % len(args.quarters)] for i in range(args.users)]
+
+    print(f"{'scenario':<24}{'users':>6}{'keys':>6}{'runs':>6}{'peak':>6}{'empty':>7}{'seconds':>9}")
+    failed = False
+
+    def report(name, requests, results, seconds, collections):
+        empty = sum(1 for r in results if not r)
+        print(f"{name:<24}{len(requests):>6}{len(set(requests)):>6}{collections.runs:>6}"
+              f"{collections.peak:>6}{empty:>7}{seconds:>9.2f}")
+        return empty
+
+    collections = Collections(warehouse, run_date)
+    results, seconds = run_users(same, collections.collect)
+    report("direct, same key", same, results, seconds, collections)
+
+    collections = Collections(warehouse, run_date)
+    flights = SingleFlight(args.max_concurrent)
+    results, seconds = run_users(same, lambda fq: flights.do((fq, str(run_date), None), lambda: collections.collect(fq)))
+    empty = report("single-flight, same key", same, results, seconds, collections)
+    if empty or collections.runs != 1 or any(r is not results[0] for r in results):
+        print("   ❌ expected one collection shared by every user")
+        failed = True
+
+    collections = Collections(warehouse, run_date)
+    flights = SingleFlight(args.max_concurrent)
+    results, seconds = run_users(spread, lambda fq: flights.do((fq, str(run_date), None), lambda: collections.collect(fq)))
+    empty = report("single-flight, spread", spread, results, seconds, collections)
+    if empty or collections.runs != len(set(spread)) or collections.peak > args.max_concurrent:
+        print(f"   ❌ expected one collection per key, at most {args.max_concurrent} at once")
+        failed = True
+    by_key = {}
+    for fiscal_quarter, data in zip(spread, results):
+        if data and data["metadata"]["fiscal_quarter"] != fiscal_quarter:
+            print(f"   ❌ {fiscal_quarter} user got {data['metadata']['fiscal_quarter']}")
+            failed = True
+        if by_key.setdefault(fiscal_quarter, data) is not data:
+            print(f"   ❌ {fiscal_quarter} users got different collections")
+            failed = True
+
+    print()
+    print(f"stats: {flights.stats()}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+bench_l1_slice.py - Materialized actuals slice vs reading the snapshot table
+
+Runs the L1 collector's sql and batch engines with and without materialize
+(the run_date's CQ/PQ/PY actuals copied into a session temp table first), at
+each workers setting, checks every run produces the same JSON as the
+snapshot-reading run of its engine, and reports the speedup. With workers > 1
+every pooled connection builds its own slice, which the connections column
+shows.
+
+USAGE:
+    python benchmarks/bench_l1_slice.py [--engines sql batch] [--workers 1 4] [--latency 0.0]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+from compare import diff_reports
+
+import scripts.collector as collector
+
+
+def run(warehouse, engine: str, workers: int, materialize: bool, fiscal_quarter: str, run_date):
+    collector.get_connection = warehouse.connect
+    queries, connections = warehouse.queries, warehouse.connections
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = collector.collect_all_data(fiscal_quarter, None, run_date=run_date, engine=engine,
+                                          workers=workers, materialize=materialize, checkpoint_dir=None)
+    return {
+        "data": data,
+        "seconds": time.perf_counter() - start,
+        "queries": warehouse.queries - queries,
+        "connections": warehouse.connections - connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the materialized actuals slice in the L1 collector")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q4")
+    parser.add_argument("--engines", nargs="+", choices=["sql", "batch"], default=["sql", "batch"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="Workers settings to try")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every query")
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    warehouse = build_warehouse(scale, latency=args.latency)
+    run_date = scale.run_dates[-1]
+
+    print(f"{'engine':<8}{'workers':>8}{'slice':>7}{'seconds':>10}{'speedup':>10}{'queries':>10}{'conns':>8}  output")
+    failed = False
+    for engine in args.engines:
+        for workers in sorted(set(args.workers)):
+            baseline = run(warehouse, engine, workers, False, args.fiscal_quarter, run_date)
+            for materialize in (False, True):
+                result = run(warehouse, engine, workers, True, args.fiscal_quarter, run_date) \
+                    if materialize else baseline
+                diffs = diff_reports(baseline["data"], result["data"])
+                same_order = list(baseline["data"]["hierarchy"]) == list(result["data"]["hierarchy"])
+                ok = not diffs and same_order
+                failed = failed or not ok
+                print(
+                    f"{engine:<8}{workers:>8}{'on' if materialize else 'off':>7}{result['seconds']:>10.2f}"
+                    f"{baseline['seconds'] / result['seconds']:>9.1f}x"
+                    f"{result['queries']:>10}{result['connections']:>8}  {'same' if ok else 'DIFFERENT'}"
+                )
+                for d in diffs:
+                    print(f"   {d}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
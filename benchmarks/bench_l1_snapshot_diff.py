@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+bench_l1_snapshot_diff.py - Speed and correctness of the snapshot diff
+
+Collects one quarter from two run_date snapshots (the later one restates
+history slightly, as warehouse.py generates it), diffs them with
+snapshot_diff.diff_collections and checks every node and children_breakdown
+delta against a plain nested-dict walk. Then times the diff on the real pair
+and on copies with the categories replicated up to production hierarchy size.
+
+USAGE:
+    python benchmarks/bench_l1_snapshot_diff.py [--fiscal-quarter FY2026-Q3] [--replicate 1 50] [--repeat 5]
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import math
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "skills", "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+
+import scripts.collector as collector
+from scripts.snapshot_diff import BREAKDOWN_METRICS, SUMMARY_METRICS, diff_collections
+
+RUN_DATES = (date(2026, 1, 20), date(2026, 2, 3))
+
+
+def collect(warehouse, fiscal_quarter: str, run_date):
+    collector.get_connection = warehouse.connect
+    with contextlib.redirect_stdout(io.StringIO()):
+        return collector.collect_all_data(fiscal_quarter, None, run_date=run_date, engine="batch",
+                                          checkpoint_dir=None)
+
+
+def walk(data):
+    """{path: node} for the total and every hierarchy node, the nested-dict way."""
+    nodes = {(): data["total"]}
+
+    def visit(children, path):
+        for name, node in children.items():
+            nodes[path + (name,)] = node
+            visit(node.get("children", {}), path + (name,))
+
+    visit(data["hierarchy"], ())
+    return nodes
+
+
+def reference_deltas(before, after):
+    """(path, metric) -> delta for nodes and children rows present in both snapshots."""
+    old, new = walk(before), walk(after)
+    deltas = {}
+    for path in old.keys() & new.keys():
+        a, b = old[path]["analysis"], new[path]["analysis"]
+        for metric in SUMMARY_METRICS:
+            x, y = a["summary_kpis"].get(metric), b["summary_kpis"].get(metric)
+            deltas[("node", path, metric)] = None if x is None or y is None else y - x
+        rows_a = {r["entity"]: r for r in a.get("children_breakdown", [])}
+        rows_b = {r["entity"]: r for r in b.get("children_breakdown", [])}
+        for entity in rows_a.keys() & rows_b.keys():
+            for metric in BREAKDOWN_METRICS:
+                x, y = rows_a[entity].get(metric), rows_b[entity].get(metric)
+                deltas[("child", path + (entity,), metric)] = None if x is None or y is None else y - x
+    return deltas
+
+
+def check(diff, before, after) -> list:
+    problems = []
+    frames = {"node": diff.nodes, "child": diff.children}
+    for (kind, path, metric), want in reference_deltas(before, after).items():
+        got = frames[kind].at[path, f"{metric}_delta"]
+        if want is None:
+            if not math.isnan(got):
+                problems.append(f"{kind} {path} {metric}: {got} != NULL")
+        elif math.isnan(got) or abs(got - want) > 1e-6:
+            problems.append(f"{kind} {path} {metric}: {got} != {want}")
+    return problems
+
+
+def replicate(data, copies: int):
+    """The collection with its categories repeated `copies` times under new names."""
+    if copies <= 1:
+        return data
+    data = copy.deepcopy(data)
+    categories = list(data["hierarchy"].items())
+    for i in range(1, copies):
+        for name, node in categories:
+            data["hierarchy"][f"{name} #{i}"] = node
+    return data
+
+
+def node_count(data):
+    return len(walk(data))
+
+
+def time_diff(before, after, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        diff_collections(before, after)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and check the L1 snapshot diff")
+    parser.add_argument("--scale", choices=["small", "medium"], default="small")
+    parser.add_argument("--fiscal-quarter", default="FY2026-Q3")
+    parser.add_argument("--replicate", type=int, nargs="+", default=[1, 50],
+                        help="Copies of every category to time the diff on (50: production node count)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scale = getattr(Scale, args.scale)()
+    scale.run_dates = RUN_DATES
+    warehouse = build_warehouse(scale)
+    before = collect(warehouse, args.fiscal_quarter, RUN_DATES[0])
+    after = collect(warehouse, args.fiscal_quarter, RUN_DATES[1])
+
+    diff = diff_collections(before, after)
+    problems = check(diff, before, after)
+    print(f"{args.fiscal_quarter}: {RUN_DATES[0]} -> {RUN_DATES[1]}, nodes {diff.counts()}")
+    print(diff.restatements(limit=5).to_string(index=False))
+    print()
+
+    print(f"{'copies':>8}{'nodes':>8}{'breakdown rows':>16}{'diff ms':>10}")
+    for copies in sorted(set(args.replicate)):
+        b, a = replicate(before, copies), replicate(after, copies)
+        rows = len(diff_collections(b, a).children)
+        print(f"{copies:>8}{node_count(a):>8}{rows:>16,}{time_diff(b, a, args.repeat) * 1000:>10.0f}")
+
+    print()
+    if problems:
+        print(f"❌ {len(problems)} delta(s) differ from the nested-dict walk:")
+        for p in problems[:20]:
+            print(f"   {p}")
+        sys.exit(1)
+    print("✅ Every node and breakdown delta matches the nested-dict walk")
+
+
+if __name__ == "__main__":
+    main()
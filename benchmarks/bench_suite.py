@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+bench_suite.py - End-to-end benchmark of every collector and report generator
+
+Builds the synthetic warehouse once and runs each scenario against it: the L1
+collection (sql and batch engines) and report, the weekly metrics collection
+and HTML report, and the DCR collection and HTML report. Wall time, warehouse
+queries and connections are written to <out>/results.json together with each
+scenario's output, so a later run can be compared against it:
+
+    python benchmarks/bench_suite.py --out /tmp/bench-base          # before a change
+    python benchmarks/bench_suite.py --baseline /tmp/bench-base     # after it
+
+With --baseline, a scenario fails if it got slower than --max-slowdown or if
+its collected JSON differs from the baseline's (compare.diff_reports).
+
+USAGE:
+    python benchmarks/bench_suite.py [--scale small|medium|large] [--only l1_sql weekly_collect]
+                                     [--repeat 3] [--out DIR] [--baseline DIR]
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import duckdb
+
+SKILLS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "skills")
+sys.path.insert(0, os.path.join(SKILLS, "L1_Streamlit"))
+
+from warehouse import Scale, build_warehouse
+from compare import diff_reports
+
+import scripts.collector as collector
+import scripts.fiscal as fiscal
+import scripts.reporter as reporter
+
+
+def load_script(name: str, path: str):
+    """
+    Import a standalone skill script by path. Every skill names its package
+    'scripts', so the weekly and DCR modules cannot be imported by name next
+    to L1; their directory goes on sys.path for the `from telemetry import`
+    fallback.
+    """
+    sys.path.insert(1, os.path.dirname(path))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+weekly_collect = load_script("weekly_collect", os.path.join(
+    SKILLS, "weekly-metrics-report", "scripts", "collect_weekly_data.py"))
+weekly_report = load_script("weekly_report", os.path.join(
+    SKILLS, "weekly-metrics-report", "scripts", "generate_html_report.py"))
+dcr_collect = load_script("dcr_collect", os.path.join(
+    SKILLS, "dcr-weekly-report", "scripts", "dcr_collect_data.py"))
+dcr_report = load_script("dcr_report", os.path.join(
+    SKILLS, "dcr-weekly-report", "scripts", "dcr_generate_report.py"))
+
+
+# =============================================================================
+# SCENARIOS
+# =============================================================================
+
+class Context:
+    """Dates and paths shared by the scenarios of one suite run."""
+
+    def __init__(self, scale: Scale, out_dir: str):
+        self.out_dir = out_dir
+        self.fiscal_quarter = "FY2026-Q4"
+        self.run_date = scale.run_dates[-1]
+        # Weekly reports run on the last Sat-ending (weekly) / Sun-ending (DCR) week of data
+        self.week_end = scale.end - timedelta(days=(scale.end.weekday() + 2) % 7)
+        self.week_start = self.week_end - timedelta(days=6)
+        self.dcr_week_end = scale.end - timedelta(days=(scale.end.weekday() + 1) % 7)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.out_dir, name)
+
+
+def l1_collect(engine: str):
+    def run(ctx: Context) -> str:
+        output = ctx.path(f"l1_{engine}.json")
+        collector.collect_all_data(ctx.fiscal_quarter, output, run_date=ctx.run_date,
+                                   engine=engine, checkpoint_dir=ctx.out_dir)
+        return output
+    return run
+
+
+def l1_report(ctx: Context) -> str:
+    output = ctx.path("l1_report.html")
+    reporter.generate_report(ctx.path("l1_sql.json"), output, ctx.path("l1_report.md"))
+    return output
+
+
+def weekly_collection(ctx: Context) -> str:
+    output = ctx.path("weekly.json")
+    weekly_collect.collect_all_data(str(ctx.week_start), str(ctx.week_end), output)
+    return output
+
+
+def weekly_html(ctx: Context) -> str:
+    output = ctx.path("weekly_report.html")
+    weekly_report.generate_report(ctx.path("weekly.json"), output, str(ctx.week_start), str(ctx.week_end))
+    return output
+
+
+def dcr_collection(ctx: Context) -> str:
+    output = ctx.path("dcr.json")
+    dcr_collect.main(SimpleNamespace(week_end=str(ctx.dcr_week_end), output=output, trace=False))
+    return output
+
+
+def dcr_html(ctx: Context) -> str:
+    output = ctx.path("dcr_report.html")
+    dcr_report.generate_report(ctx.path("dcr.json"), output)
+    return output
+
+
+# Run in this order: each report reads the JSON its collection wrote
+SCENARIOS = {
+    "l1_sql": l1_collect("sql"),
+    "l1_batch": l1_collect("batch"),
+    "l1_report": l1_report,
+    "weekly_collect": weekly_collection,
+    "weekly_report": weekly_html,
+    "dcr_collect": dcr_collection,
+    "dcr_report": dcr_html,
+}
+REPORT_INPUTS = {"l1_report": "l1_sql", "weekly_report": "weekly_collect", "dcr_report": "dcr_collect"}
+
+# Slowdowns smaller than this are timer noise, whatever the percentage
+NOISE_SECONDS = 0.1
+
+
+def run_scenario(warehouse, ctx: Context, name: str, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        queries, connections = warehouse.queries, warehouse.connections
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            output = SCENARIOS[name](ctx)
+        times.append(time.perf_counter() - start)
+    return {
+        "seconds": round(min(times), 4),
+        "runs": [round(t, 4) for t in times],
+        "queries": warehouse.queries - queries,
+        "connections": warehouse.connections - connections,
+        "output": os.path.basename(output),
+        "bytes": os.path.getsize(output),
+    }
+
+
+# =============================================================================
+# BASELINE COMPARISON
+# =============================================================================
+
+def compare_to_baseline(results: dict, out_dir: str, baseline_dir: str, max_slowdown: float) -> list:
+    """Regressions against a baseline suite run: slowdowns and changed collected JSON."""
+    with open(os.path.join(baseline_dir, "results.json")) as f:
+        baseline = json.load(f)
+    if baseline["scale"] != results["scale"]:
+        print(f"WARNING: Baseline was run at a different scale: {baseline['scale']}")
+
+    problems = []
+    print(f"{'scenario':<16}{'seconds':>10}{'baseline':>10}{'change':>9}{'queries':>9}{'baseline':>10}")
+    for name, current in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            print(f"{name:<16}{current['seconds']:>10.2f}{'-':>10}{'-':>9}{current['queries']:>9}{'-':>10}")
+            continue
+        change = current["seconds"] / base["seconds"] - 1 if base["seconds"] else 0.0
+        print(f"{name:<16}{current['seconds']:>10.2f}{base['seconds']:>10.2f}{change:>+9.0%}"
+              f"{current['queries']:>9}{base['queries']:>10}")
+        if change > max_slowdown and current["seconds"] - base["seconds"] > NOISE_SECONDS:
+            problems.append(f"{name}: {change:+.0%} slower than baseline (limit {max_slowdown:+.0%})")
+        if current["output"].endswith(".json"):
+            with open(os.path.join(out_dir, current["output"])) as f:
+                new = json.load(f)
+            with open(os.path.join(baseline_dir, base["output"])) as f:
+                old = json.load(f)
+            problems.extend(f"{name}: {d}" for d in diff_reports(old, new)[:10])
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every collector and report generator locally")
+    parser.add_argument("--scale", choices=["small", "medium", "large"], default="small")
+    parser.add_argument("--only", nargs="+", choices=list(SCENARIOS), help="Scenarios to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario; the fastest is recorded")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds injected per query")
+    parser.add_argument("--out", help="Directory for results.json and scenario outputs (default: a temp dir)")
+    parser.add_argument("--baseline", help="Directory of an earlier --out to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=0.25,
+                        help="Allowed slowdown vs the baseline before a scenario fails (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    names = [n for n in SCENARIOS if not args.only or n in args.only]
+    for name in names:
+        needed = REPORT_INPUTS.get(name)
+        if needed and needed not in names:
+            parser.error(f"{name} reads the output of {needed}; add it to --only")
+
+    scale = getattr(Scale, args.scale)()
+    start = time.perf_counter()
+    # CURRENT_DATE is pinned to the last day of data so date-relative queries are repeatable
+    warehouse = build_warehouse(scale, latency=args.latency, today=scale.end)
+    build_seconds = time.perf_counter() - start
+    print(f"Built {args.scale} warehouse in {build_seconds:.1f}s")
+    for module in (collector, weekly_collect, dcr_collect):
+        module.get_connection = warehouse.connect
+
+    out_dir = args.out or tempfile.mkdtemp(prefix="bench_suite_")
+    os.makedirs(out_dir, exist_ok=True)
+    # Each skill's fiscal calendar (weekly and DCR share one module): fresh cache, same pinned today
+    calendars = {sys.modules[f.__module__] for f in (fiscal.load_calendar, weekly_collect.load_calendar,
+                                                      dcr_collect.load_calendar)}
+    for calendar in calendars:
+        calendar.CACHE_DIR = tempfile.mkdtemp(prefix="bench_calendar_")
+        calendar.today = lambda: scale.end
+    ctx = Context(scale, out_dir)
+
+    results = {
+        "scale": json.loads(json.dumps(asdict(scale), default=str)),
+        "latency": args.latency,
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "duckdb": duckdb.__version__,
+        "build_seconds": round(build_seconds, 2),
+        "scenarios": {},
+    }
+    for name in names:
+        results["scenarios"][name] = result = run_scenario(warehouse, ctx, name, args.repeat)
+        print(f"  {name:<16}{result['seconds']:>8.2f}s{result['queries']:>6} queries")
+
+    with open(os.path.join(out_dir, "results.json"), "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {os.path.join(out_dir, 'results.json')}")
+
+    if args.baseline:
+        print()
+        problems = compare_to_baseline(results, out_dir, args.baseline, args.max_slowdown)
+        print()
+        if problems:
+            print("❌ Regressions against the baseline:")
+            for p in problems:
+                print(f"   {p}")
+            sys.exit(1)
+        print("✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+compare.py - Report comparison helpers shared by the benchmarks
+
+Two collections of the same data can legitimately differ in row order for
+ORDER BY ties and in the last digit of a ROUND() when float sums run in a
+different order; everything else must match exactly, including value types.
+"""
+
+import math
+
+
+def _row_identity(row):
+    """Sort key for a result row: its non-numeric fields (entity, customer, day...)."""
+    if isinstance(row, dict):
+        return repr(sorted((k, v) for k, v in row.items() if not isinstance(v, (int, float))))
+    return repr(row)
+
+
+def _canonical(value):
+    """Order-insensitive form of a report (ties in ORDER BY are engine-dependent)."""
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in value.items() if k != "generated_at"}
+    if isinstance(value, list):
+        return sorted((_canonical(v) for v in value), key=_row_identity)
+    return value
+
+
+def _close(key, a, b) -> bool:
+    """
+    Numbers match if they agree after rounding noise: float sums in a different
+    order can flip a ROUND(x, 0) at .5 or a ROUND(x, 2) at .005.
+    """
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, (int, float)):
+        tolerance = 0.011 if str(key).endswith("pct") else 1.0
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=tolerance)
+    return a == b
+
+
+def diff_reports(left, right, path="$", limit=10):
+    """Return a list of human-readable differences between two reports."""
+    diffs = []
+
+    def walk(a, b, where, key=None):
+        if len(diffs) >= limit:
+            return
+        if isinstance(a, dict) and isinstance(b, dict):
+            for key in sorted(set(a) | set(b), key=str):
+                if key not in a or key not in b:
+                    diffs.append(f"{where}.{key}: missing on one side")
+                else:
+                    walk(a[key], b[key], f"{where}.{key}", key)
+        elif isinstance(a, list) and isinstance(b, list):
+            if len(a) != len(b):
+                diffs.append(f"{where}: {len(a)} rows vs {len(b)} rows")
+            for i, (x, y) in enumerate(zip(a, b)):
+                walk(x, y, f"{where}[{i}]")
+        elif not _close(key, a, b):
+            diffs.append(f"{where}: {a!r} != {b!r}")
+
+    walk(_canonical(left), _canonical(right), path)
+    return diffs
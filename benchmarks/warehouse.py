@@ -0,0 +1,651 @@
+"""
+warehouse.py - Local DuckDB Stand-in for the Finance Warehouse
+
+Builds synthetic copies of the tables the collectors read and exposes them
+through a connection object with the same cursor API the skills use
+(cursor().execute / description / fetchall / fetch_arrow_all /
+fetch_arrow_batches / close, plus execute_async / get_results_from_sfqid and
+the connection's query status calls), so collectors can be run and timed
+without Snowflake access. CREATE TEMPORARY TABLE is private to the connection
+that ran it, like a Snowflake session's.
+
+TABLES:
+    finance.customer.product_category_revenue_snapshot   (L1 ACTUALS_TABLE)
+    finance.dev_sensitive.achatlani_nov_plan_final        (L1 PLAN_TABLE)
+    finance.stg_utils.stg_fiscal_calendar                 (CALENDAR_TABLE)
+    finance.customer.fy26_product_category_revenue        (weekly + DCR actuals)
+    finance.customer.temp_product_category_revenue_plan, product_category_most_recent_plan,
+    product_category_rev_actuals_w_forecast_sfdc, catalyst_revenue_reporting,
+    finance.prep_customer.product_feature_forecast_aligned_view,
+    finance.raw_google_sheets.fy_26_product_category_feature_targets   (weekly)
+    snowscience.cleanrooms.*, snowscience.snowservices.*                 (DCR)
+
+USAGE:
+    from warehouse import build_warehouse
+    wh = build_warehouse(Scale.small())
+    conn = wh.connect()
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Iterator, List, Optional, Tuple
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+# =============================================================================
+# SCALE
+# =============================================================================
+
+@dataclass
+class Scale:
+    """Size of the synthetic dataset."""
+    categories: int = 4
+    use_cases_per_category: int = 3
+    features_per_use_case: int = 3
+    customers: int = 300
+    features_per_customer: int = 4
+    start: date = date(2024, 2, 1)
+    end: date = date(2026, 1, 31)
+    run_dates: Tuple[date, ...] = (date(2026, 2, 3),)
+    seed: int = 7
+
+    @classmethod
+    def small(cls) -> "Scale":
+        return cls()
+
+    @classmethod
+    def medium(cls) -> "Scale":
+        return cls(categories=10, use_cases_per_category=4, features_per_use_case=5,
+                   customers=2_000, features_per_customer=6)
+
+    @classmethod
+    def large(cls) -> "Scale":
+        """Production-sized: 50 categories, 2,000 features, 50k customers, 2 years."""
+        return cls(categories=50, use_cases_per_category=8, features_per_use_case=5,
+                   customers=50_000, features_per_customer=2)
+
+
+# =============================================================================
+# SQL DIALECT SHIM
+# =============================================================================
+
+# Snowflake functions that DuckDB lacks or types differently (both return DATE)
+MACROS = [
+    "CREATE MACRO date_trunc_d(part, d) AS CAST(date_trunc(part, d) AS DATE)",
+    """CREATE MACRO dateadd(part, n, d) AS CAST(CASE lower(part)
+        WHEN 'day' THEN d + to_days(CAST(n AS INTEGER))
+        WHEN 'week' THEN d + to_days(CAST(n AS INTEGER) * 7)
+        WHEN 'month' THEN d + to_months(CAST(n AS INTEGER))
+        WHEN 'year' THEN d + to_years(CAST(n AS INTEGER))
+    END AS DATE)""",
+    "CREATE MACRO iff(c, a, b) AS CASE WHEN c THEN a ELSE b END",
+    "CREATE MACRO div0(a, b) AS CASE WHEN b = 0 THEN 0 ELSE a / b END",
+    "CREATE MACRO to_date(d) AS CAST(d AS DATE)",
+    # Snowflake takes (value, array); DuckDB's array_contains takes (list, value)
+    "CREATE MACRO sf_array_contains(x, arr) AS list_contains(arr, x)",
+]
+
+# (pattern, replacement) pairs applied in order
+_REWRITES = [
+    (re.compile(r"\bDATE_TRUNC\s*\(", re.IGNORECASE), "date_trunc_d("),
+    (re.compile(r"\bDATEADD\s*\(\s*(year|month|week|day)\s*,", re.IGNORECASE), r"dateadd('\1',"),
+    (re.compile(r"\bARRAY_CONTAINS\s*\(", re.IGNORECASE), "sf_array_contains("),
+    (re.compile(r"\bARRAY_UNIQUE_AGG\s*\(", re.IGNORECASE), "list(DISTINCT "),
+    (re.compile(r"\bARRAY_UNION_AGG\s*\(([^()]*)\)", re.IGNORECASE), r"list_distinct(flatten(list(\1)))"),
+    # Order-independent like Snowflake's HASH_AGG (arguments must be plain columns)
+    (re.compile(r"\bHASH_AGG\s*\(([^()]*)\)", re.IGNORECASE), r"SUM(hash(\1))"),
+    (re.compile(r"\bCOUNT\s*\(\s*DISTINCT\s+([^(),]+),\s*([^(),]+)\)", re.IGNORECASE), r"COUNT(DISTINCT (\1, \2))"),
+    (re.compile(r"\bTABLE\s*\(\s*GENERATOR\s*\(\s*ROWCOUNT\s*=>\s*(\d+)\s*\)\s*\)", re.IGNORECASE),
+     r"range(\1) AS _generator(seq4)"),
+    (re.compile(r"\bseq4\s*\(\s*\)", re.IGNORECASE), "seq4"),
+    (re.compile(r"::\s*NUMBER\b", re.IGNORECASE), "::BIGINT"),
+    (re.compile(r"::\s*VARIANT\b", re.IGNORECASE), ""),
+    (re.compile(r"\bCURRENT_TIMESTAMP\s*\(\s*\)", re.IGNORECASE), "CURRENT_TIMESTAMP"),
+]
+_CURRENT_DATE = re.compile(r"\bCURRENT_DATE\b(\s*\(\s*\))?", re.IGNORECASE)
+_USE_STATEMENT = re.compile(r"^\s*USE\s+(WAREHOUSE|ROLE|DATABASE|SCHEMA)\b", re.IGNORECASE)
+_TEMP_TABLE = re.compile(r"\bCREATE\s+(?:OR\s+REPLACE\s+)?TEMP(?:ORARY)?\s+TABLE\s+([\w.]+)", re.IGNORECASE)
+
+_TOKEN = re.compile(r"'[^']*'|\(|\)|,|\bSELECT\b|\bFROM\b|\bGROUP\s+BY\s+ALL\b", re.IGNORECASE)
+_AGGREGATE = re.compile(r"\b(SUM|COUNT|AVG|MIN|MAX|ANY_VALUE|MEDIAN|LIST)\s*\(|\bOVER\s*\(", re.IGNORECASE)
+_ALIAS = re.compile(r"\s+AS\s+(\w+)\s*$", re.IGNORECASE)
+
+
+def _expand_group_by_all(sql: str) -> str:
+    """
+    Spell out GROUP BY ALL as column positions where the select list has a
+    window function: DuckDB tries to group on those, Snowflake skips them.
+    Keys are the items with no aggregate, no window and no reference to an
+    earlier alias (Snowflake lets a select item use one).
+    """
+    selects: List[Tuple[int, int]] = []   # (depth, end of SELECT keyword)
+    pieces, last = [], 0
+    depth = 0
+    for token in _TOKEN.finditer(sql):
+        text = token.group().upper()
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        elif text == "SELECT":
+            selects.append((depth, token.end()))
+        elif text.startswith("GROUP"):
+            start = next(end for d, end in reversed(selects) if d == depth)
+            items = _select_items(sql, start)
+            if not any(re.search(r"\bOVER\s*\(", item, re.IGNORECASE) for item in items):
+                continue
+            keys, aliases = [], []
+            for i, item in enumerate(items, 1):
+                refs_alias = any(re.search(rf"\b{a}\b", item, re.IGNORECASE) for a in aliases)
+                if not _AGGREGATE.search(item) and not refs_alias:
+                    keys.append(str(i))
+                alias = _ALIAS.search(item)
+                if alias:
+                    aliases.append(alias.group(1))
+            pieces.append(sql[last:token.start()] + f"GROUP BY {', '.join(keys)}")
+            last = token.end()
+    return "".join(pieces) + sql[last:]
+
+
+def _select_items(sql: str, start: int) -> List[str]:
+    """Top-level comma-separated items of the select list starting at `start`."""
+    items, depth, begin = [], 0, start
+    for token in _TOKEN.finditer(sql, start):
+        text = token.group().upper()
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        elif depth == 0 and text == ",":
+            items.append(sql[begin:token.start()].strip())
+            begin = token.end()
+        elif depth == 0 and text == "FROM":
+            break
+    items.append(sql[begin:token.start()].strip())
+    return items
+
+
+def translate(query: str, today: Optional[date] = None) -> Optional[str]:
+    """
+    Rewrite Snowflake SQL for DuckDB. Returns None for session no-ops.
+    With `today`, CURRENT_DATE is pinned so date-relative queries are repeatable.
+    """
+    if _USE_STATEMENT.match(query):
+        return None
+    for pattern, replacement in _REWRITES:
+        query = pattern.sub(replacement, query)
+    query = _CURRENT_DATE.sub(f"DATE '{today}'" if today else "CURRENT_DATE", query)
+    return _expand_group_by_all(query)
+
+
+# Async queries the stand-in runs at once (a warehouse's concurrency level)
+ASYNC_WORKERS = 8
+
+
+class LocalCursor:
+    """Snowflake-cursor lookalike over a DuckDB cursor."""
+
+    def __init__(self, warehouse: "LocalWarehouse", session: Optional["LocalConnection"] = None):
+        self._warehouse = warehouse
+        self._session = session
+        self._cursor = warehouse.db.cursor()
+        self.description: Optional[List[Tuple]] = None
+        self.sfqid: Optional[str] = None
+        self.rowcount: Optional[int] = None
+
+    def execute(self, query: str) -> "LocalCursor":
+        self.sfqid = self._warehouse.next_query_id()
+        self._use(self._warehouse.run(query, self._cursor, self._session))
+        return self
+
+    def execute_async(self, query: str) -> dict:
+        """Start the query on a warehouse thread; poll it through the connection."""
+        self.sfqid = self._warehouse.submit(query, self._session)
+        return {"queryId": self.sfqid}
+
+    def get_results_from_sfqid(self, sfqid: str) -> None:
+        """Attach the finished result of an execute_async query to this cursor."""
+        self.sfqid = sfqid
+        cursor = self._warehouse.job(sfqid).result()
+        if cursor is not None:
+            self._cursor.close()
+            self._cursor = cursor
+        self._use(cursor)
+
+    def _use(self, cursor: Optional[duckdb.DuckDBPyConnection]) -> None:
+        # None: a statement translate() skips, answered like Snowflake's status row
+        self.description = cursor.description if cursor is not None else [("status",)]
+
+    def fetchall(self) -> List[Tuple]:
+        if self.description == [("status",)]:
+            return [("Statement executed successfully.",)]
+        rows = self._cursor.fetchall()
+        self.rowcount = len(rows)
+        return rows
+
+    def fetch_arrow_all(self) -> Optional[pa.Table]:
+        """Whole result as one Arrow table, or None when it is empty (like the connector)."""
+        table = self._cursor.fetch_arrow_table()
+        self.rowcount = table.num_rows
+        return table if table.num_rows else None
+
+    def fetch_arrow_batches(self) -> Iterator[pa.Table]:
+        """Arrow result batches, like SnowflakeCursor.fetch_arrow_batches()."""
+        for batch in self._cursor.to_arrow_reader():
+            yield pa.Table.from_batches([batch])
+
+    def fetchone(self) -> Optional[Tuple]:
+        rows = self.fetchall()
+        return rows[0] if rows else None
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class LocalConnection:
+    """Snowflake-connection lookalike handed to collectors in place of get_connection()."""
+
+    # Keeps on-disk caches keyed by account (results, fiscal calendar) apart from Snowflake's
+    account = "local-duckdb"
+
+    def __init__(self, warehouse: "LocalWarehouse"):
+        self._warehouse = warehouse
+        self._closed = False
+        self._temp_tables: List[str] = []
+        with warehouse._lock:
+            warehouse.connections += 1
+            self.session_id = warehouse.connections
+        if warehouse.connect_latency:
+            time.sleep(warehouse.connect_latency)
+
+    def cursor(self) -> LocalCursor:
+        return LocalCursor(self._warehouse, self)
+
+    def session_sql(self, sql: str) -> str:
+        """
+        Give this session's temporary tables session-unique names: DuckDB's
+        own temp tables belong to one DuckDB cursor, and every LocalCursor has
+        its own.
+        """
+        match = _TEMP_TABLE.search(sql)
+        if match:
+            if match.group(1) not in self._temp_tables:
+                self._temp_tables.append(match.group(1))
+            sql = f"{sql[:match.start()]}CREATE OR REPLACE TABLE {match.group(1)}{sql[match.end():]}"
+        for name in self._temp_tables:
+            sql = re.sub(rf"(?<![\w.]){re.escape(name)}\b", f"{name}__s{self.session_id}", sql)
+        return sql
+
+    def get_query_status_throw_if_error(self, sfqid: str) -> str:
+        """'RUNNING' or 'SUCCESS'; raises the query's error if it failed."""
+        job = self._warehouse.job(sfqid)
+        if not job.done():
+            return "RUNNING"
+        job.result()
+        return "SUCCESS"
+
+    def is_still_running(self, status: str) -> bool:
+        return status == "RUNNING"
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        self._closed = True
+        cursor = self._warehouse.db.cursor()
+        for name in self._temp_tables:
+            cursor.execute(f"DROP TABLE IF EXISTS {name}__s{self.session_id}")
+        cursor.close()
+
+
+class LocalWarehouse:
+    """A DuckDB database holding the synthetic finance tables."""
+
+    def __init__(
+        self,
+        db: duckdb.DuckDBPyConnection,
+        latency: float = 0.0,
+        connect_latency: float = 0.0,
+        today: Optional[date] = None,
+    ):
+        self.db = db
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.today = today
+        self.queries = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._jobs: dict = {}
+        self._async_pool: Optional[ThreadPoolExecutor] = None
+
+    def next_query_id(self) -> str:
+        with self._lock:
+            self.queries += 1
+            return f"local-{self.queries:06d}"
+
+    def run(
+        self,
+        query: str,
+        cursor: Optional[duckdb.DuckDBPyConnection] = None,
+        session: Optional[LocalConnection] = None,
+    ):
+        """Run a query on a DuckDB cursor (a new one by default); None for skipped statements."""
+        if self.latency:
+            time.sleep(self.latency)
+        sql = translate(query, self.today)
+        if sql is None:
+            return None
+        if session is not None:
+            sql = session.session_sql(sql)
+        cursor = cursor or self.db.cursor()
+        cursor.execute(sql)
+        return cursor
+
+    def submit(self, query: str, session: Optional[LocalConnection] = None) -> str:
+        """Start a query in the background (execute_async) and return its query id."""
+        sfqid = self.next_query_id()
+        with self._lock:
+            if self._async_pool is None:
+                self._async_pool = ThreadPoolExecutor(max_workers=ASYNC_WORKERS, thread_name_prefix="warehouse")
+            self._jobs[sfqid] = self._async_pool.submit(self.run, query, None, session)
+        return sfqid
+
+    def job(self, sfqid: str) -> Future:
+        """The background run of an execute_async query."""
+        with self._lock:
+            return self._jobs[sfqid]
+
+    def connect(self, *args: Any, **kwargs: Any) -> LocalConnection:
+        """Drop-in replacement for db.get_connection()."""
+        return LocalConnection(self)
+
+
+# =============================================================================
+# SYNTHETIC DATA
+# =============================================================================
+
+INDUSTRIES = ["Financial Services", "Healthcare", "Retail", "Technology", "Media", None]
+AGREEMENTS = ["Capacity", "Capacity", "Capacity", "On Demand"]
+DCR_FEATURE = "Data Clean Room"
+ACCOUNT_TYPES = ["Customer", "Customer", "Customer", "Customer", "Partner", "Internal"]
+DEPLOYMENTS = ["aws_us_west_2", "aws_us_east_1", "azure_eastus2"]
+JOB_BUCKETS = ["Overlap Analysis", "Activation", "Custom Template", "ML Lookalike", "Provider Run"]
+# Days of clean room activity generated before scale.end
+DCR_HISTORY_DAYS = 180
+
+
+def _fiscal_calendar(start: date, end: date) -> pd.DataFrame:
+    """Snowflake fiscal calendar: FY runs Feb 1 - Jan 31, named by its end year."""
+    days = pd.date_range(start, end, freq="D")
+    fiscal_month = (days.month - 2) % 12
+    fiscal_year = days.year + (days.month >= 2).astype(int)
+    quarter = fiscal_month // 3 + 1
+    labels = [f"FY{y}-Q{q}" for y, q in zip(fiscal_year, quarter)]
+    frame = pd.DataFrame({
+        "_date": days.date,
+        "fiscal_quarter_fyyyyy_qq": labels,
+        "fiscal_quarter_qq_fyyyyy": [f"Q{q}-FY{y}" for y, q in zip(fiscal_year, quarter)],
+        "fiscal_year_fyyyyy": [f"FY{y}" for y in fiscal_year],
+    })
+    for period, column in (("quarter", "fiscal_quarter_fyyyyy_qq"), ("year", "fiscal_year_fyyyyy")):
+        bounds = frame.groupby(column)["_date"].agg(["min", "max"])
+        frame[f"fiscal_{period}_start"] = frame[column].map(bounds["min"])
+        frame[f"fiscal_{period}_end"] = frame[column].map(bounds["max"])
+    return frame
+
+
+def _hierarchy(scale: Scale) -> pd.DataFrame:
+    rows = []
+    for c in range(scale.categories):
+        for u in range(scale.use_cases_per_category):
+            for f in range(scale.features_per_use_case):
+                rows.append((f"Category {c:02d}", f"Use Case {c:02d}.{u}", f"Feature {c:02d}.{u}.{f}"))
+    # The DCR report filters on this feature name
+    rows[0] = rows[0][:2] + (DCR_FEATURE,)
+    return pd.DataFrame(rows, columns=["product_category", "use_case", "feature"])
+
+
+def generate_tables(scale: Scale) -> dict:
+    """Generate actuals, plan and calendar frames at the requested scale."""
+    rng = np.random.default_rng(scale.seed)
+    features = _hierarchy(scale)
+    days = pd.date_range(scale.start, scale.end, freq="D")
+
+    customers = pd.DataFrame({
+        "latest_salesforce_account_name": [f"Customer {i:05d}" for i in range(scale.customers)],
+        "industry_rollup": rng.choice(np.array(INDUSTRIES, dtype=object), scale.customers),
+        "agreement_type": rng.choice(AGREEMENTS, scale.customers),
+        "size": rng.pareto(1.2, scale.customers) * 200 + 10,
+        "growth": rng.normal(0.0015, 0.002, scale.customers),
+        "onboard": rng.integers(0, len(days) - 30, scale.customers),
+    })
+    # A few unattributed rows exercise the NULL-customer code paths
+    customers.loc[customers.index[-1], "latest_salesforce_account_name"] = None
+
+    links = pd.DataFrame({
+        "customer": np.repeat(np.arange(scale.customers), scale.features_per_customer),
+        "feature": rng.integers(0, len(features), scale.customers * scale.features_per_customer),
+    }).drop_duplicates()
+
+    day_index = np.arange(len(days))
+    cust = customers.iloc[links["customer"].to_numpy()].reset_index(drop=True)
+    rows = pd.DataFrame({
+        "link": np.repeat(np.arange(len(links)), len(days)),
+        "day": np.tile(day_index, len(links)),
+    })
+    rows = rows[rows["day"].to_numpy() >= cust["onboard"].to_numpy()[rows["link"].to_numpy()]]
+    link_ids = rows["link"].to_numpy()
+    day_ids = rows["day"].to_numpy()
+    base = cust["size"].to_numpy()[link_ids] * np.exp(cust["growth"].to_numpy()[link_ids] * day_ids)
+    revenue = np.round(base * rng.lognormal(0, 0.25, len(rows)), 2)
+
+    feat = features.iloc[links["feature"].to_numpy()[link_ids]].reset_index(drop=True)
+    meta = cust.iloc[link_ids].reset_index(drop=True)
+    daily = pd.DataFrame({
+        "ds": days.date[day_ids],
+        "product_category": feat["product_category"],
+        "use_case": feat["use_case"],
+        "feature": feat["feature"],
+        "latest_salesforce_account_name": meta["latest_salesforce_account_name"],
+        "industry_rollup": meta["industry_rollup"],
+        "agreement_type": meta["agreement_type"],
+        "revenue": revenue * 0.9,
+        "product_led_revenue": revenue * 0.1,
+    })
+
+    snapshots = []
+    for i, run_date in enumerate(sorted(scale.run_dates)):
+        snap = daily[daily["ds"] < run_date].copy()
+        # Later snapshots restate a slice of history
+        snap["revenue"] = snap["revenue"] * (1 + 0.001 * i)
+        snap.insert(1, "run_date", run_date)
+        snapshots.append(snap)
+    actuals = pd.concat(snapshots, ignore_index=True)
+
+    plan = daily[["ds", "product_category", "use_case", "feature",
+                  "latest_salesforce_account_name", "industry_rollup"]].copy()
+    plan = plan.rename(columns={"latest_salesforce_account_name": "salesforce_account_name"})
+    plan["revenue"] = np.round((daily["revenue"] + daily["product_led_revenue"]).to_numpy()
+                               * rng.normal(1.0, 0.08, len(daily)), 2)
+    plan = plan[plan["ds"] >= date(2025, 2, 1)]
+
+    calendar = _fiscal_calendar(date(scale.start.year - 1, 2, 1), date(scale.end.year + 1, 1, 31))
+    return {
+        "finance.customer.product_category_revenue_snapshot": actuals,
+        "finance.dev_sensitive.achatlani_nov_plan_final": plan,
+        "finance.stg_utils.stg_fiscal_calendar": calendar,
+        **_weekly_tables(daily, plan, calendar, rng),
+        **_cleanroom_tables(scale, customers, rng),
+    }
+
+
+def _weekly_tables(daily: pd.DataFrame, plan: pd.DataFrame, calendar: pd.DataFrame, rng) -> dict:
+    """Latest actuals, plans, forecasts and targets read by the weekly and DCR collectors."""
+    by_category = daily.groupby(["ds", "product_category"], as_index=False)["revenue"].sum()
+
+    # One forecast per month from Aug 2025: the realized series with noise after the run date
+    forecasts = []
+    for run_date in pd.date_range("2025-08-04", daily["ds"].max(), freq="MS").date:
+        future = by_category[by_category["ds"] > run_date]
+        forecasts.append(pd.DataFrame({
+            "forecast_run_date": run_date,
+            "calendar_date": future["ds"],
+            "product_category": future["product_category"],
+            "revenue": np.round(future["revenue"].to_numpy() * rng.normal(1.0, 0.05, len(future)), 2),
+        }))
+
+    quarters = calendar.set_index("_date")["fiscal_quarter_fyyyyy_qq"]
+    targets = daily.assign(fiscal_quarter_fyyyyy_qq=daily["ds"].map(quarters))
+    targets = targets.groupby(["fiscal_quarter_fyyyyy_qq", "product_category", "feature"], as_index=False)["revenue"].sum()
+    targets["target_revenue"] = np.round(targets.pop("revenue") * 1.05, 2)
+
+    days = np.sort(daily["ds"].unique())
+    return {
+        "finance.customer.fy26_product_category_revenue": daily,
+        "finance.customer.temp_product_category_revenue_plan": plan.groupby(
+            ["ds", "product_category", "use_case", "feature"], as_index=False
+        )["revenue"].sum().rename(columns={"ds": "general_date"}),
+        "finance.customer.product_category_most_recent_plan": plan[
+            ["ds", "feature", "salesforce_account_name", "revenue"]
+        ].rename(columns={"revenue": "plan_revenue"}),
+        "finance.customer.product_category_rev_actuals_w_forecast_sfdc": by_category.assign(
+            ds=pd.to_datetime(by_category["ds"])
+        ).rename(columns={"ds": "usage_date"}),
+        "finance.prep_customer.product_feature_forecast_aligned_view": pd.concat(forecasts, ignore_index=True),
+        "finance.customer.catalyst_revenue_reporting": pd.DataFrame({
+            "usage_day": days,
+            "catalyst_revenue": np.round(rng.gamma(4.0, 250.0, len(days)), 2),
+        }),
+        "finance.raw_google_sheets.fy_26_product_category_feature_targets": targets,
+    }
+
+
+def _cleanroom_tables(scale: Scale, customers: pd.DataFrame, rng) -> dict:
+    """Clean room accounts, jobs, edges and SPCS credits for the DCR collector."""
+    n = max(20, scale.customers // 20)
+    ids = [f"SF{i:06d}" for i in range(n)]
+    ids[-1] = ""  # Unattributed account, filtered out by every DCR query
+    accounts = pd.DataFrame({
+        "snowflake_account_id": [f"ACC{i:06d}" for i in range(n)],
+        "snowflake_deployment": rng.choice(DEPLOYMENTS, n),
+        "salesforce_account_id": ids,
+        "salesforce_account_name": customers["latest_salesforce_account_name"].iloc[:n].fillna("Unknown").to_numpy(),
+        "snowflake_account_type": rng.choice(ACCOUNT_TYPES, n),
+    })
+
+    days = pd.date_range(scale.end - timedelta(days=DCR_HISTORY_DAYS - 1), scale.end, freq="D").date
+    active = rng.random((len(days), n)) < rng.uniform(0.05, 0.6, n)
+    day_ids, account_ids = np.nonzero(active)
+    jobs_per_day = rng.integers(1, 4, len(day_ids))
+    day_ids, account_ids = np.repeat(day_ids, jobs_per_day), np.repeat(account_ids, jobs_per_day)
+    acct = accounts.iloc[account_ids].reset_index(drop=True)
+    job_ids = [f"job-{i:08d}" for i in range(len(day_ids))]
+    credits = np.round(rng.gamma(2.0, 1.5, len(day_ids)), 4)
+
+    consumption = pd.DataFrame({
+        "ds": days[day_ids],
+        "salesforce_account_id": acct["salesforce_account_id"],
+        "salesforce_account_name": acct["salesforce_account_name"],
+        "snowflake_account_type": acct["snowflake_account_type"],
+        "job_bucket": rng.choice(JOB_BUCKETS, len(day_ids)),
+        "job_credits": credits,
+        "job_id": job_ids,
+        "deployment": acct["snowflake_deployment"],
+        "account_id": acct["snowflake_account_id"],
+    })
+    spcs_direct = consumption.groupby(
+        ["ds", "salesforce_account_id", "snowflake_account_type"], as_index=False
+    )["job_credits"].sum().rename(columns={"job_credits": "spcs_direct_credits"})
+    spcs_direct["spcs_direct_credits"] = np.round(spcs_direct["spcs_direct_credits"] * 0.3, 4)
+
+    providers = accounts["salesforce_account_name"].to_numpy()[rng.integers(0, n, len(day_ids))]
+    analysis_jobs = consumption[["ds", "salesforce_account_id", "salesforce_account_name",
+                                 "snowflake_account_type", "deployment"]].copy()
+    analysis_jobs["providers"] = [[p] for p in providers]
+    analysis_jobs["total_credits"] = credits
+    analysis_jobs["detailed_analysis_type"] = consumption["job_bucket"]
+    analysis_jobs["application_id"] = [f"app-{i % 7}" for i in range(len(day_ids))]
+    analysis_jobs["cleanroom_id"] = [f"cr-{a % 50:03d}" for a in account_ids]
+    analysis_jobs["database_name"] = [[f"DB_{a % 13}", "SAMOOHA_SAMPLE_DATABASE"] for a in account_ids]
+    analysis_jobs["root_uuid"] = job_ids
+    analysis_jobs["sproc_errored"] = rng.random(len(day_ids)) < 0.05
+
+    pairs = rng.integers(0, n, (n * 2, 2))
+    edges = pd.DataFrame({
+        "ds": scale.end,
+        "edge_id": [f"edge-{i:05d}" for i in range(len(pairs))],
+        "provider_account_id": accounts["snowflake_account_id"].to_numpy()[pairs[:, 0]],
+        "provider_deployment": accounts["snowflake_deployment"].to_numpy()[pairs[:, 0]],
+        "consumer_account_id": accounts["snowflake_account_id"].to_numpy()[pairs[:, 1]],
+        "consumer_deployment": accounts["snowflake_deployment"].to_numpy()[pairs[:, 1]],
+        "associated_stable_edge": rng.random(len(pairs)) < 0.7,
+        "job_types": [["DCR_SAMOOHA"] if r < 0.8 else ["OTHER"] for r in rng.random(len(pairs))],
+    })
+
+    # SPCS jobs: a quarter of them are not samooha jobs, which is what the DCR queries count
+    services = accounts[["snowflake_deployment", "snowflake_account_id"]].rename(
+        columns={"snowflake_deployment": "deployment", "snowflake_account_id": "account_id"})
+    services["compute_pool_id"] = [f"pool-{i:06d}" for i in range(n)]
+    services["service_id"] = [f"svc-{i:06d}" for i in range(n)]
+    services["managing_object_type"] = "NativeApp(DCR)"
+    spcs_rows = rng.random(len(day_ids)) < 0.5
+    spcs = services.iloc[account_ids[spcs_rows]].reset_index(drop=True)
+    spcs_jobs = pd.DataFrame({
+        "ds": days[day_ids[spcs_rows]],
+        "deployment": spcs["deployment"],
+        "account_id": spcs["account_id"],
+        "service_id": spcs["service_id"],
+        "compute_pool_id": spcs["compute_pool_id"],
+        "job_id": [j if r < 0.75 else f"spcs-{j}" for j, r in
+                   zip(np.array(job_ids)[spcs_rows], rng.random(spcs_rows.sum()))],
+        "total_credits": np.round(credits[spcs_rows] * 0.2, 4),
+    })
+    from_spcs, to_spcs = spcs_jobs.iloc[::2], spcs_jobs.iloc[1::2].rename(columns={"service_id": "target_service_id"})
+
+    return {
+        "snowscience.cleanrooms.samooha_consumption_v": consumption,
+        "snowscience.cleanrooms.samooha_spcs_credits": spcs_direct,
+        "snowscience.cleanrooms.samooha_analysis_jobs": analysis_jobs,
+        "snowscience.cleanrooms.cleanroom_edges": edges,
+        "snowscience.cleanrooms.dim_cleanroom_accounts_v": accounts,
+        "snowscience.snowservices.spcs_credits_indirect_from_spcs_raw": from_spcs,
+        "snowscience.snowservices.spcs_credits_indirect_to_spcs_raw": to_spcs,
+        "snowscience.snowservices.spcs_dim_services": services,
+    }
+
+
+def build_warehouse(
+    scale: Optional[Scale] = None,
+    latency: float = 0.0,
+    connect_latency: float = 0.0,
+    today: Optional[date] = None,
+) -> LocalWarehouse:
+    """
+    Create an in-memory DuckDB warehouse populated with synthetic data.
+
+    latency / connect_latency (seconds) are injected per query / per connect
+    to model warehouse round trips that DuckDB does not have. today pins
+    CURRENT_DATE (default: the real date).
+    """
+    scale = scale or Scale.small()
+    db = duckdb.connect()
+    for macro in MACROS:
+        db.execute(macro)
+
+    for name, frame in generate_tables(scale).items():
+        database, schema, table = name.split(".")
+        db.execute(f"ATTACH IF NOT EXISTS ':memory:' AS {database}")
+        db.execute(f"CREATE SCHEMA IF NOT EXISTS {database}.{schema}")
+        db.register("_frame", frame)
+        db.execute(f"CREATE TABLE {name} AS SELECT * FROM _frame")
+        db.unregister("_frame")
+
+    return LocalWarehouse(db, latency=latency, connect_latency=connect_latency, today=today)
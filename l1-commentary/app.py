@@ -5,8 +5,10 @@ Interactive quarterly financial analysis report with:
 - Drill-down page navigation (Total -> Category -> Use Case -> Feature)
 - KPI cards grid for quick comparison
 - Pre-cached data loaded from Snowflake stage (no database queries needed)
+- Sharded cache: the manifest loads first, a category's shard when it is opened
 """
 
+import gzip
 import json
 import streamlit as st
 from typing import Dict, Any, Optional, List
@@ -27,12 +29,38 @@ st.set_page_config(
 # =============================================================================
 
 STAGE_PATH = "@FINANCE.DEV_SENSITIVE.L1_COMMENTARY_STAGE"
+# Sharded collection directory (skills/L1_Streamlit/scripts/shards.py), uploaded with
+#   PUT file://cache/l1_FY2026-Q4_2026-02-04_all/* @STAGE/l1_FY2026-Q4_2026-02-04_all/ AUTO_COMPRESS=FALSE
+COLLECTION = "l1_FY2026-Q4_2026-02-04_all"
+# Single-file collection (.json, or .json.gz / .json.zst from report_store.py), read
+# when the stage has no sharded one
 CACHE_FILE = "l1_FY2026-Q4_2026-02-04_all.json"
+SHARD_FORMAT = "l1-shards-v1"
 
 # =============================================================================
 # DATA LOADING FROM STAGE
 # =============================================================================
 
+def _unpack_rows(obj: Dict) -> Any:
+    """Packed tables ({"~cols", "~rows"}) back into row dicts, as report_store.py does."""
+    if "~cols" in obj and "~rows" in obj and len(obj) == 2:
+        return [dict(zip(obj["~cols"], row)) for row in obj["~rows"]]
+    return obj
+
+
+def decode_report(file_name: str, payload: bytes) -> Any:
+    """Parse a report_store.py file by suffix: .json, .json.gz or .json.zst."""
+    if file_name.endswith(".json.zst"):
+        import pyarrow as pa
+        with pa.CompressedInputStream(pa.BufferReader(payload), "zstd") as stream:
+            payload = stream.read()
+    elif file_name.endswith(".json.gz"):
+        payload = gzip.decompress(payload)
+    else:
+        return json.loads(payload)
+    return json.loads(payload, object_hook=_unpack_rows)
+
+
 @st.cache_data(ttl=3600)
 def load_cached_data() -> Optional[Dict]:
     """Load pre-computed data from Snowflake stage."""
@@ -42,13 +70,65 @@ def load_cached_data() -> Optional[Dict]:
         
         # Read file from stage
         with session.file.get_stream(file_path) as f:
-            data = json.load(f)
+            data = decode_report(CACHE_FILE, f.read())
         return data
     except Exception as e:
         st.error(f"Error loading cache from stage: {e}")
         return None
 
 
+@st.cache_data(ttl=3600)
+def load_manifest() -> Optional[Dict]:
+    """Load the sharded collection's manifest (tree + KPIs) from stage; None if there is none."""
+    try:
+        session = get_active_session()
+        with session.file.get_stream(f"{STAGE_PATH}/{COLLECTION}/manifest.json") as f:
+            manifest = json.load(f)
+    except Exception:
+        return None
+    return manifest if manifest.get('format') == SHARD_FORMAT else None
+
+
+@st.cache_data(ttl=3600)
+def load_shard(file_name: str) -> Dict:
+    """Load one category's subtree from its shard on stage."""
+    session = get_active_session()
+    with session.file.get_stream(f"{STAGE_PATH}/{COLLECTION}/{file_name}") as f:
+        return decode_report(file_name, f.read())
+
+
+def _expand(entry: Dict) -> Dict:
+    """A manifest entry as a stub node whose analysis holds summary_kpis only."""
+    return {
+        'name': entry['name'],
+        'level': entry['level'],
+        'analysis': {'summary_kpis': entry['summary_kpis']} if 'summary_kpis' in entry else {},
+        'children': {name: _expand(child) for name, child in entry.get('children', {}).items()},
+    }
+
+
+def load_report(nav_path: List[str]) -> Optional[Dict]:
+    """
+    Report data for the current page: Total and the child cards come from the
+    manifest, the open category from its shard. Falls back to CACHE_FILE.
+    """
+    manifest = load_manifest()
+    if manifest is None:
+        return load_cached_data()
+    tree = manifest['tree']
+    data = {
+        'metadata': manifest['metadata'],
+        'total': manifest['total'],
+        'hierarchy': {name: _expand(entry) for name, entry in tree.items()},
+    }
+    if nav_path and nav_path[0] in tree:
+        try:
+            data['hierarchy'][nav_path[0]] = load_shard(tree[nav_path[0]]['shard']['file'])
+        except Exception as e:
+            st.error(f"Error loading {nav_path[0]} from stage: {e}")
+    return data
+
+
 # =============================================================================
 # FORMATTERS
 # =============================================================================
@@ -466,11 +546,11 @@ def main():
         st.session_state.nav_path = []
     
     # Load data automatically from stage
-    data = load_cached_data()
+    data = load_report(st.session_state.nav_path)
     
     if data is None:
         st.error("Failed to load report data from stage")
-        st.info(f"Expected file: {STAGE_PATH}/{CACHE_FILE}")
+        st.info(f"Expected {STAGE_PATH}/{COLLECTION}/manifest.json or {STAGE_PATH}/{CACHE_FILE}")
         return
     
     # Sidebar
@@ -2,14 +2,17 @@
 L1 Commentary - Streamlit Application
 
 Interactive quarterly financial analysis report with:
-- Drill-down page navigation (Total -> Category -> Use Case -> Feature)
+- Drill-down page navigation (Total -> Category -> Use Case -> Feature -> Customer)
 - KPI cards grid for quick comparison
-- Local JSON caching for fast re-access
+- Local sharded caching: the manifest opens instantly, categories load as you navigate
+- One shared copy of each cached report for all sessions (scripts/shared_reports.py)
+- Size-capped cache directory with an index for instant status (scripts/cache_index.py)
+- Pooled Snowflake connections shared by metadata queries and drill-down fills
+- Snapshot picker from an incrementally refreshed run_date catalog (scripts/run_dates.py)
 """
 
 import os
-import json
-import fcntl
+import time
 import streamlit as st
 from datetime import date, datetime
 from typing import Dict, Any, Optional, List
@@ -18,9 +21,21 @@ from typing import Dict, Any, Optional, List
 import sys
 sys.path.insert(0, os.path.dirname(__file__))
 
-from scripts.db import get_connection, get_available_run_dates
-from scripts.fiscal import get_fiscal_dates
-from scripts.collector import collect_all_data
+from scripts.db import ConnectionPool
+from scripts.fiscal import FiscalDates, get_fiscal_dates
+from scripts.run_dates import RunDateCatalog, load_run_dates
+from scripts.hierarchy import HierarchyIndex, fetch_hierarchy
+from scripts.customers import customer_entities
+from scripts.snapshot_diff import SnapshotDiff
+from scripts.jobs import JobQueue, start_workers, ACTIVE_STATUSES, JOB_DONE, JOB_QUEUED
+from scripts.lazy import open_node
+from scripts.shards import ShardedCollection, save_collection
+from scripts.cache_index import CacheIndex
+from scripts.shared_reports import SharedReports
+from scripts.config import (
+    HIERARCHY, JOB_POLL_SECONDS, APP_LAZY_COLLECTIONS,
+    CONNECTION_POOL_MAX_SIZE, CONNECTION_POOL_IDLE_SECONDS, CONNECTION_POOL_HEALTH_CHECK_SECONDS,
+)
 
 # Page config
 st.set_page_config(
@@ -39,42 +54,68 @@ os.makedirs(CACHE_DIR, exist_ok=True)
 
 
 def get_cache_path(fiscal_quarter: str, run_date: date, category: Optional[str] = None) -> str:
-    """Generate cache file path."""
+    """Generate cache path: a sharded directory (a legacy .json beside it is still read)."""
     cat_suffix = f"_{category.replace('/', '_').replace(' ', '_')}" if category else "_all"
-    return os.path.join(CACHE_DIR, f"l1_{fiscal_quarter}_{run_date}{cat_suffix}.json")
+    return os.path.join(CACHE_DIR, f"l1_{fiscal_quarter}_{run_date}{cat_suffix}")
+
+
+@st.cache_resource
+def get_cache_index() -> CacheIndex:
+    """Index of CACHE_DIR (size cap, TTL, version), reconciled with the files once per process."""
+    index = CacheIndex(CACHE_DIR)
+    index.sync()
+    return index
+
 
+@st.cache_resource
+def get_shared_reports() -> SharedReports:
+    """Opened collections shared by every session of the app process; sessions keep only the path."""
+    return SharedReports()
 
-def load_from_cache(cache_path: str) -> Optional[Dict]:
-    """Load data from cache if exists."""
-    if os.path.exists(cache_path):
-        with open(cache_path, 'r') as f:
-            return json.load(f)
-    return None
+
+def load_from_cache(cache_path: str) -> Optional[ShardedCollection]:
+    """The shared collection cached at cache_path, if it exists (opened once per process)."""
+    return get_shared_reports().get(cache_path)
 
 
 def save_to_cache(data: Dict, cache_path: str) -> None:
-    """Save data to cache with file locking to prevent corruption."""
-    temp_path = cache_path + '.tmp'
-    with open(temp_path, 'w') as f:
-        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-        json.dump(data, f, indent=2)
-        f.flush()
-        os.fsync(f.fileno())
-        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-    os.rename(temp_path, cache_path)
+    """Save data to cache atomically, one shard per category, and index it."""
+    save_collection(data, cache_path)
+    get_cache_index().record(cache_path, data.get('metadata'))
 
 
 # =============================================================================
 # DATA LOADING
 # =============================================================================
 
+@st.cache_resource
+def get_connection_pool() -> ConnectionPool:
+    """
+    Snowflake connections shared by every session of the app process, so a
+    metadata query or drill-down reuses an open session instead of paying
+    connect + USE WAREHOUSE again. Collections run in job workers, which
+    keep a pool of their own (jobs.py).
+    """
+    return ConnectionPool(
+        max_size=CONNECTION_POOL_MAX_SIZE,
+        idle_timeout=CONNECTION_POOL_IDLE_SECONDS,
+        health_check_after=CONNECTION_POOL_HEALTH_CHECK_SECONDS,
+    )
+
+
+def get_run_date_catalog() -> RunDateCatalog:
+    """
+    Snapshots with row counts and day ranges (run_dates.py): kept in memory and
+    on disk, refreshed incrementally. A connection is borrowed only for a refresh.
+    """
+    return load_run_dates(get_connection_pool().connect)
+
+
 @st.cache_data(ttl=3600)
-def get_run_dates() -> List[date]:
-    """Get available snapshot dates."""
-    conn = get_connection()
-    dates = get_available_run_dates(conn)
-    conn.close()
-    return dates
+def get_quarter_dates(fiscal_quarter: str) -> Optional[FiscalDates]:
+    """Quarter, prior-quarter and prior-year boundaries (from the cached fiscal calendar)."""
+    with get_connection_pool().connection() as conn:
+        return get_fiscal_dates(conn, fiscal_quarter)
 
 
 @st.cache_data(ttl=3600)
@@ -90,25 +131,94 @@ def get_fiscal_quarters() -> List[str]:
     ]
 
 
-def load_data(fiscal_quarter: str, run_date: date, category: Optional[str] = None) -> Dict:
-    """Load data from cache or generate."""
+@st.cache_data(ttl=3600)
+def get_hierarchy(fiscal_quarter: str, run_date: date) -> Optional[HierarchyIndex]:
+    """Node tree with QTD revenue and customer counts (one query, before any collection)."""
+    with get_connection_pool().connection() as conn:
+        dates = get_fiscal_dates(conn, fiscal_quarter)
+        return fetch_hierarchy(conn, dates, run_date) if dates else None
+
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    """Background collection queue (jobs.py), shared by every session of the app process."""
+    return JobQueue()
+
+
+def submit_collection(fiscal_quarter: str, run_date: date, category: Optional[str] = None) -> Optional[int]:
+    """Queue a collection for the worker processes; None if it is already cached."""
     cache_path = get_cache_path(fiscal_quarter, run_date, category)
+    if get_cache_index().adopt(cache_path) is not None:
+        return None
     
-    cached = load_from_cache(cache_path)
-    if cached:
-        return cached
+    # A collection already queued or running (from any session) is shared
+    queue = get_job_queue()
+    job_id = queue.submit(fiscal_quarter, run_date, category, output_path=cache_path, lazy=APP_LAZY_COLLECTIONS)
+    start_workers(queue)
+    return job_id
+
+
+def finish_report(params: Dict) -> bool:
+    """Point the session at the requested report (and snapshot diff) in the shared store."""
+    report_path = get_cache_path(params['fiscal_quarter'], params['run_date'])
+    collection = load_from_cache(report_path)
+    if collection is None:
+        return False
+    get_cache_index().record(report_path, collection.data.get('metadata'))
+    snapshot_diff = None
+    compare_date = params.get('compare_date')
+    if compare_date:
+        # Both sides are read in full; lazy ones first get summary_kpis for every
+        # node (one query per level), else unopened nodes would read as unchanged.
+        # The diff is computed once and shared
+        other_path = get_cache_path(params['fiscal_quarter'], compare_date)
+        get_cache_index().touch(other_path)
+        earlier, later = (other_path, report_path) if compare_date < params['run_date'] else (report_path, other_path)
+        snapshot_diff = get_shared_reports().diff(earlier, later, connect=get_connection_pool().connect)
+    st.session_state.report_path = report_path
+    st.session_state.report_data = None
+    st.session_state.snapshot_diff = snapshot_diff
+    return True
+
+
+def poll_report_jobs() -> Dict[str, Dict]:
+    """
+    Refresh the session from its collection jobs; returns the statuses of
+    the ones still queued or running.
     
-    data = collect_all_data(
-        fiscal_quarter=fiscal_quarter,
-        output_path=None,
-        run_date=run_date,
-        filter_category=category if category != "All" else None,
-    )
+    While the main collection runs, report_data holds the categories it has
+    finished so far (re-read whenever another one completes); once it is
+    cached the session switches to report_path in the shared store.
+    """
+    queue = get_job_queue()
+    statuses = {role: queue.status(job_id) for role, job_id in st.session_state.report_jobs.items()}
+    
+    ended = [job for job in statuses.values() if job is None or job['status'] not in ACTIVE_STATUSES]
+    failed = [job for job in ended if job is None or job['status'] != JOB_DONE]
+    if failed:
+        job = failed[0]
+        st.session_state.report_error = (
+            "Collection job not found" if job is None else
+            f"Collection {job['status']}" + (f": {job['error']}" if job['error'] else "")
+        )
+        for job_id in st.session_state.report_jobs.values():
+            queue.cancel(job_id)
+        st.session_state.report_jobs = {}
+        return {}
     
-    if data:
-        save_to_cache(data, cache_path)
+    if len(ended) == len(statuses):
+        st.session_state.report_jobs = {}
+        if not finish_report(st.session_state.report_params):
+            st.session_state.report_error = "Collection finished but its cache file is missing"
+        return {}
     
-    return data
+    main_job = statuses.get('data')
+    if main_job and main_job['status'] in ACTIVE_STATUSES and main_job['categories_done'] != st.session_state.partial_categories:
+        partial = queue.partial(main_job['id'])
+        if partial:
+            st.session_state.report_data = partial
+            st.session_state.partial_categories = main_job['categories_done']
+    return {role: job for role, job in statuses.items() if job['status'] in ACTIVE_STATUSES}
 
 
 # =============================================================================
@@ -196,6 +306,13 @@ COLUMN_NAMES = {
     'mom_pct': 'MoM %',
     'in_quarter': 'In Quarter',
     'contribution_pct': 'Contrib %',
+    'node': 'Node',
+    'level': 'Level',
+    'status': 'Status',
+    'metric': 'Metric',
+    'before': 'Before',
+    'after': 'After',
+    'delta_pct': 'Change %',
 }
 
 # Columns that should use format_currency
@@ -203,12 +320,12 @@ CURRENCY_COLS = {
     'qtd_revenue', 'prior_q_revenue', 'prior_year_revenue', 'qtd_plan',
     'vs_plan', 'qoq_delta', 'current_quarter_revenue', 'prior_quarter_revenue',
     'delta', 'delta_to_plan', 'revenue', 'plan_revenue', 'mom_delta', 'yoy_delta',
-    'cumulative_revenue', 'cumulative_plan',
+    'cumulative_revenue', 'cumulative_plan', 'before', 'after',
 }
 
 # Columns that should use format_pct (growth rates with +/-)
 GROWTH_PCT_COLS = {
-    'vs_plan_pct', 'pct_vs_plan', 'qoq_growth_pct', 'yoy_growth_pct', 'mom_pct',
+    'vs_plan_pct', 'pct_vs_plan', 'qoq_growth_pct', 'yoy_growth_pct', 'mom_pct', 'delta_pct',
 }
 
 # Columns that should use format_share (proportions, no sign)
@@ -262,6 +379,9 @@ def get_current_entity(data: Dict, nav_path: List[str]) -> tuple[Dict, str]:
         if step in current:
             entity = current[step]
             current = entity.get('children', {})
+            # Features keep their customers as compact rows, expanded on the way down
+            if entity.get('level') == 'feature':
+                current = customer_entities(data, entity)
         else:
             return data.get('total', {}), 'total'
     
@@ -273,7 +393,9 @@ def get_children(data: Dict, nav_path: List[str]) -> Dict:
     if not nav_path:
         return data.get('hierarchy', {})
     
-    entity, _ = get_current_entity(data, nav_path)
+    entity, level = get_current_entity(data, nav_path)
+    if level == 'feature':
+        return customer_entities(data, entity)
     return entity.get('children', {})
 
 
@@ -342,7 +464,7 @@ def render_children_cards(children: Dict, current_level: str):
         'total': 'Categories',
         'category': 'Use Cases',
         'use_case': 'Features',
-        'feature': 'Details',
+        'feature': 'Top Customers',
     }
     
     st.subheader(level_labels.get(current_level, 'Breakdown'))
@@ -359,7 +481,10 @@ def render_children_cards(children: Dict, current_level: str):
             
             with cols[col_idx]:
                 with st.container(border=True):
-                    icon = "📁" if has_children else "🔧"
+                    if current_level == 'feature':
+                        icon = HIERARCHY['customer'].icon
+                    else:
+                        icon = "📁" if has_children else "🔧"
                     if st.button(f"{icon} {name}", key=f"card_{name}", use_container_width=True, type="primary"):
                         clicked_name = name
                     
@@ -379,6 +504,90 @@ def render_children_cards(children: Dict, current_level: str):
         st.rerun()
 
 
+def render_snapshot_diff(diff: SnapshotDiff, nav_path: List[str], name: str):
+    """Render what changed at the current node between the two compared snapshots."""
+    import pandas as pd
+    
+    row = diff.node(tuple(nav_path))
+    if row is None:
+        return
+    
+    st.markdown(f"#### Changes {diff.before.get('run_date')} → {diff.after.get('run_date')}")
+    if row['status'] in ('added', 'removed'):
+        st.caption(f"*{name} is only in the {'later' if row['status'] == 'added' else 'earlier'} snapshot*")
+    elif row['status'] == 'unknown':
+        st.caption(f"*{name} has no KPIs in one of the snapshots' collections, so its changes are unknown*")
+    
+    def value(v):
+        return None if pd.isna(v) else float(v)
+    
+    cols = st.columns(3)
+    for col, (label, metric) in zip(cols, [
+        ("QTD Revenue", 'qtd_revenue'),
+        ("Prior Q Revenue", 'prior_q_revenue'),
+        ("Prior Year Revenue", 'prior_year_revenue'),
+    ]):
+        col.metric(label, format_currency(value(row[f"{metric}_after"])), format_delta(value(row[f"{metric}_delta"])))
+    
+    restated = diff.restatements(limit=20, under=tuple(nav_path))
+    if len(restated):
+        with st.expander(f"Biggest restatements below {name}"):
+            st.dataframe(format_dataframe(restated), use_container_width=True, hide_index=True)
+
+
+def render_job_progress(job: Dict, label: str):
+    """Progress bar of one collection job: nodes done, what runs now and the ETA."""
+    if job['status'] == JOB_QUEUED:
+        st.progress(0.0, text=f"{label}: queued")
+        return
+    done, total = job['nodes_done'], job['nodes_total'] or 0
+    text = f"{label}: {done} of {total} nodes" if total else f"{label}: starting"
+    if job['current_node']:
+        text += f" · {job['current_node']}"
+        if job['current_analysis']:
+            text += f" ({job['current_analysis']})"
+    if job['eta_seconds'] is not None:
+        minutes, seconds = divmod(int(job['eta_seconds']), 60)
+        text += f" · ~{minutes}m {seconds:02d}s left"
+    st.progress(min(done / total, 1.0) if total else 0.0, text=text)
+
+
+def render_hierarchy_preview(hierarchy: HierarchyIndex):
+    """Sidebar summary of the node tree and category sizes (customers only when queried)."""
+    counts = hierarchy.counts()
+    customers = hierarchy.size().customers
+    st.caption(
+        f"{counts['category']} categories · {counts['use_case']} use cases · {counts['feature']} features"
+        + (f" · {format_int(customers)} customers" if customers is not None else "")
+    )
+    import pandas as pd
+    rows = []
+    for (category,) in hierarchy.level_nodes('category'):
+        size = hierarchy.size((category,))
+        row = {'Category': category, 'QTD Revenue': format_currency(size.revenue)}
+        if customers is not None:
+            row['Customers'] = format_int(size.customers)
+        row['Features'] = len(hierarchy.level_nodes('feature', category))
+        rows.append(row)
+    with st.expander("Node sizes"):
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+
+def render_snapshot_coverage(snapshot, fiscal_quarter: str):
+    """Sidebar warning when a snapshot's days do not span the quarter (or the prior year it is compared with)."""
+    dates = get_quarter_dates(fiscal_quarter)
+    if snapshot is None or dates is None or snapshot.covers(dates.py_start, dates.effective_end):
+        return
+    if snapshot.last_day is None or snapshot.last_day < dates.q_start:
+        st.warning(f"Snapshot {snapshot.run_date} has no data for {fiscal_quarter} (its days end {snapshot.last_day})")
+        return
+    if snapshot.last_day < dates.effective_end:
+        st.info(f"Snapshot {snapshot.run_date} covers {fiscal_quarter} through {snapshot.last_day}")
+    if snapshot.first_day > dates.py_start:
+        st.warning(f"Snapshot {snapshot.run_date} starts {snapshot.first_day}; "
+                   f"prior-year comparisons (from {dates.py_start}) are incomplete")
+
+
 # =============================================================================
 # DETAIL VIEWS
 # =============================================================================
@@ -526,6 +735,12 @@ def render_detail_tabs(analysis: Dict, level: str):
     
     import pandas as pd
     
+    # The customer tier only has KPIs and monthly revenue vs plan
+    if level == 'customer':
+        st.markdown("### Monthly Revenue vs Plan")
+        render_monthly_trends(analysis.get('monthly_trends', []))
+        return
+    
     child_type = {
         'total': 'Category',
         'category': 'Use Case',
@@ -604,12 +819,22 @@ def main():
     if 'report_data' not in st.session_state:
         st.session_state.report_data = None
         st.session_state.report_params = None
+        st.session_state.snapshot_diff = None
+        st.session_state.report_path = None
+    
+    if 'report_jobs' not in st.session_state:
+        st.session_state.report_jobs = {}
+        st.session_state.report_error = None
+        st.session_state.partial_categories = None
     
     if 'nav_path' not in st.session_state:
         st.session_state.nav_path = []
     
+    # Collections running in the background for this session
+    running = poll_report_jobs() if st.session_state.report_jobs else {}
+    
     # Check if we already have data
-    has_data = st.session_state.report_data is not None
+    has_data = st.session_state.report_path is not None or st.session_state.report_data is not None
     
     # Sidebar
     with st.sidebar:
@@ -617,7 +842,8 @@ def main():
         
         # Get available dates
         try:
-            run_dates = get_run_dates()
+            catalog = get_run_date_catalog()
+            run_dates = catalog.run_dates()
             if not run_dates:
                 st.error("No snapshot dates found")
                 return
@@ -629,7 +855,7 @@ def main():
         run_date = st.selectbox(
             "Snapshot Date",
             options=run_dates,
-            format_func=lambda x: str(x),
+            format_func=lambda x: f"{x} ({catalog.get(x).rows / 1e6:.1f}M rows)",
             help="Select which data snapshot to analyze"
         )
         
@@ -639,26 +865,81 @@ def main():
             options=get_fiscal_quarters(),
             help="Select the fiscal quarter to analyze"
         )
+        render_snapshot_coverage(catalog.get(run_date), fiscal_quarter)
+        
+        # Another snapshot of the same quarter to diff against
+        compare_date = st.selectbox(
+            "Compare With Snapshot",
+            options=[None] + [d for d in run_dates if d != run_date],
+            format_func=lambda x: "None" if x is None else str(x),
+            help="Show restatements and late-arriving revenue since another snapshot"
+        )
+        
+        # Node sizes: read from the cached collection's manifest when there is
+        # one; otherwise the GROUPING SETS scan of the snapshot runs only on request
+        hierarchy = None
+        cached = load_from_cache(get_cache_path(fiscal_quarter, run_date))
+        quarter_dates = get_quarter_dates(fiscal_quarter)
+        if cached is not None and quarter_dates is not None:
+            hierarchy = HierarchyIndex.from_collection(cached.data, run_date, quarter_dates)
+        elif st.checkbox("Show node sizes", key=f"node_sizes_{fiscal_quarter}_{run_date}",
+                         help="Node counts, QTD revenue and customers per category (one query over the snapshot)"):
+            try:
+                hierarchy = get_hierarchy(fiscal_quarter, run_date)
+            except Exception as e:
+                st.warning(f"Hierarchy unavailable: {e}")
+        if hierarchy:
+            render_hierarchy_preview(hierarchy)
         
         st.markdown("---")
         
         # Generate button
         if st.button("Generate Report", type="primary", use_container_width=True):
-            with st.spinner("Loading..."):
-                data = load_data(fiscal_quarter, run_date, None)
-                if data:
-                    st.session_state.report_data = data
-                    st.session_state.report_params = {
-                        'fiscal_quarter': fiscal_quarter,
-                        'run_date': run_date,
-                    }
-                    st.session_state.nav_path = []
-                    st.rerun()
+            # Uncached collections run as background jobs; the report fills in as they finish
+            params = {
+                'fiscal_quarter': fiscal_quarter,
+                'run_date': run_date,
+                'compare_date': compare_date,
+            }
+            jobs = {}
+            for role, snapshot in (('data', run_date), ('compare', compare_date)):
+                job_id = submit_collection(fiscal_quarter, snapshot) if snapshot else None
+                if job_id is not None:
+                    jobs[role] = job_id
+            st.session_state.report_params = params
+            st.session_state.report_jobs = jobs
+            st.session_state.report_error = None
+            st.session_state.partial_categories = None
+            st.session_state.report_data = None
+            st.session_state.report_path = None
+            st.session_state.snapshot_diff = None
+            st.session_state.nav_path = []
+            if not jobs and not finish_report(params):
+                st.session_state.report_error = "Cached report could not be loaded"
+            elif 'data' not in jobs:
+                # Browse the cached report while the comparison snapshot is collected
+                report_path = get_cache_path(fiscal_quarter, run_date)
+                collection = load_from_cache(report_path)
+                if collection is not None:
+                    get_cache_index().record(report_path, collection.data.get('metadata'))
+                    st.session_state.report_path = report_path
+            st.rerun()
+        
+        if running:
+            if st.button("Cancel", use_container_width=True):
+                queue = get_job_queue()
+                for job_id in st.session_state.report_jobs.values():
+                    queue.cancel(job_id)
+                st.session_state.report_jobs = {}
+                st.session_state.report_data = None
+                st.session_state.report_path = None
+                st.session_state.nav_path = []
+                st.rerun()
         
         # Cache info
-        cache_path = get_cache_path(fiscal_quarter, run_date, None)
-        if os.path.exists(cache_path):
-            st.success("📦 Cached data available")
+        cached = get_cache_index().lookup(get_cache_path(fiscal_quarter, run_date, None))
+        if cached:
+            st.success(f"📦 Cached data available ({cached['bytes'] / 1e6:.1f} MB)")
         else:
             st.info("🔄 Will fetch fresh data")
         
@@ -671,30 +952,73 @@ def main():
                     st.rerun()
             
             if st.button("Clear Report", use_container_width=True):
+                queue = get_job_queue()
+                for job_id in st.session_state.report_jobs.values():
+                    queue.cancel(job_id)
+                st.session_state.report_jobs = {}
                 st.session_state.report_data = None
+                st.session_state.report_path = None
                 st.session_state.report_params = None
+                st.session_state.snapshot_diff = None
                 st.session_state.nav_path = []
                 st.rerun()
     
+    if st.session_state.report_error:
+        st.error(st.session_state.report_error)
+    
+    for role, job in running.items():
+        label = "Comparison snapshot" if role == 'compare' else "Report"
+        render_job_progress(job, f"{label} {job['fiscal_quarter']} @ {job['run_date']}")
+    
+    # A cached report is read from the shared store (its shard for this page loaded once for
+    # all sessions); report_data only holds a collection still running for this session
+    report_path = st.session_state.report_path
+    data = st.session_state.report_data
+    if report_path is not None:
+        collection = get_shared_reports().ensure(report_path, st.session_state.nav_path)
+        if collection is None:
+            st.session_state.report_path = report_path = None
+            st.error("Cached report is no longer available; generate it again")
+        else:
+            data = collection.data
+    
     # Display report
-    if st.session_state.report_data is not None:
-        data = st.session_state.report_data
+    if data is not None:
         params = st.session_state.report_params
         
         # Header
         st.caption(f"{params['fiscal_quarter']} | Snapshot: {params['run_date']}")
+        metadata = data.get('metadata', {})
+        if metadata.get('partial'):
+            st.caption(f"⏳ {metadata['categories_done']} of {metadata['categories_total']} categories "
+                       f"collected so far; the rest appear as they finish")
         
         # Breadcrumb navigation
         render_breadcrumbs(st.session_state.nav_path)
         
         # Get current entity
         entity, level = get_current_entity(data, st.session_state.nav_path)
+        entity_name = entity.get('name', 'Total')
+        
+        # Lazy collections compute a node's remaining analyses on its first visit (and cache them)
+        if metadata.get('lazy') and level != 'customer':
+            with st.spinner(f"Computing {entity_name}..."):
+                if report_path is not None:
+                    # Sessions opening the same node at once share one fill
+                    if get_shared_reports().open_node(report_path, st.session_state.nav_path,
+                                                      get_connection_pool().connect):
+                        get_cache_index().record(report_path, metadata)
+                elif not metadata.get('partial'):
+                    # A running job's partial data has no fiscal dates; its nodes fill once it is cached
+                    open_node(data, tuple(st.session_state.nav_path), None, get_connection_pool().connect)
         analysis = entity.get('analysis', {})
         
         # Entity KPIs
-        entity_name = entity.get('name', 'Total')
         render_kpi_header(analysis.get('summary_kpis', {}), entity_name)
         
+        if st.session_state.snapshot_diff is not None and level != 'customer':
+            render_snapshot_diff(st.session_state.snapshot_diff, st.session_state.nav_path, entity_name)
+        
         st.markdown("---")
         
         # Children cards
@@ -706,8 +1030,13 @@ def main():
         # Detail tabs
         render_detail_tabs(analysis, level)
     
-    else:
+    elif not running:
         st.info("👈 Select options and click 'Generate Report' to begin")
+    
+    # Poll the background jobs again shortly
+    if running:
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
 
 
 if __name__ == "__main__":
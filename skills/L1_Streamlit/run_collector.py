@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+run_collector.py - Regenerate the L1 Commentary Cache
+
+Runs the hierarchy collector and writes the v6 collection the app reads from
+cache/: one REPORT_STORE_FORMAT file (scripts/report_store.py; give --output a
+.json name for indent=2 JSON) or, with --sharded, the sharded directory format
+of scripts/shards.py.
+
+USAGE:
+    SNOWFLAKE_CONNECTION_NAME=snowhouse python run_collector.py
+    SNOWFLAKE_CONNECTION_NAME=snowhouse python run_collector.py --workers 8
+    SNOWFLAKE_CONNECTION_NAME=snowhouse python run_collector.py --async
+    SNOWFLAKE_CONNECTION_NAME=snowhouse python run_collector.py --materialize
+    SNOWFLAKE_CONNECTION_NAME=snowhouse python run_collector.py --max-customers 25
+    SNOWFLAKE_CONNECTION_NAME=snowhouse python run_collector.py --category "Data Engineering"
+    SNOWFLAKE_CONNECTION_NAME=snowhouse python run_collector.py --result-cache
+    SNOWFLAKE_CONNECTION_NAME=snowhouse python run_collector.py --incremental
+    SNOWFLAKE_CONNECTION_NAME=snowhouse python run_collector.py --resume
+    SNOWFLAKE_CONNECTION_NAME=snowhouse python run_collector.py --trace
+    SNOWFLAKE_CONNECTION_NAME=snowhouse python run_collector.py --sharded
+    SNOWFLAKE_CONNECTION_NAME=snowhouse python run_collector.py --fiscal-quarter FY2026-Q1 FY2026-Q2 FY2026-Q3 FY2026-Q4
+"""
+
+import argparse
+import glob
+import os
+from datetime import date
+
+from scripts.collector import ENGINES, collect_all_data
+from scripts.multi_quarter import collect_quarters
+from scripts.config import (
+    ASYNC_MAX_IN_FLIGHT, DEFAULT_WORKERS, MAX_CUSTOMERS_PER_FEATURE, REPORT_STORE_FORMAT, RESULT_CACHE_DIR,
+)
+from scripts.db import enable_result_cache
+from scripts.run_dates import load_run_dates
+from scripts.report_store import FORMATS, save_report
+from scripts.shards import open_collection, write_sharded
+from scripts.telemetry import start_trace
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache")
+
+
+def _cache_suffix(category):
+    """Same suffix as app.get_cache_path: _all or _<category>."""
+    return f"_{category.replace('/', '_').replace(' ', '_')}" if category else "_all"
+
+
+def find_previous_collection(fiscal_quarter, category=None):
+    """
+    Most recent cached collection of the quarter (by run_date in the name; any
+    format) that is not lazy, or None. The app writes lazy collections, whose
+    nodes below category have no analyses to reuse.
+    """
+    pattern = os.path.join(CACHE_DIR, f"l1_{fiscal_quarter}_*{_cache_suffix(category)}")
+    matches = glob.glob(pattern + "/")
+    for suffix in FORMATS:
+        matches += glob.glob(pattern + suffix)
+    for path in sorted((p.rstrip("/") for p in matches), reverse=True):
+        try:
+            collection = open_collection(path)
+        except (OSError, ValueError) as e:
+            print(f"WARNING: Skipping unreadable cached collection {path}: {e}")
+            continue
+        if collection and not collection.data.get('metadata', {}).get('lazy'):
+            return path
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect L1 commentary data")
+    parser.add_argument("--fiscal-quarter", nargs="+", default=["FY2026-Q4"],
+                        help="e.g. FY2026-Q4; several quarters are collected from one shared cube scan")
+    parser.add_argument("--run-date", type=date.fromisoformat, nargs="+",
+                        help="Snapshot date (default: latest); several are collected from one shared cube scan")
+    parser.add_argument("--category", help="Collect a single product category")
+    parser.add_argument("--engine", choices=ENGINES, default="sql")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Nodes collected concurrently, one pooled connection each")
+    parser.add_argument("--async", dest="async_queries", type=int, nargs="?", const=ASYNC_MAX_IN_FLIGHT,
+                        default=0, metavar="N",
+                        help="Submit each node's analyses at once with execute_async, at most N "
+                             f"running per connection (default N: {ASYNC_MAX_IN_FLIGHT})")
+    parser.add_argument("--max-customers", type=int, default=MAX_CUSTOMERS_PER_FEATURE, metavar="N",
+                        help="Top customers per feature for the customer drill-down (0 skips it)")
+    parser.add_argument("--materialize", action="store_true",
+                        help="Copy the snapshot's quarter windows into a session temp table first "
+                             "and run the analyses against it")
+    parser.add_argument("--result-cache", nargs="?", const=RESULT_CACHE_DIR, metavar="DIR",
+                        help=f"Reuse query results from disk (default dir: {RESULT_CACHE_DIR})")
+    parser.add_argument("--incremental", nargs="?", const="latest", metavar="PREVIOUS",
+                        help="Copy unchanged nodes from a previous collection "
+                             "(default: latest cached one for the quarter)")
+    parser.add_argument("--lazy", action="store_true",
+                        help="Only Total and category KPIs/breakdowns; the app computes other nodes when opened")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip nodes already collected by an interrupted run of the same snapshot")
+    parser.add_argument("--trace", action="store_true",
+                        help="Write a per-query timing trace next to the output JSON")
+    parser.add_argument("--sharded", action="store_true",
+                        help="Write a sharded directory (manifest + one shard per category) instead of one JSON")
+    parser.add_argument("--output", help=f"Output path (default: cache/l1_<fq>_<run_date>_all{REPORT_STORE_FORMAT}; "
+                                         "the suffix picks the format; a directory with --sharded)")
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.async_queries < 0:
+        parser.error("--async cannot be negative")
+    if args.max_customers < 0:
+        parser.error("--max-customers cannot be negative")
+
+    multi = len(args.fiscal_quarter) > 1 or len(args.run_date or []) > 1
+    if multi and args.output:
+        parser.error("--output needs a single --fiscal-quarter and --run-date")
+    if multi and (args.incremental or args.resume or args.lazy):
+        parser.error("--incremental, --resume and --lazy need a single --fiscal-quarter and --run-date")
+
+    result_cache = None
+    if args.result_cache:
+        # Only snapshots older than the newest are cached for good
+        result_cache = enable_result_cache(args.result_cache, newest_run_date=load_run_dates().newest())
+    trace = start_trace() if args.trace else None
+
+    if multi:
+        print("Several quarters/snapshots: collecting with the cube engine from one shared scan")
+        collections = collect_quarters(
+            args.fiscal_quarter,
+            args.run_date,
+            filter_category=args.category,
+            max_customers=args.max_customers,
+        )
+    else:
+        fiscal_quarter = args.fiscal_quarter[0]
+        previous_path = args.incremental
+        if previous_path == "latest":
+            previous_path = find_previous_collection(fiscal_quarter, args.category)
+
+        data = collect_all_data(
+            fiscal_quarter,
+            None,
+            run_date=args.run_date[0] if args.run_date else None,
+            filter_category=args.category,
+            max_customers=args.max_customers,
+            engine=args.engine,
+            workers=args.workers,
+            incremental=bool(args.incremental),
+            previous_path=previous_path,
+            resume=args.resume,
+            async_queries=args.async_queries,
+            materialize=args.materialize,
+            lazy=args.lazy,
+        )
+        collections = {(fiscal_quarter, data['metadata']['run_date']): data} if data else {}
+    if result_cache:
+        stats = result_cache.stats()
+        print(f"Result cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['skipped']} uncacheable, {stats['bytes'] / 1e6:.1f} MB on disk")
+    if not collections:
+        raise SystemExit(1)
+
+    for (fiscal_quarter, run_date), data in collections.items():
+        output_path = args.output
+        if output_path is None:
+            # Same naming as app.get_cache_path so the app picks the file up
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            output_path = os.path.join(CACHE_DIR, f"l1_{fiscal_quarter}_{run_date}{_cache_suffix(args.category)}")
+            if not args.sharded:
+                output_path += REPORT_STORE_FORMAT
+
+        if args.sharded:
+            write_sharded(data, output_path)
+        else:
+            save_report(data, output_path)
+        print(f"\n✅ Data saved to {output_path}")
+        if trace:
+            print(f"   Query trace: {', '.join(trace.write(output_path))}")
+    if trace:
+        print()
+        print(trace.format_summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,29 @@ This package provides hierarchical financial analysis for product categories.
 STRUCTURE:
     config.py    - Configuration constants and hierarchy definition
     db.py        - Database connection and query utilities
+    telemetry.py - Per-query timing trace (opt-in: run_collector.py --trace)
+    result_cache.py - Opt-in on-disk SQL result cache for execute_query
+    fiscal_calendar.py - Cached in-memory fiscal calendar (shared with the weekly/DCR skills)
     fiscal.py    - Fiscal calendar date calculations
     filters.py   - SQL filter clause builders
+    actuals_slice.py - Opt-in session temp table of a run's actuals (run_collector.py --materialize)
     analyses.py  - Individual analysis functions
+    hierarchy.py - One-query discovery of the category/use case/feature tree
+    customers.py - Set-based top-customer tier below each feature (compact rows)
+    batch.py     - Level-batched versions of the analyses (one query per level)
+    cube.py      - Single-scan revenue cube engine
+    multi_quarter.py - Several quarters/snapshots collected from one shared cube scan
+    incremental.py - Node fingerprints for reusing a previous collection
+    checkpoint.py - Per-node journal for resuming interrupted collections
+    snapshot_diff.py - Columnar diff of two snapshots' collections (restatements)
+    single_flight.py - Coalesces concurrent in-process requests for one collection
+    jobs.py      - SQLite queue and worker processes for the app's background collections
+    lazy.py      - On-demand analyses for nodes of lazy collections, persisted to the cache
+    shards.py    - Sharded cache format: manifest plus one compressed shard per category
+    report_store.py - Report file formats (.json / packed .json.gz / .json.zst) and converter
+    shared_reports.py - Process-wide store of opened collections shared by app sessions
+    cache_index.py - SQLite index, size cap, TTL and version check of the app's cache directory
+    run_dates.py - Incrementally refreshed snapshot catalog (rows and day range per run_date)
     collector.py - Main data collection orchestrator
     reporter.py  - HTML/Markdown report generation
 
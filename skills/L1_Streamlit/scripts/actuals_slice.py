@@ -0,0 +1,105 @@
+"""
+actuals_slice.py - Session Temp Table of a Collection's Actuals
+
+Every analysis reads ACTUALS_TABLE filtered to one run_date and to the
+current quarter (CQ), prior quarter (PQ) and prior year (PY) windows, so the
+warehouse prunes the same snapshot table for each analysis of every node.
+materialize_slice() copies just those rows into a session temporary table
+(ACTUALS_SLICE_TABLE) once, pre-aggregated to day x category x use case x
+feature x customer x industry x agreement type, and actuals_source(conn)
+names the table the analyses read on a connection: the slice where one was
+materialized, ACTUALS_TABLE everywhere else (the app, other collections).
+
+The slice keeps the snapshot's column names, so analysis SQL runs unchanged
+on either table. Its revenue column holds SUM(revenue + product_led_revenue)
+and product_led_revenue is 0, which keeps `revenue + product_led_revenue`
+summing exactly as on the snapshot even where one of the two is NULL.
+
+Temporary tables only exist in the session that created them: with
+workers > 1, each pooled connection builds its own copy (slice_factory).
+
+USAGE:
+    materialize_slice(conn, dates, run_date)
+    f"FROM {actuals_source(conn)}"      # the slice on conn, else ACTUALS_TABLE
+    pool = ConnectionPool(factory=slice_factory(get_connection, dates, run_date), ...)
+"""
+
+import threading
+import weakref
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable
+
+from .db import execute_query
+from .config import ACTUALS_TABLE, ACTUALS_SLICE_TABLE, RUN_DATE_COLUMN
+from .fiscal import FiscalDates
+
+
+@dataclass(frozen=True)
+class ActualsSlice:
+    """The slice materialized on one connection."""
+    table: str
+    run_date: date
+    dates: FiscalDates
+
+
+# Connection -> its slice; entries go away with the connection
+_slices: "weakref.WeakKeyDictionary[Any, ActualsSlice]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def build_slice_query(dates: FiscalDates, run_date: date, table: str = ACTUALS_SLICE_TABLE) -> str:
+    """CREATE TEMPORARY TABLE ... AS the run_date's CQ, PQ and PY rows, pre-aggregated."""
+    return f"""
+    CREATE OR REPLACE TEMPORARY TABLE {table} AS
+    SELECT
+        {RUN_DATE_COLUMN},
+        ds,
+        product_category,
+        use_case,
+        feature,
+        latest_salesforce_account_name,
+        industry_rollup,
+        agreement_type,
+        SUM(revenue + product_led_revenue) AS revenue,
+        0 AS product_led_revenue
+    FROM {ACTUALS_TABLE}
+    WHERE {RUN_DATE_COLUMN} = '{run_date}'
+        AND (ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+             OR ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
+             OR ds BETWEEN '{dates.py_start}' AND '{dates.py_end}')
+    GROUP BY 1, 2, 3, 4, 5, 6, 7, 8
+    """
+
+
+def materialize_slice(conn, dates: FiscalDates, run_date: date, table: str = ACTUALS_SLICE_TABLE) -> bool:
+    """
+    Build the slice on a connection and point its analyses at it.
+
+    Returns False (and leaves the connection reading ACTUALS_TABLE) if the
+    temporary table cannot be created, e.g. without CREATE TABLE on its schema.
+    """
+    try:
+        execute_query(conn, build_slice_query(dates, run_date, table), "Materialize actuals slice", cache=False)
+    except Exception as e:
+        print(f"WARNING: Could not materialize {table}, reading {ACTUALS_TABLE}: {e}")
+        return False
+    with _lock:
+        _slices[conn] = ActualsSlice(table, run_date, dates)
+    return True
+
+
+def actuals_source(conn) -> str:
+    """The table analyses on this connection read actuals from."""
+    with _lock:
+        entry = _slices.get(conn)
+    return entry.table if entry else ACTUALS_TABLE
+
+
+def slice_factory(factory: Callable[[], Any], dates: FiscalDates, run_date: date) -> Callable[[], Any]:
+    """Wrap a connection factory so every new connection materializes its own slice."""
+    def connect():
+        conn = factory()
+        materialize_slice(conn, dates, run_date)
+        return conn
+    return connect
@@ -18,15 +18,19 @@ All functions accept:
 from typing import Any, Dict, List, Optional
 from datetime import date
 
-from .db import execute_query
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .db import execute_query, execute_query_columnar, ColumnarResult
 from .config import (
-    ACTUALS_TABLE, PLAN_TABLE, HIERARCHY, RUN_DATE_COLUMN,
+    PLAN_TABLE, HIERARCHY, RUN_DATE_COLUMN,
     GROWTH_THRESHOLD, SHRINK_THRESHOLD,
     MAX_GAINERS, MAX_CONTRACTORS, MAX_INDUSTRIES,
     EXTENDED_TREND_MONTHS, MAX_TOP_CUSTOMERS,
 )
 from .filters import build_actuals_filter, build_plan_filter
 from .fiscal import FiscalDates
+from .actuals_slice import actuals_source
 
 
 def _run_date_filter(run_date: date) -> str:
@@ -57,21 +61,21 @@ def get_summary_kpis(
     query = f"""
     WITH cq_revenue AS (
         SELECT COALESCE(SUM(revenue + product_led_revenue), 0) AS cq_rev
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
             AND {actuals_filter}
     ),
     pq_revenue AS (
         SELECT COALESCE(SUM(revenue + product_led_revenue), 0) AS pq_rev
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
             AND {actuals_filter}
     ),
     py_revenue AS (
         SELECT COALESCE(SUM(revenue + product_led_revenue), 0) AS py_rev
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
             AND {actuals_filter}
@@ -114,10 +118,13 @@ def get_monthly_trends(
     feature: Optional[str] = None,
     customer: Optional[str] = None,
     extended_months: int = EXTENDED_TREND_MONTHS,
-) -> List[Dict[str, Any]]:
+) -> ColumnarResult:
     """
     Get daily revenue vs plan for the current quarter.
     Shows cumulative actuals vs cumulative plan by day.
+    
+    Returns a ColumnarResult (one row per day); to_json_safe turns it into
+    the usual list of dicts.
     """
     actuals_filter = build_actuals_filter(category, use_case, feature, customer)
     plan_filter = build_plan_filter(category, use_case, feature, customer)
@@ -128,7 +135,7 @@ def get_monthly_trends(
         SELECT 
             ds AS day,
             SUM(revenue + product_led_revenue) AS daily_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
             AND {actuals_filter}
@@ -162,14 +169,31 @@ def get_monthly_trends(
     ORDER BY day
     """
     
-    results = execute_query(conn, query, "Daily trends (current quarter)")
+    result = execute_query_columnar(conn, query, "Daily trends (current quarter)")
+    add_cumulative_vs_plan_columns(result)
+    return result
+
+
+def add_cumulative_vs_plan_columns(result: ColumnarResult) -> None:
+    """Columnar add_cumulative_vs_plan: vs_plan / vs_plan_pct only on days with a cumulative plan."""
+    # Snowflake sends NUMBER(38,0) as decimal128(38,0), whose difference overflows
+    # decimal precision; work in float64 as the row-based path ends up doing
+    revenue = pc.cast(result.column('cumulative_revenue'), pa.float64())
+    plan = pc.cast(result.column('cumulative_plan'), pa.float64())
+    has_plan = pc.fill_null(pc.not_equal(plan, 0.0), False)
     
-    for row in results:
+    vs_plan = pc.if_else(has_plan, pc.subtract(revenue, plan), None)
+    vs_plan_pct = pc.round(pc.divide(pc.multiply(vs_plan, 100.0), plan), 2)
+    result.set_column('vs_plan', vs_plan, sparse=True)
+    result.set_column('vs_plan_pct', pc.if_else(has_plan, vs_plan_pct, None), sparse=True)
+
+
+def add_cumulative_vs_plan(rows: List[Dict[str, Any]]) -> None:
+    """Add vs_plan / vs_plan_pct to daily trend rows that have a cumulative plan."""
+    for row in rows:
         if row.get('cumulative_plan'):
             row['vs_plan'] = row['cumulative_revenue'] - row['cumulative_plan']
             row['vs_plan_pct'] = round(100.0 * row['vs_plan'] / row['cumulative_plan'], 2) if row['cumulative_plan'] else None
-    
-    return results
 
 
 # =============================================================================
@@ -206,7 +230,7 @@ def get_children_breakdown(
         SELECT 
             {child_column} AS entity, 
             SUM(revenue + product_led_revenue) AS cq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
             AND {actuals_filter}
@@ -216,7 +240,7 @@ def get_children_breakdown(
         SELECT 
             {child_column} AS entity, 
             SUM(revenue + product_led_revenue) AS pq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
             AND {actuals_filter}
@@ -235,7 +259,7 @@ def get_children_breakdown(
         SELECT 
             {child_column} AS entity, 
             SUM(revenue + product_led_revenue) AS py_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
             AND {actuals_filter}
@@ -316,7 +340,7 @@ def get_top20_vs_longtail(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS cq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
             AND {actuals_filter}
@@ -327,7 +351,7 @@ def get_top20_vs_longtail(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS pq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
             AND {actuals_filter}
@@ -338,7 +362,7 @@ def get_top20_vs_longtail(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS py_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
             AND {actuals_filter}
@@ -446,7 +470,7 @@ def get_industry_performance(
         SELECT 
             COALESCE(industry_rollup, 'Unknown') AS industry,
             SUM(revenue + product_led_revenue) AS cq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
             AND {actuals_filter}
@@ -456,7 +480,7 @@ def get_industry_performance(
         SELECT 
             COALESCE(industry_rollup, 'Unknown') AS industry,
             SUM(revenue + product_led_revenue) AS pq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
             AND {actuals_filter}
@@ -466,7 +490,7 @@ def get_industry_performance(
         SELECT 
             COALESCE(industry_rollup, 'Unknown') AS industry,
             SUM(revenue + product_led_revenue) AS py_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
             AND {actuals_filter}
@@ -556,7 +580,7 @@ def get_new_vs_existing(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS cq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
             AND {actuals_filter}
@@ -567,7 +591,7 @@ def get_new_vs_existing(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS pq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
             AND {actuals_filter}
@@ -578,7 +602,7 @@ def get_new_vs_existing(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS py_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
             AND {actuals_filter}
@@ -695,7 +719,7 @@ def get_top_gainers(
     query = f"""
     WITH current_q AS (
         SELECT {child_column} AS entity, SUM(revenue + product_led_revenue) AS cq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
             AND {actuals_filter}
@@ -703,7 +727,7 @@ def get_top_gainers(
     ),
     prior_q AS (
         SELECT {child_column} AS entity, SUM(revenue + product_led_revenue) AS pq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
             AND {actuals_filter}
@@ -766,7 +790,7 @@ def get_top_contractors(
     query = f"""
     WITH current_q AS (
         SELECT {child_column} AS entity, SUM(revenue + product_led_revenue) AS cq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
             AND {actuals_filter}
@@ -774,7 +798,7 @@ def get_top_contractors(
     ),
     prior_q AS (
         SELECT {child_column} AS entity, SUM(revenue + product_led_revenue) AS pq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
             AND {actuals_filter}
@@ -837,7 +861,7 @@ def get_concentration_trend(
             DATE_TRUNC('month', ds) AS month,
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
             AND {actuals_filter}
@@ -893,7 +917,7 @@ def get_top_customers(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS cq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
             AND {actuals_filter}
@@ -903,7 +927,7 @@ def get_top_customers(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS pq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
             AND {actuals_filter}
@@ -913,7 +937,7 @@ def get_top_customers(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS py_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
             AND {actuals_filter}
@@ -1003,7 +1027,7 @@ def get_top_customer_gainers(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS cq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
             AND {actuals_filter}
@@ -1013,7 +1037,7 @@ def get_top_customer_gainers(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS pq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
             AND {actuals_filter}
@@ -1023,7 +1047,7 @@ def get_top_customer_gainers(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS py_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
             AND {actuals_filter}
@@ -1114,7 +1138,7 @@ def get_top_customer_contractors(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS cq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
             AND {actuals_filter}
@@ -1124,7 +1148,7 @@ def get_top_customer_contractors(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS pq_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
             AND {actuals_filter}
@@ -1134,7 +1158,7 @@ def get_top_customer_contractors(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS py_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
             AND {actuals_filter}
@@ -1234,7 +1258,7 @@ def get_plan_variance_by_segment(
         SELECT 
             latest_salesforce_account_name AS customer,
             SUM(revenue + product_led_revenue) AS total_revenue
-        FROM {ACTUALS_TABLE}
+        FROM {actuals_source(conn)}
         WHERE {rd_filter}
             AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
             AND {actuals_filter}
@@ -1252,7 +1276,7 @@ def get_plan_variance_by_segment(
             a.latest_salesforce_account_name AS customer,
             CASE WHEN cr.rnk <= 20 THEN 'Top 20' ELSE 'Long Tail' END AS segment,
             SUM(a.revenue + a.product_led_revenue) AS revenue
-        FROM {ACTUALS_TABLE} a
+        FROM {actuals_source(conn)} a
         LEFT JOIN customer_ranks cr ON a.latest_salesforce_account_name = cr.customer
         WHERE {rd_filter}
             AND a.ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
@@ -0,0 +1,1247 @@
+"""
+batch.py - Level-Batched Analysis Functions
+
+Every function in analyses.py answers ONE node: the node's filters go into the
+WHERE clause, so a level with 300 features runs the same SQL 300 times. The
+functions here answer EVERY node of a level in one query. The node key
+(product_category[, use_case[, feature]]) is carried through each CTE as
+extra GROUP BY columns, joins match on it, per-node totals and rankings use
+PARTITION BY, and per-node LIMITs become QUALIFY ROW_NUMBER() filters.
+
+Results mirror analyses.py row for row (same keys, ordering, rounding and
+NULL join semantics), keyed by node path:
+
+    {('Analytics',): [...], ('Data Engineering',): [...]}                 # category
+    {('Analytics', 'BI'): [...], ('Analytics', 'Notebooks'): [...]}       # use_case
+
+NAMING CONVENTION:
+    get_<analysis_name>_batch(conn, dates, run_date, level, category=None)
+        -> Dict[NodePath, List[Dict]] (Dict[NodePath, Dict] for summary_kpis)
+
+`category` optionally restricts the batch to one category's subtree. Nodes
+with no rows are absent from the result; callers default them to [] / {}.
+Total is a single node and stays on analyses.py.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import date
+
+from .db import execute_query, safe_string
+from .config import (
+    PLAN_TABLE, HIERARCHY, RUN_DATE_COLUMN,
+    ACTUALS_COLUMNS, PLAN_COLUMNS,
+    GROWTH_THRESHOLD, SHRINK_THRESHOLD,
+    MAX_GAINERS, MAX_CONTRACTORS, MAX_INDUSTRIES, MAX_TOP_CUSTOMERS,
+)
+from .fiscal import FiscalDates
+from .analyses import add_cumulative_vs_plan
+from .actuals_slice import actuals_source
+
+
+# A node is addressed by its path of names below Total, e.g. ('Analytics', 'BI')
+NodePath = Tuple[str, ...]
+
+# Hierarchy columns that make up the node key, outermost first
+KEY_FIELDS = ['category', 'use_case', 'feature']
+BATCH_LEVELS = {'category': 1, 'use_case': 2, 'feature': 3}
+
+
+def _run_date_filter(run_date: date, alias: str = "") -> str:
+    """Build run_date filter clause for actuals queries."""
+    return f"{alias}{RUN_DATE_COLUMN} = '{run_date}'"
+
+
+# =============================================================================
+# NODE KEYS
+# =============================================================================
+
+class NodeKeys:
+    """
+    SQL fragments for carrying a level's node key through a query.
+
+    Source columns (product_category, use_case, feature) are renamed to
+    node_category, node_use_case, node_feature so they never collide with the
+    entity column an analysis groups by (e.g. use_case at category level).
+    """
+
+    def __init__(self, level: str, category: Optional[str] = None):
+        if level not in BATCH_LEVELS:
+            raise ValueError(f"No batch key for level '{level}'")
+        self.fields = KEY_FIELDS[:BATCH_LEVELS[level]]
+        self.names = [f"node_{field}" for field in self.fields]
+        self.category = category
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _source(self, field: str, table: str) -> str:
+        return (PLAN_COLUMNS if table == "plan" else ACTUALS_COLUMNS)[field]
+
+    def select(self, table: str = "actuals", alias: str = "") -> str:
+        """Key columns selected from a source table: 'product_category AS node_category, ...'."""
+        return ", ".join(
+            f"{alias}{self._source(f, table)} AS {n}" for f, n in zip(self.fields, self.names)
+        )
+
+    def where(self, table: str = "actuals", alias: str = "") -> str:
+        """Source-table filter: key columns non-NULL (a node filter never matches NULL)."""
+        clauses = [f"{alias}{self._source(f, table)} IS NOT NULL" for f in self.fields]
+        if self.category:
+            clauses.append(f"{alias}{self._source('category', table)} = '{safe_string(self.category)}'")
+        return " AND ".join(clauses)
+
+    def cols(self, alias: str = "") -> str:
+        """Key columns of a CTE: 'c.node_category, c.node_use_case'."""
+        return ", ".join(f"{alias}{n}" for n in self.names)
+
+    def on(self, left: str, right: str) -> str:
+        """Join condition matching two CTEs on the node key."""
+        return " AND ".join(f"{left}.{n} = {right}.{n}" for n in self.names)
+
+    def on_any(self, lefts: List[str], right: str) -> str:
+        """Join condition for a FULL OUTER chain: COALESCE(c.k, p.k) = right.k."""
+        return " AND ".join(
+            f"COALESCE({', '.join(f'{l}.{n}' for l in lefts)}) = {right}.{n}" for n in self.names
+        )
+
+    def on_source(self, alias: str, right: str, table: str = "actuals") -> str:
+        """Join condition matching raw table rows to a keyed CTE."""
+        return " AND ".join(
+            f"{alias}.{self._source(f, table)} = {right}.{n}" for f, n in zip(self.fields, self.names)
+        )
+
+    def coalesce(self, *aliases: str) -> str:
+        """Key columns of a FULL OUTER chain: 'COALESCE(c.node_category, p.node_category) AS node_category'."""
+        return ", ".join(
+            f"COALESCE({', '.join(f'{a}.{n}' for a in aliases)}) AS {n}" for n in self.names
+        )
+
+    def group_by(self, extra: int = 0) -> str:
+        """Positional GROUP BY for the key columns plus `extra` following columns."""
+        return ", ".join(str(i) for i in range(1, len(self.names) + extra + 1))
+
+    def split(self, rows: List[Dict[str, Any]]) -> Dict[NodePath, List[Dict[str, Any]]]:
+        """Group result rows by node path, removing the key columns (row order is kept)."""
+        by_node: Dict[NodePath, List[Dict[str, Any]]] = {}
+        for row in rows:
+            path = tuple(row.pop(n) for n in self.names)
+            by_node.setdefault(path, []).append(row)
+        return by_node
+
+
+# =============================================================================
+# SUMMARY KPIs
+# =============================================================================
+
+def get_summary_kpis_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+) -> Dict[NodePath, Dict[str, Any]]:
+    """Batch version of analyses.get_summary_kpis."""
+    keys = NodeKeys(level, category)
+    rd_filter = _run_date_filter(run_date)
+
+    query = f"""
+    WITH cq_revenue AS (
+        SELECT {keys.select()}, SUM(revenue + product_led_revenue) AS cq_rev
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by()}
+    ),
+    pq_revenue AS (
+        SELECT {keys.select()}, SUM(revenue + product_led_revenue) AS pq_rev
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by()}
+    ),
+    py_revenue AS (
+        SELECT {keys.select()}, SUM(revenue + product_led_revenue) AS py_rev
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by()}
+    ),
+    plan_revenue AS (
+        SELECT {keys.select('plan')}, SUM(revenue) AS plan_rev
+        FROM {PLAN_TABLE}
+        WHERE ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where('plan')}
+        GROUP BY {keys.group_by()}
+    ),
+    nodes AS (
+        SELECT {keys.cols()} FROM cq_revenue
+        UNION SELECT {keys.cols()} FROM pq_revenue
+        UNION SELECT {keys.cols()} FROM py_revenue
+        UNION SELECT {keys.cols()} FROM plan_revenue
+    ),
+    combined AS (
+        SELECT
+            {keys.cols('n.')},
+            COALESCE(cq.cq_rev, 0) AS cq_rev,
+            COALESCE(pq.pq_rev, 0) AS pq_rev,
+            COALESCE(py.py_rev, 0) AS py_rev,
+            COALESCE(p.plan_rev, 0) AS plan_rev
+        FROM nodes n
+        LEFT JOIN cq_revenue cq ON {keys.on('n', 'cq')}
+        LEFT JOIN pq_revenue pq ON {keys.on('n', 'pq')}
+        LEFT JOIN py_revenue py ON {keys.on('n', 'py')}
+        LEFT JOIN plan_revenue p ON {keys.on('n', 'p')}
+    )
+    SELECT
+        {keys.cols()},
+        ROUND(cq_rev, 0) AS qtd_revenue,
+        ROUND(plan_rev, 0) AS qtd_plan,
+        ROUND(cq_rev - plan_rev, 0) AS delta_to_plan,
+        ROUND(100.0 * (cq_rev - plan_rev) / NULLIF(plan_rev, 0), 2) AS pct_vs_plan,
+        ROUND(100.0 * (cq_rev - py_rev) / NULLIF(py_rev, 0), 2) AS yoy_growth_pct,
+        ROUND(100.0 * (cq_rev - pq_rev) / NULLIF(pq_rev, 0), 2) AS qoq_growth_pct,
+        ROUND(pq_rev, 0) AS prior_q_revenue,
+        ROUND(py_rev, 0) AS prior_year_revenue
+    FROM combined
+    ORDER BY {keys.group_by()}
+    """
+
+    results = execute_query(conn, query, f"Summary KPIs for all {level} nodes")
+    return {path: rows[0] for path, rows in keys.split(results).items()}
+
+
+# =============================================================================
+# DAILY TRENDS (CURRENT QUARTER)
+# =============================================================================
+
+def get_monthly_trends_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+) -> Dict[NodePath, List[Dict[str, Any]]]:
+    """Batch version of analyses.get_monthly_trends."""
+    keys = NodeKeys(level, category)
+    rd_filter = _run_date_filter(run_date)
+
+    query = f"""
+    WITH actuals AS (
+        SELECT
+            {keys.select()},
+            ds AS day,
+            SUM(revenue + product_led_revenue) AS daily_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(1)}
+    ),
+    plan AS (
+        SELECT
+            {keys.select('plan')},
+            ds AS day,
+            SUM(revenue) AS daily_plan
+        FROM {PLAN_TABLE}
+        WHERE ds BETWEEN '{dates.q_start}' AND '{dates.q_end}'
+            AND {keys.where('plan')}
+        GROUP BY {keys.group_by(1)}
+    ),
+    combined AS (
+        SELECT
+            {keys.coalesce('a', 'p')},
+            COALESCE(a.day, p.day) AS day,
+            COALESCE(a.daily_revenue, 0) AS daily_revenue,
+            COALESCE(p.daily_plan, 0) AS daily_plan
+        FROM actuals a
+        FULL OUTER JOIN plan p ON {keys.on('a', 'p')} AND a.day = p.day
+    )
+    SELECT
+        {keys.cols()},
+        day,
+        ROUND(daily_revenue, 0) AS revenue,
+        ROUND(daily_plan, 0) AS plan_revenue,
+        ROUND(SUM(daily_revenue) OVER (PARTITION BY {keys.cols()} ORDER BY day), 0) AS cumulative_revenue,
+        ROUND(SUM(daily_plan) OVER (PARTITION BY {keys.cols()} ORDER BY day), 0) AS cumulative_plan
+    FROM combined
+    WHERE day <= '{dates.effective_end}'
+    ORDER BY {keys.group_by(1)}
+    """
+
+    results = execute_query(conn, query, f"Daily trends for all {level} nodes")
+    add_cumulative_vs_plan(results)
+    return keys.split(results)
+
+
+# =============================================================================
+# CHILDREN BREAKDOWN
+# =============================================================================
+
+def get_children_breakdown_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+) -> Dict[NodePath, List[Dict[str, Any]]]:
+    """Batch version of analyses.get_children_breakdown."""
+    child_column = HIERARCHY[HIERARCHY[level].child_level].column
+    plan_child_column = "salesforce_account_name" if child_column == "latest_salesforce_account_name" else child_column
+
+    keys = NodeKeys(level, category)
+    rd_filter = _run_date_filter(run_date)
+
+    query = f"""
+    WITH current_q AS (
+        SELECT
+            {keys.select()},
+            {child_column} AS entity,
+            SUM(revenue + product_led_revenue) AS cq_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(1)}
+    ),
+    prior_q AS (
+        SELECT
+            {keys.select()},
+            {child_column} AS entity,
+            SUM(revenue + product_led_revenue) AS pq_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(1)}
+    ),
+    plan_q AS (
+        SELECT
+            {keys.select('plan')},
+            {plan_child_column} AS entity,
+            SUM(revenue) AS plan_revenue
+        FROM {PLAN_TABLE}
+        WHERE ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where('plan')}
+        GROUP BY {keys.group_by(1)}
+    ),
+    prior_year AS (
+        SELECT
+            {keys.select()},
+            {child_column} AS entity,
+            SUM(revenue + product_led_revenue) AS py_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(1)}
+    ),
+    combined AS (
+        SELECT
+            {keys.coalesce('c', 'p', 'pl', 'py')},
+            COALESCE(c.entity, p.entity, pl.entity, py.entity) AS entity,
+            COALESCE(c.cq_revenue, 0) AS cq_revenue,
+            COALESCE(p.pq_revenue, 0) AS pq_revenue,
+            COALESCE(pl.plan_revenue, 0) AS plan_revenue,
+            COALESCE(py.py_revenue, 0) AS py_revenue
+        FROM current_q c
+        FULL OUTER JOIN prior_q p
+            ON {keys.on('c', 'p')} AND c.entity = p.entity
+        FULL OUTER JOIN plan_q pl
+            ON {keys.on_any(['c', 'p'], 'pl')} AND COALESCE(c.entity, p.entity) = pl.entity
+        FULL OUTER JOIN prior_year py
+            ON {keys.on_any(['c', 'p', 'pl'], 'py')} AND COALESCE(c.entity, p.entity, pl.entity) = py.entity
+    ),
+    totals AS (
+        SELECT
+            {keys.cols()},
+            SUM(cq_revenue) AS total_revenue,
+            NULLIF(SUM(ABS(cq_revenue - plan_revenue)), 0) AS total_variance_magnitude,
+            NULLIF(SUM(ABS(cq_revenue - pq_revenue)), 0) AS total_qoq_delta_magnitude,
+            NULLIF(SUM(ABS(cq_revenue - py_revenue)), 0) AS total_yoy_delta_magnitude
+        FROM combined
+        GROUP BY {keys.group_by()}
+    )
+    SELECT
+        {keys.cols('c.')},
+        c.entity,
+        ROUND(c.cq_revenue, 0) AS qtd_revenue,
+        ROUND(c.pq_revenue, 0) AS prior_q_revenue,
+        ROUND(c.cq_revenue - c.pq_revenue, 0) AS qoq_delta,
+        ROUND(100.0 * (c.cq_revenue - c.pq_revenue) / NULLIF(c.pq_revenue, 0), 2) AS qoq_growth_pct,
+        ROUND(100.0 * ABS(c.cq_revenue - c.pq_revenue) / t.total_qoq_delta_magnitude, 2) AS contribution_to_growth_pct,
+        ROUND(c.plan_revenue, 0) AS qtd_plan,
+        ROUND(c.cq_revenue - c.plan_revenue, 0) AS delta_to_plan,
+        ROUND(100.0 * (c.cq_revenue - c.plan_revenue) / NULLIF(c.plan_revenue, 0), 2) AS pct_vs_plan,
+        ROUND(100.0 * ABS(c.cq_revenue - c.plan_revenue) / t.total_variance_magnitude, 2) AS variance_magnitude_pct,
+        ROUND(c.py_revenue, 0) AS prior_year_revenue,
+        ROUND(c.cq_revenue - c.py_revenue, 0) AS yoy_delta,
+        ROUND(100.0 * (c.cq_revenue - c.py_revenue) / NULLIF(c.py_revenue, 0), 2) AS yoy_growth_pct,
+        ROUND(100.0 * ABS(c.cq_revenue - c.py_revenue) / t.total_yoy_delta_magnitude, 2) AS yoy_contribution_to_growth_pct,
+        ROUND(100.0 * c.cq_revenue / NULLIF(t.total_revenue, 0), 2) AS mix_pct
+    FROM combined c
+    JOIN totals t ON {keys.on('c', 't')}
+    WHERE c.entity IS NOT NULL
+    ORDER BY {keys.cols('c.')}, c.cq_revenue DESC
+    """
+
+    return keys.split(execute_query(conn, query, f"Children breakdown for all {level} nodes"))
+
+
+# =============================================================================
+# TOP 20 VS LONG TAIL (CUSTOMERS)
+# =============================================================================
+
+def get_top20_vs_longtail_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+) -> Dict[NodePath, List[Dict[str, Any]]]:
+    """Batch version of analyses.get_top20_vs_longtail."""
+    keys = NodeKeys(level, category)
+    rd_filter = _run_date_filter(run_date)
+
+    query = f"""
+    WITH current_q AS (
+        SELECT
+            {keys.select()},
+            latest_salesforce_account_name AS customer,
+            SUM(revenue + product_led_revenue) AS cq_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where()}
+            AND agreement_type = 'Capacity'
+        GROUP BY {keys.group_by(1)}
+    ),
+    prior_q AS (
+        SELECT
+            {keys.select()},
+            latest_salesforce_account_name AS customer,
+            SUM(revenue + product_led_revenue) AS pq_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
+            AND {keys.where()}
+            AND agreement_type = 'Capacity'
+        GROUP BY {keys.group_by(1)}
+    ),
+    prior_year AS (
+        SELECT
+            {keys.select()},
+            latest_salesforce_account_name AS customer,
+            SUM(revenue + product_led_revenue) AS py_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
+            AND {keys.where()}
+            AND agreement_type = 'Capacity'
+        GROUP BY {keys.group_by(1)}
+    ),
+    plan_q AS (
+        SELECT
+            {keys.select('plan')},
+            salesforce_account_name AS customer,
+            SUM(revenue) AS plan_revenue
+        FROM {PLAN_TABLE}
+        WHERE ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where('plan')}
+        GROUP BY {keys.group_by(1)}
+    ),
+    combined AS (
+        SELECT
+            {keys.cols('c.')},
+            c.customer,
+            c.cq_revenue,
+            COALESCE(p.pq_revenue, 0) AS pq_revenue,
+            COALESCE(py.py_revenue, 0) AS py_revenue,
+            COALESCE(pl.plan_revenue, 0) AS plan_revenue
+        FROM current_q c
+        LEFT JOIN prior_q p ON {keys.on('c', 'p')} AND c.customer = p.customer
+        LEFT JOIN prior_year py ON {keys.on('c', 'py')} AND c.customer = py.customer
+        LEFT JOIN plan_q pl ON {keys.on('c', 'pl')} AND c.customer = pl.customer
+        WHERE c.customer IS NOT NULL
+    ),
+    ranked AS (
+        SELECT
+            {keys.cols()}, customer, cq_revenue, pq_revenue, py_revenue, plan_revenue,
+            ROW_NUMBER() OVER (PARTITION BY {keys.cols()} ORDER BY cq_revenue DESC) AS rnk,
+            SUM(cq_revenue) OVER (PARTITION BY {keys.cols()}) AS total_revenue
+        FROM combined
+    ),
+    totals AS (
+        SELECT
+            {keys.cols()},
+            NULLIF(SUM(ABS(cq_revenue - pq_revenue)), 0) AS total_qoq_magnitude,
+            NULLIF(SUM(ABS(cq_revenue - plan_revenue)), 0) AS total_plan_magnitude,
+            NULLIF(SUM(ABS(cq_revenue - py_revenue)), 0) AS total_yoy_magnitude
+        FROM combined
+        GROUP BY {keys.group_by()}
+    ),
+    aggregated AS (
+        SELECT
+            {keys.cols()},
+            CASE WHEN rnk <= 20 THEN 'Top 20 Customers' ELSE 'Long Tail' END AS segment,
+            COUNT(*) AS customer_count,
+            SUM(cq_revenue) AS cq_revenue,
+            SUM(pq_revenue) AS pq_revenue,
+            SUM(py_revenue) AS py_revenue,
+            SUM(plan_revenue) AS plan_revenue,
+            MAX(total_revenue) AS total_revenue,
+            SUM(ABS(cq_revenue - pq_revenue)) AS qoq_magnitude,
+            SUM(ABS(cq_revenue - plan_revenue)) AS plan_magnitude,
+            SUM(ABS(cq_revenue - py_revenue)) AS yoy_magnitude
+        FROM ranked
+        GROUP BY {keys.group_by(1)}
+    )
+    SELECT
+        {keys.cols('a.')},
+        a.segment,
+        a.customer_count,
+        ROUND(a.cq_revenue, 0) AS qtd_revenue,
+        ROUND(a.pq_revenue, 0) AS prior_q_revenue,
+        ROUND(a.cq_revenue - a.pq_revenue, 0) AS qoq_delta,
+        ROUND(100.0 * (a.cq_revenue - a.pq_revenue) / NULLIF(a.pq_revenue, 0), 2) AS qoq_growth_pct,
+        ROUND(100.0 * a.qoq_magnitude / t.total_qoq_magnitude, 2) AS contribution_to_growth_pct,
+        ROUND(a.plan_revenue, 0) AS qtd_plan,
+        ROUND(a.cq_revenue - a.plan_revenue, 0) AS delta_to_plan,
+        ROUND(100.0 * (a.cq_revenue - a.plan_revenue) / NULLIF(a.plan_revenue, 0), 2) AS pct_vs_plan,
+        ROUND(100.0 * a.plan_magnitude / t.total_plan_magnitude, 2) AS variance_magnitude_pct,
+        ROUND(a.py_revenue, 0) AS prior_year_revenue,
+        ROUND(a.cq_revenue - a.py_revenue, 0) AS yoy_delta,
+        ROUND(100.0 * (a.cq_revenue - a.py_revenue) / NULLIF(a.py_revenue, 0), 2) AS yoy_growth_pct,
+        ROUND(100.0 * a.yoy_magnitude / t.total_yoy_magnitude, 2) AS yoy_contribution_to_growth_pct,
+        ROUND(100.0 * a.cq_revenue / NULLIF(a.total_revenue, 0), 2) AS mix_pct
+    FROM aggregated a
+    JOIN totals t ON {keys.on('a', 't')}
+    ORDER BY {keys.cols('a.')}, a.cq_revenue DESC
+    """
+
+    return keys.split(execute_query(conn, query, f"Top 20 vs Long Tail customers for all {level} nodes"))
+
+
+# =============================================================================
+# INDUSTRY PERFORMANCE
+# =============================================================================
+
+def get_industry_performance_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+) -> Dict[NodePath, List[Dict[str, Any]]]:
+    """Batch version of analyses.get_industry_performance."""
+    keys = NodeKeys(level, category)
+    rd_filter = _run_date_filter(run_date)
+
+    query = f"""
+    WITH current_q AS (
+        SELECT
+            {keys.select()},
+            COALESCE(industry_rollup, 'Unknown') AS industry,
+            SUM(revenue + product_led_revenue) AS cq_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(1)}
+    ),
+    prior_q AS (
+        SELECT
+            {keys.select()},
+            COALESCE(industry_rollup, 'Unknown') AS industry,
+            SUM(revenue + product_led_revenue) AS pq_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(1)}
+    ),
+    prior_year AS (
+        SELECT
+            {keys.select()},
+            COALESCE(industry_rollup, 'Unknown') AS industry,
+            SUM(revenue + product_led_revenue) AS py_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(1)}
+    ),
+    plan_q AS (
+        SELECT
+            {keys.select('plan')},
+            COALESCE(industry_rollup, 'Unknown') AS industry,
+            SUM(revenue) AS plan_revenue
+        FROM {PLAN_TABLE}
+        WHERE ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where('plan')}
+        GROUP BY {keys.group_by(1)}
+    ),
+    combined AS (
+        SELECT
+            {keys.coalesce('c', 'pl')},
+            COALESCE(c.industry, pl.industry) AS industry,
+            COALESCE(c.cq_revenue, 0) AS cq_revenue,
+            COALESCE(p.pq_revenue, 0) AS pq_revenue,
+            COALESCE(py.py_revenue, 0) AS py_revenue,
+            COALESCE(pl.plan_revenue, 0) AS plan_revenue
+        FROM current_q c
+        LEFT JOIN prior_q p ON {keys.on('c', 'p')} AND c.industry = p.industry
+        LEFT JOIN prior_year py ON {keys.on('c', 'py')} AND c.industry = py.industry
+        FULL OUTER JOIN plan_q pl ON {keys.on('c', 'pl')} AND c.industry = pl.industry
+    ),
+    totals AS (
+        SELECT
+            {keys.cols()},
+            SUM(cq_revenue) AS total_revenue,
+            NULLIF(SUM(ABS(cq_revenue - pq_revenue)), 0) AS total_qoq_delta_magnitude,
+            NULLIF(SUM(ABS(cq_revenue - py_revenue)), 0) AS total_yoy_delta_magnitude,
+            NULLIF(SUM(ABS(cq_revenue - plan_revenue)), 0) AS total_variance_magnitude
+        FROM combined
+        GROUP BY {keys.group_by()}
+    )
+    SELECT
+        {keys.cols('c.')},
+        c.industry,
+        ROUND(c.cq_revenue, 0) AS qtd_revenue,
+        ROUND(c.pq_revenue, 0) AS prior_q_revenue,
+        ROUND(c.cq_revenue - c.pq_revenue, 0) AS qoq_delta,
+        ROUND(100.0 * (c.cq_revenue - c.pq_revenue) / NULLIF(c.pq_revenue, 0), 2) AS qoq_growth_pct,
+        ROUND(100.0 * ABS(c.cq_revenue - c.pq_revenue) / t.total_qoq_delta_magnitude, 2) AS contribution_to_growth_pct,
+        ROUND(c.plan_revenue, 0) AS qtd_plan,
+        ROUND(c.cq_revenue - c.plan_revenue, 0) AS delta_to_plan,
+        ROUND(100.0 * (c.cq_revenue - c.plan_revenue) / NULLIF(c.plan_revenue, 0), 2) AS pct_vs_plan,
+        ROUND(100.0 * ABS(c.cq_revenue - c.plan_revenue) / t.total_variance_magnitude, 2) AS variance_magnitude_pct,
+        ROUND(c.py_revenue, 0) AS prior_year_revenue,
+        ROUND(c.cq_revenue - c.py_revenue, 0) AS yoy_delta,
+        ROUND(100.0 * (c.cq_revenue - c.py_revenue) / NULLIF(c.py_revenue, 0), 2) AS yoy_growth_pct,
+        ROUND(100.0 * ABS(c.cq_revenue - c.py_revenue) / t.total_yoy_delta_magnitude, 2) AS yoy_contribution_to_growth_pct,
+        ROUND(100.0 * c.cq_revenue / NULLIF(t.total_revenue, 0), 2) AS mix_pct
+    FROM combined c
+    JOIN totals t ON {keys.on('c', 't')}
+    WHERE c.industry IS NOT NULL
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY {keys.cols('c.')} ORDER BY c.cq_revenue DESC) <= {MAX_INDUSTRIES}
+    ORDER BY {keys.cols('c.')}, c.cq_revenue DESC
+    """
+
+    return keys.split(execute_query(conn, query, f"Industry performance for all {level} nodes"))
+
+
+# =============================================================================
+# NEW VS EXISTING CUSTOMERS
+# =============================================================================
+
+def get_new_vs_existing_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+) -> Dict[NodePath, List[Dict[str, Any]]]:
+    """Batch version of analyses.get_new_vs_existing."""
+    keys = NodeKeys(level, category)
+    rd_filter = _run_date_filter(run_date)
+
+    query = f"""
+    WITH current_q AS (
+        SELECT
+            {keys.select()},
+            latest_salesforce_account_name AS customer,
+            SUM(revenue + product_led_revenue) AS cq_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where()}
+            AND agreement_type = 'Capacity'
+        GROUP BY {keys.group_by(1)}
+    ),
+    prior_q AS (
+        SELECT
+            {keys.select()},
+            latest_salesforce_account_name AS customer,
+            SUM(revenue + product_led_revenue) AS pq_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
+            AND {keys.where()}
+            AND agreement_type = 'Capacity'
+        GROUP BY {keys.group_by(1)}
+    ),
+    prior_year AS (
+        SELECT
+            {keys.select()},
+            latest_salesforce_account_name AS customer,
+            SUM(revenue + product_led_revenue) AS py_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
+            AND {keys.where()}
+            AND agreement_type = 'Capacity'
+        GROUP BY {keys.group_by(1)}
+    ),
+    plan_q AS (
+        SELECT
+            {keys.select('plan')},
+            salesforce_account_name AS customer,
+            SUM(revenue) AS plan_revenue
+        FROM {PLAN_TABLE}
+        WHERE ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where('plan')}
+        GROUP BY {keys.group_by(1)}
+    ),
+    combined AS (
+        SELECT
+            {keys.coalesce('c', 'p')},
+            COALESCE(c.customer, p.customer) AS customer,
+            COALESCE(c.cq_revenue, 0) AS cq_revenue,
+            COALESCE(p.pq_revenue, 0) AS pq_revenue,
+            COALESCE(py.py_revenue, 0) AS py_revenue,
+            COALESCE(pl.plan_revenue, 0) AS plan_revenue,
+            CASE
+                WHEN p.pq_revenue IS NULL OR p.pq_revenue = 0 THEN 'NEW'
+                WHEN c.cq_revenue IS NULL OR c.cq_revenue = 0 THEN 'CHURNED'
+                ELSE 'EXISTING'
+            END AS customer_type,
+            CASE
+                WHEN p.pq_revenue IS NULL OR p.pq_revenue = 0 THEN NULL
+                WHEN c.cq_revenue IS NULL OR c.cq_revenue = 0 THEN NULL
+                WHEN (COALESCE(c.cq_revenue, 0) - COALESCE(p.pq_revenue, 0)) / NULLIF(p.pq_revenue, 0) > {GROWTH_THRESHOLD} THEN 'GROWING'
+                WHEN (COALESCE(c.cq_revenue, 0) - COALESCE(p.pq_revenue, 0)) / NULLIF(p.pq_revenue, 0) < {SHRINK_THRESHOLD} THEN 'SHRINKING'
+                ELSE 'STAGNANT'
+            END AS existing_segment
+        FROM current_q c
+        FULL OUTER JOIN prior_q p
+            ON {keys.on('c', 'p')} AND c.customer = p.customer
+        LEFT JOIN prior_year py
+            ON {keys.on_any(['c', 'p'], 'py')} AND COALESCE(c.customer, p.customer) = py.customer
+        LEFT JOIN plan_q pl
+            ON {keys.on_any(['c', 'p'], 'pl')} AND COALESCE(c.customer, p.customer) = pl.customer
+    ),
+    totals AS (
+        SELECT
+            {keys.cols()},
+            NULLIF(SUM(ABS(cq_revenue - pq_revenue)), 0) AS total_qoq_magnitude,
+            NULLIF(SUM(ABS(cq_revenue - plan_revenue)), 0) AS total_plan_magnitude,
+            NULLIF(SUM(ABS(cq_revenue - py_revenue)), 0) AS total_yoy_magnitude,
+            SUM(cq_revenue) AS total_revenue
+        FROM combined
+        GROUP BY {keys.group_by()}
+    ),
+    aggregated AS (
+        SELECT
+            {keys.cols()},
+            customer_type,
+            existing_segment,
+            COUNT(DISTINCT customer) AS customer_count,
+            SUM(cq_revenue) AS cq_revenue,
+            SUM(pq_revenue) AS pq_revenue,
+            SUM(py_revenue) AS py_revenue,
+            SUM(plan_revenue) AS plan_revenue,
+            SUM(ABS(cq_revenue - pq_revenue)) AS qoq_magnitude,
+            SUM(ABS(cq_revenue - plan_revenue)) AS plan_magnitude,
+            SUM(ABS(cq_revenue - py_revenue)) AS yoy_magnitude
+        FROM combined
+        GROUP BY {keys.group_by(2)}
+    )
+    SELECT
+        {keys.cols('a.')},
+        a.customer_type,
+        a.existing_segment,
+        a.customer_count,
+        ROUND(a.cq_revenue, 0) AS qtd_revenue,
+        ROUND(a.pq_revenue, 0) AS prior_q_revenue,
+        ROUND(a.cq_revenue - a.pq_revenue, 0) AS qoq_delta,
+        ROUND(100.0 * (a.cq_revenue - a.pq_revenue) / NULLIF(a.pq_revenue, 0), 2) AS qoq_growth_pct,
+        ROUND(100.0 * a.qoq_magnitude / t.total_qoq_magnitude, 2) AS contribution_to_growth_pct,
+        ROUND(a.plan_revenue, 0) AS qtd_plan,
+        ROUND(a.cq_revenue - a.plan_revenue, 0) AS delta_to_plan,
+        ROUND(100.0 * (a.cq_revenue - a.plan_revenue) / NULLIF(a.plan_revenue, 0), 2) AS pct_vs_plan,
+        ROUND(100.0 * a.plan_magnitude / t.total_plan_magnitude, 2) AS variance_magnitude_pct,
+        ROUND(a.py_revenue, 0) AS prior_year_revenue,
+        ROUND(a.cq_revenue - a.py_revenue, 0) AS yoy_delta,
+        ROUND(100.0 * (a.cq_revenue - a.py_revenue) / NULLIF(a.py_revenue, 0), 2) AS yoy_growth_pct,
+        ROUND(100.0 * a.yoy_magnitude / t.total_yoy_magnitude, 2) AS yoy_contribution_to_growth_pct,
+        ROUND(100.0 * a.cq_revenue / NULLIF(t.total_revenue, 0), 2) AS mix_pct
+    FROM aggregated a
+    JOIN totals t ON {keys.on('a', 't')}
+    ORDER BY {keys.cols('a.')}, a.customer_type, a.existing_segment
+    """
+
+    return keys.split(execute_query(conn, query, f"New vs Existing for all {level} nodes"))
+
+
+# =============================================================================
+# TOP GAINERS / CONTRACTORS (CHILD ENTITIES)
+# =============================================================================
+
+def _child_movers_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str],
+    gainers: bool,
+) -> Dict[NodePath, List[Dict[str, Any]]]:
+    """Shared body of get_top_gainers_batch / get_top_contractors_batch."""
+    child_column = HIERARCHY[HIERARCHY[level].child_level].column
+    keys = NodeKeys(level, category)
+    rd_filter = _run_date_filter(run_date)
+
+    direction, sign, limit = ("DESC", ">", MAX_GAINERS) if gainers else ("ASC", "<", MAX_CONTRACTORS)
+
+    query = f"""
+    WITH current_q AS (
+        SELECT {keys.select()}, {child_column} AS entity, SUM(revenue + product_led_revenue) AS cq_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(1)}
+    ),
+    prior_q AS (
+        SELECT {keys.select()}, {child_column} AS entity, SUM(revenue + product_led_revenue) AS pq_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(1)}
+    ),
+    combined AS (
+        SELECT
+            {keys.coalesce('c', 'p')},
+            COALESCE(c.entity, p.entity) AS entity,
+            COALESCE(c.cq_revenue, 0) AS cq_revenue,
+            COALESCE(p.pq_revenue, 0) AS pq_revenue,
+            COALESCE(c.cq_revenue, 0) - COALESCE(p.pq_revenue, 0) AS delta
+        FROM current_q c
+        FULL OUTER JOIN prior_q p ON {keys.on('c', 'p')} AND c.entity = p.entity
+    ),
+    totals AS (
+        SELECT {keys.cols()}, NULLIF(SUM(ABS(delta)), 0) AS total_magnitude
+        FROM combined
+        GROUP BY {keys.group_by()}
+    )
+    SELECT
+        {keys.cols('c.')},
+        c.entity,
+        ROUND(c.cq_revenue, 0) AS current_quarter_revenue,
+        ROUND(c.pq_revenue, 0) AS prior_quarter_revenue,
+        ROUND(c.delta, 0) AS delta,
+        ROUND(100.0 * c.delta / NULLIF(c.pq_revenue, 0), 2) AS qoq_growth_pct,
+        ROUND(100.0 * ABS(c.delta) / t.total_magnitude, 2) AS contribution_pct
+    FROM combined c
+    JOIN totals t ON {keys.on('c', 't')}
+    WHERE c.delta {sign} 0
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY {keys.cols('c.')} ORDER BY c.delta {direction}) <= {limit}
+    ORDER BY {keys.cols('c.')}, c.delta {direction}
+    """
+
+    label = "gainers" if gainers else "contractors"
+    return keys.split(execute_query(conn, query, f"Top {label} for all {level} nodes"))
+
+
+def get_top_gainers_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+) -> Dict[NodePath, List[Dict[str, Any]]]:
+    """Batch version of analyses.get_top_gainers."""
+    return _child_movers_batch(conn, dates, run_date, level, category, gainers=True)
+
+
+def get_top_contractors_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+) -> Dict[NodePath, List[Dict[str, Any]]]:
+    """Batch version of analyses.get_top_contractors."""
+    return _child_movers_batch(conn, dates, run_date, level, category, gainers=False)
+
+
+# =============================================================================
+# CONCENTRATION TREND
+# =============================================================================
+
+def get_concentration_trend_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+) -> Dict[NodePath, List[Dict[str, Any]]]:
+    """Batch version of analyses.get_concentration_trend."""
+    keys = NodeKeys(level, category)
+    rd_filter = _run_date_filter(run_date)
+
+    query = f"""
+    WITH monthly_by_customer AS (
+        SELECT
+            {keys.select()},
+            DATE_TRUNC('month', ds) AS month,
+            latest_salesforce_account_name AS customer,
+            SUM(revenue + product_led_revenue) AS revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(2)}
+    ),
+    ranked AS (
+        SELECT
+            {keys.cols()}, month, customer, revenue,
+            ROW_NUMBER() OVER (PARTITION BY {keys.cols()}, month ORDER BY revenue DESC) AS rnk,
+            SUM(revenue) OVER (PARTITION BY {keys.cols()}, month) AS total_revenue
+        FROM monthly_by_customer
+    )
+    SELECT
+        {keys.cols()},
+        month,
+        ROUND(SUM(CASE WHEN rnk <= 10 THEN revenue ELSE 0 END), 0) AS top10_revenue,
+        ROUND(SUM(CASE WHEN rnk <= 20 THEN revenue ELSE 0 END), 0) AS top20_revenue,
+        ROUND(MAX(total_revenue), 0) AS total_revenue,
+        ROUND(100.0 * SUM(CASE WHEN rnk <= 10 THEN revenue ELSE 0 END) / NULLIF(MAX(total_revenue), 0), 2) AS top10_pct,
+        ROUND(100.0 * SUM(CASE WHEN rnk <= 20 THEN revenue ELSE 0 END) / NULLIF(MAX(total_revenue), 0), 2) AS top20_pct
+    FROM ranked
+    GROUP BY {keys.group_by(1)}
+    ORDER BY {keys.group_by(1)}
+    """
+
+    return keys.split(execute_query(conn, query, f"Concentration trend for all {level} nodes"))
+
+
+# =============================================================================
+# TOP CUSTOMERS / GAINERS / CONTRACTORS
+# =============================================================================
+
+def _customer_ctes(keys: NodeKeys, dates: FiscalDates, run_date: date, source: str) -> str:
+    """The current_q / prior_q / prior_year / plan_q / combined CTEs shared by the top customer analyses (actuals read from source)."""
+    rd_filter = _run_date_filter(run_date)
+    return f"""
+    current_q AS (
+        SELECT
+            {keys.select()},
+            latest_salesforce_account_name AS customer,
+            SUM(revenue + product_led_revenue) AS cq_revenue
+        FROM {source}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(1)}
+    ),
+    prior_q AS (
+        SELECT
+            {keys.select()},
+            latest_salesforce_account_name AS customer,
+            SUM(revenue + product_led_revenue) AS pq_revenue
+        FROM {source}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(1)}
+    ),
+    prior_year AS (
+        SELECT
+            {keys.select()},
+            latest_salesforce_account_name AS customer,
+            SUM(revenue + product_led_revenue) AS py_revenue
+        FROM {source}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(1)}
+    ),
+    plan_q AS (
+        SELECT
+            {keys.select('plan')},
+            salesforce_account_name AS customer,
+            SUM(revenue) AS plan_revenue
+        FROM {PLAN_TABLE}
+        WHERE ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where('plan')}
+        GROUP BY {keys.group_by(1)}
+    ),
+    combined AS (
+        SELECT
+            {keys.coalesce('c', 'p', 'py', 'pl')},
+            COALESCE(c.customer, p.customer, py.customer, pl.customer) AS customer,
+            COALESCE(c.cq_revenue, 0) AS cq_revenue,
+            COALESCE(p.pq_revenue, 0) AS pq_revenue,
+            COALESCE(py.py_revenue, 0) AS py_revenue,
+            COALESCE(pl.plan_revenue, 0) AS plan_revenue,
+            COALESCE(c.cq_revenue, 0) - COALESCE(p.pq_revenue, 0) AS delta
+        FROM current_q c
+        FULL OUTER JOIN prior_q p
+            ON {keys.on('c', 'p')} AND c.customer = p.customer
+        FULL OUTER JOIN prior_year py
+            ON {keys.on_any(['c', 'p'], 'py')} AND COALESCE(c.customer, p.customer) = py.customer
+        FULL OUTER JOIN plan_q pl
+            ON {keys.on_any(['c', 'p', 'py'], 'pl')} AND COALESCE(c.customer, p.customer, py.customer) = pl.customer
+    )"""
+
+
+def get_top_customers_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+) -> Dict[NodePath, List[Dict[str, Any]]]:
+    """Batch version of analyses.get_top_customers."""
+    keys = NodeKeys(level, category)
+
+    query = f"""
+    WITH {_customer_ctes(keys, dates, run_date, actuals_source(conn))},
+    totals AS (
+        SELECT
+            {keys.cols()},
+            SUM(cq_revenue) AS total_revenue,
+            NULLIF(SUM(ABS(cq_revenue - pq_revenue)), 0) AS total_qoq_delta_magnitude,
+            NULLIF(SUM(ABS(cq_revenue - py_revenue)), 0) AS total_yoy_delta_magnitude,
+            NULLIF(SUM(ABS(cq_revenue - plan_revenue)), 0) AS total_variance_magnitude
+        FROM combined
+        GROUP BY {keys.group_by()}
+    )
+    SELECT
+        {keys.cols('c.')},
+        c.customer,
+        ROUND(c.cq_revenue, 0) AS qtd_revenue,
+        ROUND(c.pq_revenue, 0) AS prior_q_revenue,
+        ROUND(c.cq_revenue - c.pq_revenue, 0) AS qoq_delta,
+        ROUND(100.0 * (c.cq_revenue - c.pq_revenue) / NULLIF(c.pq_revenue, 0), 2) AS qoq_growth_pct,
+        ROUND(100.0 * ABS(c.cq_revenue - c.pq_revenue) / t.total_qoq_delta_magnitude, 2) AS contribution_to_growth_pct,
+        ROUND(c.plan_revenue, 0) AS qtd_plan,
+        ROUND(c.cq_revenue - c.plan_revenue, 0) AS vs_plan,
+        ROUND(100.0 * (c.cq_revenue - c.plan_revenue) / NULLIF(c.plan_revenue, 0), 2) AS vs_plan_pct,
+        ROUND(100.0 * ABS(c.cq_revenue - c.plan_revenue) / t.total_variance_magnitude, 2) AS variance_magnitude_pct,
+        ROUND(c.py_revenue, 0) AS prior_year_revenue,
+        ROUND(c.cq_revenue - c.py_revenue, 0) AS yoy_delta,
+        ROUND(100.0 * (c.cq_revenue - c.py_revenue) / NULLIF(c.py_revenue, 0), 2) AS yoy_growth_pct,
+        ROUND(100.0 * ABS(c.cq_revenue - c.py_revenue) / t.total_yoy_delta_magnitude, 2) AS yoy_contribution_to_growth_pct,
+        ROUND(100.0 * c.cq_revenue / NULLIF(t.total_revenue, 0), 2) AS mix_pct
+    FROM combined c
+    JOIN totals t ON {keys.on('c', 't')}
+    WHERE c.customer IS NOT NULL
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY {keys.cols('c.')} ORDER BY c.cq_revenue DESC) <= {MAX_TOP_CUSTOMERS}
+    ORDER BY {keys.cols('c.')}, c.cq_revenue DESC
+    """
+
+    return keys.split(execute_query(conn, query, f"Top customers for all {level} nodes"))
+
+
+def get_top_customer_gainers_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+) -> Dict[NodePath, List[Dict[str, Any]]]:
+    """Batch version of analyses.get_top_customer_gainers."""
+    keys = NodeKeys(level, category)
+
+    query = f"""
+    WITH {_customer_ctes(keys, dates, run_date, actuals_source(conn))},
+    totals AS (
+        SELECT
+            {keys.cols()},
+            NULLIF(SUM(CASE WHEN delta > 0 THEN delta ELSE 0 END), 0) AS total_gains,
+            NULLIF(SUM(ABS(cq_revenue - plan_revenue)), 0) AS total_plan_magnitude,
+            NULLIF(SUM(ABS(cq_revenue - py_revenue)), 0) AS total_yoy_magnitude,
+            SUM(cq_revenue) AS total_revenue
+        FROM combined
+        GROUP BY {keys.group_by()}
+    )
+    SELECT
+        {keys.cols('c.')},
+        c.customer,
+        ROUND(c.cq_revenue, 0) AS qtd_revenue,
+        ROUND(c.pq_revenue, 0) AS prior_q_revenue,
+        ROUND(c.delta, 0) AS qoq_delta,
+        ROUND(100.0 * c.delta / NULLIF(c.pq_revenue, 0), 2) AS qoq_growth_pct,
+        ROUND(100.0 * c.delta / t.total_gains, 2) AS contribution_to_growth_pct,
+        ROUND(c.plan_revenue, 0) AS qtd_plan,
+        ROUND(c.cq_revenue - c.plan_revenue, 0) AS delta_to_plan,
+        ROUND(100.0 * (c.cq_revenue - c.plan_revenue) / NULLIF(c.plan_revenue, 0), 2) AS pct_vs_plan,
+        ROUND(100.0 * ABS(c.cq_revenue - c.plan_revenue) / t.total_plan_magnitude, 2) AS variance_magnitude_pct,
+        ROUND(c.py_revenue, 0) AS prior_year_revenue,
+        ROUND(c.cq_revenue - c.py_revenue, 0) AS yoy_delta,
+        ROUND(100.0 * (c.cq_revenue - c.py_revenue) / NULLIF(c.py_revenue, 0), 2) AS yoy_growth_pct,
+        ROUND(100.0 * ABS(c.cq_revenue - c.py_revenue) / t.total_yoy_magnitude, 2) AS yoy_contribution_to_growth_pct,
+        ROUND(100.0 * c.cq_revenue / NULLIF(t.total_revenue, 0), 2) AS mix_pct
+    FROM combined c
+    JOIN totals t ON {keys.on('c', 't')}
+    WHERE c.delta > 0 AND c.customer IS NOT NULL
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY {keys.cols('c.')} ORDER BY c.delta DESC) <= {MAX_GAINERS}
+    ORDER BY {keys.cols('c.')}, c.delta DESC
+    """
+
+    return keys.split(execute_query(conn, query, f"Top customer gainers for all {level} nodes"))
+
+
+def get_top_customer_contractors_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+) -> Dict[NodePath, List[Dict[str, Any]]]:
+    """Batch version of analyses.get_top_customer_contractors."""
+    keys = NodeKeys(level, category)
+
+    query = f"""
+    WITH {_customer_ctes(keys, dates, run_date, actuals_source(conn))},
+    totals AS (
+        SELECT
+            {keys.cols()},
+            NULLIF(SUM(CASE WHEN delta < 0 THEN ABS(delta) ELSE 0 END), 0) AS total_losses,
+            NULLIF(SUM(ABS(cq_revenue - plan_revenue)), 0) AS total_plan_magnitude,
+            NULLIF(SUM(ABS(cq_revenue - py_revenue)), 0) AS total_yoy_magnitude,
+            SUM(cq_revenue) AS total_revenue
+        FROM combined
+        GROUP BY {keys.group_by()}
+    )
+    SELECT
+        {keys.cols('c.')},
+        c.customer,
+        ROUND(c.cq_revenue, 0) AS qtd_revenue,
+        ROUND(c.pq_revenue, 0) AS prior_q_revenue,
+        ROUND(c.delta, 0) AS qoq_delta,
+        ROUND(100.0 * c.delta / NULLIF(c.pq_revenue, 0), 2) AS qoq_growth_pct,
+        ROUND(100.0 * ABS(c.delta) / t.total_losses, 2) AS contribution_to_decline_pct,
+        ROUND(c.plan_revenue, 0) AS qtd_plan,
+        ROUND(c.cq_revenue - c.plan_revenue, 0) AS delta_to_plan,
+        ROUND(100.0 * (c.cq_revenue - c.plan_revenue) / NULLIF(c.plan_revenue, 0), 2) AS pct_vs_plan,
+        ROUND(100.0 * ABS(c.cq_revenue - c.plan_revenue) / t.total_plan_magnitude, 2) AS variance_magnitude_pct,
+        ROUND(c.py_revenue, 0) AS prior_year_revenue,
+        ROUND(c.cq_revenue - c.py_revenue, 0) AS yoy_delta,
+        ROUND(100.0 * (c.cq_revenue - c.py_revenue) / NULLIF(c.py_revenue, 0), 2) AS yoy_growth_pct,
+        ROUND(100.0 * ABS(c.cq_revenue - c.py_revenue) / t.total_yoy_magnitude, 2) AS yoy_contribution_to_growth_pct,
+        ROUND(100.0 * c.cq_revenue / NULLIF(t.total_revenue, 0), 2) AS mix_pct
+    FROM combined c
+    JOIN totals t ON {keys.on('c', 't')}
+    WHERE c.delta < 0 AND c.customer IS NOT NULL
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY {keys.cols('c.')} ORDER BY c.delta ASC) <= {MAX_CONTRACTORS}
+    ORDER BY {keys.cols('c.')}, c.delta ASC
+    """
+
+    return keys.split(execute_query(conn, query, f"Top customer contractors for all {level} nodes"))
+
+
+# =============================================================================
+# PLAN VARIANCE BY CHILD ENTITY (TOP 20 VS LONG TAIL)
+# =============================================================================
+
+def get_plan_variance_by_segment_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+) -> Dict[NodePath, List[Dict[str, Any]]]:
+    """Batch version of analyses.get_plan_variance_by_segment."""
+    child_column = HIERARCHY[HIERARCHY[level].child_level].column
+    plan_child_column = "salesforce_account_name" if child_column == "latest_salesforce_account_name" else child_column
+
+    keys = NodeKeys(level, category)
+    rd_filter = _run_date_filter(run_date)
+
+    query = f"""
+    WITH customer_totals AS (
+        SELECT
+            {keys.select()},
+            latest_salesforce_account_name AS customer,
+            SUM(revenue + product_led_revenue) AS total_revenue
+        FROM {actuals_source(conn)}
+        WHERE {rd_filter}
+            AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where()}
+        GROUP BY {keys.group_by(1)}
+    ),
+    customer_ranks AS (
+        SELECT
+            {keys.cols()},
+            customer,
+            ROW_NUMBER() OVER (PARTITION BY {keys.cols()} ORDER BY total_revenue DESC) AS rnk
+        FROM customer_totals
+    ),
+    actuals_with_segment AS (
+        SELECT
+            {keys.select(alias='a.')},
+            a.{child_column} AS entity,
+            a.latest_salesforce_account_name AS customer,
+            CASE WHEN cr.rnk <= 20 THEN 'Top 20' ELSE 'Long Tail' END AS segment,
+            SUM(a.revenue + a.product_led_revenue) AS revenue
+        FROM {actuals_source(conn)} a
+        LEFT JOIN customer_ranks cr
+            ON {keys.on_source('a', 'cr')} AND a.latest_salesforce_account_name = cr.customer
+        WHERE {_run_date_filter(run_date, 'a.')}
+            AND a.ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where(alias='a.')}
+        GROUP BY {keys.group_by(3)}
+    ),
+    plan_with_segment AS (
+        SELECT
+            {keys.select('plan', 'p.')},
+            p.{plan_child_column} AS entity,
+            p.salesforce_account_name AS customer,
+            CASE WHEN cr.rnk <= 20 THEN 'Top 20' ELSE 'Long Tail' END AS segment,
+            SUM(p.revenue) AS plan_revenue
+        FROM {PLAN_TABLE} p
+        LEFT JOIN customer_ranks cr
+            ON {keys.on_source('p', 'cr', 'plan')} AND p.salesforce_account_name = cr.customer
+        WHERE p.ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+            AND {keys.where('plan', 'p.')}
+        GROUP BY {keys.group_by(3)}
+    ),
+    combined AS (
+        SELECT
+            {keys.coalesce('a', 'p')},
+            COALESCE(a.entity, p.entity) AS entity,
+            COALESCE(a.segment, p.segment) AS segment,
+            COALESCE(SUM(a.revenue), 0) AS actual_revenue,
+            COALESCE(SUM(p.plan_revenue), 0) AS plan_revenue
+        FROM actuals_with_segment a
+        FULL OUTER JOIN plan_with_segment p
+            ON {keys.on('a', 'p')} AND a.entity = p.entity AND a.customer = p.customer AND a.segment = p.segment
+        WHERE COALESCE(a.entity, p.entity) IS NOT NULL
+        GROUP BY {keys.group_by(2)}
+    )
+    SELECT
+        {keys.cols()},
+        entity,
+        segment,
+        ROUND(actual_revenue, 0) AS actual_revenue,
+        ROUND(plan_revenue, 0) AS plan_revenue,
+        ROUND(actual_revenue - plan_revenue, 0) AS variance
+    FROM combined
+    WHERE entity IS NOT NULL AND segment IS NOT NULL
+    ORDER BY {keys.group_by(2)}
+    """
+
+    return keys.split(execute_query(conn, query, f"Plan variance by segment for all {level} nodes"))
+
+
+BATCH_ANALYSES: Dict[str, Callable[..., Dict[NodePath, Any]]] = {
+    "summary_kpis": get_summary_kpis_batch,
+    "monthly_trends": get_monthly_trends_batch,
+    "children_breakdown": get_children_breakdown_batch,
+    "top20_vs_longtail": get_top20_vs_longtail_batch,
+    "industry_performance": get_industry_performance_batch,
+    "new_vs_existing": get_new_vs_existing_batch,
+    "top_gainers": get_top_gainers_batch,
+    "top_contractors": get_top_contractors_batch,
+    "concentration_trend": get_concentration_trend_batch,
+    "top_customers": get_top_customers_batch,
+    "top_customer_gainers": get_top_customer_gainers_batch,
+    "top_customer_contractors": get_top_customer_contractors_batch,
+    "plan_variance_by_segment": get_plan_variance_by_segment_batch,
+}
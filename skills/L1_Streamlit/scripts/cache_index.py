@@ -0,0 +1,269 @@
+"""
+cache_index.py - Size-Capped, Indexed App Cache Directory
+
+The app's cache directory held one collection per quarter x run_date x
+category and nothing was ever removed; the sidebar also stat'ed the file
+system on every rerun to say whether a report was cached. CacheIndex keeps
+a SQLite index (index.sqlite in the cache directory) with one row per
+cached collection: bytes on disk, when it was written and last opened, and
+its metadata.version.
+
+POLICY:
+    - Collections of another version than COLLECTION_VERSION (written by an
+      older or newer collector) are invalid and deleted.
+    - Collections not opened for ttl_seconds expire and are deleted.
+    - Above max_bytes in total, the least recently opened collections are
+      deleted (never the one just recorded).
+
+lookup() answers from the index alone, on a connection kept open for it,
+so the sidebar costs one indexed SELECT per rerun. Collections written
+without going through record() (by run_collector.py, or by a job whose
+session went away) are picked up by adopt(), which the app calls before
+queueing a collection, and by sync() when the index is opened.
+
+USAGE:
+    index = CacheIndex('cache')                     # APP_CACHE_MAX_BYTES, APP_CACHE_TTL_DAYS
+    index.lookup('cache/l1_FY2026-Q4_2026-02-03_all')   # {'bytes': ..., 'accessed_at': ...} or None
+    index.record('cache/l1_FY2026-Q4_2026-02-03_all', metadata)   # after writing or opening it
+    index.stats()
+"""
+
+import contextlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .config import APP_CACHE_MAX_BYTES, APP_CACHE_TTL_DAYS, COLLECTION_VERSION
+from .report_store import FORMATS, find_report, strip_format
+from .shards import MANIFEST, is_sharded, open_collection
+
+
+INDEX_FILE = "index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS collections (
+    name TEXT PRIMARY KEY,
+    version TEXT,
+    bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS collections_accessed ON collections (accessed_at);
+"""
+
+
+def _disk_bytes(base: str) -> Optional[int]:
+    """Bytes of the collection at base (sharded directory or single report file), None if absent."""
+    if is_sharded(base):
+        total = 0
+        for entry in os.scandir(base):
+            try:
+                total += entry.stat().st_size
+            except OSError:
+                continue
+        return total
+    single = find_report(base)
+    if single is None:
+        return None
+    try:
+        return os.path.getsize(single)
+    except OSError:
+        return None
+
+
+def _remove(base: str) -> None:
+    """Delete the collection at base in every layout (and its write lock)."""
+    shutil.rmtree(base, ignore_errors=True)
+    for path in [base + '.lock'] + [base + suffix for suffix in FORMATS]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class CacheIndex:
+    """
+    The cache directory's index and eviction policy.
+
+    Writes open their own connection (as jobs.JobQueue does); lookup()
+    reuses one read connection under a lock. One index can be shared by all
+    sessions of the app process, and several app processes can share one
+    directory.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = APP_CACHE_MAX_BYTES,
+        ttl_seconds: float = APP_CACHE_TTL_DAYS * 86400,
+        version: str = COLLECTION_VERSION,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.version = version
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        self._reader: Optional[sqlite3.Connection] = None
+        self._reader_lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(os.path.join(self.directory, INDEX_FILE), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def _row(self, path: str) -> Optional[sqlite3.Row]:
+        """The index row of path, read on the shared connection (each SELECT sees the latest commit)."""
+        with self._reader_lock:
+            if self._reader is None:
+                self._reader = sqlite3.connect(os.path.join(self.directory, INDEX_FILE), timeout=30,
+                                               isolation_level=None, check_same_thread=False)
+                self._reader.row_factory = sqlite3.Row
+            return self._reader.execute("SELECT * FROM collections WHERE name = ?", (self._name(path),)).fetchone()
+
+    def _name(self, path: str) -> str:
+        return os.path.relpath(strip_format(path), self.directory)
+
+    def _base(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _valid(self, row: sqlite3.Row, now: float) -> bool:
+        return row['version'] == self.version and now - row['accessed_at'] <= self.ttl_seconds
+
+    # -------------------------------------------------------------------------
+    # Lookups
+    # -------------------------------------------------------------------------
+
+    def lookup(self, path: str) -> Optional[Dict[str, Any]]:
+        """The index row of the collection cached at path, or None if it is missing, expired or invalid."""
+        row = self._row(path)
+        if row is None or not self._valid(row, time.time()):
+            return None
+        return dict(row)
+
+    def adopt(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        lookup(), falling back to the files: a collection written without
+        record() is indexed now (if its version is current). Stale files
+        of an invalid or expired entry are deleted.
+        """
+        entry = self.lookup(path)
+        if entry is not None:
+            return entry
+        base = strip_format(path)
+        if self._row(path) is not None:
+            self.remove(path)
+            return None
+        if _disk_bytes(base) is None:
+            return None
+        try:
+            collection = open_collection(base)
+        except (OSError, ValueError) as e:
+            print(f"WARNING: cannot read cached collection {base}: {e}")
+            return None
+        if collection is None:
+            return None
+        metadata = collection.data.get('metadata', {})
+        if metadata.get('version') != self.version:
+            print(f"WARNING: {base} is a {metadata.get('version')} collection, not {self.version}; removing it")
+            _remove(base)
+            return None
+        self.record(path, metadata)
+        return self.lookup(path)
+
+    # -------------------------------------------------------------------------
+    # Updates
+    # -------------------------------------------------------------------------
+
+    def record(self, path: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Index the collection at path (just written, opened or grown by a lazy
+        fill): refresh its size and last-opened time, then evict() if the
+        directory is over max_bytes.
+        """
+        size = _disk_bytes(strip_format(path))
+        if size is None:
+            return
+        version = (metadata or {}).get('version', self.version)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO collections (name, version, bytes, created_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET version = excluded.version, bytes = excluded.bytes, "
+                "accessed_at = excluded.accessed_at",
+                (self._name(path), version, size, now, now),
+            )
+            total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM collections").fetchone()[0]
+        if total > self.max_bytes:
+            self.evict(keep=path)
+
+    def touch(self, path: str) -> None:
+        """Mark the collection at path as opened now (LRU order and TTL)."""
+        with self._connect() as conn:
+            conn.execute("UPDATE collections SET accessed_at = ? WHERE name = ?", (time.time(), self._name(path)))
+
+    def remove(self, path: str) -> None:
+        """Delete a collection's files and its index row."""
+        _remove(strip_format(path))
+        with self._connect() as conn:
+            conn.execute("DELETE FROM collections WHERE name = ?", (self._name(path),))
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Delete invalid and expired collections, then the least recently
+        opened until the rest fit in max_bytes. Returns the names removed.
+        """
+        kept = self._name(keep) if keep else None
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM collections ORDER BY accessed_at").fetchall()
+        total = sum(row['bytes'] for row in rows)
+        removed = []
+        for row in rows:
+            if row['name'] == kept:
+                continue
+            if self._valid(row, now) and total <= self.max_bytes:
+                continue
+            self.remove(self._base(row['name']))
+            total -= row['bytes']
+            removed.append(row['name'])
+        return removed
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Reconcile the index with the directory: drop rows whose files are
+        gone, adopt() collections that are not indexed, then evict().
+        """
+        with self._connect() as conn:
+            indexed = {row['name'] for row in conn.execute("SELECT name FROM collections")}
+        on_disk = set()
+        for entry in os.scandir(self.directory):
+            if entry.is_dir() and os.path.isfile(os.path.join(entry.path, MANIFEST)):
+                on_disk.add(entry.name)
+            elif entry.is_file() and strip_format(entry.name) != entry.name:
+                on_disk.add(strip_format(entry.name))
+        gone = indexed - on_disk
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM collections WHERE name = ?", [(name,) for name in gone])
+        adopted = 0
+        for name in sorted(on_disk - indexed):
+            if self.adopt(self._base(name)) is not None:
+                adopted += 1
+        evicted = self.evict()
+        return {'dropped': len(gone), 'adopted': adopted, 'evicted': len(evicted)}
+
+    def stats(self) -> Dict[str, int]:
+        """Collections indexed and their total bytes."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM collections").fetchone()
+        return {'collections': row[0], 'bytes': row[1]}
@@ -0,0 +1,202 @@
+"""
+checkpoint.py - Per-Node Journal for Resumable Collections
+
+A full collection runs for a long time and used to write nothing until the
+end, so a warehouse timeout or a sleeping laptop lost every node collected so
+far. The collector now appends each finished node to a JSONL journal, one
+fsync'd line per node, keyed by fiscal_quarter/run_date/category and node
+path. A resumed run reads the journal back and only collects the nodes that
+are missing; the journal is deleted once the output has been assembled.
+
+Nodes are journaled in their to_json_safe() form, which round-trips through
+JSON unchanged, so a resumed run writes the same output as an uninterrupted
+one (apart from metadata.generated_at).
+
+Lazy runs (lazy.py) journal to their own file, with "lazy": true in the
+header, so a full run never resumes from a lazy run's nodes or the reverse.
+
+FILE FORMAT:
+    {"fiscal_quarter": "FY2026-Q4", "run_date": "2026-02-03", "filter_category": null, "version": "v6"}
+    {"path": [], "analysis": {...}, "children": ["Analytics", ...]}
+    {"path": ["Analytics"], "analysis": {...}, "children": [...]}
+
+USAGE:
+    journal = CheckpointJournal.open(CHECKPOINT_DIR, 'FY2026-Q4', run_date, None, resume=True)
+    done = journal.get(('Analytics',))      # (analysis, children) or None
+    so_far = CheckpointJournal.peek(CHECKPOINT_DIR, 'FY2026-Q4', run_date)   # from another process
+    journal.record(('Analytics', 'BI'), analysis, children)
+    journal.remove()
+"""
+
+import json
+import os
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import COLLECTION_VERSION
+from .db import to_json_safe
+
+
+# A node is addressed by its path of names below Total, e.g. ('Analytics', 'BI')
+NodePath = Tuple[str, ...]
+
+
+def journal_path(
+    directory: str,
+    fiscal_quarter: str,
+    run_date: date,
+    filter_category: Optional[str],
+    lazy: bool = False,
+) -> str:
+    """Journal file for one collection (same suffix scheme as the cached JSON)."""
+    suffix = f"_{filter_category.replace('/', '_').replace(' ', '_')}" if filter_category else "_all"
+    if lazy:
+        suffix += "_lazy"
+    return os.path.join(directory, f"l1_{fiscal_quarter}_{run_date}{suffix}.jsonl")
+
+
+class CheckpointJournal:
+    """
+    Append-only record of finished nodes.
+
+    Thread-safe: record() is called from the traversal's worker threads.
+    """
+
+    def __init__(self, path: str, header: Dict[str, Any], nodes: Dict[NodePath, Tuple[Dict[str, Any], List[str]]]):
+        self.path = path
+        self.header = header
+        self.nodes = nodes
+        self.resumed = len(nodes)
+        self._lock = threading.Lock()
+        self._file = None
+
+    @classmethod
+    def open(
+        cls,
+        directory: str,
+        fiscal_quarter: str,
+        run_date: date,
+        filter_category: Optional[str] = None,
+        resume: bool = False,
+        lazy: bool = False,
+    ) -> "CheckpointJournal":
+        """
+        Open the journal for a collection. With resume, nodes already in a
+        matching journal are kept; otherwise any old journal is discarded.
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = journal_path(directory, fiscal_quarter, run_date, filter_category, lazy)
+        header = _header(fiscal_quarter, run_date, filter_category, lazy)
+        nodes = cls._read(path, header) if resume else {}
+
+        journal = cls(path, header, nodes)
+        # Rewrite rather than append so a torn last line from a crash is dropped
+        journal._file = open(path, 'w')
+        journal._write(header)
+        for node_path, (analysis, children) in nodes.items():
+            journal._write({'path': list(node_path), 'analysis': analysis, 'children': children})
+        return journal
+
+    @staticmethod
+    def _read(path: str, header: Dict[str, Any]) -> Dict[NodePath, Tuple[Dict[str, Any], List[str]]]:
+        """Nodes from an existing journal, or {} if there is none or it belongs to another collection."""
+        try:
+            with open(path) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            print(f"No checkpoint at {path}; starting from the beginning")
+            return {}
+        except OSError as e:
+            print(f"WARNING: Cannot read checkpoint {path}: {e}")
+            return {}
+
+        if not lines or _parse(lines[0]) != header:
+            print(f"WARNING: Checkpoint {path} is for a different collection; starting from the beginning")
+            return {}
+
+        nodes = {}
+        for line in lines[1:]:
+            entry = _parse(line)
+            if entry is None:
+                continue  # Torn write from the interrupted run
+            nodes[tuple(entry['path'])] = (entry['analysis'], entry['children'])
+        return nodes
+
+    @staticmethod
+    def peek(
+        directory: str,
+        fiscal_quarter: str,
+        run_date: date,
+        filter_category: Optional[str] = None,
+        lazy: bool = False,
+    ) -> Dict[NodePath, Tuple[Dict[str, Any], List[str]]]:
+        """
+        Nodes journaled so far by a collection that may still be running
+        (read-only; {} if there is no matching journal).
+        """
+        path = journal_path(directory, fiscal_quarter, run_date, filter_category, lazy)
+        try:
+            with open(path) as f:
+                lines = f.readlines()
+        except OSError:
+            return {}
+        header = _header(fiscal_quarter, run_date, filter_category, lazy)
+        if not lines or _parse(lines[0]) != header:
+            return {}
+        entries = (_parse(line) for line in lines[1:])
+        return {tuple(e['path']): (e['analysis'], e['children']) for e in entries if e is not None}
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def get(self, path: NodePath) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+        """(analysis, children) of a node finished by an earlier run, or None."""
+        return self.nodes.get(path)
+
+    def record(self, path: NodePath, analysis: Dict[str, Any], children: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Journal a finished node. Returns it in journaled (JSON-safe) form so the
+        caller assembles exactly what a resumed run would read back.
+        """
+        analysis = to_json_safe(analysis)
+        children = list(children)
+        with self._lock:
+            self.nodes[path] = (analysis, children)
+            self._write({'path': list(path), 'analysis': analysis, 'children': children})
+        return analysis, children
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def remove(self) -> None:
+        """Close and delete the journal once the collection has completed."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _header(fiscal_quarter: str, run_date: date, filter_category: Optional[str], lazy: bool = False) -> Dict[str, Any]:
+    header = {
+        'fiscal_quarter': fiscal_quarter,
+        'run_date': str(run_date),
+        'filter_category': filter_category,
+        'version': COLLECTION_VERSION,
+    }
+    if lazy:
+        header['lazy'] = True
+    return header
+
+
+def _parse(line: str) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
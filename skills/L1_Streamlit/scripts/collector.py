@@ -6,16 +6,20 @@ It orchestrates the hierarchy traversal and analysis collection.
 """
 
 import os
-import json
 import fcntl
 import atexit
-from typing import Any, Dict, List, Optional
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime, date
 
-from .db import get_connection, execute_query, to_json_safe, get_available_run_dates
+from .db import (
+    get_connection, execute_query, to_json_safe, get_available_run_dates, ConnectionPool, async_submission,
+)
 from .config import (
-    HIERARCHY, ANALYSES_BY_LEVEL, ACTUALS_TABLE, RUN_DATE_COLUMN,
-    MAX_CUSTOMERS_PER_FEATURE,
+    HIERARCHY, ANALYSES_BY_LEVEL, LAZY_ANALYSES_BY_LEVEL, RUN_DATE_COLUMN,
+    MAX_CUSTOMERS_PER_FEATURE, DEFAULT_WORKERS, CHECKPOINT_DIR, COLLECTION_VERSION,
 )
 from .fiscal import get_fiscal_dates, FiscalDates
 from .filters import build_actuals_filter
@@ -34,42 +38,63 @@ from .analyses import (
     get_top_customer_contractors,
     get_plan_variance_by_segment,
 )
+from .cube import RevenueCube, fetch_revenue_cube, compute_analyses_for_level
+from .batch import BATCH_ANALYSES, NodePath
+from .hierarchy import HierarchyIndex, fetch_hierarchy
+from .incremental import IncrementalPlan, fetch_node_fingerprints
+from .actuals_slice import actuals_source, materialize_slice, slice_factory
+from .customers import fetch_customer_tier, tier_metadata
+from .checkpoint import CheckpointJournal
+from .telemetry import get_trace, query_context
+from .report_store import save_report
 
 
 # =============================================================================
 # LOCK FILE TO PREVENT DUPLICATE RUNS
 # =============================================================================
 
-LOCK_FILE = '/tmp/l1_commentary_collector.lock'
-_lock_fd = None
+# One lock file per collection (quarter, snapshot, category): a duplicate run
+# of the same collection is refused, different collections run side by side
+LOCK_FILE = '/tmp/l1_commentary_collector{suffix}.lock'
+_lock_fds: Dict[str, Any] = {}
+_lock_fds_guard = threading.Lock()
+
+def lock_path(fiscal_quarter: str, run_date: Optional[date] = None, category: Optional[str] = None) -> str:
+    """Lock file of one collection."""
+    key = f"{fiscal_quarter}_{run_date or 'latest'}_{category or 'all'}"
+    return LOCK_FILE.format(suffix='_' + key.replace('/', '_').replace(' ', '_'))
 
-def acquire_lock() -> bool:
+def acquire_lock(path: str) -> bool:
     """Try to acquire exclusive lock. Returns False if already running."""
-    global _lock_fd
+    fd = None
     try:
-        _lock_fd = open(LOCK_FILE, 'w')
-        fcntl.flock(_lock_fd.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-        _lock_fd.write(str(datetime.now()))
-        _lock_fd.flush()
-        return True
+        fd = open(path, 'w')
+        fcntl.flock(fd.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        fd.write(str(datetime.now()))
+        fd.flush()
     except (IOError, OSError):
-        if _lock_fd:
-            _lock_fd.close()
-            _lock_fd = None
+        if fd:
+            fd.close()
         return False
+    with _lock_fds_guard:
+        _lock_fds[path] = fd
+    return True
 
-def release_lock():
-    """Release the lock."""
-    global _lock_fd
-    if _lock_fd:
+def release_lock(path: Optional[str] = None):
+    """Release one lock (all held locks if path is None)."""
+    with _lock_fds_guard:
+        paths = [path] if path else list(_lock_fds)
+        fds = [(p, _lock_fds.pop(p, None)) for p in paths]
+    for p, fd in fds:
+        if fd is None:
+            continue
         try:
-            fcntl.flock(_lock_fd.fileno(), fcntl.LOCK_UN)
-            _lock_fd.close()
+            fcntl.flock(fd.fileno(), fcntl.LOCK_UN)
+            fd.close()
         except:
             pass
-        _lock_fd = None
         try:
-            os.remove(LOCK_FILE)
+            os.remove(p)
         except:
             pass
 
@@ -80,135 +105,120 @@ atexit.register(release_lock)
 # ANALYSIS DISPATCHER
 # =============================================================================
 
-def collect_analyses_for_level(
+def _run_analysis(
     conn,
+    analysis_name: str,
     dates: FiscalDates,
     run_date: date,
     level: str,
-    category: Optional[str] = None,
-    use_case: Optional[str] = None,
-    feature: Optional[str] = None,
-    customer: Optional[str] = None,
-) -> Dict[str, Any]:
-    """
-    Collect all appropriate analyses for a given hierarchy level.
-    
-    Uses ANALYSES_BY_LEVEL config to determine which analyses to run.
-    Returns a dict with analysis name as key and results as value.
-    """
-    analyses_to_run = ANALYSES_BY_LEVEL.get(level, [])
-    results = {}
-    
-    for analysis_name in analyses_to_run:
+    category: Optional[str],
+    use_case: Optional[str],
+    feature: Optional[str],
+    customer: Optional[str],
+) -> Any:
+    """Run one analysis; failures are logged and give the analysis' empty default."""
+    with query_context(analysis=analysis_name):
         try:
             if analysis_name == "summary_kpis":
-                results[analysis_name] = get_summary_kpis(
+                return get_summary_kpis(
                     conn, dates, run_date, category, use_case, feature, customer
                 )
             elif analysis_name == "monthly_trends":
-                results[analysis_name] = get_monthly_trends(
+                return get_monthly_trends(
                     conn, dates, run_date, category, use_case, feature, customer
                 )
             elif analysis_name == "children_breakdown":
-                results[analysis_name] = get_children_breakdown(
+                return get_children_breakdown(
                     conn, dates, run_date, level, category, use_case, feature, customer
                 )
             elif analysis_name == "top20_vs_longtail":
-                results[analysis_name] = get_top20_vs_longtail(
+                return get_top20_vs_longtail(
                     conn, dates, run_date, level, category, use_case, feature, customer
                 )
             elif analysis_name == "industry_performance":
-                results[analysis_name] = get_industry_performance(
+                return get_industry_performance(
                     conn, dates, run_date, category, use_case, feature, customer
                 )
             elif analysis_name == "new_vs_existing":
-                results[analysis_name] = get_new_vs_existing(
+                return get_new_vs_existing(
                     conn, dates, run_date, category, use_case, feature, customer
                 )
             elif analysis_name == "top_gainers":
-                results[analysis_name] = get_top_gainers(
+                return get_top_gainers(
                     conn, dates, run_date, level, category, use_case, feature, customer
                 )
             elif analysis_name == "top_contractors":
-                results[analysis_name] = get_top_contractors(
+                return get_top_contractors(
                     conn, dates, run_date, level, category, use_case, feature, customer
                 )
             elif analysis_name == "concentration_trend":
-                results[analysis_name] = get_concentration_trend(
+                return get_concentration_trend(
                     conn, dates, run_date, category, use_case, feature, customer
                 )
             elif analysis_name == "top_customers":
-                results[analysis_name] = get_top_customers(
+                return get_top_customers(
                     conn, dates, run_date, category, use_case, feature, customer
                 )
             elif analysis_name == "top_customer_gainers":
-                results[analysis_name] = get_top_customer_gainers(
+                return get_top_customer_gainers(
                     conn, dates, run_date, category, use_case, feature, customer
                 )
             elif analysis_name == "top_customer_contractors":
-                results[analysis_name] = get_top_customer_contractors(
+                return get_top_customer_contractors(
                     conn, dates, run_date, category, use_case, feature, customer
                 )
             elif analysis_name == "plan_variance_by_segment":
-                results[analysis_name] = get_plan_variance_by_segment(
+                return get_plan_variance_by_segment(
                     conn, dates, run_date, level, category, use_case, feature, customer
                 )
         except Exception as e:
             print(f"    WARNING: {analysis_name} failed: {e}")
-            results[analysis_name] = [] if analysis_name != "summary_kpis" else {}
-    
-    return results
+        return [] if analysis_name != "summary_kpis" else {}
 
 
-# =============================================================================
-# HIERARCHY NAVIGATION
-# =============================================================================
-
-def get_categories(conn, dates: FiscalDates, run_date: date) -> List[str]:
-    """Get all product categories with revenue in the quarter."""
-    query = f"""
-    SELECT DISTINCT product_category
-    FROM {ACTUALS_TABLE}
-    WHERE {RUN_DATE_COLUMN} = '{run_date}'
-        AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
-        AND product_category IS NOT NULL
-    ORDER BY 1
+def collect_analyses_for_level(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    category: Optional[str] = None,
+    use_case: Optional[str] = None,
+    feature: Optional[str] = None,
+    customer: Optional[str] = None,
+    async_queries: int = 0,
+    analyses: Optional[List[str]] = None,
+) -> Dict[str, Any]:
     """
-    results = execute_query(conn, query, "Get categories")
-    return [r['product_category'] for r in results]
-
-
-def get_use_cases(conn, dates: FiscalDates, run_date: date, category: str) -> List[str]:
-    """Get use cases for a category."""
-    query = f"""
-    SELECT DISTINCT use_case
-    FROM {ACTUALS_TABLE}
-    WHERE {RUN_DATE_COLUMN} = '{run_date}'
-        AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
-        AND product_category = '{category}'
-        AND use_case IS NOT NULL
-    ORDER BY 1
+    Collect all appropriate analyses for a given hierarchy level.
+    
+    Uses ANALYSES_BY_LEVEL config to determine which analyses to run, unless
+    `analyses` names them (lazy collections, lazy.py).
+    Returns a dict with analysis name as key and results as value.
+    
+    With async_queries=N, every analysis is started at once on its own thread
+    and their queries are submitted on `conn` with execute_async, at most N
+    running at a time (db.async_submission). Otherwise they run one by one.
     """
-    results = execute_query(conn, query, f"Get use cases for {category}")
-    return [r['use_case'] for r in results]
-
+    analyses_to_run = ANALYSES_BY_LEVEL.get(level, []) if analyses is None else analyses
+    args = (dates, run_date, level, category, use_case, feature, customer)
+    
+    if async_queries <= 0 or len(analyses_to_run) < 2:
+        return {name: _run_analysis(conn, name, *args) for name in analyses_to_run}
+    
+    with async_submission(conn, async_queries), \
+            ThreadPoolExecutor(max_workers=len(analyses_to_run)) as executor:
+        # Each thread starts from a copy of this context (query labels, async submitter)
+        futures = [
+            executor.submit(contextvars.copy_context().run, _run_analysis, conn, name, *args)
+            for name in analyses_to_run
+        ]
+        # Insertion in ANALYSES_BY_LEVEL order keeps the JSON identical to a sequential run
+        return {name: future.result() for name, future in zip(analyses_to_run, futures)}
 
-def get_features(conn, dates: FiscalDates, run_date: date, category: str, use_case: str) -> List[str]:
-    """Get features for a use case."""
-    from .db import safe_string
-    query = f"""
-    SELECT DISTINCT feature
-    FROM {ACTUALS_TABLE}
-    WHERE {RUN_DATE_COLUMN} = '{run_date}'
-        AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
-        AND product_category = '{safe_string(category)}'
-        AND use_case = '{safe_string(use_case)}'
-        AND feature IS NOT NULL
-    ORDER BY 1
-    """
-    results = execute_query(conn, query, f"Get features for {use_case}")
-    return [r['feature'] for r in results]
 
+# =============================================================================
+# HIERARCHY NAVIGATION
+# =============================================================================
 
 def get_feature_customers(
     conn, 
@@ -225,7 +235,7 @@ def get_feature_customers(
     SELECT 
         latest_salesforce_account_name AS customer, 
         SUM(revenue + product_led_revenue) AS revenue
-    FROM {ACTUALS_TABLE}
+    FROM {actuals_source(conn)}
     WHERE {RUN_DATE_COLUMN} = '{run_date}'
         AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
         AND product_category = '{safe_string(category)}'
@@ -240,6 +250,350 @@ def get_feature_customers(
     return [r['customer'] for r in results]
 
 
+# =============================================================================
+# ENGINE DISPATCH
+# =============================================================================
+
+ENGINES = ("sql", "batch", "cube")
+
+
+def _node_analyses(
+    conn,
+    cube: Optional[RevenueCube],
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    async_queries: int = 0,
+    analyses: Optional[List[str]] = None,
+    **filters: str,
+) -> Dict[str, Any]:
+    """Collect a node's analyses from the cube if one was loaded, else via SQL."""
+    if cube is not None:
+        return compute_analyses_for_level(cube, dates, level, **filters)
+    return collect_analyses_for_level(conn, dates, run_date, level, async_queries=async_queries, analyses=analyses,
+                                      **filters)
+
+
+def _node_children(
+    cube: Optional[RevenueCube],
+    index: Optional[HierarchyIndex],
+    path: NodePath,
+) -> List[str]:
+    """List a node's children (categories, use cases or features)."""
+    if index is not None:
+        return index.children(path)
+    category, use_case = (path + (None, None))[:2]
+    if use_case is not None:
+        return cube.get_features(category, use_case)
+    if category is not None:
+        return cube.get_use_cases(category)
+    return cube.get_categories()
+
+
+# =============================================================================
+# PARALLEL TRAVERSAL
+# =============================================================================
+
+LEVELS_BY_DEPTH = ['total', 'category', 'use_case', 'feature']
+
+# progress(path, children), called once per finished node
+NodeProgress = Callable[[NodePath, List[str]], None]
+
+
+def _path_filters(path: NodePath) -> Dict[str, str]:
+    """Map a node path to category/use_case/feature keyword filters."""
+    return dict(zip(('category', 'use_case', 'feature'), path))
+
+
+def _select_categories(all_categories: List[str], filter_category: Optional[str]) -> List[str]:
+    """Apply the optional single-category filter (falls back to all if not found)."""
+    if not filter_category:
+        return all_categories
+    categories = [c for c in all_categories if c == filter_category]
+    if not categories:
+        print(f"WARNING: Category '{filter_category}' not found.")
+        print(f"Available: {all_categories}")
+        return all_categories
+    return categories
+
+
+def _collect_node(
+    conn,
+    cube: Optional[RevenueCube],
+    dates: FiscalDates,
+    run_date: date,
+    path: NodePath,
+    index: Optional[HierarchyIndex] = None,
+    async_queries: int = 0,
+    analyses_by_level: Optional[Dict[str, List[str]]] = None,
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Collect one node's analyses and list its children (from the index if there is one).
+    
+    analyses_by_level replaces ANALYSES_BY_LEVEL for SQL collection (lazy runs).
+    """
+    level = LEVELS_BY_DEPTH[len(path)]
+    filters = _path_filters(path)
+    analyses = analyses_by_level.get(level, []) if analyses_by_level is not None else None
+    with query_context(node=' / '.join(path) or 'Total'):
+        analysis = _node_analyses(conn, cube, dates, run_date, level, async_queries, analyses, **filters)
+        if level == 'feature':
+            return analysis, []
+        with query_context(analysis='children'):
+            return analysis, _node_children(cube, index, path)
+
+
+def _log_node(path: NodePath, children: List[str], progress: Optional[NodeProgress] = None) -> None:
+    """Print one progress line per completed node and report it to the progress callback."""
+    level = LEVELS_BY_DEPTH[len(path)]
+    if level == 'total':
+        print(f"\nProcessing {len(children)} categories...")
+    elif level == 'category':
+        print(f"\n📁 {path[-1]}\n   {len(children)} use cases")
+    elif level == 'use_case':
+        print(f"   📂 {' / '.join(path)}")
+    else:
+        print(f"      🔧 {' / '.join(path)}")
+    if progress:
+        progress(path, children)
+
+
+def _traverse_hierarchy(
+    collect_node: Callable[[NodePath], Tuple[Dict[str, Any], List[str]]],
+    workers: int,
+    filter_category: Optional[str] = None,
+    progress: Optional[NodeProgress] = None,
+) -> Dict[NodePath, Tuple[Dict[str, Any], List[str]]]:
+    """
+    Fan node collection out over a bounded thread pool.
+    
+    collect_node(path) returns (analysis, child names). Children are submitted
+    as soon as their parent finishes, so at most `workers` nodes are in flight.
+    Returns {path: (analysis, children)} for every node, including Total at ().
+    If a node (or the progress callback) raises, queued nodes are dropped and
+    only the ones already running finish before the error propagates.
+    """
+    nodes: Dict[NodePath, Tuple[Dict[str, Any], List[str]]] = {}
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending = {executor.submit(collect_node, ()): ()}
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    analysis, children = future.result()
+                    if not path:
+                        children = _select_categories(children, filter_category)
+                    nodes[path] = (analysis, children)
+                    _log_node(path, children, progress)
+                    for child in children:
+                        child_path = path + (child,)
+                        pending[executor.submit(collect_node, child_path)] = child_path
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    
+    return nodes
+
+
+def _assemble_children(
+    nodes: Dict[NodePath, Tuple[Dict[str, Any], List[str]]],
+    path: NodePath,
+    fingerprints: Optional[Dict[NodePath, str]] = None,
+    customers: Optional[Dict[NodePath, List[List[Any]]]] = None,
+) -> Dict[str, Any]:
+    """
+    Rebuild the nested `children` dict of a node in discovery (ORDER BY) order.
+    
+    With fingerprints (incremental runs), each node records its own so the
+    next incremental run can compare against it. With a customer tier, each
+    feature gets its compact `customers` rows.
+    """
+    _, children = nodes[path]
+    assembled = {}
+    for name in children:
+        child_path = path + (name,)
+        analysis, _ = nodes[child_path]
+        assembled[name] = {
+            'name': name,
+            'level': LEVELS_BY_DEPTH[len(child_path)],
+            'analysis': analysis,
+            'children': _assemble_children(nodes, child_path, fingerprints, customers),
+        }
+        if customers is not None and len(child_path) == len(LEVELS_BY_DEPTH) - 1:
+            assembled[name]['customers'] = customers.get(child_path, [])
+        if fingerprints and child_path in fingerprints:
+            assembled[name]['fingerprint'] = fingerprints[child_path]
+    return assembled
+
+
+# =============================================================================
+# LEVEL-BATCHED TRAVERSAL
+# =============================================================================
+
+def collect_analyses_for_level_batch(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    paths: List[NodePath],
+    category: Optional[str] = None,
+    analysis_name: Optional[str] = None,
+) -> Dict[NodePath, Dict[str, Any]]:
+    """
+    Collect analyses for every node of a level, one query per analysis.
+    
+    Batch counterpart of collect_analyses_for_level. Returns
+    {path: {analysis_name: result}} for each of `paths`; nodes without rows get
+    the same empty defaults a failed analysis gets. Pass analysis_name to run a
+    single analysis instead of the whole ANALYSES_BY_LEVEL list.
+    """
+    analyses_to_run = [analysis_name] if analysis_name else ANALYSES_BY_LEVEL.get(level, [])
+    results: Dict[NodePath, Dict[str, Any]] = {path: {} for path in paths}
+    
+    for name in analyses_to_run:
+        try:
+            with query_context(analysis=name, node=f"all {level} nodes"):
+                by_node = BATCH_ANALYSES[name](conn, dates, run_date, level, category)
+        except Exception as e:
+            print(f"    WARNING: {name} ({level} batch) failed: {e}")
+            by_node = {}
+        for path in paths:
+            results[path][name] = by_node.get(path, {} if name == "summary_kpis" else [])
+    
+    return results
+
+
+def _collect_level_batch(
+    pool: ConnectionPool,
+    dates: FiscalDates,
+    run_date: date,
+    level: str,
+    paths: List[NodePath],
+    category: Optional[str],
+    workers: int,
+    async_queries: int = 0,
+    analyses_by_level: Optional[Dict[str, List[str]]] = None,
+) -> Dict[NodePath, Dict[str, Any]]:
+    """
+    Run a level's batch analyses, fanned out over the pool one analysis per task.
+    
+    With async_queries=N they instead all run on one pooled connection,
+    submitted with execute_async and at most N at a time.
+    """
+    analyses_to_run = (analyses_by_level if analyses_by_level is not None else ANALYSES_BY_LEVEL).get(level, [])
+    results: Dict[NodePath, Dict[str, Any]] = {path: {} for path in paths}
+    
+    if async_queries > 0:
+        with pool.connection() as conn, async_submission(conn, async_queries), \
+                ThreadPoolExecutor(max_workers=max(1, len(analyses_to_run))) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, collect_analyses_for_level_batch,
+                                conn, dates, run_date, level, paths, category, analysis_name)
+                for analysis_name in analyses_to_run
+            ]
+            partials = [future.result() for future in futures]
+    else:
+        def run(analysis_name: str) -> Dict[NodePath, Dict[str, Any]]:
+            with pool.connection() as conn:
+                return collect_analyses_for_level_batch(
+                    conn, dates, run_date, level, paths, category, analysis_name
+                )
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            partials = list(executor.map(run, analyses_to_run))
+    
+    # Merged in ANALYSES_BY_LEVEL order, so the JSON key order matches the SQL engine
+    for partial in partials:
+        for path, analysis in partial.items():
+            results[path].update(analysis)
+    return results
+
+
+def _traverse_levels(
+    pool: ConnectionPool,
+    dates: FiscalDates,
+    run_date: date,
+    workers: int,
+    index: HierarchyIndex,
+    filter_category: Optional[str] = None,
+    plan: Optional[IncrementalPlan] = None,
+    journal: Optional[CheckpointJournal] = None,
+    async_queries: int = 0,
+    progress: Optional[NodeProgress] = None,
+    analyses_by_level: Optional[Dict[str, List[str]]] = None,
+) -> Dict[NodePath, Tuple[Dict[str, Any], List[str]]]:
+    """
+    Collect the hierarchy level by level instead of node by node.
+    
+    Total runs on analyses.py; each lower level takes its nodes from the
+    hierarchy index and runs each analysis once for all of them (batch.py).
+    Returns the same {path: (analysis, children)} mapping as _traverse_hierarchy.
+    
+    In an incremental run unchanged nodes are copied from the previous
+    collection one by one and only the changed ones are batched; when those
+    all sit in one category the batch scans only that category. Likewise a
+    resumed run skips the nodes its journal already holds.
+    """
+    reused_total = (journal.get(()) if journal else None) or (plan.reuse(()) if plan else None)
+    if reused_total is not None:
+        total, categories = reused_total
+    else:
+        with pool.connection() as conn, query_context(node='Total'):
+            total = collect_analyses_for_level(
+                conn, dates, run_date, 'total', async_queries=async_queries,
+                analyses=analyses_by_level.get('total', []) if analyses_by_level is not None else None,
+            )
+        categories = index.children(())
+    if journal and journal.get(()) is None:
+        total, categories = journal.record((), total, categories)
+    categories = _select_categories(categories, filter_category)
+    
+    # Restrict the batch queries to the filtered category's subtree when there is one
+    category = categories[0] if filter_category in categories else None
+    nodes: Dict[NodePath, Tuple[Dict[str, Any], List[str]]] = {(): (total, categories)}
+    _log_node((), categories, progress)
+    
+    paths: List[NodePath] = [(c,) for c in categories]
+    for depth, level in enumerate(LEVELS_BY_DEPTH[1:], start=1):
+        pending: List[NodePath] = []
+        for path in paths:
+            known = journal.get(path) if journal else None
+            if known is None and plan:
+                known = plan.reuse(path)
+                if known is not None and journal:
+                    known = journal.record(path, *known)
+            if known is None:
+                pending.append(path)
+            else:
+                nodes[path] = known
+                _log_node(path, known[1], progress)
+        
+        if pending:
+            # Scan only the changed nodes' category when they all share one
+            pending_categories = {path[0] for path in pending}
+            scope = category or (pending[0][0] if len(pending_categories) == 1 else None)
+            analyses = _collect_level_batch(pool, dates, run_date, level, pending, scope, workers, async_queries,
+                                            analyses_by_level)
+            
+            children: Dict[NodePath, List[str]] = {path: [] for path in pending}
+            if depth + 1 < len(LEVELS_BY_DEPTH):
+                for child_path in index.level_nodes(LEVELS_BY_DEPTH[depth + 1], scope):
+                    if child_path[:-1] in children:
+                        children[child_path[:-1]].append(child_path[-1])
+            
+            for path in pending:
+                nodes[path] = (analyses[path], children[path])
+                if journal:
+                    nodes[path] = journal.record(path, *nodes[path])
+                _log_node(path, children[path], progress)
+        paths = [path + (child,) for path in paths for child in nodes[path][1]]
+    
+    return nodes
+
+
 # =============================================================================
 # MAIN COLLECTION FUNCTION
 # =============================================================================
@@ -250,6 +604,20 @@ def collect_all_data(
     run_date: Optional[date] = None,
     filter_category: Optional[str] = None,
     max_customers: int = MAX_CUSTOMERS_PER_FEATURE,
+    engine: str = "sql",
+    workers: int = DEFAULT_WORKERS,
+    incremental: bool = False,
+    previous_path: Optional[str] = None,
+    resume: bool = False,
+    checkpoint_dir: Optional[str] = CHECKPOINT_DIR,
+    hierarchy: Optional[HierarchyIndex] = None,
+    async_queries: int = 0,
+    materialize: bool = False,
+    cube: Optional[RevenueCube] = None,
+    progress: Optional[NodeProgress] = None,
+    lazy: bool = False,
+    connect: Optional[Callable[[], Any]] = None,
+    lock: bool = True,
 ) -> Dict[str, Any]:
     """
     Collect hierarchical L1 commentary data for a fiscal quarter.
@@ -259,24 +627,67 @@ def collect_all_data(
     
     Args:
         fiscal_quarter: e.g., 'FY2026-Q4'
-        output_path: Path to save JSON output
+        output_path: Path to save the output (format by suffix, see report_store.py)
         run_date: Snapshot date to use (defaults to latest)
         filter_category: Optional single category to process
-        max_customers: Max customers to collect per feature
+        max_customers: Top customers per feature in the customer tier
+                       (customers.py), stored compactly on each feature
+                       node; 0 skips the tier
+        engine: 'sql' runs one query per analysis per node; 'batch' runs one
+                query per analysis per level; 'cube' fetches a single
+                pre-aggregated cube and computes analyses locally
+        workers: Nodes collected concurrently, each on a pooled connection
+        incremental: Fingerprint every node and copy unchanged nodes from
+                     previous_path instead of collecting them again
+        previous_path: Earlier collection JSON of the same quarter (implies
+                       incremental); without one, fingerprints are only recorded
+        resume: Skip nodes journaled by an interrupted run of the same
+                quarter/run_date/category
+        checkpoint_dir: Where each finished node is journaled (None disables
+                        checkpointing); the journal is deleted on success
+        hierarchy: Node tree already fetched for this quarter and run_date
+                   (e.g. by the app); discovered with one query otherwise
+        async_queries: Submit all of a node's analyses (a level's, for the
+                       batch engine) at once on one connection with
+                       execute_async, at most this many running; 0 runs
+                       them one after another. Ignored by the cube engine.
+        materialize: Copy the run_date's CQ/PQ/PY actuals into a session temp
+                     table first and run every analysis against it (see
+                     actuals_slice.py). Ignored by the cube engine.
+        cube: Revenue cube already fetched for this quarter and run_date
+              (e.g. by multi_quarter.py); used by the cube engine only
+        progress: Called with (path, children) as each node finishes, on the
+                  traversal's thread (e.g. by jobs.py); an exception it raises
+                  aborts the collection and keeps the checkpoint journal
+        lazy: Run only LAZY_ANALYSES_BY_LEVEL (Total, category KPIs and
+              breakdowns); every node is still listed and lazy.py fills in
+              the rest when a node is first opened. Journaled apart
+              from full runs. Ignored by the cube engine.
+        connect: Zero-arg callable returning a connection, used for every
+                 connection the collection opens (e.g. ConnectionPool.connect
+                 of a long-lived pool with at least `workers` connections);
+                 defaults to get_connection
+        lock: Take the collection's lock file (lock_path); False when the
+              caller already holds it, as a job worker does
     
     Returns:
         The collected data dictionary
     """
-    if not acquire_lock():
-        print("ERROR: Another collection is already running. Aborting to prevent corruption.")
+    path = lock_path(fiscal_quarter, run_date, filter_category) if lock else None
+    if path and not acquire_lock(path):
+        print("ERROR: Another collection of this quarter/snapshot is already running. "
+              "Aborting to prevent corruption.")
         return {}
     
     try:
         return _collect_all_data_impl(
-            fiscal_quarter, output_path, run_date, filter_category, max_customers
+            fiscal_quarter, output_path, run_date, filter_category, max_customers, engine, workers,
+            incremental or bool(previous_path), previous_path, resume, checkpoint_dir, hierarchy,
+            async_queries, materialize, cube, progress, lazy, connect,
         )
     finally:
-        release_lock()
+        if path:
+            release_lock(path)
 
 
 def _collect_all_data_impl(
@@ -285,10 +696,28 @@ def _collect_all_data_impl(
     run_date: Optional[date] = None,
     filter_category: Optional[str] = None,
     max_customers: int = MAX_CUSTOMERS_PER_FEATURE,
+    engine: str = "sql",
+    workers: int = DEFAULT_WORKERS,
+    incremental: bool = False,
+    previous_path: Optional[str] = None,
+    resume: bool = False,
+    checkpoint_dir: Optional[str] = CHECKPOINT_DIR,
+    hierarchy: Optional[HierarchyIndex] = None,
+    async_queries: int = 0,
+    materialize: bool = False,
+    cube: Optional[RevenueCube] = None,
+    progress: Optional[NodeProgress] = None,
+    lazy: bool = False,
+    connect: Optional[Callable[[], Any]] = None,
 ) -> Dict[str, Any]:
     """Internal implementation of collect_all_data."""
+    if engine not in ENGINES:
+        print(f"ERROR: Unknown engine '{engine}'. Expected one of {ENGINES}")
+        return {}
+    
+    connect = connect or get_connection
     print(f"Connecting to Snowflake...")
-    conn = get_connection()
+    conn = connect()
     
     # Get run_date if not provided
     if run_date is None:
@@ -312,97 +741,140 @@ def _collect_all_data_impl(
     print(dates)
     print()
     
-    # Collect TOTAL level
-    print("Collecting TOTAL level analysis...")
-    total_analysis = collect_analyses_for_level(conn, dates, run_date, 'total')
+    plan = None
+    if incremental:
+        print("Fingerprinting nodes...")
+        fingerprints = fetch_node_fingerprints(conn, dates, run_date)
+        if previous_path:
+            plan = IncrementalPlan.from_file(previous_path, fiscal_quarter, fingerprints)
+        else:
+            plan = IncrementalPlan({}, fingerprints)
     
-    # Get categories to process
-    all_categories = get_categories(conn, dates, run_date)
-    if filter_category:
-        categories = [c for c in all_categories if c == filter_category]
-        if not categories:
-            print(f"WARNING: Category '{filter_category}' not found.")
-            print(f"Available: {all_categories}")
-            categories = all_categories
+    factory = connect
+    if materialize and engine != "cube":
+        print("Materializing actuals slice...")
+        if materialize_slice(conn, dates, run_date):
+            factory = slice_factory(connect, dates, run_date)
+    
+    index = None
+    if engine == "cube":
+        if cube is None:
+            print("Fetching revenue cube...")
+            cube = fetch_revenue_cube(conn, dates, run_date)
+        print(f"   {len(cube):,} cube rows")
+    elif hierarchy is not None and hierarchy.matches(run_date, dates):
+        cube = None
+        index = hierarchy
     else:
-        categories = all_categories
+        cube = None
+        print("Discovering hierarchy...")
+        with query_context(node='Total', analysis='children'):
+            index = fetch_hierarchy(conn, dates, run_date, sizes=False)
+        counts = index.counts()
+        print(f"   {counts['category']} categories, {counts['use_case']} use cases, {counts['feature']} features")
     
-    print(f"\nProcessing {len(categories)} categories...")
+    analyses_by_level = LAZY_ANALYSES_BY_LEVEL if lazy and engine != "cube" else None
     
-    hierarchy = {}
+    # A lazy run has a journal of its own, so its nodes are never resumed into a full run
+    journal = None
+    if checkpoint_dir:
+        journal = CheckpointJournal.open(checkpoint_dir, fiscal_quarter, run_date, filter_category, resume,
+                                         lazy=analyses_by_level is not None)
+        if journal.resumed:
+            print(f"Resuming: {journal.resumed} node(s) already collected")
     
-    for cat in categories:
-        print(f"\n📁 {cat}")
-        
-        cat_data = {
-            'name': cat,
-            'level': 'category',
-            'analysis': collect_analyses_for_level(conn, dates, run_date, 'category', category=cat),
-            'children': {},
-        }
-        
-        use_cases = get_use_cases(conn, dates, run_date, cat)
-        print(f"   {len(use_cases)} use cases")
-        
-        for uc in use_cases:
-            print(f"   📂 {uc}")
-            
-            uc_data = {
-                'name': uc,
-                'level': 'use_case',
-                'analysis': collect_analyses_for_level(conn, dates, run_date, 'use_case', category=cat, use_case=uc),
-                'children': {},
-            }
-            
-            features = get_features(conn, dates, run_date, cat, uc)
-            
-            for feat in features:
-                print(f"      🔧 {feat}")
-                
-                feat_data = {
-                    'name': feat,
-                    'level': 'feature',
-                    'analysis': collect_analyses_for_level(
-                        conn, dates, run_date, 'feature', 
-                        category=cat, use_case=uc, feature=feat
-                    ),
-                    'children': {},
-                }
-                
-                uc_data['children'][feat] = feat_data
-            
-            cat_data['children'][uc] = uc_data
-        
-        hierarchy[cat] = cat_data
+    # The main connection seeds the pool, so workers=1 still uses one connection
+    pool = ConnectionPool(max_size=workers, factory=factory, connections=[conn])
+    
+    def collect_node(path: NodePath) -> Tuple[Dict[str, Any], List[str]]:
+        reused = plan.reuse(path) if plan else None
+        if reused is not None:
+            return reused
+        if cube is not None:
+            return _collect_node(None, cube, dates, run_date, path)
+        with pool.connection() as node_conn:
+            return _collect_node(node_conn, cube, dates, run_date, path, index, async_queries, analyses_by_level)
+    
+    def collect_checkpointed(path: NodePath) -> Tuple[Dict[str, Any], List[str]]:
+        finished = journal.get(path)
+        if finished is not None:
+            return finished
+        return journal.record(path, *collect_node(path))
     
-    conn.close()
+    print(f"Collecting hierarchy with {pool.max_size} worker(s)...")
+    try:
+        if engine == "batch":
+            nodes = _traverse_levels(pool, dates, run_date, workers, index, filter_category, plan, journal,
+                                     async_queries, progress, analyses_by_level)
+        else:
+            nodes = _traverse_hierarchy(collect_checkpointed if journal else collect_node, workers, filter_category,
+                                        progress)
+        customers = None
+        if max_customers > 0:
+            print(f"\nCollecting top {max_customers} customers per feature...")
+            tier_category = filter_category if filter_category in nodes[()][1] else None
+            try:
+                with pool.connection() as tier_conn, query_context(node='all features', analysis='customer_tier'):
+                    customers = fetch_customer_tier(tier_conn, dates, run_date, max_customers, tier_category)
+            except Exception as e:
+                print(f"WARNING: Customer tier failed: {e}")
+        trace = get_trace()
+        if trace:
+            with pool.connection() as trace_conn:
+                trace.fetch_bytes_scanned(trace_conn)
+    finally:
+        pool.close_all()
+        if journal:
+            journal.close()
+    
+    fingerprints = plan.fingerprints if plan else None
+    total_analysis, _ = nodes[()]
+    hierarchy = _assemble_children(nodes, (), fingerprints, customers)
+    
+    metadata = {
+        'fiscal_quarter': fiscal_quarter,
+        'run_date': str(run_date),
+        'q_start': str(dates.q_start),
+        'q_end': str(dates.q_end),
+        'effective_end': str(dates.effective_end),
+        'pq_start': str(dates.pq_start),
+        'pq_end': str(dates.pq_end),
+        'py_start': str(dates.py_start),
+        'py_end': str(dates.py_end),
+        'generated_at': datetime.now().isoformat(),
+        'version': COLLECTION_VERSION,
+    }
+    if filter_category:
+        metadata['filter_category'] = filter_category
+    if customers is not None:
+        metadata['customer_tier'] = tier_metadata(dates, max_customers)
+    if analyses_by_level is not None:
+        metadata['lazy'] = True
+    total = {
+        'name': 'All Categories',
+        'level': 'total',
+        'analysis': total_analysis,
+    }
+    if plan:
+        if () in fingerprints:
+            total['fingerprint'] = fingerprints[()]
+        metadata['incremental'] = plan.summary()
+        print(f"\nIncremental: {plan.recomputed} node(s) recomputed, "
+              f"{plan.reused} reused from {plan.previous_run_date or 'nothing'}")
     
     # Build output structure
     data = to_json_safe({
-        'metadata': {
-            'fiscal_quarter': fiscal_quarter,
-            'run_date': str(run_date),
-            'q_start': str(dates.q_start),
-            'q_end': str(dates.q_end),
-            'effective_end': str(dates.effective_end),
-            'pq_start': str(dates.pq_start),
-            'pq_end': str(dates.pq_end),
-            'py_start': str(dates.py_start),
-            'py_end': str(dates.py_end),
-            'generated_at': datetime.now().isoformat(),
-            'version': 'v6',
-        },
-        'total': {
-            'name': 'All Categories',
-            'level': 'total',
-            'analysis': total_analysis,
-        },
+        'metadata': metadata,
+        'total': total,
         'hierarchy': hierarchy,
     })
     
     if output_path:
-        with open(output_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        save_report(data, output_path)
         print(f"\n✅ Data saved to {output_path}")
+        if trace:
+            print(f"   Query trace: {', '.join(trace.write(output_path))}")
     
+    if journal:
+        journal.remove()
     return data
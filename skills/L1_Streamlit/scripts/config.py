@@ -7,6 +7,7 @@ This file centralizes all configuration to make the tool:
 3. Consistent across all modules
 """
 
+import os
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 
@@ -19,6 +20,12 @@ RUN_DATE_COLUMN = "run_date"
 PLAN_TABLE = "finance.dev_sensitive.achatlani_nov_plan_final"
 CALENDAR_TABLE = "finance.stg_utils.stg_fiscal_calendar"
 
+# Session temp table run_collector.py --materialize copies a collection's
+# run_date and CQ/PQ/PY rows into. Analyses name their source with
+# actuals_slice.actuals_source(conn), which is this table on connections that
+# materialized it and ACTUALS_TABLE everywhere else.
+ACTUALS_SLICE_TABLE = "finance.dev_sensitive.l1_actuals_slice"
+
 # =============================================================================
 # COLUMN MAPPINGS
 # =============================================================================
@@ -114,9 +121,9 @@ HIERARCHY: Dict[str, HierarchyLevel] = {
 # =============================================================================
 
 # Which analyses to run at each level
-# Customer level gets reduced set because:
-#   - No plan data exists
-#   - Concentration/Top20 don't make sense for single entity
+# Customers are not collected as nodes: the customer tier (customers.py) gives
+# each feature's top MAX_CUSTOMERS_PER_FEATURE customers their summary KPIs and
+# monthly trends in two queries for the whole hierarchy
 ANALYSES_BY_LEVEL: Dict[str, List[str]] = {
     "total": [
         "summary_kpis",
@@ -171,6 +178,15 @@ ANALYSES_BY_LEVEL: Dict[str, List[str]] = {
     ],
 }
 
+# Lazy collections (run_collector.py --lazy, the app) run only these up front;
+# lazy.py computes the rest of a node's analyses the first time it is opened
+LAZY_ANALYSES_BY_LEVEL: Dict[str, List[str]] = {
+    "total": ANALYSES_BY_LEVEL["total"],
+    "category": ["summary_kpis", "children_breakdown"],
+    "use_case": [],
+    "feature": [],
+}
+
 # =============================================================================
 # THRESHOLDS AND LIMITS
 # =============================================================================
@@ -180,13 +196,76 @@ GROWTH_THRESHOLD = 0.05      # >+5% QoQ = GROWING
 SHRINK_THRESHOLD = -0.05     # <-5% QoQ = SHRINKING
 
 # Query limits
-MAX_CUSTOMERS_PER_FEATURE = 0  # No customer drill-down
+MAX_CUSTOMERS_PER_FEATURE = 0  # Customer tier size per feature (0 = no customer drill-down; opt in with --max-customers)
 MAX_GAINERS = 5
 MAX_CONTRACTORS = 5
 MAX_INDUSTRIES = 10
 MAX_TOP_CUSTOMERS = 10
 EXTENDED_TREND_MONTHS = 3  # Months before quarter to show in trends
 
+# =============================================================================
+# COLLECTION
+# =============================================================================
+
+# Hierarchy nodes collected concurrently (each on its own pooled connection)
+DEFAULT_WORKERS = 1
+
+# Async mode (run_collector.py --async): queries running at once per connection,
+# and the status poll interval, doubling up to the max while a query runs
+ASYNC_MAX_IN_FLIGHT = 8
+ASYNC_POLL_SECONDS = 0.05
+ASYNC_POLL_MAX_SECONDS = 1.0
+
+# Snapshot catalog (run_dates.py): where it is kept, how long before the app asks
+# for new run_dates, and how often every run_date is re-read (drops deleted ones)
+RUN_DATE_CATALOG_DIR = os.path.expanduser("~/.cache/l1_commentary/run_dates")
+RUN_DATE_CATALOG_REFRESH_SECONDS = 300
+RUN_DATE_CATALOG_FULL_REFRESH_DAYS = 7
+
+# On-disk SQL result cache (opt-in: run_collector.py --result-cache)
+RESULT_CACHE_DIR = os.path.expanduser("~/.cache/l1_commentary/results")
+RESULT_CACHE_MAX_BYTES = 2 * 1024 ** 3  # LRU-evicted above 2 GB
+# Results that can change (plan, calendar, the newest snapshot) are reused for at most this long (0 = never cached)
+RESULT_CACHE_TTL_SECONDS = 3600
+
+# Per-node journals of in-progress collections (resume with run_collector.py --resume)
+CHECKPOINT_DIR = os.path.expanduser("~/.cache/l1_commentary/checkpoints")
+
+# Collections of different quarters/snapshots running at once (job workers,
+# single_flight.py); requests for one already running wait for it
+COLLECTION_MAX_CONCURRENT = 2
+
+# Background collection jobs started from the app (jobs.py): the SQLite queue,
+# how often a worker checks for new jobs, and how long an idle worker stays up
+JOBS_DB = os.path.expanduser("~/.cache/l1_commentary/jobs.sqlite")
+JOB_POLL_SECONDS = 1.0
+JOB_WORKER_IDLE_SECONDS = 300
+
+# Pooled Snowflake connections kept by the app process and by each job worker
+# (db.ConnectionPool): at most this many open, closed after idling this long,
+# and checked with SELECT 1 before reuse once unused for this long
+CONNECTION_POOL_MAX_SIZE = 4
+CONNECTION_POOL_IDLE_SECONDS = 1800
+CONNECTION_POOL_HEALTH_CHECK_SECONDS = 60
+
+# The app collects lazily: Total and category KPIs up front, other nodes on first visit
+APP_LAZY_COLLECTIONS = True
+
+# Schema version written to metadata.version; cached collections, checkpoints and
+# --incremental inputs of any other version are not reused
+COLLECTION_VERSION = "v6"
+
+# The app's cache directory (cache_index.py): total size above which the least
+# recently opened collections are deleted, and days a collection may go unopened
+APP_CACHE_MAX_BYTES = 5 * 1024 ** 3
+APP_CACHE_TTL_DAYS = 30
+
+# Cached collections the app holds in memory at once, shared by all sessions (shared_reports.py)
+SHARED_REPORTS_MAX_ENTRIES = 8
+
+# File format of cached collections and shards (report_store.py); .json writes indent=2 JSON
+REPORT_STORE_FORMAT = ".json.zst"
+
 # =============================================================================
 # DISPLAY CONFIGURATION
 # =============================================================================
@@ -0,0 +1,729 @@
+"""
+cube.py - Single-Scan Revenue Cube Engine
+
+The SQL engine in analyses.py issues one query per analysis per node, and each
+query rescans the actuals snapshot three or four times (cq, pq, py CTEs). The
+cube engine instead pulls ONE pre-aggregated result set per run_date and
+computes every analysis in ANALYSES_BY_LEVEL locally with pandas/NumPy.
+
+CUBE LAYOUT (one row per group, `bucket` says which slice it belongs to):
+    CQ          month x category x use_case x feature x customer x industry x capacity
+    PQ, PY      category x use_case x feature x customer x industry x capacity
+    PLAN        category x use_case x feature x customer x industry (CQ window)
+    CQ_DAILY    day x category x use_case x feature
+    PLAN_DAILY  day x category x use_case x feature
+
+Results mirror analyses.py row for row (same keys, ordering, rounding and
+NULL-key join semantics), so the v6 JSON schema is unchanged.
+
+USAGE:
+    cube = fetch_revenue_cube(conn, dates, run_date)
+    analysis = compute_analyses_for_level(cube, dates, 'category', category='Analytics')
+"""
+
+import math
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .db import execute_query
+from .config import (
+    ACTUALS_TABLE, PLAN_TABLE, HIERARCHY, RUN_DATE_COLUMN, ANALYSES_BY_LEVEL,
+    GROWTH_THRESHOLD, SHRINK_THRESHOLD,
+    MAX_GAINERS, MAX_CONTRACTORS, MAX_INDUSTRIES, MAX_TOP_CUSTOMERS,
+)
+from .fiscal import FiscalDates
+
+
+CUBE_COLUMNS = [
+    "bucket", "period_date", "category", "use_case", "feature",
+    "customer", "industry", "is_capacity", "revenue",
+]
+
+# Cube column holding each hierarchy level's key (same names as HIERARCHY)
+NODE_KEYS = ["category", "use_case", "feature"]
+
+STANDARD_COLUMNS = [
+    "qtd_revenue", "prior_q_revenue", "qoq_delta", "qoq_growth_pct",
+    "contribution_to_growth_pct", "qtd_plan", "delta_to_plan", "pct_vs_plan",
+    "variance_magnitude_pct", "prior_year_revenue", "yoy_delta", "yoy_growth_pct",
+    "yoy_contribution_to_growth_pct", "mix_pct",
+]
+
+
+# =============================================================================
+# CUBE QUERY
+# =============================================================================
+
+def build_cube_query(dates: FiscalDates, run_date: date) -> str:
+    """Build the single query that returns the full revenue cube for a run_date."""
+    return f"""
+    WITH windows AS (
+        SELECT 'CQ' AS bucket, '{dates.q_start}'::DATE AS w_start, '{dates.effective_end}'::DATE AS w_end
+        UNION ALL SELECT 'PQ', '{dates.pq_start}'::DATE, '{dates.pq_end}'::DATE
+        UNION ALL SELECT 'PY', '{dates.py_start}'::DATE, '{dates.py_end}'::DATE
+    ),
+    actuals AS (
+        SELECT
+            w.bucket,
+            a.ds,
+            a.product_category,
+            a.use_case,
+            a.feature,
+            a.latest_salesforce_account_name,
+            a.industry_rollup,
+            a.agreement_type,
+            a.revenue + a.product_led_revenue AS revenue
+        FROM {ACTUALS_TABLE} a
+        JOIN windows w ON a.ds BETWEEN w.w_start AND w.w_end
+        WHERE a.{RUN_DATE_COLUMN} = '{run_date}'
+    ),
+    plan AS (
+        SELECT ds, product_category, use_case, feature, salesforce_account_name, industry_rollup, revenue
+        FROM {PLAN_TABLE}
+        WHERE ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+    )
+    SELECT
+        bucket,
+        CASE WHEN bucket = 'CQ' THEN DATE_TRUNC('month', ds) END AS period_date,
+        product_category AS category,
+        use_case,
+        feature,
+        latest_salesforce_account_name AS customer,
+        industry_rollup AS industry,
+        agreement_type = 'Capacity' AS is_capacity,
+        SUM(revenue) AS revenue
+    FROM actuals
+    GROUP BY 1, 2, 3, 4, 5, 6, 7, 8
+    UNION ALL
+    SELECT 'CQ_DAILY', ds, product_category, use_case, feature, NULL, NULL, NULL, SUM(revenue)
+    FROM actuals
+    WHERE bucket = 'CQ'
+    GROUP BY ds, product_category, use_case, feature
+    UNION ALL
+    SELECT 'PLAN', NULL, product_category, use_case, feature, salesforce_account_name, industry_rollup, NULL, SUM(revenue)
+    FROM plan
+    GROUP BY product_category, use_case, feature, salesforce_account_name, industry_rollup
+    UNION ALL
+    SELECT 'PLAN_DAILY', ds, product_category, use_case, feature, NULL, NULL, NULL, SUM(revenue)
+    FROM plan
+    GROUP BY ds, product_category, use_case, feature
+    """
+
+
+class CubeNode:
+    """The cube rows for one hierarchy node, split by bucket."""
+
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        self.cq = frames["CQ"]
+        self.pq = frames["PQ"]
+        self.py = frames["PY"]
+        self.plan = frames["PLAN"]
+        self.cq_daily = frames["CQ_DAILY"]
+        self.plan_daily = frames["PLAN_DAILY"]
+
+
+class RevenueCube:
+    """
+    In-memory revenue cube with per-level row indexes.
+
+    Each bucket is stored as its own DataFrame; node lookups use precomputed
+    groupby positions so slicing a node is O(rows in node), not O(cube).
+    """
+
+    BUCKETS = ("CQ", "PQ", "PY", "PLAN", "CQ_DAILY", "PLAN_DAILY")
+
+    def __init__(self, frame: pd.DataFrame):
+        frame = frame.copy()
+        frame["revenue"] = frame["revenue"].astype(float).fillna(0.0)
+        frame["industry"] = frame["industry"].fillna("Unknown")
+        frame["is_capacity"] = frame["is_capacity"].fillna(False).astype(bool)
+        self.row_count = len(frame)
+
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self._positions: Dict[str, Dict[int, Dict[Any, np.ndarray]]] = {}
+        for bucket in self.BUCKETS:
+            part = frame[frame["bucket"] == bucket].reset_index(drop=True)
+            self.frames[bucket] = part
+            self._positions[bucket] = {
+                depth: part.groupby(NODE_KEYS[:depth] if depth > 1 else NODE_KEYS[0], sort=False).indices
+                for depth in (1, 2, 3)
+            }
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "RevenueCube":
+        """Build a cube from execute_query results."""
+        return cls(pd.DataFrame(rows, columns=CUBE_COLUMNS))
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    # -------------------------------------------------------------------------
+    # Hierarchy navigation (same semantics as collector.get_* queries)
+    # -------------------------------------------------------------------------
+
+    def _cq_children(self, column: str, **filters: str) -> List[str]:
+        node = self.frames["CQ"] if not filters else self.node(**filters).cq
+        return sorted(node[column].dropna().unique().tolist())
+
+    def get_categories(self) -> List[str]:
+        """Categories with rows in the current quarter."""
+        return self._cq_children("category")
+
+    def get_use_cases(self, category: str) -> List[str]:
+        """Use cases of a category with rows in the current quarter."""
+        return self._cq_children("use_case", category=category)
+
+    def get_features(self, category: str, use_case: str) -> List[str]:
+        """Features of a use case with rows in the current quarter."""
+        return self._cq_children("feature", category=category, use_case=use_case)
+
+    def node(
+        self,
+        category: Optional[str] = None,
+        use_case: Optional[str] = None,
+        feature: Optional[str] = None,
+    ) -> CubeNode:
+        """Slice every bucket down to one hierarchy node."""
+        key = tuple(v for v in (category, use_case, feature) if v is not None)
+        if not key:
+            return CubeNode(self.frames)
+
+        lookup = key[0] if len(key) == 1 else key
+        frames = {}
+        for bucket, frame in self.frames.items():
+            positions = self._positions[bucket][len(key)].get(lookup)
+            frames[bucket] = frame.iloc[positions] if positions is not None else frame.iloc[0:0]
+        return CubeNode(frames)
+
+
+def fetch_revenue_cube(conn, dates: FiscalDates, run_date: date) -> RevenueCube:
+    """Run the cube query once and load it into a RevenueCube."""
+    rows = execute_query(conn, build_cube_query(dates, run_date), "Revenue cube")
+    return RevenueCube.from_rows(rows)
+
+
+# =============================================================================
+# VECTOR HELPERS
+# =============================================================================
+
+def _round(values, digits: int):
+    """ROUND(x, digits) with SQL half-away-from-zero semantics."""
+    scale = 10.0 ** digits
+    values = np.asarray(values, dtype=float)
+    return np.sign(values) * np.floor(np.abs(values) * scale + 0.5) / scale
+
+
+def _pct(numerator, denominator):
+    """ROUND(100.0 * numerator / NULLIF(denominator, 0), 2)."""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(denominator == 0, np.nan, 100.0 * numerator / denominator)
+    return _round(ratio, 2)
+
+
+def _nullif(value: float) -> float:
+    """NULLIF(value, 0) for scalar totals."""
+    return np.nan if value == 0 else value
+
+
+def _sum_by(frame: pd.DataFrame, key) -> pd.Series:
+    """SUM(revenue) GROUP BY key, keeping the NULL-key group like SQL does."""
+    return frame.groupby(key, dropna=False, sort=False)["revenue"].sum()
+
+
+def _full_outer(**parts: pd.Series) -> pd.DataFrame:
+    """
+    Combine per-period sums the way the SQL FULL OUTER JOIN chains do.
+
+    Non-NULL keys are aligned across periods (missing -> 0). NULL keys never
+    match in SQL, so each period's NULL group becomes its own row.
+    """
+    names = list(parts)
+    keyed = pd.DataFrame({n: s[s.index.notna()] for n, s in parts.items()}, columns=names)
+    keyed = keyed.fillna(0.0)
+
+    null_rows = []
+    for name, series in parts.items():
+        nulls = series[series.index.isna()]
+        if len(nulls):
+            row = dict.fromkeys(names, 0.0)
+            row[name] = float(nulls.sum())
+            null_rows.append(row)
+    if null_rows:
+        nulls = pd.DataFrame(null_rows, columns=names, index=[np.nan] * len(null_rows))
+        keyed = pd.concat([keyed, nulls]) if len(keyed) else nulls
+    return keyed
+
+
+def _left(base: pd.Series, **parts: pd.Series) -> pd.DataFrame:
+    """LEFT JOIN other period sums onto a base period (NULL keys never match)."""
+    combined = pd.DataFrame({"base": base})
+    for name, series in parts.items():
+        combined[name] = series[series.index.notna()].reindex(combined.index).fillna(0.0).to_numpy()
+        combined.loc[combined.index.isna(), name] = 0.0
+    return combined
+
+
+def _records(frame: pd.DataFrame, columns: List[str]) -> List[Dict[str, Any]]:
+    """Convert a frame to execute_query-style rows (native types, NaN -> None)."""
+    values = {c: frame[c].tolist() for c in columns}
+    rows = []
+    for i in range(len(frame)):
+        row = {}
+        for c in columns:
+            v = values[c][i]
+            row[c] = None if isinstance(v, float) and math.isnan(v) else v
+        rows.append(row)
+    return rows
+
+
+def _standard_metrics(frame: pd.DataFrame, cq, pq, plan, py, totals: Dict[str, float]) -> pd.DataFrame:
+    """
+    Add the standard QoQ / Plan / YoY / Mix columns shared by most analyses.
+
+    `totals` holds total_revenue and the three magnitude denominators
+    (already NULLIF'ed), exactly as the SQL `totals` CTEs compute them.
+    """
+    frame["qtd_revenue"] = _round(cq, 0)
+    frame["prior_q_revenue"] = _round(pq, 0)
+    frame["qoq_delta"] = _round(cq - pq, 0)
+    frame["qoq_growth_pct"] = _pct(cq - pq, pq)
+    frame["contribution_to_growth_pct"] = _round(100.0 * np.abs(cq - pq) / totals["qoq"], 2)
+    frame["qtd_plan"] = _round(plan, 0)
+    frame["delta_to_plan"] = _round(cq - plan, 0)
+    frame["pct_vs_plan"] = _pct(cq - plan, plan)
+    frame["variance_magnitude_pct"] = _round(100.0 * np.abs(cq - plan) / totals["plan"], 2)
+    frame["prior_year_revenue"] = _round(py, 0)
+    frame["yoy_delta"] = _round(cq - py, 0)
+    frame["yoy_growth_pct"] = _pct(cq - py, py)
+    frame["yoy_contribution_to_growth_pct"] = _round(100.0 * np.abs(cq - py) / totals["yoy"], 2)
+    frame["mix_pct"] = _pct(cq, totals["revenue"])
+    return frame
+
+
+def _magnitude_totals(combined: pd.DataFrame) -> Dict[str, float]:
+    """The `totals` CTE: total revenue and NULLIF'ed delta magnitudes."""
+    cq, pq, py, plan = (combined[c].to_numpy() for c in ("cq", "pq", "py", "plan"))
+    return {
+        "revenue": float(cq.sum()),
+        "qoq": _nullif(float(np.abs(cq - pq).sum())),
+        "plan": _nullif(float(np.abs(cq - plan).sum())),
+        "yoy": _nullif(float(np.abs(cq - py).sum())),
+    }
+
+
+def _sort_desc(frame: pd.DataFrame, column: str, ascending: bool = False) -> pd.DataFrame:
+    return frame.sort_values(column, ascending=ascending, kind="mergesort")
+
+
+def _child_key(level: str) -> Optional[str]:
+    hierarchy_level = HIERARCHY.get(level)
+    if not hierarchy_level or not hierarchy_level.child_level:
+        return None
+    return hierarchy_level.child_level
+
+
+# =============================================================================
+# ANALYSES (one per analyses.get_<name>)
+# =============================================================================
+
+def cube_summary_kpis(node: CubeNode, dates: FiscalDates, level: str) -> Dict[str, Any]:
+    """Cube version of analyses.get_summary_kpis."""
+    cq = node.cq["revenue"].sum()
+    pq = node.pq["revenue"].sum()
+    py = node.py["revenue"].sum()
+    plan = node.plan["revenue"].sum()
+    row = pd.DataFrame({
+        "qtd_revenue": _round([cq], 0),
+        "qtd_plan": _round([plan], 0),
+        "delta_to_plan": _round([cq - plan], 0),
+        "pct_vs_plan": _pct([cq - plan], [plan]),
+        "yoy_growth_pct": _pct([cq - py], [py]),
+        "qoq_growth_pct": _pct([cq - pq], [pq]),
+        "prior_q_revenue": _round([pq], 0),
+        "prior_year_revenue": _round([py], 0),
+    })
+    return _records(row, list(row.columns))[0]
+
+
+def cube_monthly_trends(node: CubeNode, dates: FiscalDates, level: str) -> List[Dict[str, Any]]:
+    """Cube version of analyses.get_monthly_trends (daily cumulative vs plan)."""
+    actuals = _sum_by(node.cq_daily, "period_date")
+    plan = _sum_by(node.plan_daily, "period_date")
+    combined = pd.DataFrame({"daily_revenue": actuals, "daily_plan": plan}).fillna(0.0)
+    combined = combined[combined.index.notna()]
+    combined = combined.loc[sorted(combined.index)]
+    combined = combined[[d <= dates.effective_end for d in combined.index]]
+
+    frame = pd.DataFrame({"day": list(combined.index)})
+    daily_revenue = combined["daily_revenue"].to_numpy()
+    daily_plan = combined["daily_plan"].to_numpy()
+    frame["revenue"] = _round(daily_revenue, 0)
+    frame["plan_revenue"] = _round(daily_plan, 0)
+    frame["cumulative_revenue"] = _round(np.cumsum(daily_revenue), 0)
+    frame["cumulative_plan"] = _round(np.cumsum(daily_plan), 0)
+
+    results = _records(frame, list(frame.columns))
+    for row in results:
+        if row.get('cumulative_plan'):
+            row['vs_plan'] = row['cumulative_revenue'] - row['cumulative_plan']
+            row['vs_plan_pct'] = round(100.0 * row['vs_plan'] / row['cumulative_plan'], 2) if row['cumulative_plan'] else None
+    return results
+
+
+def cube_children_breakdown(node: CubeNode, dates: FiscalDates, level: str) -> List[Dict[str, Any]]:
+    """Cube version of analyses.get_children_breakdown."""
+    key = _child_key(level)
+    if key is None:
+        return []
+
+    combined = _full_outer(
+        cq=_sum_by(node.cq, key),
+        pq=_sum_by(node.pq, key),
+        plan=_sum_by(node.plan, key),
+        py=_sum_by(node.py, key),
+    )
+    totals = _magnitude_totals(combined)
+    combined = _sort_desc(combined[combined.index.notna()], "cq")
+
+    frame = pd.DataFrame({"entity": list(combined.index)})
+    _standard_metrics(
+        frame, combined["cq"].to_numpy(), combined["pq"].to_numpy(),
+        combined["plan"].to_numpy(), combined["py"].to_numpy(), totals,
+    )
+    return _records(frame, ["entity"] + STANDARD_COLUMNS)
+
+
+def cube_top20_vs_longtail(node: CubeNode, dates: FiscalDates, level: str) -> List[Dict[str, Any]]:
+    """Cube version of analyses.get_top20_vs_longtail (Capacity customers only)."""
+    cq = _sum_by(node.cq[node.cq["is_capacity"]], "customer")
+    combined = _left(
+        cq[cq.index.notna()],
+        pq=_sum_by(node.pq[node.pq["is_capacity"]], "customer"),
+        py=_sum_by(node.py[node.py["is_capacity"]], "customer"),
+        plan=_sum_by(node.plan, "customer"),
+    ).rename(columns={"base": "cq"})
+    if combined.empty:
+        return []
+
+    combined = _sort_desc(combined, "cq")
+    combined["segment"] = np.where(np.arange(len(combined)) < 20, "Top 20 Customers", "Long Tail")
+    totals = _magnitude_totals(combined)
+
+    combined["qoq_mag"] = np.abs(combined["cq"] - combined["pq"])
+    combined["plan_mag"] = np.abs(combined["cq"] - combined["plan"])
+    combined["yoy_mag"] = np.abs(combined["cq"] - combined["py"])
+    aggregated = combined.groupby("segment", sort=False).agg(
+        customer_count=("cq", "size"),
+        cq=("cq", "sum"), pq=("pq", "sum"), py=("py", "sum"), plan=("plan", "sum"),
+        qoq_mag=("qoq_mag", "sum"), plan_mag=("plan_mag", "sum"), yoy_mag=("yoy_mag", "sum"),
+    )
+    aggregated = _sort_desc(aggregated, "cq")
+
+    cq_a, pq_a, py_a, plan_a = (aggregated[c].to_numpy() for c in ("cq", "pq", "py", "plan"))
+    frame = pd.DataFrame({
+        "segment": list(aggregated.index),
+        "customer_count": [int(v) for v in aggregated["customer_count"]],
+    })
+    _standard_metrics(frame, cq_a, pq_a, plan_a, py_a, totals)
+    frame["contribution_to_growth_pct"] = _round(100.0 * aggregated["qoq_mag"].to_numpy() / totals["qoq"], 2)
+    frame["variance_magnitude_pct"] = _round(100.0 * aggregated["plan_mag"].to_numpy() / totals["plan"], 2)
+    frame["yoy_contribution_to_growth_pct"] = _round(100.0 * aggregated["yoy_mag"].to_numpy() / totals["yoy"], 2)
+    return _records(frame, ["segment", "customer_count"] + STANDARD_COLUMNS)
+
+
+def cube_industry_performance(node: CubeNode, dates: FiscalDates, level: str) -> List[Dict[str, Any]]:
+    """Cube version of analyses.get_industry_performance."""
+    cq = _sum_by(node.cq, "industry")
+    plan = _sum_by(node.plan, "industry")
+    combined = _left(cq, pq=_sum_by(node.pq, "industry"), py=_sum_by(node.py, "industry"))
+    combined = combined.rename(columns={"base": "cq"})
+    combined["plan"] = plan.reindex(combined.index).fillna(0.0).to_numpy()
+
+    plan_only = plan[~plan.index.isin(combined.index)]
+    if len(plan_only):
+        extra = pd.DataFrame({"cq": 0.0, "pq": 0.0, "py": 0.0, "plan": plan_only})
+        combined = pd.concat([combined, extra]) if len(combined) else extra
+    if combined.empty:
+        return []
+
+    totals = _magnitude_totals(combined)
+    combined = _sort_desc(combined, "cq").head(MAX_INDUSTRIES)
+
+    frame = pd.DataFrame({"industry": list(combined.index)})
+    _standard_metrics(
+        frame, combined["cq"].to_numpy(), combined["pq"].to_numpy(),
+        combined["plan"].to_numpy(), combined["py"].to_numpy(), totals,
+    )
+    return _records(frame, ["industry"] + STANDARD_COLUMNS)
+
+
+def cube_new_vs_existing(node: CubeNode, dates: FiscalDates, level: str) -> List[Dict[str, Any]]:
+    """Cube version of analyses.get_new_vs_existing (Capacity customers only)."""
+    cq = _sum_by(node.cq[node.cq["is_capacity"]], "customer")
+    pq = _sum_by(node.pq[node.pq["is_capacity"]], "customer")
+    combined = _full_outer(cq=cq, pq=pq)
+    if combined.empty:
+        return []
+
+    py = _sum_by(node.py[node.py["is_capacity"]], "customer")
+    plan = _sum_by(node.plan, "customer")
+    notna = combined.index.notna()
+    combined["py"] = np.where(notna, py[py.index.notna()].reindex(combined.index).fillna(0.0).to_numpy(), 0.0)
+    combined["plan"] = np.where(notna, plan[plan.index.notna()].reindex(combined.index).fillna(0.0).to_numpy(), 0.0)
+
+    cq_v, pq_v = combined["cq"].to_numpy(), combined["pq"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = (cq_v - pq_v) / pq_v
+    is_new = pq_v == 0
+    is_churned = ~is_new & (cq_v == 0)
+    combined["customer_type"] = np.where(is_new, "NEW", np.where(is_churned, "CHURNED", "EXISTING"))
+    combined["existing_segment"] = np.where(
+        is_new | is_churned, None,
+        np.where(growth > GROWTH_THRESHOLD, "GROWING",
+                 np.where(growth < SHRINK_THRESHOLD, "SHRINKING", "STAGNANT")),
+    )
+    combined["customer"] = list(combined.index)
+    totals = _magnitude_totals(combined)
+
+    combined["qoq_mag"] = np.abs(cq_v - pq_v)
+    combined["plan_mag"] = np.abs(cq_v - combined["plan"].to_numpy())
+    combined["yoy_mag"] = np.abs(cq_v - combined["py"].to_numpy())
+    aggregated = combined.groupby(["customer_type", "existing_segment"], dropna=False, sort=False).agg(
+        customer_count=("customer", "nunique"),
+        cq=("cq", "sum"), pq=("pq", "sum"), py=("py", "sum"), plan=("plan", "sum"),
+        qoq_mag=("qoq_mag", "sum"), plan_mag=("plan_mag", "sum"), yoy_mag=("yoy_mag", "sum"),
+    ).reset_index()
+    aggregated = aggregated.sort_values(
+        ["customer_type", "existing_segment"], na_position="last", kind="mergesort"
+    )
+
+    cq_a, pq_a, py_a, plan_a = (aggregated[c].to_numpy() for c in ("cq", "pq", "py", "plan"))
+    frame = pd.DataFrame({
+        "customer_type": aggregated["customer_type"].tolist(),
+        "existing_segment": aggregated["existing_segment"].tolist(),
+        "customer_count": [int(v) for v in aggregated["customer_count"]],
+    })
+    _standard_metrics(frame, cq_a, pq_a, plan_a, py_a, totals)
+    frame["contribution_to_growth_pct"] = _round(100.0 * aggregated["qoq_mag"].to_numpy() / totals["qoq"], 2)
+    frame["variance_magnitude_pct"] = _round(100.0 * aggregated["plan_mag"].to_numpy() / totals["plan"], 2)
+    frame["yoy_contribution_to_growth_pct"] = _round(100.0 * aggregated["yoy_mag"].to_numpy() / totals["yoy"], 2)
+    return _records(frame, ["customer_type", "existing_segment", "customer_count"] + STANDARD_COLUMNS)
+
+
+def _child_movers(node: CubeNode, level: str, gainers: bool) -> List[Dict[str, Any]]:
+    """Shared body of cube_top_gainers / cube_top_contractors."""
+    key = _child_key(level)
+    if key is None:
+        return []
+
+    combined = _full_outer(cq=_sum_by(node.cq, key), pq=_sum_by(node.pq, key))
+    combined["delta"] = combined["cq"] - combined["pq"]
+    total_magnitude = _nullif(float(np.abs(combined["delta"]).sum()))
+    if gainers:
+        combined = _sort_desc(combined[combined["delta"] > 0], "delta").head(MAX_GAINERS)
+    else:
+        combined = _sort_desc(combined[combined["delta"] < 0], "delta", ascending=True).head(MAX_CONTRACTORS)
+
+    delta = combined["delta"].to_numpy()
+    frame = pd.DataFrame({"entity": list(combined.index)})
+    frame["current_quarter_revenue"] = _round(combined["cq"].to_numpy(), 0)
+    frame["prior_quarter_revenue"] = _round(combined["pq"].to_numpy(), 0)
+    frame["delta"] = _round(delta, 0)
+    frame["qoq_growth_pct"] = _pct(delta, combined["pq"].to_numpy())
+    frame["contribution_pct"] = _round(100.0 * np.abs(delta) / total_magnitude, 2)
+    return _records(frame, list(frame.columns))
+
+
+def cube_top_gainers(node: CubeNode, dates: FiscalDates, level: str) -> List[Dict[str, Any]]:
+    """Cube version of analyses.get_top_gainers."""
+    return _child_movers(node, level, gainers=True)
+
+
+def cube_top_contractors(node: CubeNode, dates: FiscalDates, level: str) -> List[Dict[str, Any]]:
+    """Cube version of analyses.get_top_contractors."""
+    return _child_movers(node, level, gainers=False)
+
+
+def cube_concentration_trend(node: CubeNode, dates: FiscalDates, level: str) -> List[Dict[str, Any]]:
+    """Cube version of analyses.get_concentration_trend."""
+    monthly = node.cq.groupby(["period_date", "customer"], dropna=False, sort=False)["revenue"].sum().reset_index()
+    monthly = monthly[monthly["period_date"].notna()]
+    if monthly.empty:
+        return []
+
+    monthly = monthly.sort_values(["period_date", "revenue"], ascending=[True, False], kind="mergesort")
+    rank = monthly.groupby("period_date", sort=False).cumcount().to_numpy() + 1
+    monthly["top10"] = np.where(rank <= 10, monthly["revenue"], 0.0)
+    monthly["top20"] = np.where(rank <= 20, monthly["revenue"], 0.0)
+    by_month = monthly.groupby("period_date", sort=False).agg(
+        top10=("top10", "sum"), top20=("top20", "sum"), total=("revenue", "sum"),
+    )
+    by_month = by_month.loc[sorted(by_month.index)]
+
+    total = by_month["total"].to_numpy()
+    frame = pd.DataFrame({"month": list(by_month.index)})
+    frame["top10_revenue"] = _round(by_month["top10"].to_numpy(), 0)
+    frame["top20_revenue"] = _round(by_month["top20"].to_numpy(), 0)
+    frame["total_revenue"] = _round(total, 0)
+    frame["top10_pct"] = _pct(by_month["top10"].to_numpy(), total)
+    frame["top20_pct"] = _pct(by_month["top20"].to_numpy(), total)
+    return _records(frame, list(frame.columns))
+
+
+def _customer_combined(node: CubeNode) -> pd.DataFrame:
+    """The FULL OUTER customer `combined` CTE shared by the top customer analyses."""
+    combined = _full_outer(
+        cq=_sum_by(node.cq, "customer"),
+        pq=_sum_by(node.pq, "customer"),
+        py=_sum_by(node.py, "customer"),
+        plan=_sum_by(node.plan, "customer"),
+    )
+    combined["delta"] = combined["cq"] - combined["pq"]
+    return combined
+
+
+def _customer_rows(combined: pd.DataFrame, totals: Dict[str, float]) -> pd.DataFrame:
+    frame = pd.DataFrame({"customer": list(combined.index)})
+    return _standard_metrics(
+        frame, combined["cq"].to_numpy(), combined["pq"].to_numpy(),
+        combined["plan"].to_numpy(), combined["py"].to_numpy(), totals,
+    )
+
+
+def cube_top_customers(node: CubeNode, dates: FiscalDates, level: str) -> List[Dict[str, Any]]:
+    """Cube version of analyses.get_top_customers."""
+    combined = _customer_combined(node)
+    totals = _magnitude_totals(combined)
+    combined = _sort_desc(combined[combined.index.notna()], "cq").head(MAX_TOP_CUSTOMERS)
+
+    frame = _customer_rows(combined, totals).rename(columns={
+        "delta_to_plan": "vs_plan", "pct_vs_plan": "vs_plan_pct",
+    })
+    columns = ["customer"] + [
+        {"delta_to_plan": "vs_plan", "pct_vs_plan": "vs_plan_pct"}.get(c, c) for c in STANDARD_COLUMNS
+    ]
+    return _records(frame, columns)
+
+
+def _customer_movers(node: CubeNode, gainers: bool) -> List[Dict[str, Any]]:
+    """Shared body of cube_top_customer_gainers / cube_top_customer_contractors."""
+    combined = _customer_combined(node)
+    totals = _magnitude_totals(combined)
+    delta = combined["delta"].to_numpy()
+    if gainers:
+        movement = _nullif(float(np.where(delta > 0, delta, 0.0).sum()))
+        picked = combined[(combined["delta"] > 0) & combined.index.notna()]
+        picked = _sort_desc(picked, "delta").head(MAX_GAINERS)
+    else:
+        movement = _nullif(float(np.where(delta < 0, np.abs(delta), 0.0).sum()))
+        picked = combined[(combined["delta"] < 0) & combined.index.notna()]
+        picked = _sort_desc(picked, "delta", ascending=True).head(MAX_CONTRACTORS)
+
+    frame = _customer_rows(picked, totals)
+    picked_delta = picked["delta"].to_numpy()
+    contribution_column = "contribution_to_growth_pct" if gainers else "contribution_to_decline_pct"
+    frame[contribution_column] = _round(100.0 * np.abs(picked_delta) / movement, 2)
+
+    columns = ["customer"] + [
+        contribution_column if c == "contribution_to_growth_pct" else c for c in STANDARD_COLUMNS
+    ]
+    return _records(frame, columns)
+
+
+def cube_top_customer_gainers(node: CubeNode, dates: FiscalDates, level: str) -> List[Dict[str, Any]]:
+    """Cube version of analyses.get_top_customer_gainers."""
+    return _customer_movers(node, gainers=True)
+
+
+def cube_top_customer_contractors(node: CubeNode, dates: FiscalDates, level: str) -> List[Dict[str, Any]]:
+    """Cube version of analyses.get_top_customer_contractors."""
+    return _customer_movers(node, gainers=False)
+
+
+def cube_plan_variance_by_segment(node: CubeNode, dates: FiscalDates, level: str) -> List[Dict[str, Any]]:
+    """Cube version of analyses.get_plan_variance_by_segment."""
+    key = _child_key(level)
+    if key is None:
+        return []
+
+    # Rank every CQ customer (the NULL group takes a rank slot, as in SQL)
+    customer_totals = _sort_desc(_sum_by(node.cq, "customer").to_frame(), "revenue")
+    ranked = customer_totals.index[:20]
+    top20 = set(ranked[ranked.notna()])
+
+    def by_segment(frame: pd.DataFrame) -> pd.Series:
+        segment = np.where(frame["customer"].isin(top20).to_numpy(), "Top 20", "Long Tail")
+        grouped = frame.assign(segment=segment).groupby([key, "segment"], sort=False)["revenue"].sum()
+        return grouped
+
+    combined = pd.DataFrame({
+        "actual": by_segment(node.cq),
+        "plan": by_segment(node.plan),
+    }).fillna(0.0)
+    if combined.empty:
+        return []
+    combined = combined.sort_index(kind="mergesort")
+
+    actual = combined["actual"].to_numpy()
+    plan = combined["plan"].to_numpy()
+    frame = pd.DataFrame({
+        "entity": combined.index.get_level_values(0).tolist(),
+        "segment": combined.index.get_level_values(1).tolist(),
+    })
+    frame["actual_revenue"] = _round(actual, 0)
+    frame["plan_revenue"] = _round(plan, 0)
+    frame["variance"] = _round(actual - plan, 0)
+    return _records(frame, list(frame.columns))
+
+
+CUBE_ANALYSES: Dict[str, Callable[[CubeNode, FiscalDates, str], Any]] = {
+    "summary_kpis": cube_summary_kpis,
+    "monthly_trends": cube_monthly_trends,
+    "children_breakdown": cube_children_breakdown,
+    "top20_vs_longtail": cube_top20_vs_longtail,
+    "industry_performance": cube_industry_performance,
+    "new_vs_existing": cube_new_vs_existing,
+    "top_gainers": cube_top_gainers,
+    "top_contractors": cube_top_contractors,
+    "concentration_trend": cube_concentration_trend,
+    "top_customers": cube_top_customers,
+    "top_customer_gainers": cube_top_customer_gainers,
+    "top_customer_contractors": cube_top_customer_contractors,
+    "plan_variance_by_segment": cube_plan_variance_by_segment,
+}
+
+
+# =============================================================================
+# DISPATCHER
+# =============================================================================
+
+def compute_analyses_for_level(
+    cube: RevenueCube,
+    dates: FiscalDates,
+    level: str,
+    category: Optional[str] = None,
+    use_case: Optional[str] = None,
+    feature: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Cube counterpart of collector.collect_analyses_for_level.
+
+    Same contract: one entry per analysis in ANALYSES_BY_LEVEL[level], and a
+    failed analysis becomes [] (or {} for summary_kpis).
+    """
+    node = cube.node(category, use_case, feature)
+    results = {}
+
+    for analysis_name in ANALYSES_BY_LEVEL.get(level, []):
+        try:
+            results[analysis_name] = CUBE_ANALYSES[analysis_name](node, dates, level)
+        except Exception as e:
+            print(f"    WARNING: {analysis_name} failed: {e}")
+            results[analysis_name] = [] if analysis_name != "summary_kpis" else {}
+
+    return results
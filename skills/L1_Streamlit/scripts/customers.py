@@ -0,0 +1,252 @@
+"""
+customers.py - Set-Based Customer Tier Below Features
+
+Collecting customers as hierarchy nodes would run every analysis once per
+customer per feature. fetch_customer_tier() instead ranks the customers of
+every feature by QTD revenue and, for the top N of each, computes the summary
+KPIs (QTD, plan, QoQ, YoY, same formulas as get_summary_kpis) and the monthly
+revenue vs plan of the quarter in two queries, whatever the number of
+features.
+
+The tier is stored compactly: each feature node of the JSON gets a
+`customers` list with one row (a list, in CUSTOMER_COLUMNS order) per
+customer, and metadata.customer_tier holds the column names and the months
+the monthly_revenue / monthly_plan arrays refer to. customer_entities()
+expands a feature's rows into entity dicts shaped like hierarchy nodes for the
+app's Feature -> Customer drill-down.
+
+USAGE:
+    tier = fetch_customer_tier(conn, dates, run_date, limit=10)
+    tier[('Analytics', 'BI', 'Dashboards')]     # [[customer, qtd_revenue, ...], ...]
+    customer_entities(data, feature_node)       # {customer: {'name', 'level', 'analysis'}}
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from .db import execute_query, safe_string
+from .config import PLAN_TABLE, RUN_DATE_COLUMN
+from .fiscal import FiscalDates
+from .actuals_slice import actuals_source
+
+
+NodePath = Tuple[str, ...]
+
+KPI_COLUMNS = [
+    "qtd_revenue", "qtd_plan", "delta_to_plan", "pct_vs_plan",
+    "yoy_growth_pct", "qoq_growth_pct", "prior_q_revenue", "prior_year_revenue",
+]
+CUSTOMER_COLUMNS = ["customer"] + KPI_COLUMNS + ["monthly_revenue", "monthly_plan"]
+
+_KEYS = ("product_category", "use_case", "feature")
+
+
+def tier_months(dates: FiscalDates) -> List[date]:
+    """First day of each calendar month from the quarter start to effective_end."""
+    months = []
+    month = dates.q_start.replace(day=1)
+    while month <= dates.effective_end:
+        months.append(month)
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return months
+
+
+def _top_customers_ctes(
+    source: str,
+    dates: FiscalDates,
+    run_date: date,
+    limit: int,
+    category: Optional[str] = None,
+) -> str:
+    """customer_periods / top_customers CTEs: CQ/PQ/PY revenue of each feature's top `limit` customers."""
+    category_filter = f"AND product_category = '{safe_string(category)}'" if category else ""
+    return f"""
+    customer_periods AS (
+        SELECT
+            product_category, use_case, feature,
+            latest_salesforce_account_name AS customer,
+            SUM(CASE WHEN ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+                THEN revenue + product_led_revenue END) AS cq_rev,
+            SUM(CASE WHEN ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
+                THEN revenue + product_led_revenue END) AS pq_rev,
+            SUM(CASE WHEN ds BETWEEN '{dates.py_start}' AND '{dates.py_end}'
+                THEN revenue + product_led_revenue END) AS py_rev
+        FROM {source}
+        WHERE {RUN_DATE_COLUMN} = '{run_date}'
+            AND (ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+                 OR ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
+                 OR ds BETWEEN '{dates.py_start}' AND '{dates.py_end}')
+            AND latest_salesforce_account_name IS NOT NULL
+            {category_filter}
+        GROUP BY 1, 2, 3, 4
+    ),
+    top_customers AS (
+        SELECT *
+        FROM (
+            SELECT
+                customer_periods.*,
+                ROW_NUMBER() OVER (
+                    PARTITION BY product_category, use_case, feature
+                    ORDER BY cq_rev DESC, customer
+                ) AS rnk
+            FROM customer_periods
+            WHERE cq_rev IS NOT NULL
+        ) ranked
+        WHERE rnk <= {int(limit)}
+    )"""
+
+
+def _join_top(alias: str, customer_column: str) -> str:
+    """JOIN top_customers t on the feature keys and customer of `alias`."""
+    keys = " AND ".join(f"t.{k} = {alias}.{k}" for k in _KEYS)
+    return f"JOIN top_customers t ON {keys} AND t.customer = {alias}.{customer_column}"
+
+
+def fetch_customer_tier(
+    conn,
+    dates: FiscalDates,
+    run_date: date,
+    limit: int,
+    category: Optional[str] = None,
+) -> Dict[NodePath, List[List[Any]]]:
+    """
+    Top `limit` customers of every feature (optionally within one category).
+
+    Returns {feature path: rows}, rows in CUSTOMER_COLUMNS order, highest QTD
+    revenue first. Features without customers are absent.
+    """
+    if limit <= 0:
+        return {}
+    source = actuals_source(conn)
+    ctes = _top_customers_ctes(source, dates, run_date, limit, category)
+
+    kpi_query = f"""
+    WITH {ctes},
+    customer_plan AS (
+        SELECT
+            p.product_category, p.use_case, p.feature,
+            p.salesforce_account_name AS customer,
+            SUM(p.revenue) AS plan_rev
+        FROM {PLAN_TABLE} p
+        {_join_top('p', 'salesforce_account_name')}
+        WHERE p.ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+        GROUP BY 1, 2, 3, 4
+    )
+    SELECT
+        t.product_category, t.use_case, t.feature, t.customer, t.rnk,
+        ROUND(t.cq_rev, 0) AS qtd_revenue,
+        ROUND(COALESCE(p.plan_rev, 0), 0) AS qtd_plan,
+        ROUND(t.cq_rev - COALESCE(p.plan_rev, 0), 0) AS delta_to_plan,
+        ROUND(100.0 * (t.cq_rev - COALESCE(p.plan_rev, 0)) / NULLIF(COALESCE(p.plan_rev, 0), 0), 2) AS pct_vs_plan,
+        ROUND(100.0 * (t.cq_rev - COALESCE(t.py_rev, 0)) / NULLIF(COALESCE(t.py_rev, 0), 0), 2) AS yoy_growth_pct,
+        ROUND(100.0 * (t.cq_rev - COALESCE(t.pq_rev, 0)) / NULLIF(COALESCE(t.pq_rev, 0), 0), 2) AS qoq_growth_pct,
+        ROUND(COALESCE(t.pq_rev, 0), 0) AS prior_q_revenue,
+        ROUND(COALESCE(t.py_rev, 0), 0) AS prior_year_revenue
+    FROM top_customers t
+    LEFT JOIN customer_plan p
+        ON p.product_category = t.product_category AND p.use_case = t.use_case
+        AND p.feature = t.feature AND p.customer = t.customer
+    ORDER BY t.product_category, t.use_case, t.feature, t.rnk
+    """
+
+    monthly_query = f"""
+    WITH {ctes},
+    actual_months AS (
+        SELECT
+            a.product_category, a.use_case, a.feature,
+            a.latest_salesforce_account_name AS customer,
+            DATE_TRUNC('month', a.ds) AS month,
+            SUM(a.revenue + a.product_led_revenue) AS revenue
+        FROM {source} a
+        {_join_top('a', 'latest_salesforce_account_name')}
+        WHERE a.{RUN_DATE_COLUMN} = '{run_date}'
+            AND a.ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+        GROUP BY 1, 2, 3, 4, 5
+    ),
+    plan_months AS (
+        SELECT
+            p.product_category, p.use_case, p.feature,
+            p.salesforce_account_name AS customer,
+            DATE_TRUNC('month', p.ds) AS month,
+            SUM(p.revenue) AS plan_revenue
+        FROM {PLAN_TABLE} p
+        {_join_top('p', 'salesforce_account_name')}
+        WHERE p.ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+        GROUP BY 1, 2, 3, 4, 5
+    )
+    SELECT
+        COALESCE(a.product_category, p.product_category) AS product_category,
+        COALESCE(a.use_case, p.use_case) AS use_case,
+        COALESCE(a.feature, p.feature) AS feature,
+        COALESCE(a.customer, p.customer) AS customer,
+        COALESCE(a.month, p.month) AS month,
+        ROUND(COALESCE(a.revenue, 0), 0) AS revenue,
+        ROUND(COALESCE(p.plan_revenue, 0), 0) AS plan_revenue
+    FROM actual_months a
+    FULL OUTER JOIN plan_months p
+        ON p.product_category = a.product_category AND p.use_case = a.use_case
+        AND p.feature = a.feature AND p.customer = a.customer AND p.month = a.month
+    """
+
+    kpis = execute_query(conn, kpi_query, "Customer tier KPIs")
+    monthly = execute_query(conn, monthly_query, "Customer tier monthly trends")
+
+    months = {str(m): i for i, m in enumerate(tier_months(dates))}
+    series: Dict[Tuple[NodePath, str], Tuple[List[float], List[float]]] = {}
+    for row in monthly:
+        i = months.get(str(_as_date(row['month'])))
+        if i is None:
+            continue
+        key = (tuple(row[k] for k in _KEYS), row['customer'])
+        revenue, plan = series.setdefault(key, ([0.0] * len(months), [0.0] * len(months)))
+        revenue[i] = float(row['revenue'])
+        plan[i] = float(row['plan_revenue'])
+
+    tier: Dict[NodePath, List[List[Any]]] = {}
+    for row in kpis:
+        path = tuple(row[k] for k in _KEYS)
+        revenue, plan = series.get((path, row['customer']), ([0.0] * len(months), [0.0] * len(months)))
+        tier.setdefault(path, []).append([row['customer']] + [row[k] for k in KPI_COLUMNS] + [revenue, plan])
+    return tier
+
+
+def _as_date(value) -> date:
+    """DATE_TRUNC may come back as a date or a timestamp."""
+    return value.date() if hasattr(value, 'date') else value
+
+
+def tier_metadata(dates: FiscalDates, limit: int) -> Dict[str, Any]:
+    """metadata.customer_tier: what the compact rows of every feature mean."""
+    return {
+        'limit': limit,
+        'columns': CUSTOMER_COLUMNS,
+        'months': [str(m) for m in tier_months(dates)],
+    }
+
+
+def customer_entities(data: Dict[str, Any], feature_node: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Expand a feature's compact customer rows into hierarchy-style entities.
+
+    Returns {customer: {'name', 'level': 'customer', 'analysis'}} in rank
+    order, where analysis holds summary_kpis and monthly_trends like a node's.
+    """
+    tier = data.get('metadata', {}).get('customer_tier')
+    if not tier:
+        return {}
+    columns, months = tier['columns'], tier['months']
+    entities = {}
+    for values in feature_node.get('customers', []):
+        row = dict(zip(columns, values))
+        entities[row['customer']] = {
+            'name': row['customer'],
+            'level': 'customer',
+            'analysis': {
+                'summary_kpis': {k: row[k] for k in KPI_COLUMNS},
+                'monthly_trends': [
+                    {'month': month, 'revenue': revenue, 'plan_revenue': plan}
+                    for month, revenue, plan in zip(months, row['monthly_revenue'], row['monthly_plan'])
+                ],
+            },
+        }
+    return entities
@@ -5,11 +5,19 @@ Handles all Snowflake connectivity and provides safe query execution
 with proper error handling and logging.
 """
 
+import contextvars
 import os
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import date
+import numpy as np
+import pyarrow as pa
 import snowflake.connector
 
+from .telemetry import timed_query
+
 
 def get_connection(connection_name: Optional[str] = None) -> snowflake.connector.SnowflakeConnection:
     """
@@ -28,18 +36,333 @@ def get_connection(connection_name: Optional[str] = None) -> snowflake.connector
     return conn
 
 
+class ConnectionPool:
+    """
+    Bounded pool of reusable Snowflake connections.
+    
+    Connections are created lazily (up to max_size) and handed back to the
+    pool after each use, so N workers share at most N connections and each
+    pays the connect + USE WAREHOUSE round trip once.
+    
+    Long-lived pools (the app's, a job worker's) can also set:
+        idle_timeout: idle connections unused for this many seconds are
+                      closed (Snowflake sessions time out on their own anyway)
+        health_check_after: a connection idle for this many seconds is
+                      checked with SELECT 1 before it is lent, and replaced
+                      if the check fails
+    
+    Usage:
+        pool = ConnectionPool(max_size=4)
+        with pool.connection() as conn:
+            execute_query(conn, "SELECT 1")
+        conn = pool.connect()       # for code that calls conn.close() itself:
+        conn.close()                # returns it to the pool
+        pool.close_all()
+    """
+    
+    def __init__(
+        self,
+        max_size: int = 4,
+        factory: Optional[Callable[[], Any]] = None,
+        connections: Optional[List[Any]] = None,
+        idle_timeout: Optional[float] = None,
+        health_check_after: Optional[float] = None,
+    ):
+        """
+        Args:
+            max_size: Maximum number of open connections
+            factory: Zero-arg callable returning a new connection (default get_connection)
+            connections: Already-open connections to seed the pool with
+            idle_timeout: Seconds after which an idle connection is closed (None: never)
+            health_check_after: Idle seconds after which a connection is pinged before use (None: never)
+        """
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self._factory = factory or get_connection
+        self._idle: List[Tuple[Any, float]] = []       # (connection, returned at); last is newest
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._lock = threading.Lock()
+        self._open: List[Any] = []
+        self._stats = {'created': 0, 'reused': 0, 'replaced': 0, 'expired': 0}
+        for conn in (connections or [])[:self.max_size]:
+            self._open.append(conn)
+            self._idle.append((conn, time.monotonic()))
+    
+    @property
+    def size(self) -> int:
+        """Number of connections currently open."""
+        return len(self._open)
+    
+    def _discard(self, conn: Any, reason: Optional[str] = None) -> None:
+        with self._lock:
+            if conn in self._open:
+                self._open.remove(conn)
+            if reason:
+                self._stats[reason] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    def _expire_idle(self) -> None:
+        """Close connections idle longer than idle_timeout (oldest are first in the list)."""
+        if self.idle_timeout is None:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [conn for conn, returned in self._idle if returned < cutoff]
+            self._idle = [(conn, returned) for conn, returned in self._idle if returned >= cutoff]
+        for conn in expired:
+            self._discard(conn, 'expired')
+    
+    def _healthy(self, conn: Any, idle_seconds: float) -> bool:
+        if _is_closed(conn):
+            return False
+        if self.health_check_after is None or idle_seconds < self.health_check_after:
+            return True
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+    
+    def acquire(self) -> Any:
+        """Borrow a connection, blocking while all max_size are in use; give it back with release()."""
+        self._slots.acquire()
+        try:
+            self._expire_idle()
+            while True:
+                with self._lock:
+                    conn, returned = self._idle.pop() if self._idle else (None, None)
+                if conn is None:
+                    break
+                if self._healthy(conn, time.monotonic() - returned):
+                    with self._lock:
+                        self._stats['reused'] += 1
+                    return conn
+                self._discard(conn, 'replaced')
+            conn = self._factory()
+            with self._lock:
+                self._open.append(conn)
+                self._stats['created'] += 1
+            return conn
+        except BaseException:
+            self._slots.release()
+            raise
+    
+    def release(self, conn: Any) -> None:
+        """Return a connection from acquire() (one that was closed meanwhile is dropped)."""
+        try:
+            if _is_closed(conn):
+                with self._lock:
+                    if conn in self._open:
+                        self._open.remove(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+        self._expire_idle()
+    
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a connection, blocking while all max_size are in use."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+    
+    def connect(self) -> "PooledConnection":
+        """A borrowed connection whose close() returns it to the pool (a drop-in for get_connection())."""
+        return PooledConnection(self, self.acquire())
+    
+    def stats(self) -> Dict[str, int]:
+        """Connections created, reused, replaced after a failed health check, expired; open and idle now."""
+        with self._lock:
+            return dict(self._stats, open=len(self._open), idle=len(self._idle))
+    
+    def close_all(self) -> None:
+        """Close every pooled connection."""
+        with self._lock:
+            conns, self._open = self._open, []
+            self._idle = []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class PooledConnection:
+    """
+    A connection lent by ConnectionPool.connect(): behaves like the
+    connection, except close() hands it back to the pool instead.
+    """
+    
+    def __init__(self, pool: ConnectionPool, conn: Any):
+        self._pool = pool
+        self._conn = conn
+        self._released = False
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+    
+    def is_closed(self) -> bool:
+        return self._released or _is_closed(self._conn)
+    
+    def close(self) -> None:
+        if not self._released:
+            self._released = True
+            self._pool.release(self._conn)
+
+
+def _is_closed(conn) -> bool:
+    """True if the connection reports itself closed."""
+    is_closed = getattr(conn, "is_closed", None)
+    return bool(is_closed()) if callable(is_closed) else False
+
+
+# =============================================================================
+# RESULT CACHE (opt-in)
+# =============================================================================
+
+_result_cache = None
+
+
+def enable_result_cache(
+    directory: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    newest_run_date: Optional[date] = None,
+    ttl_seconds: Optional[float] = None,
+):
+    """
+    Turn on the on-disk result cache for every execute_query call.
+    
+    Args:
+        directory: Cache location (default RESULT_CACHE_DIR)
+        max_bytes: Size cap before LRU eviction (default RESULT_CACHE_MAX_BYTES)
+        newest_run_date: Newest snapshot (e.g. the run_date catalog's); queries
+                         of older snapshots are cached for good
+        ttl_seconds: How long other results are reused (default RESULT_CACHE_TTL_SECONDS)
+    
+    Returns:
+        The active ResultCache, for its hit/miss counters.
+    """
+    global _result_cache
+    from .config import RESULT_CACHE_DIR, RESULT_CACHE_MAX_BYTES, RESULT_CACHE_TTL_SECONDS
+    from .result_cache import ResultCache
+    
+    _result_cache = ResultCache(
+        directory or RESULT_CACHE_DIR,
+        RESULT_CACHE_MAX_BYTES if max_bytes is None else max_bytes,
+        RESULT_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds,
+        newest_run_date,
+    )
+    return _result_cache
+
+
+def disable_result_cache() -> None:
+    """Turn the result cache off (cached files are kept)."""
+    global _result_cache
+    _result_cache = None
+
+
+def get_result_cache():
+    """The active ResultCache, or None if caching is off."""
+    return _result_cache
+
+
+# =============================================================================
+# ASYNC SUBMISSION (opt-in)
+# =============================================================================
+
+class AsyncSubmitter:
+    """
+    Runs the queries of many threads on one connection with execute_async.
+    
+    Each query is submitted without waiting for the previous one, its status
+    is polled (with backoff) until it finishes, and its result is fetched by
+    query id. At most max_in_flight queries are outstanding at once, so the
+    warehouse runs them in parallel without a connection per query.
+    
+    Thread-safe: every query uses its own cursor; the semaphore is the only
+    shared state.
+    """
+    
+    def __init__(self, conn, max_in_flight: int):
+        from .config import ASYNC_POLL_SECONDS, ASYNC_POLL_MAX_SECONDS
+        self.conn = conn
+        self.max_in_flight = max(1, max_in_flight)
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._poll = ASYNC_POLL_SECONDS
+        self._max_poll = ASYNC_POLL_MAX_SECONDS
+    
+    def execute(self, cursor, query: str) -> None:
+        """Submit, wait for completion, and leave the result ready to fetch on `cursor`."""
+        with self._slots:
+            cursor.execute_async(query)
+            query_id = cursor.sfqid
+            delay = self._poll
+            # Raises ProgrammingError if the query failed
+            while self.conn.is_still_running(self.conn.get_query_status_throw_if_error(query_id)):
+                time.sleep(delay)
+                delay = min(delay * 2, self._max_poll)
+            cursor.get_results_from_sfqid(query_id)
+
+
+_async_submitter: contextvars.ContextVar = contextvars.ContextVar("async_submitter", default=None)
+
+
+@contextmanager
+def async_submission(conn, max_in_flight: int) -> Iterator[AsyncSubmitter]:
+    """
+    Run execute_query/execute_query_columnar calls on `conn` inside the block
+    with execute_async. Queries only overlap when the block fans them out over
+    threads (each started with contextvars.copy_context()); other connections
+    are unaffected.
+    """
+    submitter = AsyncSubmitter(conn, max_in_flight)
+    token = _async_submitter.set(submitter)
+    try:
+        yield submitter
+    finally:
+        _async_submitter.reset(token)
+
+
+def _execute(conn, cursor, query: str) -> None:
+    """cursor.execute(query), or through the active async submitter for this connection."""
+    submitter = _async_submitter.get()
+    if submitter is not None and submitter.conn is conn:
+        submitter.execute(cursor, query)
+    else:
+        cursor.execute(query)
+
+
 def execute_query(
     conn: snowflake.connector.SnowflakeConnection,
     query: str,
     description: str = "",
+    cache: bool = True,
 ) -> List[Dict[str, Any]]:
     """
     Execute a SQL query and return results as list of dictionaries.
     
+    When the result cache is enabled, identical queries against the same
+    account/user/role are answered from disk instead of the warehouse. When
+    a trace is active (telemetry.start_trace), the query is recorded in it.
+    Inside async_submission(conn, ...) the query runs with execute_async.
+    
     Args:
         conn: Active Snowflake connection
         query: SQL query string
-        description: Human-readable description for logging/debugging
+        description: Human-readable description, recorded in the query trace
+        cache: False for queries whose answer can change between runs
     
     Returns:
         List of dicts, one per row, with lowercase column names as keys.
@@ -47,14 +370,167 @@ def execute_query(
     Raises:
         snowflake.connector.errors.ProgrammingError: On SQL errors
     """
-    cursor = conn.cursor()
+    with timed_query(description) as timer:
+        result_cache = _result_cache if cache else None
+        key = result_cache.key(conn, query) if result_cache else None
+        if key:
+            cached = result_cache.get(key)
+            if cached is not None:
+                timer.rows, timer.cached = cached.num_rows, True
+                return cached.to_pylist()
+        
+        cursor = conn.cursor()
+        try:
+            _execute(conn, cursor, query)
+            timer.query_id = getattr(cursor, "sfqid", None)
+            columns = [col[0].lower() for col in cursor.description]
+            rows = cursor.fetchall()
+            timer.rows = len(rows)
+        finally:
+            cursor.close()
+        
+        if key:
+            table = _rows_to_table(columns, rows)
+            if table is not None:
+                result_cache.put(key, table)
+    return [dict(zip(columns, row)) for row in rows]
+
+
+# =============================================================================
+# COLUMNAR RESULTS
+# =============================================================================
+
+class ColumnarResult:
+    """
+    Column-oriented query result backed by a pyarrow Table.
+    
+    Post-processing works on whole columns (column / to_numpy / set_column)
+    instead of one dict per row; to_json_safe turns it into the legacy
+    list-of-dicts when the report is written.
+    
+    Columns listed in `sparse` are left out of a row's dict when NULL, for
+    fields the row-based code only set on some rows (e.g. vs_plan).
+    """
+    
+    def __init__(self, table: pa.Table, sparse: Iterable[str] = ()):
+        self.table = table
+        self.sparse = set(sparse)
+    
+    def __len__(self) -> int:
+        return self.table.num_rows
+    
+    @property
+    def columns(self) -> List[str]:
+        return self.table.column_names
+    
+    def column(self, name: str) -> pa.ChunkedArray:
+        """One column as an Arrow array."""
+        return self.table.column(name)
+    
+    def to_numpy(self, name: str) -> np.ndarray:
+        """One column as a NumPy array (NULLs become NaN/None)."""
+        return self.table.column(name).to_numpy()
+    
+    def set_column(self, name: str, values: Any, sparse: bool = False) -> None:
+        """Add or replace a column; sparse=True omits it from rows where it is NULL."""
+        values = values if isinstance(values, (pa.Array, pa.ChunkedArray)) else pa.array(values)
+        if name in self.table.column_names:
+            self.table = self.table.set_column(self.table.column_names.index(name), name, values)
+        else:
+            self.table = self.table.append_column(name, values)
+        if sparse:
+            self.sparse.add(name)
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Legacy list-of-dicts form, one dict per row."""
+        rows = self.table.to_pylist()
+        if self.sparse:
+            for row in rows:
+                for name in self.sparse:
+                    if row.get(name) is None:
+                        row.pop(name, None)
+        return rows
+    
+    def to_pandas(self):
+        return self.table.to_pandas()
+
+
+def _rows_to_table(columns: List[str], rows: List[tuple]) -> Optional[pa.Table]:
+    """Build an Arrow table from fetchall() rows, or None if a column has mixed types."""
     try:
-        cursor.execute(query)
-        columns = [col[0].lower() for col in cursor.description]
-        rows = cursor.fetchall()
-        return [dict(zip(columns, row)) for row in rows]
-    finally:
-        cursor.close()
+        return pa.Table.from_pydict({col: [row[i] for row in rows] for i, col in enumerate(columns)})
+    except (pa.ArrowException, TypeError, ValueError):
+        return None
+
+
+def _fetch_table(cursor) -> pa.Table:
+    """
+    Fetch an executed cursor's result as an Arrow table.
+    
+    Uses the connector's Arrow batches when the result is in Arrow format and
+    falls back to fetchall() otherwise (JSON result format, non-Snowflake cursors).
+    """
+    columns = [col[0].lower() for col in cursor.description]
+    fetch_batches = getattr(cursor, "fetch_arrow_batches", None)
+    if fetch_batches is not None:
+        try:
+            batches = list(fetch_batches())
+        except snowflake.connector.errors.NotSupportedError:
+            batches = None
+        if batches is not None:
+            if not batches:
+                return pa.table({col: pa.array([], pa.null()) for col in columns})
+            return pa.concat_tables(batches).rename_columns(columns)
+    
+    table = _rows_to_table(columns, cursor.fetchall())
+    if table is None:
+        raise ValueError("Query result has mixed-type columns; use execute_query instead")
+    return table
+
+
+def execute_query_columnar(
+    conn: snowflake.connector.SnowflakeConnection,
+    query: str,
+    description: str = "",
+    cache: bool = True,
+) -> ColumnarResult:
+    """
+    Execute a SQL query and return a column-oriented result.
+    
+    Same contract as execute_query (lowercase column names, result cache),
+    without materializing a dict per row. Use it for large results and for
+    analyses that post-process whole columns.
+    
+    Args:
+        conn: Active Snowflake connection
+        query: SQL query string
+        description: Human-readable description, recorded in the query trace
+        cache: False for queries whose answer can change between runs
+    
+    Returns:
+        ColumnarResult over the fetched Arrow table.
+    """
+    with timed_query(description) as timer:
+        result_cache = _result_cache if cache else None
+        key = result_cache.key(conn, query) if result_cache else None
+        if key:
+            cached = result_cache.get(key)
+            if cached is not None:
+                timer.rows, timer.cached = cached.num_rows, True
+                return ColumnarResult(cached)
+        
+        cursor = conn.cursor()
+        try:
+            _execute(conn, cursor, query)
+            timer.query_id = getattr(cursor, "sfqid", None)
+            table = _fetch_table(cursor)
+            timer.rows = table.num_rows
+        finally:
+            cursor.close()
+        
+        if key:
+            result_cache.put(key, table)
+    return ColumnarResult(table)
 
 
 def safe_string(value: Any) -> str:
@@ -84,6 +560,7 @@ def to_json_safe(obj: Any) -> Any:
     - datetime/date objects → ISO format strings
     - Decimal → float
     - Nested dicts and lists
+    - ColumnarResult → list of dicts
     
     Args:
         obj: Any Python object
@@ -91,7 +568,9 @@ def to_json_safe(obj: Any) -> Any:
     Returns:
         JSON-serializable version of the object
     """
-    if isinstance(obj, dict):
+    if isinstance(obj, ColumnarResult):
+        return to_json_safe(obj.to_dicts())
+    elif isinstance(obj, dict):
         return {k: to_json_safe(v) for k, v in obj.items()}
     elif isinstance(obj, list):
         return [to_json_safe(v) for v in obj]
@@ -112,6 +591,9 @@ def get_available_run_dates(conn) -> List[date]:
     """
     Get all available snapshot run dates from the actuals table.
     
+    Scans every snapshot; the app reads the incremental catalog in
+    run_dates.py instead, which also has row counts and day ranges.
+    
     Returns:
         List of dates, most recent first.
     """
@@ -123,5 +605,6 @@ def get_available_run_dates(conn) -> List[date]:
     ORDER BY run_date DESC
     """
     
-    results = execute_query(conn, query, "Get available run dates")
+    # Never cached: a new snapshot adds a run_date
+    results = execute_query(conn, query, "Get available run dates", cache=False)
     return [row['run_date'] for row in results]
@@ -6,10 +6,11 @@ date ranges for current quarter, prior quarter, and prior year comparisons.
 """
 
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, timedelta
 from typing import Optional
 
-from .db import execute_query
+from . import fiscal_calendar
+from .fiscal_calendar import load_calendar
 from .config import CALENDAR_TABLE
 
 
@@ -47,6 +48,9 @@ def get_fiscal_dates(conn, fiscal_quarter: str) -> Optional[FiscalDates]:
     """
     Calculate all date ranges for a fiscal quarter.
     
+    Boundaries come from the cached fiscal calendar (fiscal_calendar.py), so
+    after the first load this runs no query.
+    
     Args:
         conn: Snowflake connection
         fiscal_quarter: Quarter identifier (e.g., 'FY2026-Q4')
@@ -61,59 +65,20 @@ def get_fiscal_dates(conn, fiscal_quarter: str) -> Optional[FiscalDates]:
         Prior Q:   2025-08-01 to 2025-10-31
         Prior Y:   2024-11-01 to 2025-01-31
     """
-    query = f"""
-    WITH current_q AS (
-        SELECT 
-            MIN(_date) AS q_start, 
-            MAX(_date) AS q_end
-        FROM {CALENDAR_TABLE}
-        WHERE fiscal_quarter_fyyyyy_qq = '{fiscal_quarter}'
-    ),
-    prior_q AS (
-        SELECT 
-            MIN(_date) AS pq_start, 
-            MAX(_date) AS pq_end
-        FROM {CALENDAR_TABLE}
-        WHERE fiscal_quarter_fyyyyy_qq = (
-            SELECT DISTINCT fiscal_quarter_fyyyyy_qq
-            FROM {CALENDAR_TABLE}
-            WHERE _date = DATEADD('month', -3, (SELECT q_start FROM current_q))
-        )
-    ),
-    prior_year AS (
-        SELECT 
-            DATEADD('year', -1, (SELECT q_start FROM current_q)) AS py_start,
-            DATEADD('year', -1, (SELECT q_end FROM current_q)) AS py_end
-    )
-    SELECT 
-        cq.q_start, 
-        cq.q_end,
-        pq.pq_start, 
-        pq.pq_end,
-        py.py_start, 
-        py.py_end,
-        CASE 
-            WHEN cq.q_end >= CURRENT_DATE() 
-            THEN CURRENT_DATE() - 2 
-            ELSE cq.q_end 
-        END AS effective_end
-    FROM current_q cq
-    CROSS JOIN prior_q pq
-    CROSS JOIN prior_year py
-    """
-    
-    results = execute_query(conn, query, f"Get fiscal dates for {fiscal_quarter}")
-    
-    if not results:
+    calendar = load_calendar(conn, CALENDAR_TABLE)
+    quarter = calendar.quarter(fiscal_quarter)
+    if quarter is None:
         return None
     
-    row = results[0]
+    prior = calendar.prior_quarter(quarter)
+    py_start, py_end = calendar.prior_year(quarter)
+    current_date = fiscal_calendar.today()
     return FiscalDates(
-        q_start=row['q_start'],
-        q_end=row['q_end'],
-        effective_end=row['effective_end'],
-        pq_start=row['pq_start'],
-        pq_end=row['pq_end'],
-        py_start=row['py_start'],
-        py_end=row['py_end'],
+        q_start=quarter.start,
+        q_end=quarter.end,
+        effective_end=current_date - timedelta(days=2) if quarter.end >= current_date else quarter.end,
+        pq_start=prior.start if prior else None,
+        pq_end=prior.end if prior else None,
+        py_start=py_start,
+        py_end=py_end,
     )
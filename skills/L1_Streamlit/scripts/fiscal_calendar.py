@@ -0,0 +1,283 @@
+"""
+fiscal_calendar.py - In-Memory Fiscal Calendar Index
+
+Every collector used to ask the warehouse for fiscal boundaries: L1's
+get_fiscal_dates ran a three-CTE query per collection, and the weekly and DCR
+analyses each carried a fiscal_context CTE over the calendar table. The
+calendar changes once a year, so load_calendar() reads it once as one row per
+fiscal quarter, keeps it in memory as a sorted interval index and caches it
+on disk for CACHE_TTL_SECONDS. Quarter, prior-quarter, prior-year,
+fiscal-year and week boundaries are then answered in Python, and callers
+inline the dates into their SQL as literals (sql_date()).
+
+today() stands in for CURRENT_DATE(): the warehouse session's UTC offset is
+read with the calendar (SELECT CURRENT_TIMESTAMP()) and cached with it, so a
+host in another timezone than the session, or a run near midnight, gets the
+date the warehouse would. The offset is as of the load, so for up to
+CACHE_TTL_SECONDS after a DST change today() can lag an hour.
+
+Vendored: install.sh copies each skill directory on its own, so a skill can
+only import from itself. L1_Streamlit/scripts/fiscal_calendar.py is the canonical copy;
+change it there and copy it over the weekly-metrics-report and
+dcr-weekly-report ones. L1_Streamlit/tests/test_vendored.py fails when the
+copies differ.
+
+USAGE:
+    calendar = load_calendar(conn)
+    q = calendar.quarter('FY2026-Q4')           # FiscalQuarter(start=2025-11-01, ...)
+    calendar.quarter_of(date(2026, 1, 10))      # the quarter containing a day
+    calendar.prior_quarter(q), calendar.prior_year(q)
+    f"WHERE ds >= {sql_date(q.start)}"          # WHERE ds >= '2025-11-01'
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .telemetry import timed_query
+except ImportError:  # run as a script: python scripts/<name>.py
+    from telemetry import timed_query
+
+
+CALENDAR_TABLE = "finance.stg_utils.stg_fiscal_calendar"
+
+# Set CACHE_DIR to None to keep the calendar in memory only
+CACHE_DIR = os.path.expanduser("~/.cache/fiscal_calendar")
+CACHE_TTL_SECONDS = 24 * 3600
+
+_CACHE_VERSION = 2
+
+# UTC offset of the warehouse session's clock, from the last calendar loaded (None: the host's clock)
+_session_utc_offset: Optional[timedelta] = None
+
+
+def today() -> date:
+    """The date CURRENT_DATE() would return in the warehouse session (replaceable for repeatable runs)."""
+    if _session_utc_offset is None:
+        return date.today()
+    return datetime.now(timezone(_session_utc_offset)).date()
+
+
+def sql_date(day: Optional[date]) -> str:
+    """A date as a SQL literal; NULL (matching nothing) when the calendar has no answer."""
+    return f"'{day}'" if day is not None else "NULL"
+
+
+def _add_years(day: date, years: int) -> date:
+    """DATEADD('year', n, day): Feb 29 becomes Feb 28 in a non-leap year."""
+    try:
+        return day.replace(year=day.year + years)
+    except ValueError:
+        return day.replace(year=day.year + years, day=28)
+
+
+@dataclass(frozen=True)
+class FiscalQuarter:
+    """One fiscal quarter and the fiscal year it belongs to."""
+    name: str           # fiscal_quarter_fyyyyy_qq, e.g. 'FY2026-Q4'
+    label: str          # fiscal_quarter_qq_fyyyyy, e.g. 'Q4-FY2026'
+    start: date
+    end: date
+    fiscal_year: str    # fiscal_year_fyyyyy, e.g. 'FY2026'
+    year_start: date
+    year_end: date
+
+
+class FiscalCalendar:
+    """
+    Fiscal quarters sorted by start date, looked up by name or by day.
+
+    Read-only once built, so threads and Streamlit sessions share it freely.
+    """
+
+    def __init__(self, quarters: List[FiscalQuarter], utc_offset: Optional[timedelta] = None):
+        self.quarters = sorted(quarters, key=lambda q: q.start)
+        # The warehouse session's UTC offset when the calendar was read
+        self.utc_offset = utc_offset
+        self._starts = [q.start for q in self.quarters]
+        self._by_name = {q.name: q for q in self.quarters}
+
+    def __len__(self) -> int:
+        return len(self.quarters)
+
+    def quarter(self, name: str) -> Optional[FiscalQuarter]:
+        """A quarter by its 'FY2026-Q4' name."""
+        return self._by_name.get(name)
+
+    def quarter_of(self, day) -> Optional[FiscalQuarter]:
+        """The quarter containing a day (a date or 'YYYY-MM-DD')."""
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        i = bisect.bisect_right(self._starts, day) - 1
+        if i >= 0 and day <= self.quarters[i].end:
+            return self.quarters[i]
+        return None
+
+    def prior_quarter(self, quarter: FiscalQuarter) -> Optional[FiscalQuarter]:
+        """The quarter before (the one containing the day before its start)."""
+        return self.quarter_of(quarter.start - timedelta(days=1))
+
+    def prior_year(self, quarter: FiscalQuarter) -> Tuple[date, date]:
+        """The same dates a year earlier (DATEADD('year', -1, ...) of start and end)."""
+        return _add_years(quarter.start, -1), _add_years(quarter.end, -1)
+
+    def fiscal_year_of(self, day) -> Optional[Tuple[str, date, date]]:
+        """(name, start, end) of the fiscal year containing a day."""
+        quarter = self.quarter_of(day)
+        if quarter is None:
+            return None
+        return quarter.fiscal_year, quarter.year_start, quarter.year_end
+
+    @staticmethod
+    def week(week_end: date, weeks_back: int = 0) -> Tuple[date, date]:
+        """(start, end) of the 7-day week ending on week_end, or the one weeks_back before it."""
+        end = week_end - timedelta(days=7 * weeks_back)
+        return end - timedelta(days=6), end
+
+    def to_json(self) -> Dict:
+        return {
+            'version': _CACHE_VERSION,
+            'quarters': [{k: str(v) for k, v in asdict(q).items()} for q in self.quarters],
+            'utc_offset_seconds': self.utc_offset.total_seconds() if self.utc_offset is not None else None,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> 'FiscalCalendar':
+        quarters = []
+        for q in data['quarters']:
+            quarters.append(FiscalQuarter(
+                name=q['name'], label=q['label'], fiscal_year=q['fiscal_year'],
+                **{k: date.fromisoformat(q[k]) for k in ('start', 'end', 'year_start', 'year_end')},
+            ))
+        offset = data.get('utc_offset_seconds')
+        return cls(quarters, timedelta(seconds=offset) if offset is not None else None)
+
+
+def fetch_calendar(conn, table: str = CALENDAR_TABLE) -> FiscalCalendar:
+    """Read the calendar table as one row per fiscal quarter."""
+    query = f"""
+    SELECT
+        fiscal_quarter_fyyyyy_qq AS name,
+        fiscal_quarter_qq_fyyyyy AS label,
+        fiscal_year_fyyyyy AS fiscal_year,
+        MIN(_date) AS q_start,
+        MAX(_date) AS q_end,
+        MIN(fiscal_year_start) AS year_start,
+        MAX(fiscal_year_end) AS year_end
+    FROM {table}
+    WHERE fiscal_quarter_fyyyyy_qq IS NOT NULL
+    GROUP BY 1, 2, 3
+    ORDER BY q_start
+    """
+    with timed_query("Fiscal calendar") as timer:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query)
+            timer.query_id = getattr(cursor, "sfqid", None)
+            rows = cursor.fetchall()
+            timer.rows = len(rows)
+        finally:
+            cursor.close()
+    return FiscalCalendar([
+        FiscalQuarter(name, label, _as_date(start), _as_date(end), year, _as_date(year_start), _as_date(year_end))
+        for name, label, year, start, end, year_start, year_end in rows
+    ], fetch_utc_offset(conn))
+
+
+def fetch_utc_offset(conn) -> Optional[timedelta]:
+    """The session's UTC offset (CURRENT_DATE() follows the session timezone), or None if unreadable."""
+    try:
+        with timed_query("Session clock") as timer:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT CURRENT_TIMESTAMP() AS now")
+                timer.query_id = getattr(cursor, "sfqid", None)
+                now = cursor.fetchone()[0]
+                timer.rows = 1
+            finally:
+                cursor.close()
+    except Exception as e:
+        print(f"WARNING: Could not read the warehouse clock, using the local date: {e}")
+        return None
+    if now.tzinfo is not None:
+        return now.utcoffset()
+    # A naive timestamp is the session's wall clock: its distance from UTC, to the quarter hour
+    seconds = (now - datetime.now(timezone.utc).replace(tzinfo=None)).total_seconds()
+    return timedelta(minutes=15 * round(seconds / 900))
+
+
+def _as_date(value) -> date:
+    """Calendar columns may come back as dates or timestamps."""
+    return value.date() if hasattr(value, 'date') else value
+
+
+# In-process copies, keyed like the disk cache
+_loaded: Dict[str, Tuple[float, FiscalCalendar]] = {}
+_lock = threading.Lock()
+
+
+def _cache_key(conn, table: str) -> str:
+    account = getattr(conn, 'account', None) or os.getenv("SNOWFLAKE_CONNECTION_NAME") or "snowhouse"
+    return hashlib.sha256(f"{account}|{table}".encode()).hexdigest()[:16]
+
+
+def _read_cache(path: str, ttl: float) -> Optional[Tuple[float, FiscalCalendar]]:
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != _CACHE_VERSION or time.time() - data['loaded_at'] > ttl:
+            return None
+        return data['loaded_at'], FiscalCalendar.from_json(data)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"WARNING: Ignoring unreadable fiscal calendar cache {path}: {e}")
+        return None
+
+
+def _write_cache(path: str, loaded_at: float, calendar: FiscalCalendar) -> None:
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump({**calendar.to_json(), 'loaded_at': loaded_at}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"WARNING: Could not cache the fiscal calendar: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_calendar(conn, table: str = CALENDAR_TABLE, ttl: Optional[float] = None) -> FiscalCalendar:
+    """
+    The fiscal calendar, from memory, the disk cache or the warehouse (in that order).
+
+    Args:
+        conn: Snowflake connection (only used when neither cache is fresh)
+        table: Calendar table to read
+        ttl: Seconds a loaded calendar stays fresh (default CACHE_TTL_SECONDS)
+    """
+    global _session_utc_offset
+    ttl = CACHE_TTL_SECONDS if ttl is None else ttl
+    key = _cache_key(conn, table)
+    path = os.path.join(CACHE_DIR, f"{key}.json") if CACHE_DIR else None
+    with _lock:
+        entry = _loaded.get(key)
+        if entry is None or time.time() - entry[0] > ttl:
+            entry = _read_cache(path, ttl) if path else None
+            if entry is None:
+                entry = time.time(), fetch_calendar(conn, table)
+                if path and len(entry[1]):
+                    _write_cache(path, *entry)
+            _loaded[key] = entry
+        if entry[1].utc_offset is not None:
+            _session_utc_offset = entry[1].utc_offset
+        return entry[1]
@@ -0,0 +1,169 @@
+"""
+hierarchy.py - One-Query Hierarchy Discovery
+
+The traversal used to list each node's children with its own SELECT DISTINCT
+(one for the categories, one per category, one per use case) before any
+analysis ran. fetch_hierarchy() reads the whole Total -> category -> use case
+-> feature tree of a run_date and quarter in one GROUPING SETS query, together
+with each node's quarter-to-date revenue and customer count, and
+HierarchyIndex answers children and size lookups from memory.
+
+The collector (sql and batch engines) lists children from the index, and the
+Streamlit app uses the same index to show node sizes before collecting. For
+a snapshot that is already cached, HierarchyIndex.from_collection() builds
+the index from the collection (or its shard manifest) without a query.
+
+USAGE:
+    index = fetch_hierarchy(conn, dates, run_date)
+    index.children(())                      # categories, in ORDER BY order
+    index.children(('Analytics',))          # use cases of Analytics
+    index.size(('Analytics', 'BI'))         # NodeSize(revenue=..., customers=...)
+    index.level_nodes('feature')            # every feature path
+    HierarchyIndex.from_collection(data, run_date, dates)   # no query; revenue sizes only
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from .db import execute_query
+from .config import RUN_DATE_COLUMN
+from .fiscal import FiscalDates
+from .incremental import DEPTH_BY_GROUPING
+from .actuals_slice import actuals_source
+
+
+# A node is addressed by its path of names below Total, e.g. ('Analytics', 'BI')
+NodePath = Tuple[str, ...]
+
+LEVEL_DEPTHS = {'total': 0, 'category': 1, 'use_case': 2, 'feature': 3}
+
+
+@dataclass
+class NodeSize:
+    """Quarter-to-date size of a node (None when fetched without sizes)."""
+    revenue: Optional[float] = None
+    customers: Optional[int] = None
+
+
+class HierarchyIndex:
+    """
+    The node tree of one run_date and quarter.
+
+    Read-only once built, so the traversal's worker threads share it freely.
+    """
+
+    def __init__(self, run_date: date, dates: FiscalDates):
+        self.run_date = run_date
+        self.dates = dates
+        self._children: Dict[NodePath, List[str]] = {(): []}
+        self._sizes: Dict[NodePath, NodeSize] = {}
+
+    @classmethod
+    def from_collection(cls, data: Dict[str, Any], run_date: date, dates: FiscalDates) -> "HierarchyIndex":
+        """
+        The tree of a collected v6 collection (a shard manifest is enough).
+        Sizes hold QTD revenue from summary_kpis where it was collected;
+        customer counts are not part of a collection and stay None.
+        """
+        def size(node: Dict[str, Any]) -> NodeSize:
+            revenue = (node.get('analysis', {}).get('summary_kpis') or {}).get('qtd_revenue')
+            return NodeSize(float(revenue) if revenue is not None else None)
+
+        index = cls(run_date, dates)
+        index.add((), size(data.get('total', {})))
+
+        def walk(children: Dict[str, Any], prefix: NodePath) -> None:
+            for name, node in children.items():
+                index.add(prefix + (name,), size(node))
+                walk(node.get('children', {}), prefix + (name,))
+
+        walk(data.get('hierarchy', {}), ())
+        return index
+
+    def add(self, path: NodePath, size: Optional[NodeSize] = None) -> None:
+        """Add a node below its (already added) parent; nodes must arrive in sibling order."""
+        self._sizes[path] = size or NodeSize()
+        if path:
+            self._children.setdefault(path, [])
+            self._children[path[:-1]].append(path[-1])
+
+    def matches(self, run_date: date, dates: FiscalDates) -> bool:
+        """Whether the index was built for this snapshot and quarter window."""
+        return str(self.run_date) == str(run_date) and self.dates == dates
+
+    def __contains__(self, path: NodePath) -> bool:
+        return path in self._sizes
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def children(self, path: NodePath = ()) -> List[str]:
+        """Child names of a node in discovery order ([] for features and unknown nodes)."""
+        return list(self._children.get(path, []))
+
+    def size(self, path: NodePath = ()) -> NodeSize:
+        return self._sizes.get(path, NodeSize())
+
+    def level_nodes(self, level: str, category: Optional[str] = None) -> List[NodePath]:
+        """Every node of a level (optionally within one category), in discovery order."""
+        depth = LEVEL_DEPTHS[level]
+        paths: List[NodePath] = [()]
+        for _ in range(depth):
+            paths = [path + (child,) for path in paths for child in self.children(path)]
+            if category is not None:
+                paths = [path for path in paths if path[0] == category]
+        return paths
+
+    def counts(self) -> Dict[str, int]:
+        """Number of nodes per level below Total."""
+        return {level: len(self.level_nodes(level)) for level in ('category', 'use_case', 'feature')}
+
+
+def fetch_hierarchy(conn, dates: FiscalDates, run_date: date, sizes: bool = True) -> HierarchyIndex:
+    """
+    Discover every node with actuals in the quarter in one query.
+
+    Siblings come out ordered by name, as the cube engine lists them. With
+    sizes=False only the tree is read, which skips the per-node
+    COUNT(DISTINCT customer).
+    """
+    measures = """,
+        SUM(revenue + product_led_revenue) AS revenue,
+        COUNT(DISTINCT latest_salesforce_account_name) AS customers""" if sizes else ""
+    query = f"""
+    SELECT
+        GROUPING(product_category, use_case, feature) AS grouping_id,
+        product_category, use_case, feature{measures}
+    FROM {actuals_source(conn)}
+    WHERE {RUN_DATE_COLUMN} = '{run_date}'
+        AND ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+    GROUP BY GROUPING SETS (
+        (),
+        (product_category),
+        (product_category, use_case),
+        (product_category, use_case, feature)
+    )
+    ORDER BY product_category, use_case, feature
+    """
+    results = execute_query(conn, query, "Hierarchy discovery")
+
+    index = HierarchyIndex(run_date, dates)
+    by_depth: Dict[int, List[Tuple[NodePath, NodeSize]]] = {0: [], 1: [], 2: [], 3: []}
+    for row in results:
+        depth = DEPTH_BY_GROUPING[row['grouping_id']]
+        path = tuple(row[k] for k in ('product_category', 'use_case', 'feature')[:depth])
+        if any(name is None for name in path):
+            continue  # NULL keys are part of the parent's total but never a node
+        size = NodeSize(
+            float(row['revenue']) if row.get('revenue') is not None else None,
+            row.get('customers'),
+        )
+        by_depth[depth].append((path, size))
+
+    # Parents first, so every node's parent is already in the index
+    for depth in range(4):
+        for path, size in by_depth[depth]:
+            if depth == 0 or path[:-1] in index:
+                index.add(path, size)
+    return index
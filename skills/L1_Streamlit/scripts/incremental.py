@@ -0,0 +1,220 @@
+"""
+incremental.py - Incremental Collection Across Snapshots
+
+Consecutive run_date snapshots mostly restate the same history, so most nodes
+come out identical. Before collecting, one query fingerprints every node: per
+period (CQ, PQ, PY, PLAN) it takes the revenue SUM, the row COUNT and a
+HASH_AGG over the rows' content (day, use case, feature, customer, industry,
+agreement type, revenue), so a renamed customer or revenue moved between
+customers or days changes the fingerprint even when the totals do not. A
+node whose fingerprint matches the previous collection's JSON reuses that
+node's analysis. Only nodes whose fingerprint changed are collected again.
+
+Fingerprints are written into each node of the output ('fingerprint' key), so
+the next incremental run can compare against it.
+
+USAGE:
+    fingerprints = fetch_node_fingerprints(conn, dates, run_date)
+    plan = IncrementalPlan.from_file('cache/l1_FY2026-Q4_2026-02-02_all.json.zst', fiscal_quarter, fingerprints)
+    reused = plan.reuse(('Analytics', 'BI'))   # (analysis, children) or None
+    print(plan.summary())
+"""
+
+import hashlib
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from .db import execute_query
+from .config import ACTUALS_TABLE, COLLECTION_VERSION, PLAN_TABLE, RUN_DATE_COLUMN
+from .fiscal import FiscalDates
+from .report_store import load_report
+from .shards import ShardedCollection, is_sharded
+
+
+# A node is addressed by its path of names below Total, e.g. ('Analytics', 'BI')
+NodePath = Tuple[str, ...]
+
+# GROUPING(product_category, use_case, feature) bitmask -> node depth
+DEPTH_BY_GROUPING = {7: 0, 3: 1, 1: 2, 0: 3}
+
+
+# =============================================================================
+# FINGERPRINTS
+# =============================================================================
+
+def fetch_node_fingerprints(conn, dates: FiscalDates, run_date: date) -> Dict[NodePath, str]:
+    """
+    Fingerprint every node (Total, categories, use cases, features) in one query.
+
+    Always reads ACTUALS_TABLE, never a materialized slice: its row_count
+    would change with the slice's pre-aggregation.
+
+    Returns {path: fingerprint}; Total is the empty path ().
+    """
+    query = f"""
+    WITH periods AS (
+        SELECT
+            ds, product_category, use_case, feature,
+            latest_salesforce_account_name AS customer,
+            industry_rollup, agreement_type,
+            CASE
+                WHEN ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}' THEN 'CQ'
+                WHEN ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}' THEN 'PQ'
+                ELSE 'PY'
+            END AS period,
+            ROUND(revenue + product_led_revenue, 2) AS revenue
+        FROM {ACTUALS_TABLE}
+        WHERE {RUN_DATE_COLUMN} = '{run_date}'
+            AND (ds BETWEEN '{dates.q_start}' AND '{dates.effective_end}'
+                 OR ds BETWEEN '{dates.pq_start}' AND '{dates.pq_end}'
+                 OR ds BETWEEN '{dates.py_start}' AND '{dates.py_end}')
+        UNION ALL
+        SELECT
+            ds, product_category, use_case, feature,
+            salesforce_account_name AS customer,
+            industry_rollup, NULL AS agreement_type,
+            'PLAN' AS period,
+            ROUND(revenue, 2) AS revenue
+        FROM {PLAN_TABLE}
+        WHERE ds BETWEEN '{dates.q_start}' AND '{dates.q_end}'
+    )
+    SELECT
+        GROUPING(product_category, use_case, feature) AS grouping_id,
+        product_category, use_case, feature, period,
+        ROUND(SUM(revenue), 2) AS revenue,
+        COUNT(*) AS row_count,
+        HASH_AGG(ds, use_case, feature, customer, industry_rollup, agreement_type, revenue) AS content_hash
+    FROM periods
+    GROUP BY GROUPING SETS (
+        (period),
+        (period, product_category),
+        (period, product_category, use_case),
+        (period, product_category, use_case, feature)
+    )
+    """
+    results = execute_query(conn, query, "Node fingerprints")
+
+    parts: Dict[NodePath, List[str]] = {}
+    for row in results:
+        depth = DEPTH_BY_GROUPING[row['grouping_id']]
+        path = tuple(row[k] for k in ('product_category', 'use_case', 'feature')[:depth])
+        if any(name is None for name in path):
+            continue  # NULL keys are part of the parent's total but never a node
+        parts.setdefault(path, []).append(
+            f"{row['period']}:{float(row['revenue'] or 0):.2f}:{row['row_count']}:{row['content_hash']}"
+        )
+
+    # Period bounds go into every hash: a moved effective_end invalidates all nodes
+    salt = str(dates)
+    return {
+        path: hashlib.sha1("|".join([salt] + sorted(p)).encode("utf-8")).hexdigest()[:16]
+        for path, p in parts.items()
+    }
+
+
+# =============================================================================
+# REUSE PLAN
+# =============================================================================
+
+def _flatten(data: Dict[str, Any]) -> Dict[NodePath, Dict[str, Any]]:
+    """Map every node of a v6 JSON (Total at ()) to its node dict."""
+    # Total keeps its children under the top-level 'hierarchy' key
+    nodes = {(): dict(data.get('total', {}), children=data.get('hierarchy', {}))}
+
+    def walk(children: Dict[str, Any], prefix: NodePath) -> None:
+        for name, node in children.items():
+            nodes[prefix + (name,)] = node
+            walk(node.get('children', {}), prefix + (name,))
+
+    walk(data.get('hierarchy', {}), ())
+    return nodes
+
+
+class IncrementalPlan:
+    """
+    Decides, node by node, whether the previous collection can be reused.
+
+    Thread-safe: reuse() is called from the traversal's worker threads.
+    """
+
+    def __init__(
+        self,
+        previous: Dict[NodePath, Dict[str, Any]],
+        fingerprints: Dict[NodePath, str],
+        previous_run_date: Optional[str] = None,
+    ):
+        self.previous = previous
+        self.fingerprints = fingerprints
+        self.previous_run_date = previous_run_date
+        self.reused = 0
+        self.recomputed = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str,
+        fiscal_quarter: str,
+        fingerprints: Dict[NodePath, str],
+    ) -> "IncrementalPlan":
+        """
+        Load a previous collection (report file or sharded directory). Reuses
+        nothing if it is missing, is another quarter or schema version, is
+        lazy (its nodes below category have no analyses), or has no
+        fingerprints.
+        """
+        try:
+            if is_sharded(path):
+                data = ShardedCollection.open(path).load_all()
+            else:
+                data = load_report(path)
+        except FileNotFoundError:
+            print(f"No previous collection at {path}; collecting everything")
+            return cls({}, fingerprints)
+        except (OSError, ValueError) as e:
+            print(f"WARNING: Cannot read previous collection {path}: {e}")
+            return cls({}, fingerprints)
+
+        metadata = data.get('metadata', {})
+        if metadata.get('fiscal_quarter') != fiscal_quarter or metadata.get('version') != COLLECTION_VERSION:
+            print(f"WARNING: {path} is not a {COLLECTION_VERSION} collection of {fiscal_quarter}; collecting everything")
+            return cls({}, fingerprints)
+        if metadata.get('lazy'):
+            print(f"WARNING: {path} is a lazy collection; collecting everything")
+            return cls({}, fingerprints)
+
+        previous = {p: n for p, n in _flatten(data).items() if n.get('fingerprint')}
+        if metadata.get('filter_category'):
+            # Total's children were filtered down to one category
+            previous.pop((), None)
+        if not previous:
+            print(f"WARNING: {path} has no node fingerprints; collecting everything")
+        return cls(previous, fingerprints, metadata.get('run_date'))
+
+    def lookup(self, path: NodePath) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+        """(analysis, children) from the previous run if the node is unchanged, else None."""
+        node = self.previous.get(path)
+        if node is None or node['fingerprint'] != self.fingerprints.get(path):
+            return None
+        return node.get('analysis', {}), list(node.get('children', {}))
+
+    def reuse(self, path: NodePath) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+        """lookup() that also counts the node as reused or recomputed."""
+        reused = self.lookup(path)
+        self.record(reused=int(reused is not None), recomputed=int(reused is None))
+        return reused
+
+    def record(self, reused: int = 0, recomputed: int = 0) -> None:
+        """Count nodes whose reuse was decided by the caller (e.g. a whole batch level)."""
+        with self._lock:
+            self.reused += reused
+            self.recomputed += recomputed
+
+    def summary(self) -> Dict[str, Any]:
+        """Counts for the output metadata and the progress log."""
+        return {
+            'previous_run_date': self.previous_run_date,
+            'nodes_recomputed': self.recomputed,
+            'nodes_reused': self.reused,
+        }
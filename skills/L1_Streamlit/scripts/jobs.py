@@ -0,0 +1,656 @@
+"""
+jobs.py - Background Collection Jobs
+
+A full collection takes minutes, and the app used to run it inside the
+user's session under st.spinner: nothing could be browsed until it finished
+and nothing showed how far it had got. The app now submits a job to a local
+SQLite queue and returns at once; a worker process (python -m scripts.jobs,
+started on demand by start_workers) claims queued jobs and runs
+collect_all_data with a progress callback that writes, after every node:
+nodes done / total per level (totals from the hierarchy index), the node and
+analysis running now, and how many categories are complete. The callback
+also checks the job's cancel flag and aborts the collection if it is set.
+
+ETA: per engine and level, the queue keeps the seconds per node of every
+finished job (node_timings); remaining nodes x those rates, or this job's own
+rate where there is no history yet.
+
+While a job runs, partial() assembles the categories whose whole subtree is
+already in the collection's checkpoint journal (checkpoint.py), so they can
+be browsed before the rest finish. Workers resume from the journal, so a
+cancelled or crashed job submitted again continues where it stopped.
+
+Submitting a collection that is already queued or running with the same
+options and output path returns the existing job, so concurrent requests
+from any number of sessions (or app processes) share one run. A job whose
+collection lock (collector.lock_path) is held, by a job with other options
+or by a run_collector.py run, goes back to the queue and is retried once
+the lock is free, instead of failing.
+
+USAGE:
+    queue = JobQueue()
+    job_id = queue.submit('FY2026-Q4', run_date, output_path='cache/l1_FY2026-Q4_2026-02-03_all')   # .json: one file, else sharded
+    start_workers(queue)                # detached worker processes, up to COLLECTION_MAX_CONCURRENT
+    queue.status(job_id)                # {'status': 'running', 'nodes_done': 41, 'nodes_total': 120, 'eta_seconds': 95.0, ...}
+    queue.partial(job_id)               # v6 JSON of the categories finished so far
+    queue.cancel(job_id)
+
+    python -m scripts.jobs [--db PATH] [--once]     # run a worker in the foreground
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import collector
+from .checkpoint import CheckpointJournal
+from .collector import LEVELS_BY_DEPTH, NodePath, _assemble_children
+from .config import (
+    JOBS_DB, JOB_POLL_SECONDS, JOB_WORKER_IDLE_SECONDS, COLLECTION_MAX_CONCURRENT,
+    CHECKPOINT_DIR, MAX_CUSTOMERS_PER_FEATURE, COLLECTION_VERSION,
+    CONNECTION_POOL_MAX_SIZE, CONNECTION_POOL_IDLE_SECONDS, CONNECTION_POOL_HEALTH_CHECK_SECONDS,
+)
+from .db import ConnectionPool, get_available_run_dates
+from .fiscal import get_fiscal_dates
+from .hierarchy import fetch_hierarchy
+from .shards import save_collection
+from .telemetry import latest_labels
+
+
+JOB_QUEUED, JOB_RUNNING, JOB_DONE = "queued", "running", "done"
+JOB_FAILED, JOB_CANCELLED = "failed", "cancelled"
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fiscal_quarter TEXT NOT NULL,
+    run_date TEXT,
+    category TEXT,
+    options TEXT NOT NULL,
+    output_path TEXT,
+    status TEXT NOT NULL,
+    submitted_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    worker_pid INTEGER,
+    nodes_done INTEGER NOT NULL DEFAULT 0,
+    nodes_total INTEGER,
+    level_done TEXT,
+    level_total TEXT,
+    categories_done INTEGER NOT NULL DEFAULT 0,
+    categories_total INTEGER,
+    current_node TEXT,
+    current_analysis TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    log_path TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+CREATE TABLE IF NOT EXISTS node_timings (
+    engine TEXT NOT NULL,
+    level TEXT NOT NULL,
+    nodes INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (engine, level)
+);
+CREATE TABLE IF NOT EXISTS workers (
+    pid INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL
+);
+"""
+
+# Worker processes started by this process, polled so exited ones are reaped
+_spawned: List[subprocess.Popen] = []
+
+
+class CollectionLocked(Exception):
+    """Another job or a run_collector.py run holds the collection's lock file."""
+
+
+class JobCancelled(Exception):
+    """Raised from the progress callback to abort a cancelled job's collection."""
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """
+    The SQLite job table, shared by the app (submit / status / cancel) and
+    the workers (claim / report / finish).
+
+    Every call opens its own connection, so one queue object can be used
+    from any Streamlit session thread. Jobs journal their nodes under
+    checkpoint_dir, where partial() reads them back.
+    """
+
+    def __init__(self, db_path: str = JOBS_DB, checkpoint_dir: str = CHECKPOINT_DIR):
+        self.db_path = db_path
+        self.checkpoint_dir = checkpoint_dir
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    # -------------------------------------------------------------------------
+    # App side
+    # -------------------------------------------------------------------------
+
+    def submit(
+        self,
+        fiscal_quarter: str,
+        run_date: Optional[date] = None,
+        category: Optional[str] = None,
+        output_path: Optional[str] = None,
+        engine: str = "sql",
+        workers: int = 1,
+        max_customers: int = MAX_CUSTOMERS_PER_FEATURE,
+        lazy: bool = False,
+    ) -> int:
+        """
+        Queue a collection; returns the id of the job already queued or running
+        for it (same options and output path), if any.
+        """
+        run_date = str(run_date) if run_date else None
+        options = json.dumps({'engine': engine, 'workers': workers, 'max_customers': max_customers, 'lazy': lazy})
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = conn.execute(
+                    "SELECT id FROM jobs WHERE fiscal_quarter = ? AND run_date IS ? AND category IS ? "
+                    "AND options = ? AND output_path IS ? AND status IN (?, ?) ORDER BY id LIMIT 1",
+                    (fiscal_quarter, run_date, category, options, output_path, *ACTIVE_STATUSES),
+                ).fetchone()
+                if existing:
+                    job_id = existing['id']
+                else:
+                    job_id = conn.execute(
+                        "INSERT INTO jobs (fiscal_quarter, run_date, category, options, output_path, status, "
+                        "submitted_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (fiscal_quarter, run_date, category, options, output_path, JOB_QUEUED, _now()),
+                    ).lastrowid
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def status(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """The job's row plus `eta_seconds` (None when unknown), or None if there is no such job."""
+        self.reap()
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = self._job(row)
+            rates = {r['level']: r['seconds'] / r['nodes'] for r in conn.execute(
+                "SELECT level, nodes, seconds FROM node_timings WHERE engine = ? AND nodes > 0",
+                (job['options'].get('engine'),),
+            )}
+        job['eta_seconds'] = self._eta(job, rates)
+        return job
+
+    def jobs(self, active_only: bool = False) -> List[Dict[str, Any]]:
+        """Every job (or only queued and running ones), newest first."""
+        self.reap()
+        query = "SELECT * FROM jobs"
+        if active_only:
+            query += " WHERE status IN (?, ?)"
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY id DESC", ACTIVE_STATUSES if active_only else ()).fetchall()
+        return [self._job(row) for row in rows]
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a job: a queued one at once, a running one at its next finished
+        node. Returns False if the job has already ended.
+        """
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (JOB_CANCELLED, _now(), job_id, JOB_QUEUED),
+            ).rowcount
+            updated += conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                (job_id, JOB_RUNNING),
+            ).rowcount
+        return updated > 0
+
+    def partial(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """
+        v6 JSON of the categories a running job has finished so far (read from
+        its checkpoint journal), or None before Total is collected.
+        """
+        job = self.status(job_id)
+        if job is None or not job['run_date']:
+            return None
+        lazy = bool(job['options'].get('lazy'))
+        nodes = CheckpointJournal.peek(self.checkpoint_dir, job['fiscal_quarter'], job['run_date'], job['category'],
+                                       lazy)
+        if () not in nodes:
+            return None
+        return partial_collection(nodes, job['fiscal_quarter'], job['run_date'], job['category'], lazy)
+
+    # -------------------------------------------------------------------------
+    # Worker side
+    # -------------------------------------------------------------------------
+
+    def claim(self, pid: int, skip: Iterable[int] = ()) -> Optional[Dict[str, Any]]:
+        """
+        Mark the oldest queued job (other than the ids in skip) running on
+        worker `pid` and return it, or None if there is none.
+        """
+        skip = list(skip)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    f"SELECT id FROM jobs WHERE status = ? AND id NOT IN ({', '.join('?' * len(skip))}) "
+                    "ORDER BY id LIMIT 1", (JOB_QUEUED, *skip),
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, started_at = ?, worker_pid = ? WHERE id = ?",
+                        (JOB_RUNNING, _now(), pid, row['id']),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            if row is None:
+                return None
+            return self._job(conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone())
+
+    def report(self, job_id: int, fields: Dict[str, Any]) -> bool:
+        """Update a running job's progress columns; returns whether it has been cancelled."""
+        fields = {k: json.dumps(v) if isinstance(v, dict) else v for k, v in fields.items()}
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def requeue(self, job_id: int) -> str:
+        """
+        Put a claimed job back in the queue (its collection is locked); one
+        cancelled meanwhile ends cancelled instead. Returns its new status.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ? AND cancel_requested = 1",
+                (JOB_CANCELLED, _now(), job_id, JOB_RUNNING),
+            )
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, worker_pid = NULL, current_node = NULL, "
+                "current_analysis = NULL WHERE id = ? AND status = ?",
+                (JOB_QUEUED, job_id, JOB_RUNNING),
+            )
+            return conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()['status']
+
+    def finish(self, job_id: int, status: str, error: Optional[str] = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ?, current_node = NULL, "
+                "current_analysis = NULL WHERE id = ?",
+                (status, _now(), error, job_id),
+            )
+
+    def record_timings(self, engine: str, level_done: Dict[str, int], level_seconds: Dict[str, float]) -> None:
+        """Add a finished job's per-level node counts and seconds to the ETA history."""
+        with self._connect() as conn:
+            for level, nodes in level_done.items():
+                if nodes:
+                    conn.execute(
+                        "INSERT INTO node_timings (engine, level, nodes, seconds) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (engine, level) DO UPDATE SET nodes = nodes + excluded.nodes, "
+                        "seconds = seconds + excluded.seconds",
+                        (engine, level, nodes, level_seconds[level]),
+                    )
+
+    def register_worker(self, pid: int) -> None:
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO workers (pid, started_at) VALUES (?, ?)", (pid, _now()))
+
+    def unregister_worker(self, pid: int) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM workers WHERE pid = ?", (pid,))
+
+    def live_workers(self) -> List[int]:
+        self.reap()
+        with self._connect() as conn:
+            return [row['pid'] for row in conn.execute("SELECT pid FROM workers")]
+
+    def reap(self) -> None:
+        """Forget workers that have exited; their running jobs failed."""
+        for process in list(_spawned):
+            if process.poll() is not None:
+                _spawned.remove(process)
+        with self._connect() as conn:
+            dead = [row['pid'] for row in conn.execute("SELECT pid FROM workers") if not _pid_alive(row['pid'])]
+            dead += [row['worker_pid'] for row in conn.execute(
+                "SELECT DISTINCT worker_pid FROM jobs WHERE status = ?", (JOB_RUNNING,)
+            ) if row['worker_pid'] not in dead and not _pid_alive(row['worker_pid'])]
+            for pid in dead:
+                conn.execute("DELETE FROM workers WHERE pid = ?", (pid,))
+                conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE worker_pid = ? AND status = ?",
+                    (JOB_FAILED, _now(), f"Worker {pid} exited", pid, JOB_RUNNING),
+                )
+
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for column in ('options', 'level_done', 'level_total'):
+            job[column] = json.loads(job[column]) if job[column] else {}
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        return job
+
+    @staticmethod
+    def _eta(job: Dict[str, Any], rates: Dict[str, float]) -> Optional[float]:
+        """Seconds left: remaining nodes per level x historical seconds per node (else this job's rate)."""
+        if job['status'] != JOB_RUNNING or not job['level_total']:
+            return None
+        own_rate = None
+        if job['nodes_done'] and job['started_at']:
+            elapsed = (datetime.now() - datetime.fromisoformat(job['started_at'])).total_seconds()
+            own_rate = elapsed / job['nodes_done']
+        eta = 0.0
+        for level, total in job['level_total'].items():
+            remaining = max(0, total - job['level_done'].get(level, 0))
+            rate = rates.get(level, own_rate)
+            if remaining and rate is None:
+                return None
+            eta += remaining * (rate or 0.0)
+        return round(eta, 1)
+
+
+# =============================================================================
+# PARTIAL RESULTS
+# =============================================================================
+
+def partial_collection(
+    nodes: Dict[NodePath, Any],
+    fiscal_quarter: str,
+    run_date: str,
+    category: Optional[str] = None,
+    lazy: bool = False,
+) -> Dict[str, Any]:
+    """
+    Assemble the journaled nodes of an unfinished collection, keeping only
+    categories whose whole subtree is collected. metadata.partial is True
+    (and metadata.lazy for a lazy run).
+    """
+    complete: Dict[NodePath, bool] = {}
+
+    def is_complete(path: NodePath) -> bool:
+        if path not in complete:
+            complete[path] = path in nodes and all(is_complete(path + (c,)) for c in nodes[path][1])
+        return complete[path]
+
+    total, categories = nodes[()]
+    if category in categories:
+        categories = [category]
+    done = [c for c in categories if is_complete((c,))]
+    hierarchy = _assemble_children({**nodes, (): (total, done)}, ())
+    metadata = {
+        'fiscal_quarter': fiscal_quarter,
+        'run_date': str(run_date),
+        'filter_category': category,
+        'version': COLLECTION_VERSION,
+        'partial': True,
+        'categories_done': len(done),
+        'categories_total': len(categories),
+    }
+    if lazy:
+        metadata['lazy'] = True
+    return {
+        'metadata': metadata,
+        'total': {'name': 'All Categories', 'level': 'total', 'analysis': total},
+        'hierarchy': hierarchy,
+    }
+
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+class _Progress:
+    """collect_all_data progress callback: per-level counts, timings and complete categories."""
+
+    def __init__(self, queue: JobQueue, job_id: int, level_total: Dict[str, int]):
+        self.queue = queue
+        self.job_id = job_id
+        self.level_total = level_total
+        self.level_done = dict.fromkeys(LEVELS_BY_DEPTH, 0)
+        self.level_seconds = dict.fromkeys(LEVELS_BY_DEPTH, 0.0)
+        self.discovered = dict.fromkeys(LEVELS_BY_DEPTH, 0)
+        self.discovered['total'] = 1
+        # Nodes of each category's subtree not collected yet
+        self.outstanding: Dict[str, int] = {}
+        self.categories_done = 0
+        self.last = time.perf_counter()
+
+    def __call__(self, path: NodePath, children: List[str]) -> None:
+        now = time.perf_counter()
+        level = LEVELS_BY_DEPTH[len(path)]
+        self.level_seconds[level] += now - self.last
+        self.last = now
+        self.level_done[level] += 1
+        if len(path) + 1 < len(LEVELS_BY_DEPTH):
+            self.discovered[LEVELS_BY_DEPTH[len(path) + 1]] += len(children)
+        if path:
+            # The node itself is done, its children are now known to be outstanding
+            self.outstanding[path[0]] = self.outstanding.get(path[0], 0) + len(children) - (len(path) > 1)
+            if self.outstanding[path[0]] == 0:
+                self.categories_done += 1
+
+        totals = {l: max(self.level_total.get(l, 0), self.discovered[l]) for l in LEVELS_BY_DEPTH}
+        labels = latest_labels()
+        cancelled = self.queue.report(self.job_id, {
+            'nodes_done': sum(self.level_done.values()),
+            'nodes_total': sum(totals.values()),
+            'level_done': self.level_done,
+            'level_total': totals,
+            'categories_done': self.categories_done,
+            'categories_total': totals['category'],
+            'current_node': labels.get('node') or ' / '.join(path) or 'Total',
+            'current_analysis': labels.get('analysis'),
+        })
+        if cancelled:
+            raise JobCancelled(f"Job {self.job_id} cancelled")
+
+
+def _level_totals(index, category: Optional[str]) -> Dict[str, int]:
+    """Nodes per level of the collection, from the hierarchy index."""
+    if category not in index.children(()):
+        category = None
+    totals = {level: len(index.level_nodes(level, category)) for level in LEVELS_BY_DEPTH[1:]}
+    return {'total': 1, **totals}
+
+
+def _last_error(log_path: str) -> Optional[str]:
+    try:
+        with open(log_path) as f:
+            errors = [line.strip() for line in f if line.startswith("ERROR:")]
+    except OSError:
+        return None
+    return errors[-1] if errors else None
+
+
+def run_job(queue: JobQueue, job: Dict[str, Any], pool: Optional[ConnectionPool] = None) -> str:
+    """
+    Run one claimed job to completion and record how it ended; returns its
+    final status. The collection's output goes to a log next to the queue.
+    Connections come from pool (the worker's, kept between jobs) when it is
+    large enough for the job's workers.
+
+    The job takes the collection's lock itself; if another job or a CLI run
+    holds it, the job is requeued and JOB_QUEUED returned.
+    """
+    job_id, options = job['id'], job['options']
+    connect = pool.connect if pool and options.get('workers', 1) <= pool.max_size else collector.get_connection
+    log_path = os.path.join(os.path.dirname(os.path.abspath(queue.db_path)), f"job_{job_id}.log")
+    queue.report(job_id, {'log_path': log_path, 'current_node': 'Total', 'current_analysis': 'hierarchy'})
+
+    status, error, lock = JOB_FAILED, None, None
+    with open(log_path, 'w') as log, contextlib.redirect_stdout(log):
+        try:
+            # The hierarchy index gives the node totals up front and saves the collector's own discovery query
+            run_date = date.fromisoformat(job['run_date']) if job['run_date'] else None
+            conn = connect()
+            try:
+                if run_date is None:
+                    available = get_available_run_dates(conn)
+                    run_date = available[0] if available else None
+                path = collector.lock_path(job['fiscal_quarter'], run_date, job['category'])
+                if not collector.acquire_lock(path):
+                    raise CollectionLocked(f"{job['fiscal_quarter']} @ {run_date} is being collected elsewhere")
+                lock = path
+                dates = get_fiscal_dates(conn, job['fiscal_quarter']) if run_date else None
+                index = fetch_hierarchy(conn, dates, run_date, sizes=False) if dates else None
+            finally:
+                conn.close()
+
+            progress = _Progress(queue, job_id, _level_totals(index, job['category']) if index else {})
+            data = collector.collect_all_data(
+                job['fiscal_quarter'], None, run_date=run_date, filter_category=job['category'],
+                max_customers=options.get('max_customers', MAX_CUSTOMERS_PER_FEATURE),
+                engine=options.get('engine', 'sql'), workers=options.get('workers', 1),
+                resume=True, checkpoint_dir=queue.checkpoint_dir, hierarchy=index, progress=progress,
+                lazy=options.get('lazy', False), connect=connect, lock=False,
+            )
+            if data:
+                if job['output_path']:
+                    save_collection(data, job['output_path'])
+                queue.record_timings(options.get('engine', 'sql'), progress.level_done, progress.level_seconds)
+                status = JOB_DONE
+            else:
+                error = "Collection returned no data"
+        except CollectionLocked as e:
+            print(f"{e}; job left queued")
+            status = JOB_QUEUED
+        except JobCancelled:
+            status = JOB_CANCELLED
+        except Exception as e:
+            print(f"ERROR: {type(e).__name__}: {e}")
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            if lock:
+                collector.release_lock(lock)
+    if status == JOB_QUEUED:
+        return queue.requeue(job_id)
+    if status == JOB_FAILED:
+        error = _last_error(log_path) or error
+    queue.finish(job_id, status, error)
+    return status
+
+
+def run_worker(
+    db_path: str = JOBS_DB,
+    once: bool = False,
+    idle_seconds: float = JOB_WORKER_IDLE_SECONDS,
+    checkpoint_dir: str = CHECKPOINT_DIR,
+) -> int:
+    """
+    Claim and run queued jobs one at a time until the queue has been empty
+    for idle_seconds (with once, until it is empty). Returns the jobs run.
+    Jobs whose collection is locked are skipped until the queue has nothing
+    else, then retried after JOB_POLL_SECONDS.
+    """
+    queue = JobQueue(db_path, checkpoint_dir)
+    pid = os.getpid()
+    queue.register_worker(pid)
+    # Consecutive jobs reuse the worker's connections instead of connecting again
+    pool = ConnectionPool(
+        max_size=CONNECTION_POOL_MAX_SIZE, factory=lambda: collector.get_connection(),
+        idle_timeout=CONNECTION_POOL_IDLE_SECONDS, health_check_after=CONNECTION_POOL_HEALTH_CHECK_SECONDS,
+    )
+    ran = 0
+    locked: List[int] = []
+    try:
+        idle_since = time.monotonic()
+        while True:
+            job = queue.claim(pid, skip=locked)
+            if job is None:
+                if locked and not once:
+                    locked.clear()
+                    idle_since = time.monotonic()
+                elif once or time.monotonic() - idle_since >= idle_seconds:
+                    return ran
+                time.sleep(JOB_POLL_SECONDS)
+                continue
+            print(f"Job {job['id']}: {job['fiscal_quarter']} @ {job['run_date'] or 'latest'} ...", flush=True)
+            status = run_job(queue, job, pool)
+            print(f"Job {job['id']}: {status}", flush=True)
+            if status == JOB_QUEUED:
+                locked.append(job['id'])
+                continue
+            ran += 1
+            idle_since = time.monotonic()
+    finally:
+        pool.close_all()
+        queue.unregister_worker(pid)
+
+
+def start_workers(queue: JobQueue, max_workers: int = COLLECTION_MAX_CONCURRENT) -> int:
+    """
+    Start detached worker processes until there is one per active job, at
+    most max_workers in all. Returns the number started.
+    """
+    active = len(queue.jobs(active_only=True))
+    wanted = min(max_workers, active) - len(queue.live_workers())
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    log_path = os.path.join(os.path.dirname(os.path.abspath(queue.db_path)), "workers.log")
+    for _ in range(max(0, wanted)):
+        with open(log_path, 'a') as log:
+            process = subprocess.Popen(
+                [sys.executable, '-m', 'scripts.jobs', '--db', queue.db_path],
+                cwd=package_dir, stdout=log, stderr=subprocess.STDOUT, start_new_session=True,
+            )
+        _spawned.append(process)
+        # Registered here as well, so a second call right away does not start another
+        queue.register_worker(process.pid)
+    return max(0, wanted)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run L1 collection jobs from the queue")
+    parser.add_argument("--db", default=JOBS_DB, help="Job queue database")
+    parser.add_argument("--once", action="store_true", help="Exit as soon as the queue is empty")
+    args = parser.parse_args()
+    run_worker(args.db, once=args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+lazy.py - On-Demand Analyses for Lazy Collections
+
+Most app users look at Total and two or three categories, yet a full
+collection runs every analysis for every use case and feature. A lazy
+collection (collect_all_data(lazy=True)) runs only LAZY_ANALYSES_BY_LEVEL:
+every analysis of Total, summary_kpis and children_breakdown of each
+category, and nothing below; the tree itself is complete, so every node can
+be navigated to. metadata.lazy marks such a collection.
+
+fill_node() completes one node the first time it is opened: its missing
+ANALYSES_BY_LEVEL analyses (one SQL query each, as the sql engine runs them)
+plus summary_kpis for its children, for the child cards, in one level-batched
+query (batch.py). persist_nodes() merges the new analyses into the cached
+collection under a file lock, so the next visitor of the node finds them there.
+Filled nodes are identical to the same nodes of a full collection.
+
+A snapshot diff reads summary_kpis of every node; open_summaries() fills
+them for the whole tree in one level-batched query per level.
+
+USAGE:
+    if data['metadata'].get('lazy'):
+        open_node(data, ('Analytics', 'BI'), cache_path)    # fill + persist, no-op once complete
+        open_summaries(data, cache_path)                    # before diffing it
+"""
+
+import fcntl
+import os
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+
+from . import collector
+from .batch import NodePath
+from .collector import LEVELS_BY_DEPTH, collect_analyses_for_level, collect_analyses_for_level_batch
+from .config import ANALYSES_BY_LEVEL
+from .db import to_json_safe
+from .fiscal import FiscalDates
+from .report_store import load_report, save_report
+from .shards import ShardedCollection, is_sharded
+
+
+def find_node(data: Dict[str, Any], path: NodePath) -> Optional[Dict[str, Any]]:
+    """The Total (path ()) or hierarchy node at path, or None if there is none."""
+    if not path:
+        return data.get('total')
+    node = None
+    children = data.get('hierarchy', {})
+    for name in path:
+        node = children.get(name)
+        if node is None:
+            return None
+        children = node.get('children', {})
+    return node
+
+
+def missing_analyses(node: Dict[str, Any]) -> List[str]:
+    """ANALYSES_BY_LEVEL analyses the node has not been given yet."""
+    analysis = node.get('analysis', {})
+    return [name for name in ANALYSES_BY_LEVEL.get(node.get('level'), []) if name not in analysis]
+
+
+def _ordered(analysis: Dict[str, Any], level: str) -> Dict[str, Any]:
+    """Analyses in ANALYSES_BY_LEVEL order, as a full collection writes them."""
+    order = ANALYSES_BY_LEVEL.get(level, [])
+    return {name: analysis[name] for name in order if name in analysis}
+
+
+def _metadata_date(value: Optional[str]) -> Optional[date]:
+    """A metadata date; a quarter with no prior quarter in the calendar has None (written as "None")."""
+    return None if value in (None, 'None') else date.fromisoformat(value)
+
+
+def _fiscal_dates(metadata: Dict[str, Any]) -> FiscalDates:
+    return FiscalDates(**{
+        field: _metadata_date(metadata.get(field))
+        for field in ('q_start', 'q_end', 'effective_end', 'pq_start', 'pq_end', 'py_start', 'py_end')
+    })
+
+
+def fill_node(data: Dict[str, Any], path: NodePath, conn) -> List[NodePath]:
+    """
+    Compute a node's missing analyses and its children's summary_kpis, in place.
+
+    Returns the paths whose analyses changed ([] if the node was complete).
+    """
+    node = find_node(data, path)
+    if node is None or len(path) >= len(LEVELS_BY_DEPTH):
+        return []
+    metadata = data['metadata']
+    dates = _fiscal_dates(metadata)
+    run_date = date.fromisoformat(metadata['run_date'])
+    level = LEVELS_BY_DEPTH[len(path)]
+    changed = []
+
+    missing = missing_analyses(node)
+    if missing:
+        filters = dict(zip(('category', 'use_case', 'feature'), path))
+        computed = collect_analyses_for_level(conn, dates, run_date, level, analyses=missing, **filters)
+        node['analysis'] = _ordered({**node.get('analysis', {}), **to_json_safe(computed)}, level)
+        changed.append(path)
+
+    children = node.get('children', {}) if path else data.get('hierarchy', {})
+    pending = [path + (name,) for name, child in children.items()
+               if 'summary_kpis' not in child.get('analysis', {})]
+    if pending:
+        child_level = LEVELS_BY_DEPTH[len(path) + 1]
+        computed = collect_analyses_for_level_batch(
+            conn, dates, run_date, child_level, pending, path[0] if path else None, 'summary_kpis'
+        )
+        for child_path in pending:
+            child = find_node(data, child_path)
+            child['analysis'] = _ordered(
+                {**child.get('analysis', {}), **to_json_safe(computed[child_path])}, child_level
+            )
+        changed.extend(pending)
+    return changed
+
+
+def missing_summaries(data: Dict[str, Any]) -> Dict[int, List[NodePath]]:
+    """Paths of the nodes without summary_kpis, by depth."""
+    pending: Dict[int, List[NodePath]] = {}
+
+    def walk(children: Dict[str, Any], prefix: NodePath) -> None:
+        for name, child in children.items():
+            child_path = prefix + (name,)
+            if 'summary_kpis' not in child.get('analysis', {}):
+                pending.setdefault(len(child_path), []).append(child_path)
+            walk(child.get('children', {}), child_path)
+
+    walk(data.get('hierarchy', {}), ())
+    return pending
+
+
+def fill_summaries(data: Dict[str, Any], conn) -> List[NodePath]:
+    """
+    summary_kpis for every node that has none yet, in place: one batch query
+    per level. Returns the paths filled.
+    """
+    pending = missing_summaries(data)
+    metadata = data['metadata']
+    dates = _fiscal_dates(metadata)
+    run_date = date.fromisoformat(metadata['run_date'])
+    changed = []
+    for depth, paths in sorted(pending.items()):
+        level = LEVELS_BY_DEPTH[depth]
+        computed = collect_analyses_for_level_batch(
+            conn, dates, run_date, level, paths, metadata.get('filter_category'), 'summary_kpis'
+        )
+        for path in paths:
+            node = find_node(data, path)
+            node['analysis'] = _ordered({**node.get('analysis', {}), **to_json_safe(computed[path])}, level)
+        changed.extend(paths)
+    return changed
+
+
+def persist_nodes(cache_path: str, data: Dict[str, Any], paths: List[NodePath]) -> None:
+    """
+    Merge the analyses of `paths` into the cached collection at cache_path
+    (a report file, or a sharded directory where only the affected shards
+    are rewritten).
+
+    Another session may have filled other nodes meanwhile, so the cache is
+    re-read under an exclusive lock and only the given nodes are merged.
+    """
+    def merge(path: NodePath, target: Dict[str, Any]) -> None:
+        source = find_node(data, path)
+        if source is not None:
+            level = LEVELS_BY_DEPTH[len(path)]
+            target['analysis'] = _ordered({**source['analysis'], **target.get('analysis', {})}, level)
+
+    if is_sharded(cache_path):
+        ShardedCollection.open(cache_path).update(paths, merge)
+        return
+
+    with open(cache_path + '.lock', 'w') as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            stored = load_report(cache_path)
+            for path in paths:
+                target = find_node(stored, path)
+                if target is not None:
+                    merge(path, target)
+            save_report(stored, cache_path)
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def open_node(
+    data: Dict[str, Any],
+    path: NodePath,
+    cache_path: Optional[str] = None,
+    connect: Optional[Callable[[], Any]] = None,
+) -> bool:
+    """
+    Make a lazy collection's node ready to display: fill it in if anything is
+    missing and persist it to cache_path. Returns whether anything was computed.
+    connect defaults to the collector's get_connection.
+    """
+    node = find_node(data, path)
+    if node is None:
+        return False
+    children = node.get('children', {}) if path else data.get('hierarchy', {})
+    if not missing_analyses(node) and all('summary_kpis' in c.get('analysis', {}) for c in children.values()):
+        return False
+
+    return _fill(data, lambda conn: fill_node(data, path, conn), cache_path, connect)
+
+
+def open_summaries(
+    data: Dict[str, Any],
+    cache_path: Optional[str] = None,
+    connect: Optional[Callable[[], Any]] = None,
+) -> bool:
+    """
+    Give every node of a lazy collection its summary_kpis (what a snapshot
+    diff compares) and persist them to cache_path. Returns whether anything
+    was computed; a no-op for full collections.
+    """
+    if not data.get('metadata', {}).get('lazy') or not missing_summaries(data):
+        return False
+    return _fill(data, lambda conn: fill_summaries(data, conn), cache_path, connect)
+
+
+def _fill(
+    data: Dict[str, Any],
+    fill: Callable[[Any], List[NodePath]],
+    cache_path: Optional[str],
+    connect: Optional[Callable[[], Any]],
+) -> bool:
+    conn = (connect or collector.get_connection)()
+    try:
+        changed = fill(conn)
+    finally:
+        conn.close()
+    if changed and cache_path and os.path.exists(cache_path):
+        persist_nodes(cache_path, data, changed)
+    return bool(changed)
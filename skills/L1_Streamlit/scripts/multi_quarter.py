@@ -0,0 +1,238 @@
+"""
+multi_quarter.py - Several Quarters (and Snapshots) From One Scan
+
+Collecting FY2026-Q1..Q4 one collect_all_data run at a time rescans the
+actuals once per quarter, and the windows overlap: Q2's prior quarter is Q1,
+every quarter's prior year sits in the previous fiscal year, and so on.
+collect_quarters() plans the union of every quarter's CQ/PQ/PY windows once
+and runs ONE cube query (cube.py layout) for all quarters and run_dates: the
+actuals are read once over the merged windows, each row is tagged with every
+quarter x bucket window it falls in, and the result carries fiscal_quarter and
+run_date columns. It is split into one RevenueCube per quarter x run_date and
+fanned out to collect_all_data(engine='cube', cube=...), which builds one v6
+JSON per quarter x run_date exactly as a single-quarter cube run would.
+
+The customer tier (customers.py) still runs its own two queries per
+collection.
+
+USAGE:
+    results = collect_quarters(['FY2026-Q1', 'FY2026-Q2', 'FY2026-Q3', 'FY2026-Q4'])
+    results[('FY2026-Q2', '2026-02-03')]        # v6 JSON dict
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from . import collector
+from .db import execute_query, get_available_run_dates, safe_string
+from .config import ACTUALS_TABLE, PLAN_TABLE, RUN_DATE_COLUMN, MAX_CUSTOMERS_PER_FEATURE, CHECKPOINT_DIR
+from .cube import CUBE_COLUMNS, RevenueCube
+from .fiscal import FiscalDates, get_fiscal_dates
+
+
+Window = Tuple[date, date]
+
+_ONE_DAY = timedelta(days=1)
+
+
+# =============================================================================
+# WINDOW PLANNING
+# =============================================================================
+
+def quarter_windows(dates: FiscalDates) -> Dict[str, Window]:
+    """The CQ / PQ / PY actuals windows of a quarter."""
+    return {
+        "CQ": (dates.q_start, dates.effective_end),
+        "PQ": (dates.pq_start, dates.pq_end),
+        "PY": (dates.py_start, dates.py_end),
+    }
+
+
+def merge_windows(windows: Iterable[Window]) -> List[Window]:
+    """
+    The union of date windows as sorted, non-overlapping, non-adjacent ranges.
+    Windows with a None bound (no prior quarter in the calendar) are dropped.
+    """
+    merged: List[Window] = []
+    for start, end in sorted(w for w in windows if None not in w and w[0] <= w[1]):
+        if merged and start <= merged[-1][1] + _ONE_DAY:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _in_windows(column: str, windows: List[Window]) -> str:
+    return "(" + " OR ".join(f"{column} BETWEEN '{s}' AND '{e}'" for s, e in windows) + ")"
+
+
+# =============================================================================
+# MULTI-QUARTER CUBE QUERY
+# =============================================================================
+
+def build_multi_cube_query(quarters: Dict[str, FiscalDates], run_dates: Sequence[date]) -> str:
+    """
+    cube.build_cube_query for several quarters and run_dates at once.
+
+    The actuals are read once, restricted to the merged union of every
+    quarter's windows; the join to `windows` then tags each row with every
+    quarter x bucket it falls in, and the result is the cube rows of each
+    quarter with fiscal_quarter and run_date columns in front.
+    """
+    windows = "\n        UNION ALL ".join(
+        f"SELECT '{safe_string(fq)}' AS fiscal_quarter, '{bucket}' AS bucket, "
+        f"'{start}'::DATE AS w_start, '{end}'::DATE AS w_end"
+        for fq, dates in quarters.items()
+        for bucket, (start, end) in quarter_windows(dates).items()
+        if start is not None and end is not None
+    )
+    actual_ranges = merge_windows(w for d in quarters.values() for w in quarter_windows(d).values())
+    plan_ranges = merge_windows(quarter_windows(d)["CQ"] for d in quarters.values())
+    run_date_list = ", ".join(f"'{d}'" for d in run_dates)
+    return f"""
+    WITH windows AS (
+        {windows}
+    ),
+    actuals AS (
+        SELECT
+            a.{RUN_DATE_COLUMN} AS run_date,
+            w.fiscal_quarter,
+            w.bucket,
+            a.ds,
+            a.product_category,
+            a.use_case,
+            a.feature,
+            a.latest_salesforce_account_name,
+            a.industry_rollup,
+            a.agreement_type,
+            a.revenue + a.product_led_revenue AS revenue
+        FROM {ACTUALS_TABLE} a
+        JOIN windows w ON a.ds BETWEEN w.w_start AND w.w_end
+        WHERE a.{RUN_DATE_COLUMN} IN ({run_date_list})
+            AND {_in_windows('a.ds', actual_ranges)}
+    ),
+    plan AS (
+        SELECT w.fiscal_quarter, p.ds, p.product_category, p.use_case, p.feature,
+            p.salesforce_account_name, p.industry_rollup, p.revenue
+        FROM {PLAN_TABLE} p
+        JOIN windows w ON w.bucket = 'CQ' AND p.ds BETWEEN w.w_start AND w.w_end
+        WHERE {_in_windows('p.ds', plan_ranges)}
+    )
+    SELECT
+        fiscal_quarter,
+        run_date,
+        bucket,
+        CASE WHEN bucket = 'CQ' THEN DATE_TRUNC('month', ds) END AS period_date,
+        product_category AS category,
+        use_case,
+        feature,
+        latest_salesforce_account_name AS customer,
+        industry_rollup AS industry,
+        agreement_type = 'Capacity' AS is_capacity,
+        SUM(revenue) AS revenue
+    FROM actuals
+    GROUP BY 1, 2, 3, 4, 5, 6, 7, 8, 9, 10
+    UNION ALL
+    SELECT fiscal_quarter, run_date, 'CQ_DAILY', ds, product_category, use_case, feature, NULL, NULL, NULL, SUM(revenue)
+    FROM actuals
+    WHERE bucket = 'CQ'
+    GROUP BY fiscal_quarter, run_date, ds, product_category, use_case, feature
+    UNION ALL
+    SELECT fiscal_quarter, NULL, 'PLAN', NULL, product_category, use_case, feature, salesforce_account_name, industry_rollup, NULL, SUM(revenue)
+    FROM plan
+    GROUP BY fiscal_quarter, product_category, use_case, feature, salesforce_account_name, industry_rollup
+    UNION ALL
+    SELECT fiscal_quarter, NULL, 'PLAN_DAILY', ds, product_category, use_case, feature, NULL, NULL, NULL, SUM(revenue)
+    FROM plan
+    GROUP BY fiscal_quarter, ds, product_category, use_case, feature
+    """
+
+
+def fetch_quarter_cubes(
+    conn,
+    quarters: Dict[str, FiscalDates],
+    run_dates: Sequence[date],
+) -> Dict[Tuple[str, date], RevenueCube]:
+    """Run the multi-quarter cube query once and split it into a RevenueCube per quarter x run_date."""
+    rows = pd.DataFrame(
+        execute_query(conn, build_multi_cube_query(quarters, run_dates), "Multi-quarter revenue cube"),
+        columns=["fiscal_quarter", "run_date"] + CUBE_COLUMNS,
+    )
+    print(f"   {len(rows):,} cube rows")
+
+    # Plan rows belong to every run_date of their quarter
+    snapshot = rows["run_date"].astype(str)
+    is_plan = rows["bucket"].isin(["PLAN", "PLAN_DAILY"]).to_numpy()
+    by_quarter = rows.groupby("fiscal_quarter", sort=False).indices
+    cubes = {}
+    for fiscal_quarter in quarters:
+        positions = by_quarter.get(fiscal_quarter, [])
+        for run_date in run_dates:
+            mask = is_plan[positions] | (snapshot.iloc[positions] == str(run_date)).to_numpy()
+            cubes[(fiscal_quarter, run_date)] = RevenueCube(rows.iloc[positions][mask][CUBE_COLUMNS])
+    return cubes
+
+
+# =============================================================================
+# ENTRY POINT
+# =============================================================================
+
+def collect_quarters(
+    fiscal_quarters: List[str],
+    run_dates: Optional[List[date]] = None,
+    filter_category: Optional[str] = None,
+    max_customers: int = MAX_CUSTOMERS_PER_FEATURE,
+    checkpoint_dir: Optional[str] = CHECKPOINT_DIR,
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    Collect several fiscal quarters (and snapshots) from one actuals scan.
+
+    Args:
+        fiscal_quarters: e.g. ['FY2026-Q1', 'FY2026-Q2']
+        run_dates: Snapshot dates to collect each quarter for (default: latest)
+        filter_category: Optional single category to process
+        max_customers: Top customers per feature in each collection's tier
+        checkpoint_dir: Passed to each collect_all_data run
+
+    Returns:
+        {(fiscal_quarter, run_date): v6 JSON dict}; a quarter missing from the
+        fiscal calendar or a failed collection is left out.
+    """
+    print("Connecting to Snowflake...")
+    conn = collector.get_connection()
+    try:
+        if not run_dates:
+            available_dates = get_available_run_dates(conn)
+            if not available_dates:
+                print("ERROR: No snapshot dates found in actuals table")
+                return {}
+            run_dates = available_dates[:1]
+            print(f"Using latest snapshot: {run_dates[0]}")
+
+        quarters = {}
+        for fiscal_quarter in dict.fromkeys(fiscal_quarters):
+            dates = get_fiscal_dates(conn, fiscal_quarter)
+            if dates is None:
+                print(f"ERROR: Could not find fiscal dates for {fiscal_quarter}")
+                continue
+            quarters[fiscal_quarter] = dates
+        if not quarters:
+            return {}
+
+        print(f"Fetching revenue cubes for {len(quarters)} quarter(s) x {len(run_dates)} snapshot(s)...")
+        cubes = fetch_quarter_cubes(conn, quarters, run_dates)
+    finally:
+        conn.close()
+
+    results = {}
+    for (fiscal_quarter, run_date), cube in cubes.items():
+        print(f"\n=== {fiscal_quarter} @ {run_date} ===")
+        data = collector.collect_all_data(
+            fiscal_quarter, None, run_date=run_date, filter_category=filter_category,
+            max_customers=max_customers, engine="cube", checkpoint_dir=checkpoint_dir, cube=cube,
+        )
+        if data:
+            results[(fiscal_quarter, str(run_date))] = data
+    return results
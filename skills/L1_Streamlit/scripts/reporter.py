@@ -5,10 +5,10 @@ Generates interactive HTML reports with click-to-expand hierarchy
 and summary Markdown reports from collected L1 data.
 """
 
-import json
 from typing import Any, Dict, List, Optional
 
 from .config import HIERARCHY, ANALYSES_BY_LEVEL, CUSTOMER_SEGMENTS
+from .report_store import load_report
 
 
 # =============================================================================
@@ -753,12 +753,11 @@ def generate_report(data_path: str, html_path: str, md_path: str) -> None:
     Generate both HTML and Markdown reports from collected data.
     
     Args:
-        data_path: Path to the JSON data file
+        data_path: Path to the data file (any report_store format)
         html_path: Output path for HTML report
         md_path: Output path for Markdown report
     """
-    with open(data_path, 'r') as f:
-        data = json.load(f)
+    data = load_report(data_path)
     
     generate_html_report(data, html_path)
     generate_markdown_report(data, md_path)
@@ -0,0 +1,217 @@
+"""
+result_cache.py - On-Disk SQL Result Cache
+
+A run_date snapshot never changes once written, so the same SQL against it
+returns the same rows on every run. This cache stores each result set as a
+Parquet file named by a hash of the normalized SQL text and the connection
+identity, so re-collecting an existing snapshot reads from local disk.
+
+POLICY:
+    - Queries matching UNCACHEABLE_PATTERNS (CURRENT_DATE() etc.) are never
+      cached: their answer depends on when they run.
+    - A query is immutable, and cached until evicted, when it filters
+      RUN_DATE_COLUMN = '<date>' only on run_dates older than the newest
+      snapshot (the newest may still be loading) and reads none of
+      MUTABLE_TABLES (plan and calendar, which are reloaded in place).
+    - Every other query is keyed by its ttl_seconds window as well, so its
+      result is reused for at most that long (never with ttl_seconds=0).
+    - Callers can opt a query out with execute_query(..., cache=False).
+    - The directory is capped at max_bytes; least recently used files
+      (by mtime, refreshed on every hit) are evicted first.
+
+USAGE:
+    from scripts.db import enable_result_cache
+    cache = enable_result_cache(newest_run_date=catalog.newest())   # RESULT_CACHE_DIR, _MAX_BYTES, _TTL_SECONDS
+    ... run the collector ...
+    print(cache.stats())
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import date
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .config import CALENDAR_TABLE, PLAN_TABLE, RUN_DATE_COLUMN
+
+
+# Queries whose result depends on the wall clock rather than the snapshot
+UNCACHEABLE_PATTERNS = [
+    re.compile(r"\bCURRENT_(DATE|TIMESTAMP|TIME)\b", re.IGNORECASE),
+    re.compile(r"\b(GETDATE|SYSDATE|SYSTIMESTAMP|LOCALTIMESTAMP)\s*\(", re.IGNORECASE),
+]
+
+# Tables reloaded in place rather than versioned by run_date
+MUTABLE_TABLES = [PLAN_TABLE, CALENDAR_TABLE]
+
+_RUN_DATE_LITERAL = re.compile(rf"\b{RUN_DATE_COLUMN}\s*=\s*'(\d{{4}}-\d{{2}}-\d{{2}})'", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_SUFFIX = ".parquet"
+
+
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace so indentation changes do not change the cache key."""
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+def connection_profile(conn) -> str:
+    """
+    Identity of the data a connection can see (account/user/role).
+
+    Falls back to the SNOWFLAKE_CONNECTION_NAME profile for connections that
+    do not expose these attributes.
+    """
+    parts = [getattr(conn, attr, None) for attr in ("account", "user", "role")]
+    if any(parts):
+        return "/".join(str(p or "") for p in parts)
+    return os.getenv("SNOWFLAKE_CONNECTION_NAME") or "snowhouse"
+
+
+class ResultCache:
+    """
+    Size-capped, content-addressed store of query results.
+
+    Thread-safe: files are written to a temp name and renamed into place, and
+    the counters are guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        ttl_seconds: float = 0,
+        newest_run_date: Optional[date] = None,
+    ):
+        """
+        Args:
+            directory: Where result files are stored (created if missing)
+            max_bytes: Total size above which the oldest files are evicted
+            ttl_seconds: How long results that can change are reused (0 = not cached)
+            newest_run_date: The newest snapshot; only older ones are immutable
+                             (None: no query is)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.newest_run_date = newest_run_date
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # Running total so put() only rescans the directory when over the cap
+        self._bytes = self.size()
+
+    def immutable(self, query: str) -> bool:
+        """Whether the query reads only snapshots older than the newest one (see POLICY)."""
+        run_dates = _RUN_DATE_LITERAL.findall(query)
+        if not run_dates or self.newest_run_date is None:
+            return False
+        if any(table.lower() in query.lower() for table in MUTABLE_TABLES):
+            return False
+        return all(run_date < str(self.newest_run_date) for run_date in run_dates)
+
+    def key(self, conn, query: str) -> Optional[str]:
+        """Cache key for a query, or None if the policy says never cache it."""
+        text = f"{connection_profile(conn)}\n{normalize_sql(query)}"
+        if not any(pattern.search(query) for pattern in UNCACHEABLE_PATTERNS):
+            if self.immutable(query):
+                return hashlib.sha256(text.encode("utf-8")).hexdigest()
+            if self.ttl_seconds > 0:
+                # A new window gives a new key; the old window's file is left to LRU eviction
+                window = int(time.time() // self.ttl_seconds)
+                return hashlib.sha256(f"{text}\n{window}".encode("utf-8")).hexdigest()
+        with self._lock:
+            self.skipped += 1
+        return None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[pa.Table]:
+        """Return the cached result for a key (refreshing its LRU position), or None."""
+        path = self._path(key)
+        try:
+            table = pq.read_table(path)
+            os.utime(path)
+        except (OSError, pa.ArrowException):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return table
+
+    def put(self, key: str, table: pa.Table) -> None:
+        """Store a result set."""
+        tmp_path = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            pq.write_table(table, tmp_path, compression="zstd")
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        with self._lock:
+            self._bytes += size
+            over_cap = self._bytes > self.max_bytes
+        if over_cap:
+            self.evict()
+
+    def size(self) -> int:
+        """Total bytes of cached result files."""
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self) -> List[tuple]:
+        """(path, bytes, mtime) of every result file."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(_SUFFIX):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self) -> int:
+        """Delete least recently used files until under max_bytes. Returns files removed."""
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self._bytes = total
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        for path, _, _ in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/skip counters plus current size on disk."""
+        with self._lock:
+            counters = {"hits": self.hits, "misses": self.misses, "skipped": self.skipped}
+        counters["bytes"] = self.size()
+        return counters
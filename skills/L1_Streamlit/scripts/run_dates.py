@@ -0,0 +1,214 @@
+"""
+run_dates.py - Incremental Snapshot (run_date) Catalog
+
+The app's date picker came from SELECT DISTINCT run_date over the whole
+multi-snapshot actuals table, a full scan on every app start and every time
+the hourly cache expired. The catalog keeps one entry per snapshot (rows,
+first and last ds) in memory and on disk; a refresh only asks for run_dates
+at or after the newest one it knows:
+
+    SELECT run_date, COUNT(*), MIN(ds), MAX(ds) FROM <actuals>
+    WHERE run_date >= '<newest known>' GROUP BY run_date
+
+(the newest known snapshot is re-read in case it was still loading). Within
+RUN_DATE_CATALOG_REFRESH_SECONDS no query runs and no connection is opened:
+connect() is only called when a refresh is due. Every
+RUN_DATE_CATALOG_FULL_REFRESH_DAYS the whole table is read again, so
+snapshots deleted by retention drop out.
+
+The ds range tells whether a snapshot covers a quarter: the app warns when
+the selected snapshot has no rows for the quarter, or none for the prior
+year its comparisons need.
+
+USAGE:
+    catalog = load_run_dates(pool.connect)       # connect: zero-arg callable, default db.get_connection
+    catalog.run_dates()                         # newest first, like get_available_run_dates
+    snapshot = catalog.get(run_date)            # Snapshot(run_date, rows, first_day, last_day)
+    snapshot.covers(dates.q_start, dates.effective_end)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import (
+    ACTUALS_TABLE, ACTUALS_COLUMNS, RUN_DATE_COLUMN,
+    RUN_DATE_CATALOG_DIR, RUN_DATE_CATALOG_REFRESH_SECONDS, RUN_DATE_CATALOG_FULL_REFRESH_DAYS,
+)
+from .db import execute_query, get_connection
+
+
+_CACHE_VERSION = 1
+
+
+def _as_date(value) -> Optional[date]:
+    """Warehouse values may come back as dates, timestamps or strings."""
+    if value is None or type(value) is date:
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One run_date of the actuals table."""
+    run_date: date
+    rows: int
+    first_day: Optional[date]   # MIN(ds)
+    last_day: Optional[date]    # MAX(ds)
+
+    def covers(self, start: date, end: date) -> bool:
+        """True if the snapshot's days span start..end."""
+        return (self.first_day is not None and self.last_day is not None
+                and self.first_day <= start and self.last_day >= end)
+
+
+class RunDateCatalog:
+    """Snapshots newest first; read-only once built, so sessions share it freely."""
+
+    def __init__(self, snapshots: List[Snapshot], refreshed_at: float = 0.0, full_refreshed_at: float = 0.0):
+        self.snapshots = sorted(snapshots, key=lambda s: s.run_date, reverse=True)
+        self.refreshed_at = refreshed_at
+        self.full_refreshed_at = full_refreshed_at
+        self._by_date = {s.run_date: s for s in self.snapshots}
+
+    def __len__(self) -> int:
+        return len(self.snapshots)
+
+    def run_dates(self) -> List[date]:
+        return [s.run_date for s in self.snapshots]
+
+    def get(self, run_date) -> Optional[Snapshot]:
+        """A snapshot by run_date (a date or 'YYYY-MM-DD')."""
+        if isinstance(run_date, str):
+            run_date = date.fromisoformat(run_date)
+        return self._by_date.get(run_date)
+
+    def newest(self) -> Optional[date]:
+        return self.snapshots[0].run_date if self.snapshots else None
+
+    def merged(self, fetched: List[Snapshot], since: Optional[date], now: float) -> "RunDateCatalog":
+        """This catalog with every run_date >= since replaced by fetched (all of it when since is None)."""
+        kept = [s for s in self.snapshots if since is not None and s.run_date < since]
+        full_refreshed_at = now if since is None else self.full_refreshed_at
+        return RunDateCatalog(kept + fetched, now, full_refreshed_at)
+
+    def to_json(self) -> Dict:
+        return {
+            'version': _CACHE_VERSION,
+            'refreshed_at': self.refreshed_at,
+            'full_refreshed_at': self.full_refreshed_at,
+            'snapshots': [[str(s.run_date), s.rows, str(s.first_day) if s.first_day else None,
+                           str(s.last_day) if s.last_day else None] for s in self.snapshots],
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "RunDateCatalog":
+        snapshots = [Snapshot(date.fromisoformat(run_date), rows, _as_date(first), _as_date(last))
+                     for run_date, rows, first, last in data['snapshots']]
+        return cls(snapshots, data['refreshed_at'], data['full_refreshed_at'])
+
+
+def fetch_snapshots(conn, since: Optional[date] = None) -> List[Snapshot]:
+    """Rows and ds range per run_date (only run_dates >= since, if given)."""
+    day = ACTUALS_COLUMNS['date']
+    where = f"WHERE {RUN_DATE_COLUMN} >= '{since}'" if since else ""
+    query = f"""
+    SELECT
+        {RUN_DATE_COLUMN} AS run_date,
+        COUNT(*) AS row_count,
+        MIN({day}) AS first_day,
+        MAX({day}) AS last_day
+    FROM {ACTUALS_TABLE}
+    {where}
+    GROUP BY 1
+    ORDER BY 1 DESC
+    """
+    # Never result-cached: a new snapshot changes the answer
+    rows = execute_query(conn, query, "Run date catalog" + (" (incremental)" if since else ""), cache=False)
+    return [Snapshot(_as_date(r['run_date']), int(r['row_count']), _as_date(r['first_day']), _as_date(r['last_day']))
+            for r in rows]
+
+
+# In-process copies, keyed like the disk cache
+_loaded: Dict[str, RunDateCatalog] = {}
+_lock = threading.Lock()
+
+
+def _cache_key() -> str:
+    """From config only (the account get_connection would use), so a fresh catalog needs no connection."""
+    account = os.getenv("SNOWFLAKE_CONNECTION_NAME") or "snowhouse"
+    return hashlib.sha256(f"{account}|{ACTUALS_TABLE}|{RUN_DATE_COLUMN}".encode()).hexdigest()[:16]
+
+
+def _read_cache(path: str) -> Optional[RunDateCatalog]:
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != _CACHE_VERSION:
+            return None
+        return RunDateCatalog.from_json(data)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"WARNING: Ignoring unreadable run date catalog {path}: {e}")
+        return None
+
+
+def _write_cache(path: str, catalog: RunDateCatalog) -> None:
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump(catalog.to_json(), f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"WARNING: Could not save the run date catalog: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_run_dates(
+    connect: Optional[Callable[[], Any]] = None,
+    max_age: Optional[float] = None,
+    full: bool = False,
+) -> RunDateCatalog:
+    """
+    The snapshot catalog, from memory or the disk cache, refreshed from the
+    warehouse when older than max_age seconds.
+
+    Args:
+        connect: Zero-arg callable returning a connection (default
+                 db.get_connection); only called when a refresh is due
+        max_age: Seconds a catalog stays fresh (default RUN_DATE_CATALOG_REFRESH_SECONDS; 0 always refreshes)
+        full: Re-read every run_date instead of only the newest ones
+    """
+    max_age = RUN_DATE_CATALOG_REFRESH_SECONDS if max_age is None else max_age
+    key = _cache_key()
+    path = os.path.join(RUN_DATE_CATALOG_DIR, f"{key}.json") if RUN_DATE_CATALOG_DIR else None
+    with _lock:
+        catalog = _loaded.get(key) or (_read_cache(path) if path else None) or RunDateCatalog([])
+        now = time.time()
+        if full or not catalog or now - catalog.full_refreshed_at > RUN_DATE_CATALOG_FULL_REFRESH_DAYS * 86400:
+            since = None
+        elif now - catalog.refreshed_at > max_age:
+            since = catalog.newest()
+        else:
+            _loaded[key] = catalog
+            return catalog
+        conn = (connect or get_connection)()
+        try:
+            catalog = catalog.merged(fetch_snapshots(conn, since), since, now)
+        finally:
+            conn.close()
+        _loaded[key] = catalog
+        if path:
+            _write_cache(path, catalog)
+        return catalog
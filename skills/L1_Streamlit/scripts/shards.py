@@ -0,0 +1,279 @@
+"""
+shards.py - Sharded Per-Category Cache Format
+
+A cached collection used to be one indent=2 JSON file that the app parsed in
+full on every Generate click, although it renders one node at a time. A
+sharded collection is a directory instead:
+
+    l1_FY2026-Q4_2026-02-03_all/
+        manifest.json           metadata, Total (with all its analyses) and
+                                the tree: every node's name, level,
+                                summary_kpis and children, plus the shard
+                                file of each category
+        c0000.g1.json.zst       one compressed file per category: its full
+        c0001.g1.json.zst       subtree (analyses, customer rows, ...)
+
+Opening a collection reads only the manifest, which is enough for the Total
+page and every child card; a category's shard is read the first time the
+user navigates into it. ShardedCollection.data is an ordinary v6 dict whose
+categories start as stubs (analysis holds summary_kpis only) and are
+replaced by their shard in place, so the app's navigation code is unchanged.
+
+Writes are atomic: shards are written under a new generation number, then
+the manifest is swapped in with os.replace (the commit point), then shards
+it no longer references are deleted. A reader therefore sees the old or the
+new collection, never a mix. update() rewrites only the categories whose
+nodes changed (lazy.py fills nodes in on demand).
+
+The stage-hosted l1-commentary/app.py reads the same layout (it cannot
+import this module); upload the directory with PUT ... AUTO_COMPRESS=FALSE.
+
+USAGE:
+    write_sharded(data, 'cache/l1_FY2026-Q4_2026-02-03_all')
+    collection = open_collection('cache/l1_FY2026-Q4_2026-02-03_all')   # sharded dir or a single report file
+    collection.data['total']                    # from the manifest
+    collection.ensure('Analytics')              # reads that category's shard
+    full = collection.load_all()                # same dict as the original collection
+"""
+
+import fcntl
+import json
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .batch import NodePath
+from .config import REPORT_STORE_FORMAT
+from .report_store import find_report, format_of, load_report, save_report, strip_format
+
+
+SHARD_FORMAT = "l1-shards-v1"
+MANIFEST = "manifest.json"
+
+# Shards are report_store files (REPORT_STORE_FORMAT); older shards in another format stay readable
+_SHARD_NAME = re.compile(r"^c\d+\.g(\d+)\.json(\.\w+)?$")
+
+
+# =============================================================================
+# WRITING
+# =============================================================================
+
+def _stub(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Manifest entry of a node: name, level, summary_kpis and the same for its children."""
+    entry = {'name': node.get('name'), 'level': node.get('level')}
+    kpis = node.get('analysis', {}).get('summary_kpis')
+    if kpis is not None:
+        entry['summary_kpis'] = kpis
+    entry['children'] = {name: _stub(child) for name, child in node.get('children', {}).items()}
+    return entry
+
+
+def _write_atomic(path: str, payload: bytes) -> None:
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def _write_shard(directory: str, index: int, generation: int, node: Dict[str, Any]) -> Dict[str, Any]:
+    name = f"c{index:04d}.g{generation}{REPORT_STORE_FORMAT}"
+    return {'file': name, 'bytes': save_report(node, os.path.join(directory, name))}
+
+
+def _commit(directory: str, manifest: Dict[str, Any]) -> None:
+    """Swap the manifest in, then drop shards it no longer references."""
+    payload = json.dumps(manifest, separators=(',', ':'), default=str).encode()
+    _write_atomic(os.path.join(directory, MANIFEST), payload)
+    referenced = {entry['shard']['file'] for entry in manifest['tree'].values()}
+    for name in os.listdir(directory):
+        if _SHARD_NAME.match(name) and name not in referenced:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def _generation(directory: str) -> int:
+    """Next shard generation: above any shard file present."""
+    found = [int(m.group(1)) for m in map(_SHARD_NAME.match, os.listdir(directory)) if m]
+    return max(found, default=0) + 1
+
+
+class _locked:
+    """Exclusive lock on a sharded directory for the duration of a write."""
+
+    def __init__(self, directory: str):
+        self.path = directory.rstrip(os.sep) + '.lock'
+
+    def __enter__(self):
+        self.file = open(self.path, 'w')
+        fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        self.file.close()
+
+
+def write_sharded(data: Dict[str, Any], directory: str) -> Dict[str, Any]:
+    """Write a v6 collection as a sharded directory (replacing any earlier one); returns the manifest."""
+    os.makedirs(directory, exist_ok=True)
+    with _locked(directory):
+        generation = _generation(directory)
+        tree = {}
+        for index, (name, node) in enumerate(data.get('hierarchy', {}).items()):
+            tree[name] = _stub(node)
+            tree[name]['shard'] = _write_shard(directory, index, generation, node)
+        manifest = {
+            'format': SHARD_FORMAT,
+            'metadata': data.get('metadata', {}),
+            'total': data.get('total', {}),
+            'tree': tree,
+        }
+        _commit(directory, manifest)
+    return manifest
+
+
+# =============================================================================
+# READING
+# =============================================================================
+
+def _expand(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """A manifest entry as a hierarchy-style stub node (analysis holds summary_kpis only)."""
+    node = {'name': entry['name'], 'level': entry['level'],
+            'analysis': {'summary_kpis': entry['summary_kpis']} if 'summary_kpis' in entry else {}}
+    node['children'] = {name: _expand(child) for name, child in entry.get('children', {}).items()}
+    return node
+
+
+def is_sharded(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+
+class ShardedCollection:
+    """
+    A cached collection opened from its manifest; categories are read on demand.
+
+    Also wraps a legacy single-file JSON collection (fully loaded, ensure()
+    is then a no-op), so callers can treat both alike.
+    """
+
+    def __init__(self, path: str, data: Dict[str, Any], manifest: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.data = data
+        self.manifest = manifest
+        self.loaded = set() if manifest else set(data.get('hierarchy', {}))
+
+    @property
+    def sharded(self) -> bool:
+        return self.manifest is not None
+
+    @classmethod
+    def open(cls, directory: str) -> "ShardedCollection":
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest.get('format') != SHARD_FORMAT:
+            raise ValueError(f"{directory} is not a {SHARD_FORMAT} collection")
+        data = {
+            'metadata': manifest['metadata'],
+            'total': manifest['total'],
+            'hierarchy': {name: _expand(entry) for name, entry in manifest['tree'].items()},
+        }
+        return cls(directory, data, manifest)
+
+    def _read_shard(self, category: str) -> Dict[str, Any]:
+        return load_report(os.path.join(self.path, self.manifest['tree'][category]['shard']['file']))
+
+    def ensure(self, category: str) -> bool:
+        """Replace a category's stub with its shard; returns whether a shard was read."""
+        if category in self.loaded or category not in self.data['hierarchy']:
+            return False
+        try:
+            self.data['hierarchy'][category] = self._read_shard(category)
+        except FileNotFoundError:
+            # Rewritten since the manifest was read: pick up the new generation
+            self.manifest = ShardedCollection.open(self.path).manifest
+            self.data['hierarchy'][category] = self._read_shard(category)
+        self.loaded.add(category)
+        return True
+
+    def ensure_path(self, path: Iterable[str]) -> bool:
+        """ensure() the category a navigation path starts with (no-op at Total)."""
+        path = tuple(path)
+        return self.ensure(path[0]) if path else False
+
+    def load_all(self) -> Dict[str, Any]:
+        """Read every shard; returns data, now the complete collection."""
+        for category in list(self.data.get('hierarchy', {})):
+            self.ensure(category)
+        return self.data
+
+    def update(self, paths: List[NodePath], merge: Callable[[NodePath, Dict[str, Any]], None]) -> None:
+        """
+        Apply merge(path, stored_node) to the stored node of each path, under
+        the write lock and against the latest manifest (another session may
+        have written meanwhile), rewriting only the affected categories'
+        shards and the manifest.
+        """
+        with _locked(self.path):
+            manifest = ShardedCollection.open(self.path).manifest
+            generation = _generation(self.path)
+            categories = list(manifest['tree'])
+            for category in dict.fromkeys(path[0] for path in paths if path):
+                if category not in manifest['tree']:
+                    continue
+                stored = load_report(os.path.join(self.path, manifest['tree'][category]['shard']['file']))
+                for path in paths:
+                    if path[:1] == (category,):
+                        target = _find(stored, path[1:])
+                        if target is not None:
+                            merge(path, target)
+                entry = _stub(stored)
+                entry['shard'] = _write_shard(self.path, categories.index(category), generation, stored)
+                manifest['tree'][category] = entry
+            if () in paths:
+                merge((), manifest['total'])
+            _commit(self.path, manifest)
+        self.manifest = manifest
+
+
+def _find(node: Dict[str, Any], path: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    for name in path:
+        node = node.get('children', {}).get(name)
+        if node is None:
+            return None
+    return node
+
+
+# =============================================================================
+# ENTRY POINTS
+# =============================================================================
+
+def open_collection(path: str) -> Optional[ShardedCollection]:
+    """
+    Open a cached collection: the sharded directory at `path`, else a
+    single-file collection `path`<suffix> in any report_store format (or
+    `path` itself if it has one). Returns None if there is neither.
+    """
+    base = strip_format(path)
+    if is_sharded(base):
+        return ShardedCollection.open(base)
+    single = path if format_of(path) and os.path.isfile(path) else find_report(base)
+    if single:
+        return ShardedCollection(single, load_report(single))
+    return None
+
+
+def collection_exists(path: str) -> bool:
+    base = strip_format(path)
+    return is_sharded(base) or find_report(base) is not None
+
+
+def save_collection(data: Dict[str, Any], path: str) -> None:
+    """Write a collection atomically: as one report file if path has a report_store suffix, else sharded."""
+    if format_of(path):
+        save_report(data, path)
+    else:
+        write_sharded(data, path)
@@ -0,0 +1,191 @@
+"""
+shared_reports.py - Process-Wide Read-Mostly Report Store
+
+Every Streamlit session used to load its own copy of the report into
+st.session_state.report_data, so ten analysts viewing the same quarter held
+ten copies in RAM. SharedReports keeps one opened collection (shards.py) per
+cache path for the whole app process; sessions hold only the path and their
+nav_path and look the collection up on every rerun, so memory stays flat as
+sessions are added.
+
+    get(path)         the shared collection, opened once (concurrent first
+                      opens coalesce via single_flight.py); re-opened when
+                      the files on disk change (a new collection was written)
+    ensure(path, nav) reads the category shard the page needs, once for all
+    open_node(...)    lazy.py drill-down on the shared data: concurrent
+                      sessions opening the same node share one fill
+    diff(a, b)        snapshot diff of two cached collections, kept with them
+                      (lazy ones get every node's summary_kpis first)
+
+At most max_entries collections are held; the least recently used is
+dropped (sessions still rendering it keep their reference until the rerun
+ends). Shared data is only ever changed by lazy fills, which replace a
+node's analysis dict in one assignment, so readers never see half a node.
+
+USAGE:
+    reports = SharedReports()                   # once per process (st.cache_resource)
+    collection = reports.get(cache_path)        # None if nothing is cached there
+    reports.ensure(cache_path, nav_path)
+    reports.open_node(cache_path, nav_path)     # lazy collections only
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import COLLECTION_MAX_CONCURRENT, SHARED_REPORTS_MAX_ENTRIES
+from .lazy import open_node, open_summaries
+from .report_store import find_report, format_of, strip_format
+from .shards import MANIFEST, ShardedCollection, is_sharded, open_collection
+from .single_flight import SingleFlight
+from .snapshot_diff import SnapshotDiff, diff_collections
+
+
+Signature = Optional[Tuple[int, int]]
+
+
+def _signature(path: str) -> Signature:
+    """(mtime_ns, size) of the file that changes when the collection at path is rewritten, or None."""
+    base = strip_format(path)
+    if is_sharded(base):
+        target = os.path.join(base, MANIFEST)
+    elif format_of(path) and os.path.isfile(path):
+        target = path
+    else:
+        target = find_report(base)
+    if target is None:
+        return None
+    try:
+        stat = os.stat(target)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _Entry:
+    def __init__(self, collection: ShardedCollection, signature: Signature):
+        self.collection = collection
+        self.signature = signature
+        self.lock = threading.Lock()
+        self.diffs: Dict[str, Tuple[Signature, SnapshotDiff]] = {}
+
+
+class SharedReports:
+    """One opened collection per cache path, shared by every session of the process."""
+
+    def __init__(self, max_entries: int = SHARED_REPORTS_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._opens = SingleFlight(self.max_entries)
+        self._fills = SingleFlight(COLLECTION_MAX_CONCURRENT)
+        self._stats = {'hits': 0, 'opens': 0, 'reopens': 0, 'evictions': 0}
+
+    def _entry(self, path: str) -> Optional[_Entry]:
+        signature = _signature(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(path)
+                self._stats['hits'] += 1
+                return entry
+        if signature is None:
+            return None
+
+        def load() -> Optional[_Entry]:
+            collection = open_collection(path)
+            return _Entry(collection, signature) if collection else None
+
+        entry = self._opens.do((path, signature), load)
+        if entry is None:
+            return None
+        with self._lock:
+            current = self._entries.get(path)
+            if current is not None and current.signature == signature:
+                return current          # another caller stored the same version first
+            self._stats['reopens' if current is not None else 'opens'] += 1
+            self._entries[path] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return entry
+
+    def get(self, path: str) -> Optional[ShardedCollection]:
+        """The shared collection cached at path (sharded or single file), or None."""
+        entry = self._entry(path)
+        return entry.collection if entry else None
+
+    def ensure(self, path: str, nav_path: List[str]) -> Optional[ShardedCollection]:
+        """get(path) with the shard of nav_path's category loaded."""
+        entry = self._entry(path)
+        if entry is None:
+            return None
+        with entry.lock:
+            entry.collection.ensure_path(nav_path)
+        return entry.collection
+
+    def open_node(self, path: str, nav_path: List[str], connect: Optional[Callable[[], Any]] = None) -> bool:
+        """
+        lazy.open_node on the shared collection, persisted to its cache;
+        sessions opening the same node at once share one fill. Returns
+        whether this call (or the fill it joined) computed anything.
+        """
+        entry = self._entry(path)
+        if entry is None:
+            return False
+        node_path = tuple(nav_path)
+
+        def fill() -> bool:
+            changed = open_node(entry.collection.data, node_path, entry.collection.path, connect)
+            if changed:
+                # Our own write: the in-memory collection already has it
+                with self._lock:
+                    entry.signature = _signature(path)
+            return changed
+
+        return self._fills.do((path, node_path), fill)
+
+    def diff(
+        self,
+        before_path: str,
+        after_path: str,
+        connect: Optional[Callable[[], Any]] = None,
+    ) -> Optional[SnapshotDiff]:
+        """
+        Snapshot diff of two cached collections (all shards read), computed
+        once per version pair. Lazy collections first get summary_kpis for
+        every node (lazy.open_summaries, persisted), else the nodes nobody
+        opened would read as unchanged.
+        """
+        before, after = self._entry(before_path), self._entry(after_path)
+        if before is None or after is None:
+            return None
+        with before.lock:
+            cached = before.diffs.get(after_path)
+            if cached and cached[0] == after.signature:
+                return cached[1]
+            before.collection.load_all()
+        with after.lock:
+            after.collection.load_all()
+        for path, entry in ((before_path, before), (after_path, after)):
+            self._fill_summaries(path, entry, connect)
+        result = diff_collections(before.collection.data, after.collection.data)
+        with before.lock:
+            before.diffs[after_path] = (after.signature, result)
+        return result
+
+    def _fill_summaries(self, path: str, entry: _Entry, connect: Optional[Callable[[], Any]]) -> None:
+        def fill() -> bool:
+            changed = open_summaries(entry.collection.data, entry.collection.path, connect)
+            if changed:
+                with self._lock:
+                    entry.signature = _signature(path)
+            return changed
+
+        self._fills.do((path, 'summaries'), fill)
+
+    def stats(self) -> Dict[str, int]:
+        """hits, opens, reopens (files changed on disk), evictions and the entries held now."""
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
@@ -0,0 +1,85 @@
+"""
+single_flight.py - Coalesce Concurrent Requests for the Same Collection
+
+Streamlit serves every user session from a thread of one process. When two
+users ask for an uncached quarter/snapshot at once, the second
+collect_all_data call finds the collection's lock taken and returns {}.
+SingleFlight.do(key, fn) instead runs fn once per key: the first caller (the
+leader) runs it, callers arriving while it is in flight wait and all receive
+the leader's result (or its exception). Different keys run independently, at
+most max_concurrent at a time; leaders over the limit queue for a slot.
+
+Nothing is cached once a call finishes: the next request for the key runs
+fn again (callers read their cache file first).
+
+USAGE:
+    flights = SingleFlight(max_concurrent=2)
+    data = flights.do(('FY2026-Q4', '2026-02-03', None), lambda: collect(...))
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .config import COLLECTION_MAX_CONCURRENT
+
+
+class _Call:
+    """One in-flight call and the callers waiting for it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Per-key request coalescing with a cap on concurrently running keys."""
+
+    def __init__(self, max_concurrent: int = COLLECTION_MAX_CONCURRENT):
+        self.max_concurrent = max(1, max_concurrent)
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {'calls': 0, 'runs': 0, 'coalesced': 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the run already in flight and share its result."""
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats['runs'] += 1
+            else:
+                call.waiters += 1
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            with self._slots:
+                call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> Dict[Hashable, int]:
+        """Keys running or queued for a slot, with how many callers wait on each."""
+        with self._lock:
+            return {key: call.waiters for key, call in self._calls.items()}
+
+    def stats(self) -> Dict[str, int]:
+        """calls (all do() calls), runs (fn executions) and coalesced (calls that waited)."""
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,298 @@
+"""
+snapshot_diff.py - What Changed Between Two run_date Snapshots
+
+Two collections of the same quarter from different snapshots differ where
+history was restated or revenue arrived late. diff_collections() flattens
+each v6 JSON once into columnar frames, one row per node for summary_kpis
+and one row per parent x child for children_breakdown, both indexed by node
+path (('Analytics', 'BI') etc., () for the total). The two snapshots are then
+aligned on that index and every metric's before / after / delta is computed
+as whole-column NumPy arithmetic, so the cost is one pass over each file plus
+a few vector operations, whatever the hierarchy size.
+
+A node present on one side only has status 'added' or 'removed'; its
+revenue-type metrics count as 0 on the missing side, percentages stay NULL.
+A node without summary_kpis on a side that has it (a lazy collection's node
+nobody opened) is 'unknown', never 'unchanged': diff_files() and
+diff_run_dates() fill lazy collections' summary_kpis first (lazy.py), so
+this only remains if that fill failed.
+SnapshotDiff.restatements() ranks the individual node x metric changes of
+actuals (QTD, prior quarter, prior year revenue) by absolute size.
+
+USAGE:
+    diff = diff_files('cache/l1_FY2026-Q3_2026-01-20_all', 'cache/l1_FY2026-Q3_2026-02-03_all')
+    diff.nodes.loc[[('Analytics',)]]                 # qtd_revenue_before / _after / _delta, ...
+    diff.restatements(limit=10, level='feature')
+"""
+
+import os
+from dataclasses import dataclass
+from datetime import date
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import HIERARCHY
+from .collector import collect_all_data
+from .cube import STANDARD_COLUMNS
+from .customers import KPI_COLUMNS
+from .lazy import open_summaries
+from .shards import open_collection, save_collection
+
+
+NodePath = Tuple[str, ...]
+
+SUMMARY_METRICS = KPI_COLUMNS
+BREAKDOWN_METRICS = STANDARD_COLUMNS
+
+# Actuals metrics a restatement or late-arriving revenue moves
+RESTATEMENT_METRICS = ["qtd_revenue", "prior_q_revenue", "prior_year_revenue"]
+
+STATUS_CHANGED, STATUS_UNCHANGED = "changed", "unchanged"
+STATUS_ADDED, STATUS_REMOVED = "added", "removed"
+STATUS_UNKNOWN = "unknown"
+
+
+# =============================================================================
+# FLATTENING
+# =============================================================================
+
+def _path_index(paths: List[NodePath]) -> pd.Index:
+    """Object index of path tuples (not a MultiIndex: paths have different lengths)."""
+    return pd.Index(paths, tupleize_cols=False, dtype=object, name="path")
+
+
+def _metric_matrix(rows: List[Dict[str, Any]], metrics: List[str]) -> np.ndarray:
+    """rows x metrics float matrix, None -> NaN."""
+    if not rows:
+        return np.empty((0, len(metrics)))
+    try:
+        # Every row of an analysis has the same keys: pick them in C
+        values = list(map(itemgetter(*metrics), rows))
+    except KeyError:
+        values = [[row.get(m) for m in metrics] for row in rows]
+    return np.array(values, dtype=float).reshape(len(rows), len(metrics))
+
+
+def flatten_collection(data: Dict[str, Any]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    One collection as (nodes, children) frames.
+
+    nodes: index node path, columns level + SUMMARY_METRICS + collected
+    (False where the node has no summary_kpis).
+    children: index child path, columns level + BREAKDOWN_METRICS, from each
+    parent's children_breakdown rows.
+    """
+    paths: List[NodePath] = []
+    levels: List[str] = []
+    kpis: List[Dict[str, Any]] = []
+    collected: List[bool] = []
+    child_paths: List[NodePath] = []
+    child_levels: List[str] = []
+    breakdown: List[Dict[str, Any]] = []
+
+    stack: List[Tuple[NodePath, Dict[str, Any]]] = [((), data.get('total', {}))]
+    stack.extend(((name,), node) for name, node in reversed(list(data.get('hierarchy', {}).items())))
+    while stack:
+        path, node = stack.pop()
+        analysis = node.get('analysis', {})
+        level = node.get('level', 'unknown')
+        paths.append(path)
+        levels.append(level)
+        kpis.append(analysis.get('summary_kpis') or {})
+        collected.append('summary_kpis' in analysis)
+
+        children = node.get('children', {}) if path else {}
+        child_level = HIERARCHY[level].child_level if level in HIERARCHY else None
+        rows = analysis.get('children_breakdown') or []
+        child_paths.extend([path + (row.get('entity'),) for row in rows])
+        child_levels.extend([child_level] * len(rows))
+        breakdown.extend(rows)
+        stack.extend((path + (name,), child) for name, child in reversed(list(children.items())))
+
+    nodes = pd.DataFrame(_metric_matrix(kpis, SUMMARY_METRICS), columns=SUMMARY_METRICS, index=_path_index(paths))
+    nodes.insert(0, 'level', levels)
+    nodes['collected'] = np.array(collected, dtype=bool)
+    children = pd.DataFrame(
+        _metric_matrix(breakdown, BREAKDOWN_METRICS), columns=BREAKDOWN_METRICS, index=_path_index(child_paths))
+    children.insert(0, 'level', child_levels)
+    return nodes, children
+
+
+# =============================================================================
+# DIFF
+# =============================================================================
+
+def _is_amount(metric: str) -> bool:
+    """Revenue-type metrics count as 0 where a node is missing; percentages do not."""
+    return not metric.endswith('pct')
+
+
+def _diff_frames(before: pd.DataFrame, after: pd.DataFrame, metrics: List[str]) -> pd.DataFrame:
+    """Outer-align two flattened frames and add before / after / delta columns per metric."""
+    index = after.index.append(before.index[~before.index.isin(after.index)])
+    in_before = index.isin(before.index)
+    in_after = index.isin(after.index)
+    b = before.reindex(index)
+    a = after.reindex(index)
+
+    frame = pd.DataFrame({'level': a['level'].where(in_after, b['level'])}, index=index)
+    changed = np.zeros(len(index), dtype=bool)
+    columns = {}
+    for metric in metrics:
+        old = b[metric].to_numpy()
+        new = a[metric].to_numpy()
+        if _is_amount(metric):
+            old = np.where(in_before, old, 0.0)
+            new = np.where(in_after, new, 0.0)
+        delta = new - old
+        # NULL on both sides is no change; NULL on one side is
+        changed |= (delta != 0) & ~np.isnan(delta) | (np.isnan(old) != np.isnan(new))
+        columns[f"{metric}_before"] = old
+        columns[f"{metric}_after"] = new
+        columns[f"{metric}_delta"] = delta
+    frame = pd.concat([frame, pd.DataFrame(columns, index=index)], axis=1)
+    frame.insert(1, 'status', np.select(
+        [~in_before, ~in_after, changed],
+        [STATUS_ADDED, STATUS_REMOVED, STATUS_CHANGED],
+        STATUS_UNCHANGED,
+    ))
+    return frame
+
+
+@dataclass
+class SnapshotDiff:
+    """
+    Aligned deltas of two collections.
+
+    nodes / children hold, per node path, `status`, `level` and
+    <metric>_before / _after / _delta for every SUMMARY_METRICS /
+    BREAKDOWN_METRICS metric.
+    """
+    before: Dict[str, Any]
+    after: Dict[str, Any]
+    nodes: pd.DataFrame
+    children: pd.DataFrame
+
+    def counts(self) -> Dict[str, int]:
+        """Nodes per status."""
+        counts = self.nodes['status'].value_counts()
+        return {s: int(counts.get(s, 0))
+                for s in (STATUS_CHANGED, STATUS_UNCHANGED, STATUS_ADDED, STATUS_REMOVED, STATUS_UNKNOWN)}
+
+    def node(self, path: NodePath) -> Optional[pd.Series]:
+        """One node's row, or None if neither snapshot has it."""
+        path = tuple(path)
+        return self.nodes.loc[[path]].iloc[0] if path in self.nodes.index else None
+
+    def restatements(
+        self,
+        limit: int = 20,
+        level: Optional[str] = None,
+        under: Optional[NodePath] = None,
+    ) -> pd.DataFrame:
+        """
+        Biggest actuals changes, one row per node x metric, largest |delta| first.
+
+        Columns: node, level, status, metric, before, after, delta, delta_pct.
+        `level` keeps one hierarchy level; `under` keeps a node's descendants
+        (() for everything below the total).
+        """
+        nodes = self.nodes
+        if level is not None:
+            nodes = nodes[nodes['level'].to_numpy() == level]
+        if under is not None:
+            under = tuple(under)
+            nodes = nodes[[p[:len(under)] == under and p != under for p in nodes.index]]
+
+        k = len(RESTATEMENT_METRICS)
+        before = nodes[[f"{m}_before" for m in RESTATEMENT_METRICS]].to_numpy().ravel()
+        after = nodes[[f"{m}_after" for m in RESTATEMENT_METRICS]].to_numpy().ravel()
+        delta = nodes[[f"{m}_delta" for m in RESTATEMENT_METRICS]].to_numpy().ravel()
+        magnitude = np.nan_to_num(np.abs(delta))
+        order = np.argsort(-magnitude, kind='stable')
+        order = order[magnitude[order] > 0][:limit]
+
+        rows = order // k
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta_pct = np.where(before[order] == 0, np.nan, np.round(100.0 * delta[order] / before[order], 2))
+        return pd.DataFrame({
+            'node': [' / '.join(p) or 'Total' for p in nodes.index[rows]],
+            'level': nodes['level'].to_numpy()[rows],
+            'status': nodes['status'].to_numpy()[rows],
+            'metric': np.array(RESTATEMENT_METRICS, dtype=object)[order % k],
+            'before': before[order],
+            'after': after[order],
+            'delta': delta[order],
+            'delta_pct': delta_pct,
+        })
+
+
+def diff_collections(before: Dict[str, Any], after: Dict[str, Any]) -> SnapshotDiff:
+    """Diff two v6 collections (earlier snapshot first)."""
+    before_meta, after_meta = before.get('metadata', {}), after.get('metadata', {})
+    if before_meta.get('fiscal_quarter') != after_meta.get('fiscal_quarter'):
+        print(f"WARNING: Comparing different quarters: "
+              f"{before_meta.get('fiscal_quarter')} vs {after_meta.get('fiscal_quarter')}")
+    before_nodes, before_children = flatten_collection(before)
+    after_nodes, after_children = flatten_collection(after)
+    nodes = _diff_frames(before_nodes, after_nodes, SUMMARY_METRICS)
+    # NaN on both sides would otherwise read as no change
+    uncollected = np.zeros(len(nodes), dtype=bool)
+    for side in (before_nodes, after_nodes):
+        uncollected |= ~side['collected'].reindex(nodes.index, fill_value=True).to_numpy(dtype=bool)
+    nodes.loc[uncollected, 'status'] = STATUS_UNKNOWN
+    return SnapshotDiff(
+        before=before_meta,
+        after=after_meta,
+        nodes=nodes,
+        children=_diff_frames(before_children, after_children, BREAKDOWN_METRICS),
+    )
+
+
+def diff_files(before_path: str, after_path: str) -> SnapshotDiff:
+    """Diff two cached collections (JSON files or sharded directories); lazy ones are filled first."""
+    before, after = (open_collection(path) for path in (before_path, after_path))
+    for path, collection in ((before_path, before), (after_path, after)):
+        if collection is None:
+            raise FileNotFoundError(path)
+        open_summaries(collection.load_all(), collection.path)
+    return diff_collections(before.data, after.data)
+
+
+def collection_path(cache_dir: str, fiscal_quarter: str, run_date: date, category: Optional[str] = None) -> str:
+    """Cache path of a collection (same naming as app.get_cache_path)."""
+    suffix = f"_{category.replace('/', '_').replace(' ', '_')}" if category else "_all"
+    return os.path.join(cache_dir, f"l1_{fiscal_quarter}_{run_date}{suffix}")
+
+
+def diff_run_dates(
+    fiscal_quarter: str,
+    before_run_date: date,
+    after_run_date: date,
+    cache_dir: str,
+    category: Optional[str] = None,
+) -> Optional[SnapshotDiff]:
+    """
+    Diff a quarter's collections of two snapshots.
+
+    Reads each from cache_dir; a snapshot without a cached collection is
+    collected first (and cached). Returns None if a collection fails.
+    """
+    collections = []
+    for run_date in (before_run_date, after_run_date):
+        path = collection_path(cache_dir, fiscal_quarter, run_date, category)
+        cached = open_collection(path)
+        if cached is not None:
+            open_summaries(cached.load_all(), cached.path)
+            collections.append(cached.data)
+            continue
+        print(f"No cached collection for {run_date}, collecting...")
+        data = collect_all_data(fiscal_quarter, None, run_date=run_date, filter_category=category)
+        if not data:
+            return None
+        save_collection(data, path)
+        collections.append(data)
+    return diff_collections(*collections)
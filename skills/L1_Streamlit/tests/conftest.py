@@ -0,0 +1,47 @@
+"""
+Shared fixtures: the DuckDB warehouse stand-in from benchmarks/warehouse.py
+(pip install duckdb), built once per session at the small scale.
+"""
+
+import os
+import sys
+from datetime import date
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "..", "..", "benchmarks"))
+
+FISCAL_QUARTER = "FY2026-Q3"
+# Two snapshots two weeks apart, both inside FISCAL_QUARTER
+RUN_DATES = (date(2026, 1, 20), date(2026, 2, 3))
+
+
+@pytest.fixture(scope="session")
+def warehouse():
+    """The small-scale warehouse with one snapshot per RUN_DATES entry."""
+    pytest.importorskip("duckdb")
+    from warehouse import Scale, build_warehouse
+
+    import scripts.fiscal_calendar as fiscal_calendar
+    fiscal_calendar.CACHE_DIR = None
+
+    scale = Scale.small()
+    scale.run_dates = RUN_DATES
+    return build_warehouse(scale)
+
+
+@pytest.fixture(scope="session")
+def run_dates(warehouse):
+    return RUN_DATES
+
+
+@pytest.fixture(scope="session")
+def fiscal_dates(warehouse):
+    from scripts.fiscal import get_fiscal_dates
+    conn = warehouse.connect()
+    try:
+        return get_fiscal_dates(conn, FISCAL_QUARTER)
+    finally:
+        conn.close()
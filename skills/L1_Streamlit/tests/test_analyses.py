@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+import pyarrow as pa
+import pytest
+
+from scripts.analyses import add_cumulative_vs_plan, add_cumulative_vs_plan_columns
+from scripts.db import ColumnarResult, to_json_safe
+
+
+def test_cumulative_vs_plan_columns_with_decimal_input():
+    # Snowflake returns NUMBER(38,0) sums as decimal128(38,0)
+    decimal = pa.decimal128(38, 0)
+    table = pa.table({
+        'ds': ['2025-08-01', '2025-08-02', '2025-08-03'],
+        'cumulative_revenue': pa.array([Decimal(250), Decimal(10**30), Decimal(5)], decimal),
+        'cumulative_plan': pa.array([Decimal(200), Decimal(3 * 10**29), None], decimal),
+    })
+    result = ColumnarResult(table)
+    add_cumulative_vs_plan_columns(result)
+
+    assert result.column('vs_plan').type == pa.float64()
+    rows = to_json_safe(result)
+    assert rows[0]['vs_plan'] == 50.0 and rows[0]['vs_plan_pct'] == 25.0
+    assert rows[1]['vs_plan'] == pytest.approx(7e29) and rows[1]['vs_plan_pct'] == round(700 / 3, 2)
+    assert 'vs_plan' not in rows[2] and 'vs_plan_pct' not in rows[2]
+
+
+def test_cumulative_vs_plan_columns_match_row_based():
+    table = pa.table({
+        'cumulative_revenue': [120.0, 80.0, 30.0],
+        'cumulative_plan': [100.0, 0.0, None],
+    })
+    result = ColumnarResult(table)
+    add_cumulative_vs_plan_columns(result)
+
+    rows = table.to_pylist()
+    add_cumulative_vs_plan(rows)
+    assert to_json_safe(result) == rows
@@ -0,0 +1,54 @@
+import os
+import time
+
+from scripts.cache_index import CacheIndex
+from scripts.report_store import save_report
+
+CURRENT = {"version": "v6"}
+
+
+def _write(directory, name, size, metadata=CURRENT):
+    path = os.path.join(str(directory), name)
+    save_report({"metadata": metadata, "padding": "x" * size}, path + ".json")
+    return path
+
+
+def test_least_recently_opened_is_evicted_over_max_bytes(tmp_path):
+    index = CacheIndex(str(tmp_path), max_bytes=2500)
+    first = _write(tmp_path, "l1_first", 1000)
+    index.record(first, CURRENT)
+    second = _write(tmp_path, "l1_second", 1000)
+    index.record(second, CURRENT)
+    index.touch(first)
+    third = _write(tmp_path, "l1_third", 1000)
+    index.record(third, CURRENT)
+
+    assert index.lookup(second) is None and not os.path.exists(second + ".json")
+    assert index.lookup(first) is not None and index.lookup(third) is not None
+    assert index.stats()["collections"] == 2
+
+
+def test_unopened_collections_expire(tmp_path):
+    index = CacheIndex(str(tmp_path), ttl_seconds=0.2)
+    path = _write(tmp_path, "l1_old", 10)
+    index.record(path, CURRENT)
+    assert index.lookup(path) is not None
+    time.sleep(0.3)
+    assert index.lookup(path) is None
+    assert index.evict() == ["l1_old"]
+    assert not os.path.exists(path + ".json")
+
+
+def test_other_versions_are_invalid(tmp_path):
+    index = CacheIndex(str(tmp_path))
+    old = _write(tmp_path, "l1_old", 10, {"version": "v5"})
+    index.record(old, {"version": "v5"})
+    assert index.lookup(old) is None
+    # adopt() deletes an invalid entry's files instead of indexing them
+    assert index.adopt(old) is None and not os.path.exists(old + ".json")
+
+    unindexed = _write(tmp_path, "l1_unindexed", 10, {"version": "v5"})
+    assert index.adopt(unindexed) is None and not os.path.exists(unindexed + ".json")
+    current = _write(tmp_path, "l1_current", 10)
+    assert index.sync() == {"dropped": 0, "adopted": 1, "evicted": 0}
+    assert index.lookup(current) is not None
@@ -0,0 +1,52 @@
+import json
+from datetime import date
+
+from scripts.checkpoint import CheckpointJournal, journal_path
+
+RUN_DATE = date(2026, 2, 3)
+
+
+def _journal(directory, resume=False, category=None):
+    return CheckpointJournal.open(str(directory), "FY2026-Q3", RUN_DATE, category, resume=resume)
+
+
+def test_resume_drops_a_torn_last_line(tmp_path):
+    journal = _journal(tmp_path)
+    journal.record((), {"summary_kpis": {"qtd_revenue": 1.0}}, ["A", "B"])
+    journal.record(("A",), {"summary_kpis": {"qtd_revenue": 0.5}}, [])
+    journal.close()
+    with open(journal.path, "a") as f:
+        f.write('{"path": ["B"], "analysis": {"summ')   # killed mid-write
+
+    resumed = _journal(tmp_path, resume=True)
+    assert set(resumed.nodes) == {(), ("A",)}
+    assert resumed.get(("A",)) == ({"summary_kpis": {"qtd_revenue": 0.5}}, [])
+    resumed.close()
+    # The journal was rewritten without the torn line
+    with open(resumed.path) as f:
+        assert all(json.loads(line) for line in f)
+
+
+def test_resume_ignores_another_collections_journal(tmp_path):
+    journal = _journal(tmp_path)
+    journal.record((), {}, ["A"])
+    journal.close()
+    header = dict(journal.header, version="v0")
+    with open(journal.path) as f:
+        lines = f.readlines()
+    with open(journal.path, "w") as f:
+        f.writelines([json.dumps(header) + "\n"] + lines[1:])
+
+    assert CheckpointJournal.peek(str(tmp_path), "FY2026-Q3", RUN_DATE) == {}
+    assert _journal(tmp_path, resume=True).nodes == {}
+
+
+def test_journal_per_category_and_remove(tmp_path):
+    everything = _journal(tmp_path)
+    analytics = _journal(tmp_path, category="Data Analytics")
+    assert everything.path != analytics.path
+    assert analytics.path == journal_path(str(tmp_path), "FY2026-Q3", RUN_DATE, "Data Analytics")
+    analytics.record((), {}, ["Data Analytics"])
+    analytics.remove()
+    everything.remove()
+    assert list(tmp_path.iterdir()) == []
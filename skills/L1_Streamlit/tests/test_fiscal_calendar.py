@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+import scripts.fiscal_calendar as fiscal_calendar
+from scripts.fiscal_calendar import FiscalCalendar, fetch_utc_offset
+
+
+class ClockCursor:
+    sfqid = None
+
+    def __init__(self, now):
+        self.now = now
+
+    def execute(self, query):
+        assert "CURRENT_TIMESTAMP()" in query
+
+    def fetchone(self):
+        return (self.now,)
+
+    def close(self):
+        pass
+
+
+class ClockConn:
+    def __init__(self, now):
+        self.now = now
+
+    def cursor(self):
+        return ClockCursor(self.now)
+
+
+def test_utc_offset_from_aware_and_naive_timestamps():
+    india = timezone(timedelta(hours=5, minutes=30))
+    assert fetch_utc_offset(ClockConn(datetime.now(india))) == timedelta(hours=5, minutes=30)
+    # A naive session timestamp: its distance from UTC
+    pacific = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=8)
+    assert fetch_utc_offset(ClockConn(pacific)) == timedelta(hours=-8)
+
+
+def test_today_follows_the_session_clock(monkeypatch):
+    for hours in (-12, 0, 14):
+        offset = timedelta(hours=hours)
+        monkeypatch.setattr(fiscal_calendar, "_session_utc_offset", offset)
+        assert fiscal_calendar.today() == datetime.now(timezone(offset)).date()
+
+
+def test_offset_is_cached_with_the_calendar(warehouse, monkeypatch):
+    monkeypatch.setattr(fiscal_calendar, "_session_utc_offset", None)
+    monkeypatch.setattr(fiscal_calendar, "_loaded", {})
+    conn = warehouse.connect()
+    try:
+        calendar = fiscal_calendar.load_calendar(conn)
+    finally:
+        conn.close()
+    assert calendar.utc_offset is not None
+    assert fiscal_calendar._session_utc_offset == calendar.utc_offset
+    assert FiscalCalendar.from_json(calendar.to_json()).utc_offset == calendar.utc_offset
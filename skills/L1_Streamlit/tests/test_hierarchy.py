@@ -0,0 +1,34 @@
+import contextlib
+import io
+
+import pytest
+
+import scripts.collector as collector
+from scripts.hierarchy import HierarchyIndex, fetch_hierarchy
+from scripts.shards import open_collection, save_collection
+
+from conftest import FISCAL_QUARTER
+
+
+def test_index_from_cached_manifest_matches_query(warehouse, fiscal_dates, run_dates, tmp_path):
+    run_date = run_dates[1]
+    path = str(tmp_path / "collection")
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = collector.collect_all_data(FISCAL_QUARTER, None, run_date=run_date, engine="batch",
+                                          checkpoint_dir=None, lazy=True, connect=warehouse.connect)
+    save_collection(data, path)
+    conn = warehouse.connect()
+    try:
+        expected = fetch_hierarchy(conn, fiscal_dates, run_date)
+    finally:
+        conn.close()
+
+    queries = warehouse.queries
+    index = HierarchyIndex.from_collection(open_collection(path).data, run_date, fiscal_dates)
+    assert warehouse.queries == queries
+    assert index.counts() == expected.counts()
+    for level in ('category', 'use_case', 'feature'):
+        assert index.level_nodes(level) == expected.level_nodes(level)
+    for path in [()] + expected.level_nodes('category'):
+        assert index.size(path).revenue == pytest.approx(expected.size(path).revenue, abs=1)  # summary_kpis rounds to dollars
+        assert index.size(path).customers is None
@@ -0,0 +1,40 @@
+from scripts.config import ACTUALS_TABLE
+from scripts.incremental import fetch_node_fingerprints
+
+
+def fingerprints(warehouse, dates, run_date):
+    conn = warehouse.connect()
+    try:
+        return fetch_node_fingerprints(conn, dates, run_date)
+    finally:
+        conn.close()
+
+
+def test_fingerprints_are_stable(warehouse, fiscal_dates, run_dates):
+    assert fingerprints(warehouse, fiscal_dates, run_dates[1]) == fingerprints(warehouse, fiscal_dates, run_dates[1])
+
+
+def test_fingerprints_detect_customer_rename(warehouse, fiscal_dates, run_dates):
+    """A rename keeps every row count, revenue total and customer count; only the content hash sees it."""
+    run_date = run_dates[1]
+    category, use_case, feature, customer = warehouse.db.execute(f"""
+        SELECT product_category, use_case, feature, latest_salesforce_account_name
+        FROM {ACTUALS_TABLE}
+        WHERE run_date = '{run_date}' AND ds BETWEEN '{fiscal_dates.q_start}' AND '{fiscal_dates.effective_end}'
+        ORDER BY revenue DESC LIMIT 1
+    """).fetchone()
+    before = fingerprints(warehouse, fiscal_dates, run_date)
+
+    rename = f"""
+        UPDATE {ACTUALS_TABLE} SET latest_salesforce_account_name = ?
+        WHERE run_date = '{run_date}' AND feature = ? AND latest_salesforce_account_name = ?
+    """
+    warehouse.db.execute(rename, ["Renamed Corp", feature, customer])
+    try:
+        after = fingerprints(warehouse, fiscal_dates, run_date)
+    finally:
+        warehouse.db.execute(rename, [customer, feature, "Renamed Corp"])
+
+    path = (category, use_case, feature)
+    changed = {p for p in before if before[p] != after.get(p)}
+    assert changed == {(), path[:1], path[:2], path}
@@ -0,0 +1,114 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import scripts.collector as collector
+from scripts.checkpoint import CheckpointJournal
+from scripts.jobs import (
+    JOB_CANCELLED, JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JobQueue, partial_collection, run_job,
+)
+
+from conftest import FISCAL_QUARTER
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"), str(tmp_path / "checkpoints"))
+
+
+@pytest.fixture
+def held_lock(run_dates):
+    """The collection lock of the later snapshot, as a run_collector.py run holds it."""
+    path = collector.lock_path(FISCAL_QUARTER, run_dates[1])
+    assert collector.acquire_lock(path)
+    yield path
+    collector.release_lock(path)
+
+
+def test_submit_returns_the_active_job_for_the_same_collection(queue):
+    job_id = queue.submit(FISCAL_QUARTER, "2026-02-03", output_path="a.json")
+    assert queue.submit(FISCAL_QUARTER, "2026-02-03", output_path="a.json") == job_id
+    assert queue.submit(FISCAL_QUARTER, "2026-02-03", output_path="b.json") != job_id
+    assert queue.submit(FISCAL_QUARTER, "2026-02-03", output_path="a.json", engine="batch") != job_id
+
+    queue.finish(queue.claim(os.getpid())['id'], JOB_DONE)
+    assert queue.submit(FISCAL_QUARTER, "2026-02-03", output_path="a.json") != job_id
+
+
+def test_cancel_queued_at_once_and_running_on_request(queue):
+    queued = queue.submit(FISCAL_QUARTER, "2026-02-03", category="A")
+    running = queue.submit(FISCAL_QUARTER, "2026-02-03", category="B")
+    queue.claim(os.getpid(), skip=[queued])
+
+    assert queue.cancel(queued) and queue.status(queued)['status'] == JOB_CANCELLED
+    assert queue.cancel(running)
+    job = queue.status(running)
+    assert job['status'] == JOB_RUNNING and job['cancel_requested']
+    assert queue.report(running, {'current_node': 'A'})
+    queue.finish(running, JOB_CANCELLED)
+    assert not queue.cancel(running)
+
+
+def test_reap_fails_the_jobs_of_an_exited_worker(queue):
+    worker = subprocess.Popen([sys.executable, "-c", "pass"])
+    worker.wait()
+    queue.register_worker(worker.pid)
+    job_id = queue.submit(FISCAL_QUARTER, "2026-02-03")
+    queue.claim(worker.pid)
+
+    assert queue.live_workers() == []
+    job = queue.status(job_id)
+    assert job['status'] == JOB_FAILED and job['error'] == f"Worker {worker.pid} exited"
+
+
+def test_partial_collection_keeps_only_finished_categories(queue):
+    nodes = {
+        (): ({'summary_kpis': {}}, ['A', 'B']),
+        ('A',): ({}, ['A1']),
+        ('A', 'A1'): ({}, []),
+        ('B',): ({}, ['B1', 'B2']),
+        ('B', 'B1'): ({}, []),
+    }
+    partial = partial_collection(nodes, FISCAL_QUARTER, "2026-02-03")
+    assert list(partial['hierarchy']) == ['A']
+    assert list(partial['hierarchy']['A']['children']) == ['A1']
+    assert partial['metadata']['partial'] and partial['metadata']['categories_done'] == 1
+    assert partial['metadata']['categories_total'] == 2
+    assert partial_collection(nodes, FISCAL_QUARTER, "2026-02-03", category='B')['hierarchy'] == {}
+
+    # JobQueue.partial() reads the running job's journal
+    job_id = queue.submit(FISCAL_QUARTER, "2026-02-03")
+    assert queue.partial(job_id) is None
+    journal = CheckpointJournal.open(queue.checkpoint_dir, FISCAL_QUARTER, "2026-02-03")
+    for path, (analysis, children) in nodes.items():
+        journal.record(path, analysis, children)
+    journal.close()
+    assert queue.partial(job_id)['hierarchy'] == partial['hierarchy']
+
+
+def test_locked_collection_leaves_job_queued(warehouse, run_dates, queue, held_lock, tmp_path, monkeypatch):
+    monkeypatch.setattr(collector, "get_connection", warehouse.connect)
+    output = str(tmp_path / "out.json")
+    job_id = queue.submit(FISCAL_QUARTER, run_dates[1], output_path=output, engine="batch", lazy=True)
+
+    assert run_job(queue, queue.claim(os.getpid())) == JOB_QUEUED
+    job = queue.status(job_id)
+    assert job['status'] == JOB_QUEUED and job['worker_pid'] is None and not job['error']
+    # A worker passes over it while the lock is held
+    assert queue.claim(os.getpid(), skip=[job_id]) is None
+
+    collector.release_lock(held_lock)
+    assert run_job(queue, queue.claim(os.getpid())) == JOB_DONE
+    assert os.path.exists(output)
+
+
+def test_locked_job_cancelled_meanwhile_ends_cancelled(warehouse, run_dates, queue, held_lock, monkeypatch):
+    monkeypatch.setattr(collector, "get_connection", warehouse.connect)
+    job_id = queue.submit(FISCAL_QUARTER, run_dates[1], lazy=True)
+    job = queue.claim(os.getpid())
+    queue.cancel(job_id)
+
+    assert run_job(queue, job) == JOB_CANCELLED
+    assert queue.status(job_id)['status'] == JOB_CANCELLED
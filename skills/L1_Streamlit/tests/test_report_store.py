@@ -0,0 +1,37 @@
+import pytest
+
+from scripts.report_store import (
+    decode_packed, encode_packed, find_report, load_report, pack, save_report, strip_format,
+)
+
+REPORT = {
+    "metadata": {"version": "v6"},
+    "rows": [{"customer": "a", "revenue": 1.5}, {"customer": "b", "revenue": None}],
+    "single": [{"customer": "a"}],
+    "mixed": [{"a": 1}, {"b": 2}],
+    "nested": {"top": [{"name": "x", "children": [{"k": 1}, {"k": 2}]}, {"name": "y", "children": []}]},
+    "scalars": [1, "two", None],
+}
+
+
+def test_pack_turns_same_keyed_rows_into_tables():
+    packed = pack(REPORT)
+    assert packed["rows"] == {"~cols": ["customer", "revenue"], "~rows": [["a", 1.5], ["b", None]]}
+    assert packed["single"] == [{"customer": "a"}]
+    assert packed["mixed"] == [{"a": 1}, {"b": 2}]
+    assert packed["nested"]["top"]["~rows"][0][1] == {"~cols": ["k"], "~rows": [[1], [2]]}
+
+
+def test_packed_round_trip():
+    assert decode_packed(encode_packed(REPORT)) == REPORT
+
+
+@pytest.mark.parametrize("suffix", [".json", ".json.gz", ".json.zst"])
+def test_save_and_load_every_format(tmp_path, suffix):
+    if suffix == ".json.zst":
+        pytest.importorskip("pyarrow")
+    path = str(tmp_path / ("report" + suffix))
+    save_report(REPORT, path)
+    assert load_report(path) == REPORT
+    assert strip_format(path) == str(tmp_path / "report")
+    assert find_report(str(tmp_path / "report")) == path
@@ -0,0 +1,66 @@
+from datetime import date
+
+import pyarrow as pa
+
+from scripts import result_cache as result_cache_module
+from scripts.config import ACTUALS_TABLE, CALENDAR_TABLE, PLAN_TABLE
+from scripts.result_cache import ResultCache
+
+NEWEST = date(2026, 2, 3)
+OLDER = f"SELECT SUM(revenue) FROM {ACTUALS_TABLE} a WHERE a.run_date = '2026-01-20'"
+NEWEST_QUERY = f"SELECT SUM(revenue) FROM {ACTUALS_TABLE} WHERE run_date = '{NEWEST}'"
+PLAN = f"SELECT SUM(plan) FROM {PLAN_TABLE}"
+
+
+class Conn:
+    account, user, role = "acct", "user", "role"
+
+
+def cache(tmp_path, ttl_seconds=0, newest=NEWEST, max_bytes=10 ** 9):
+    return ResultCache(str(tmp_path), max_bytes, ttl_seconds=ttl_seconds, newest_run_date=newest)
+
+
+def test_only_older_snapshots_are_immutable(tmp_path):
+    c = cache(tmp_path)
+    assert c.immutable(OLDER)
+    assert not c.immutable(NEWEST_QUERY)
+    assert not c.immutable(PLAN)
+    assert not c.immutable(f"SELECT * FROM {CALENDAR_TABLE}")
+    # An older snapshot joined with the plan still reads a table that is reloaded in place
+    assert not c.immutable(f"{OLDER} UNION ALL SELECT SUM(plan) FROM {PLAN_TABLE}")
+    # Unknown newest snapshot: nothing is immutable
+    assert not cache(tmp_path, newest=None).immutable(OLDER)
+
+
+def test_mutable_queries_are_skipped_without_ttl(tmp_path):
+    c = cache(tmp_path)
+    assert c.key(Conn(), OLDER) is not None
+    assert c.key(Conn(), NEWEST_QUERY) is None
+    assert c.key(Conn(), PLAN) is None
+    assert c.key(Conn(), f"{OLDER} AND ds <= CURRENT_DATE()") is None
+    assert c.stats()["skipped"] == 3
+
+
+def test_mutable_queries_expire_with_their_ttl_window(tmp_path, monkeypatch):
+    c = cache(tmp_path, ttl_seconds=3600)
+    now = [1_000_000 * 3600.0]
+    monkeypatch.setattr(result_cache_module.time, "time", lambda: now[0])
+    plan_key, older_key = c.key(Conn(), PLAN), c.key(Conn(), OLDER)
+    assert plan_key is not None
+
+    now[0] += 3600
+    assert c.key(Conn(), PLAN) != plan_key
+    assert c.key(Conn(), OLDER) == older_key
+
+
+def test_put_get_and_lru_eviction(tmp_path):
+    table = pa.table({"x": list(range(1000))})
+    c = cache(tmp_path)
+    c.put("a", table)
+    assert c.get("a").equals(table)
+    assert c.get("missing") is None
+
+    c.max_bytes = c.size() + 1
+    c.put("b", table)
+    assert c.get("a") is None and c.get("b").equals(table)
+    assert c.stats()["hits"] == 2 and c.stats()["misses"] == 2
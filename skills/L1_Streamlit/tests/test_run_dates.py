@@ -0,0 +1,33 @@
+from datetime import date
+
+from scripts.run_dates import RunDateCatalog, Snapshot
+
+
+def _snapshot(day, rows=100):
+    return Snapshot(date(2026, 2, day), rows, date(2025, 2, 1), date(2026, 2, day) if day > 1 else None)
+
+
+def test_incremental_merge_replaces_from_since():
+    catalog = RunDateCatalog([_snapshot(1), _snapshot(2), _snapshot(3, rows=50)], 10.0, 5.0)
+    # The newest snapshot was still loading; a refresh re-reads it and finds one more
+    merged = catalog.merged([_snapshot(3), _snapshot(4)], since=date(2026, 2, 3), now=20.0)
+
+    assert merged.run_dates() == [date(2026, 2, day) for day in (4, 3, 2, 1)]
+    assert merged.get("2026-02-03").rows == 100
+    assert merged.newest() == date(2026, 2, 4)
+    assert (merged.refreshed_at, merged.full_refreshed_at) == (20.0, 5.0)
+    assert catalog.newest() == date(2026, 2, 3)
+
+
+def test_full_merge_drops_deleted_snapshots():
+    catalog = RunDateCatalog([_snapshot(1), _snapshot(2)], 10.0, 5.0)
+    merged = catalog.merged([_snapshot(2)], since=None, now=20.0)
+    assert merged.run_dates() == [date(2026, 2, 2)]
+    assert merged.full_refreshed_at == 20.0
+
+
+def test_json_round_trip():
+    catalog = RunDateCatalog([_snapshot(1), _snapshot(2)], 10.0, 5.0)
+    restored = RunDateCatalog.from_json(catalog.to_json())
+    assert restored.snapshots == catalog.snapshots
+    assert (restored.refreshed_at, restored.full_refreshed_at) == (10.0, 5.0)
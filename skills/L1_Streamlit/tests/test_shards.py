@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from scripts.shards import ShardedCollection, open_collection, write_sharded
+
+pytest.importorskip("pyarrow")   # shards are .json.zst
+
+
+def _node(name, level, revenue, children=()):
+    return {"name": name, "level": level, "analysis": {"summary_kpis": {"qtd_revenue": revenue}, "rows": [1, 2]},
+            "children": {child["name"]: child for child in children}}
+
+
+COLLECTION = {
+    "metadata": {"version": "v6"},
+    "total": _node("All Categories", "total", 30.0),
+    "hierarchy": {
+        "A": _node("A", "category", 10.0, [_node("A1", "use_case", 10.0)]),
+        "B": _node("B", "category", 20.0),
+    },
+}
+
+
+def _shard_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith("c"))
+
+
+def test_update_swaps_in_a_new_generation(tmp_path):
+    directory = str(tmp_path / "l1_FY2026-Q3_2026-02-03_all")
+    write_sharded(COLLECTION, directory)
+    assert _shard_files(directory) == ["c0000.g1.json.zst", "c0001.g1.json.zst"]
+    before = ShardedCollection.open(directory)
+
+    def merge(path, node):
+        node["analysis"]["summary_kpis"]["qtd_revenue"] += 1
+
+    writer = open_collection(directory)
+    writer.update([("A", "A1"), ()], merge)
+
+    # Only A's shard is rewritten, under the next generation; its old shard is gone
+    assert _shard_files(directory) == ["c0000.g2.json.zst", "c0001.g1.json.zst"]
+    after = ShardedCollection.open(directory)
+    assert after.data["total"]["analysis"]["summary_kpis"]["qtd_revenue"] == 31.0
+    assert after.data["hierarchy"]["A"]["children"]["A1"]["analysis"]["summary_kpis"]["qtd_revenue"] == 11.0
+    # A reader holding the old manifest follows the swap when it opens A
+    assert before.ensure("A")
+    assert before.data["hierarchy"]["A"]["children"]["A1"]["analysis"]["summary_kpis"]["qtd_revenue"] == 11.0
+    assert after.load_all()["hierarchy"]["B"] == COLLECTION["hierarchy"]["B"]
+
+
+def test_manifest_holds_stubs_until_a_category_is_opened(tmp_path):
+    directory = str(tmp_path / "l1")
+    write_sharded(COLLECTION, directory)
+    collection = open_collection(directory)
+    assert collection.data["hierarchy"]["A"]["analysis"] == {"summary_kpis": {"qtd_revenue": 10.0}}
+    assert collection.ensure_path(("A", "A1")) and not collection.ensure("A")
+    assert collection.load_all() == COLLECTION
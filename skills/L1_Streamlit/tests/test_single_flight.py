@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from scripts.single_flight import SingleFlight
+
+
+def test_concurrent_calls_for_one_key_share_one_run():
+    flights = SingleFlight(max_concurrent=2)
+    started = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def collect():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return {"rows": 3}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("q3", collect))) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    while flights.in_flight().get("q3", 0) < 3:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert runs == [1]
+    assert results == [{"rows": 3}] * 4
+    assert flights.stats() == {"calls": 4, "runs": 1, "coalesced": 3}
+    assert flights.in_flight() == {}
+    # Nothing is cached: the next call runs again
+    flights.do("q3", collect)
+    assert len(runs) == 2
+
+
+def test_leader_error_reaches_every_waiter():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("warehouse timeout")
+
+    errors = []
+
+    def call():
+        try:
+            flights.do("q3", fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    while flights.in_flight().get("q3", 0) < 1:
+        time.sleep(0.01)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert errors == ["warehouse timeout"] * 2
+    with pytest.raises(ValueError):
+        flights.do("q3", lambda: int("x"))
@@ -0,0 +1,71 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+import scripts.collector as collector
+from scripts.lazy import open_summaries
+from scripts.shards import open_collection, save_collection
+from scripts.snapshot_diff import STATUS_UNKNOWN, diff_collections, diff_files
+
+from conftest import FISCAL_QUARTER
+
+
+def collect(warehouse, run_date, lazy):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return collector.collect_all_data(FISCAL_QUARTER, None, run_date=run_date, engine="batch",
+                                          checkpoint_dir=None, lazy=lazy, connect=warehouse.connect)
+
+
+@pytest.fixture(scope="module")
+def full_diff(warehouse, run_dates):
+    return diff_collections(*(collect(warehouse, run_date, lazy=False) for run_date in run_dates))
+
+
+@pytest.fixture
+def lazy_paths(warehouse, run_dates, tmp_path):
+    paths = []
+    for run_date in run_dates:
+        path = os.path.join(tmp_path, f"l1_{FISCAL_QUARTER}_{run_date}_all")
+        save_collection(collect(warehouse, run_date, lazy=True), path)
+        paths.append(path)
+    return paths
+
+
+def test_lazy_diff_without_summaries_is_unknown(lazy_paths):
+    before, after = (open_collection(path).load_all() for path in lazy_paths)
+    diff = diff_collections(before, after)
+
+    counts = diff.counts()
+    assert counts[STATUS_UNKNOWN] > 0
+    # Nodes below category have no summary_kpis: never reported unchanged with NaN deltas
+    deep = diff.nodes[[len(path) > 1 for path in diff.nodes.index]]
+    assert len(deep)
+    assert (deep['status'] == STATUS_UNKNOWN).all()
+
+
+def test_lazy_diff_matches_full_once_filled(warehouse, lazy_paths, full_diff):
+    collections = [open_collection(path) for path in lazy_paths]
+    for collection in collections:
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert open_summaries(collection.load_all(), collection.path, connect=warehouse.connect)
+    diff = diff_collections(*(collection.data for collection in collections))
+
+    assert diff.counts() == full_diff.counts()
+    assert diff.counts()[STATUS_UNKNOWN] == 0
+    assert (diff.nodes['status'] == full_diff.nodes.loc[diff.nodes.index, 'status']).all()
+
+
+def test_diff_files_fills_and_persists_lazy_collections(warehouse, lazy_paths, full_diff, monkeypatch):
+    monkeypatch.setattr(collector, "get_connection", warehouse.connect)
+    with contextlib.redirect_stdout(io.StringIO()):
+        diff = diff_files(*lazy_paths)
+    assert diff.counts() == full_diff.counts()
+
+    # The summaries were written back: a second diff runs no query
+    queries = warehouse.queries
+    with contextlib.redirect_stdout(io.StringIO()):
+        again = diff_files(*lazy_paths)
+    assert warehouse.queries == queries
+    assert again.counts() == full_diff.counts()
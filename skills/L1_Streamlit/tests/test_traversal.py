@@ -0,0 +1,34 @@
+import time
+
+import pytest
+
+from scripts.collector import _traverse_hierarchy
+
+CATEGORIES = [f"cat{i}" for i in range(10)]
+
+
+def test_node_failure_drops_queued_nodes():
+    started = []
+
+    def collect_node(path):
+        if not path:
+            return {}, CATEGORIES
+        started.append(path)
+        if path == ("cat1",):
+            raise RuntimeError("query failed")
+        time.sleep(0.05)
+        return {}, []
+
+    with pytest.raises(RuntimeError, match="query failed"):
+        _traverse_hierarchy(collect_node, workers=2)
+    # Only nodes already running when cat1 failed finish; the rest never start
+    assert len(started) < len(CATEGORIES)
+
+
+def test_traversal_collects_every_node():
+    def collect_node(path):
+        return {"path": path}, (CATEGORIES[:3] if len(path) < 2 else [])
+
+    nodes = _traverse_hierarchy(collect_node, workers=4)
+    assert len(nodes) == 1 + 3 + 9
+    assert nodes[("cat0", "cat2")] == ({"path": ("cat0", "cat2")}, [])
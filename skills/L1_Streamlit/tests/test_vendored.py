@@ -0,0 +1,19 @@
+"""The modules every skill ships a copy of must stay identical to L1_Streamlit's."""
+
+import filecmp
+import os
+
+import pytest
+
+SKILLS = os.path.join(os.path.dirname(__file__), "..", "..")
+VENDORED = ("report_store.py", "fiscal_calendar.py", "telemetry.py")
+COPIES = ("weekly-metrics-report", "dcr-weekly-report")
+
+
+@pytest.mark.parametrize("skill", COPIES)
+@pytest.mark.parametrize("module", VENDORED)
+def test_vendored_copy_matches(module, skill):
+    canonical = os.path.join(SKILLS, "L1_Streamlit", "scripts", module)
+    copy = os.path.join(SKILLS, skill, "scripts", module)
+    assert filecmp.cmp(canonical, copy, shallow=False), \
+        f"{skill}/scripts/{module} differs from L1_Streamlit's: copy the canonical one over it"
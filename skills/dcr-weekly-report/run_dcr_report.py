@@ -4,6 +4,7 @@ run_dcr_report.py - Main entry point for DCR weekly report generation.
 
 Usage:
     SNOWFLAKE_CONNECTION_NAME=<your_connection> uv run python run_dcr_report.py --week-end 2026-01-25
+    SNOWFLAKE_CONNECTION_NAME=<your_connection> uv run python run_dcr_report.py --week-end 2026-01-25 --trace
 """
 
 import argparse
@@ -15,21 +16,23 @@ from scripts.dcr_generate_report import generate_report
 
 
 class CollectArgs:
-    def __init__(self, week_end, output):
+    def __init__(self, week_end, output, trace=False):
         self.week_end = week_end
         self.output = output
+        self.trace = trace
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate DCR weekly HTML report")
     parser.add_argument("--week-end", required=True, help="Week end date (YYYY-MM-DD, Sunday)")
+    parser.add_argument("--trace", action="store_true", help="Write a per-query timing trace next to the data JSON")
     args = parser.parse_args()
     
     base_dir = Path(__file__).parent
     output_dir = base_dir / "output"
     output_dir.mkdir(exist_ok=True)
     
-    data_path = output_dir / f"dcr_data_{args.week_end}.json"
+    data_path = output_dir / f"dcr_data_{args.week_end}.json.gz"
     html_path = output_dir / f"dcr_report_{args.week_end}.html"
     
     print(f"\n{'='*60}")
@@ -38,7 +41,7 @@ def main():
     print(f"{'='*60}\n")
     
     print("Step 1: Collecting data from Snowflake...")
-    collect_args = CollectArgs(args.week_end, str(data_path))
+    collect_args = CollectArgs(args.week_end, str(data_path), args.trace)
     collect_main(collect_args)
     
     print("\nStep 2: Generating HTML report...")
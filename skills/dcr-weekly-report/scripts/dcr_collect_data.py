@@ -10,12 +10,20 @@ DATA SOURCES:
 """
 
 import argparse
-import json
 import os
 from datetime import datetime, timedelta
 from collections import defaultdict
 import snowflake.connector
 
+try:
+    from .telemetry import start_trace, stop_trace, timed_query
+    from .fiscal_calendar import load_calendar, sql_date
+    from .report_store import save_report
+except ImportError:  # run as a script: python scripts/<name>.py
+    from telemetry import start_trace, stop_trace, timed_query
+    from fiscal_calendar import load_calendar, sql_date
+    from report_store import save_report
+
 
 def get_connection():
     return snowflake.connector.connect(
@@ -24,11 +32,14 @@ def get_connection():
 
 
 def execute_query(conn, query, desc=""):
-    cursor = conn.cursor()
-    cursor.execute(query)
-    columns = [d[0].lower() for d in cursor.description]
-    rows = cursor.fetchall()
-    cursor.close()
+    with timed_query(desc) as timer:
+        cursor = conn.cursor()
+        cursor.execute(query)
+        timer.query_id = getattr(cursor, "sfqid", None)
+        columns = [d[0].lower() for d in cursor.description]
+        rows = cursor.fetchall()
+        timer.rows = len(rows)
+        cursor.close()
     return [dict(zip(columns, row)) for row in rows]
 
 
@@ -47,16 +58,9 @@ def calculate_week_dates(week_end_str):
 
 
 def get_fiscal_dates(conn, week_end):
-    query = f"""
-    SELECT fiscal_quarter_start, fiscal_quarter_end
-    FROM finance.stg_utils.stg_fiscal_calendar
-    WHERE _date = '{week_end}' LIMIT 1
-    """
-    cursor = conn.cursor()
-    cursor.execute(query)
-    row = cursor.fetchone()
-    cursor.close()
-    return (row[0], row[1]) if row else (None, None)
+    """Start and end of the fiscal quarter containing week_end (from the cached calendar)."""
+    quarter = load_calendar(conn).quarter_of(week_end)
+    return (quarter.start, quarter.end) if quarter else (None, None)
 
 
 def get_dcr_revenue_wow(conn, current_start, current_end, prior_start, prior_end):
@@ -81,26 +85,22 @@ def get_dcr_revenue_wow(conn, current_start, current_end, prior_start, prior_end
         ROUND(100.0 * (COALESCE(c.current_rev, 0) - COALESCE(p.prior_rev, 0)) / NULLIF(p.prior_rev, 0), 2) AS pct_change
     FROM current_week c, prior_week p
     """
-    return execute_query(conn, query)[0]
+    return execute_query(conn, query, "DCR revenue WoW")[0]
 
 
-def get_dcr_qtd_vs_plan(conn, week_end):
+def get_dcr_qtd_vs_plan(conn, week_end, quarter_start):
     """DCR QTD actual vs plan."""
     query = f"""
-    WITH fiscal_context AS (
-        SELECT fiscal_quarter_start FROM finance.stg_utils.stg_fiscal_calendar
-        WHERE _date = '{week_end}' LIMIT 1
-    ),
-    qtd_actuals AS (
+    WITH qtd_actuals AS (
         SELECT SUM(revenue + product_led_revenue) AS qtd_actual
         FROM finance.customer.fy26_product_category_revenue
-        WHERE ds >= (SELECT fiscal_quarter_start FROM fiscal_context) AND ds <= '{week_end}'
+        WHERE ds >= {sql_date(quarter_start)} AND ds <= '{week_end}'
         AND feature = 'Data Clean Room'
     ),
     qtd_plan AS (
         SELECT SUM(revenue) AS qtd_plan
         FROM finance.customer.temp_product_category_revenue_plan
-        WHERE general_date >= (SELECT fiscal_quarter_start FROM fiscal_context) 
+        WHERE general_date >= {sql_date(quarter_start)} 
           AND general_date <= '{week_end}'
           AND feature = 'Data Clean Room'
     )
@@ -111,7 +111,7 @@ def get_dcr_qtd_vs_plan(conn, week_end):
         ROUND(100.0 * (COALESCE(a.qtd_actual, 0) - COALESCE(p.qtd_plan, 0)) / NULLIF(p.qtd_plan, 0), 2) AS pct_variance
     FROM qtd_actuals a, qtd_plan p
     """
-    return execute_query(conn, query)[0]
+    return execute_query(conn, query, "DCR QTD vs plan")[0]
 
 
 def get_dau_wau_mau(conn, date_range_start, date_range_end, job_buckets=None, account_types=None):
@@ -171,7 +171,7 @@ def get_dau_wau_mau(conn, date_range_start, date_range_end, job_buckets=None, ac
     WHERE mau.ds BETWEEN '{date_range_start}' AND '{date_range_end}'
     ORDER BY mau.ds
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, f"DAU/WAU/MAU ({', '.join(account_types or ['all'])})")
 
 
 def get_total_credits(conn, date_range_start, date_range_end, account_types=None):
@@ -242,7 +242,7 @@ def get_total_credits(conn, date_range_start, date_range_end, account_types=None
     GROUP BY ds
     ORDER BY ds
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "Total credits")
 
 
 def get_credits_by_source(conn, current_start, current_end):
@@ -290,7 +290,7 @@ def get_credits_by_source(conn, current_start, current_end):
     UNION ALL SELECT * FROM samooha_spcs_direct
     UNION ALL SELECT * FROM samooha_spcs_indirect
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "Credits by source")
 
 
 def get_partner_edges(conn, date_range_start, date_range_end, account_types=None):
@@ -379,7 +379,7 @@ def get_partner_edges(conn, date_range_start, date_range_end, account_types=None
     ORDER BY credits DESC NULLS LAST
     LIMIT 100
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "Partner edges")
 
 
 def get_top_customers_by_credits(conn, current_start, current_end, prior_start, prior_end):
@@ -426,7 +426,7 @@ def get_top_customers_by_credits(conn, current_start, current_end, prior_start,
     ORDER BY c.current_credits DESC
     LIMIT 25
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "Top customers by credits")
 
 
 def get_dcr_job_buckets_breakdown(conn, current_start, current_end):
@@ -445,7 +445,7 @@ def get_dcr_job_buckets_breakdown(conn, current_start, current_end):
     ORDER BY credits DESC
     LIMIT 20
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "Job buckets breakdown")
 
 
 def get_dcr_daily_revenue(conn, date_range_start, date_range_end):
@@ -468,24 +468,17 @@ def get_dcr_daily_revenue(conn, date_range_start, date_range_end):
     FROM daily
     ORDER BY ds
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "DCR daily revenue")
 
 
-def get_dcr_weekly_revenue_table(conn, week_end):
-    """Weekly revenue table with comprehensive financial metrics."""
+def get_dcr_weekly_revenue_table(conn, week_end, quarter):
+    """Weekly revenue table with comprehensive financial metrics (quarter: week_end's FiscalQuarter)."""
+    quarter_start = quarter.start if quarter else None
+    year_start = quarter.year_start if quarter else None
+    quarter_name = f"'{quarter.label}'" if quarter else "NULL"
+    year_name = f"'{quarter.fiscal_year}'" if quarter else "NULL"
     query = f"""
-    WITH fiscal_context AS (
-        SELECT 
-            fiscal_quarter_start,
-            fiscal_quarter_end,
-            fiscal_year_start,
-            fiscal_year_end,
-            fiscal_quarter_qq_fyyyyy AS fiscal_quarter_name,
-            fiscal_year_fyyyyy AS fiscal_year_name
-        FROM finance.stg_utils.stg_fiscal_calendar
-        WHERE _date = '{week_end}' LIMIT 1
-    ),
-    weeks AS (
+    WITH weeks AS (
         SELECT 
             DATEADD('day', -seq4() * 7, '{week_end}'::DATE) AS week_end_dt,
             DATEADD('day', -seq4() * 7 - 6, '{week_end}'::DATE) AS week_start_dt
@@ -515,28 +508,28 @@ def get_dcr_weekly_revenue_table(conn, week_end):
     qtd_actuals AS (
         SELECT SUM(revenue + product_led_revenue) AS qtd_actual
         FROM finance.customer.fy26_product_category_revenue
-        WHERE ds >= (SELECT fiscal_quarter_start FROM fiscal_context) 
+        WHERE ds >= {sql_date(quarter_start)} 
           AND ds <= '{week_end}'
           AND feature = 'Data Clean Room'
     ),
     qtd_plan AS (
         SELECT SUM(revenue) AS qtd_plan
         FROM finance.customer.temp_product_category_revenue_plan
-        WHERE general_date >= (SELECT fiscal_quarter_start FROM fiscal_context)
+        WHERE general_date >= {sql_date(quarter_start)}
           AND general_date <= '{week_end}'
           AND feature = 'Data Clean Room'
     ),
     ytd_actuals AS (
         SELECT SUM(revenue + product_led_revenue) AS ytd_actual
         FROM finance.customer.fy26_product_category_revenue
-        WHERE ds >= (SELECT fiscal_year_start FROM fiscal_context) 
+        WHERE ds >= {sql_date(year_start)} 
           AND ds <= '{week_end}'
           AND feature = 'Data Clean Room'
     ),
     ytd_plan AS (
         SELECT SUM(revenue) AS ytd_plan
         FROM finance.customer.temp_product_category_revenue_plan
-        WHERE general_date >= (SELECT fiscal_year_start FROM fiscal_context)
+        WHERE general_date >= {sql_date(year_start)}
           AND general_date <= '{week_end}'
           AND feature = 'Data Clean Room'
     )
@@ -551,12 +544,12 @@ def get_dcr_weekly_revenue_table(conn, week_end):
         ROUND(a.revenue - LAG(a.revenue) OVER (ORDER BY a.week_end_dt), 0) AS wow_change,
         ROUND(100.0 * (a.revenue - LAG(a.revenue) OVER (ORDER BY a.week_end_dt)) / NULLIF(LAG(a.revenue) OVER (ORDER BY a.week_end_dt), 0), 2) AS wow_pct,
         ROUND(AVG(a.revenue) OVER (ORDER BY a.week_end_dt ROWS BETWEEN 3 PRECEDING AND CURRENT ROW), 0) AS four_week_avg,
-        (SELECT fiscal_quarter_name FROM fiscal_context) AS fiscal_quarter,
+        {quarter_name} AS fiscal_quarter,
         ROUND((SELECT qtd_actual FROM qtd_actuals), 0) AS qtd_actual,
         ROUND((SELECT qtd_plan FROM qtd_plan), 0) AS qtd_plan,
         ROUND((SELECT qtd_actual FROM qtd_actuals) - (SELECT qtd_plan FROM qtd_plan), 0) AS qtd_variance,
         ROUND(100.0 * ((SELECT qtd_actual FROM qtd_actuals) - (SELECT qtd_plan FROM qtd_plan)) / NULLIF((SELECT qtd_plan FROM qtd_plan), 0), 2) AS qtd_variance_pct,
-        (SELECT fiscal_year_name FROM fiscal_context) AS fiscal_year,
+        {year_name} AS fiscal_year,
         ROUND((SELECT ytd_actual FROM ytd_actuals), 0) AS ytd_actual,
         ROUND((SELECT ytd_plan FROM ytd_plan), 0) AS ytd_plan,
         ROUND((SELECT ytd_actual FROM ytd_actuals) - (SELECT ytd_plan FROM ytd_plan), 0) AS ytd_variance,
@@ -565,7 +558,7 @@ def get_dcr_weekly_revenue_table(conn, week_end):
     LEFT JOIN weekly_plan p ON a.week_end_dt = p.week_end_dt
     ORDER BY a.week_end_dt DESC
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "DCR weekly revenue table")
 
 
 def get_dcr_top_revenue_customers(conn, current_start, current_end, prior_start, prior_end):
@@ -611,7 +604,7 @@ def get_dcr_top_revenue_customers(conn, current_start, current_end, prior_start,
     ORDER BY c.current_rev DESC
     LIMIT 25
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "DCR top revenue customers")
 
 
 def get_dcr_new_vs_returning_accounts(conn, current_start, current_end, prior_start, prior_end):
@@ -644,7 +637,7 @@ def get_dcr_new_vs_returning_accounts(conn, current_start, current_end, prior_st
         (SELECT COUNT(*) FROM current_accounts WHERE salesforce_account_id NOT IN (SELECT * FROM all_historical)) AS brand_new,
         (SELECT COUNT(*) FROM current_accounts WHERE salesforce_account_id NOT IN (SELECT * FROM prior_accounts) AND salesforce_account_id IN (SELECT * FROM all_historical)) AS reactivated
     """
-    return execute_query(conn, query)[0]
+    return execute_query(conn, query, "DCR new vs returning accounts")[0]
 
 
 def convert_to_json_safe(obj):
@@ -663,6 +656,7 @@ def convert_to_json_safe(obj):
 
 
 def main(args):
+    trace = start_trace() if getattr(args, 'trace', False) else None
     conn = get_connection()
     
     week_end = args.week_end
@@ -685,7 +679,7 @@ def main(args):
     dcr_revenue_wow = get_dcr_revenue_wow(conn, current_start, current_end, prior_start, prior_end)
     
     print("2/11 DCR QTD vs Plan...")
-    dcr_qtd = get_dcr_qtd_vs_plan(conn, current_end)
+    dcr_qtd = get_dcr_qtd_vs_plan(conn, current_end, qtd_start)
     
     print("3/11 DAU/WAU/MAU (all account types)...")
     dau_wau_mau_all = get_dau_wau_mau(conn, lookback_start, current_end)
@@ -715,11 +709,13 @@ def main(args):
     daily_revenue = get_dcr_daily_revenue(conn, lookback_start, current_end)
     
     print("12/12 Weekly revenue table...")
-    weekly_revenue_table = get_dcr_weekly_revenue_table(conn, current_end)
+    weekly_revenue_table = get_dcr_weekly_revenue_table(conn, current_end, load_calendar(conn).quarter_of(current_end))
     
     print("Bonus: New vs returning accounts...")
     account_cohorts = get_dcr_new_vs_returning_accounts(conn, current_start, current_end, prior_start, prior_end)
     
+    if trace:
+        trace.fetch_bytes_scanned(conn)
     conn.close()
 
     data = convert_to_json_safe({
@@ -748,18 +744,21 @@ def main(args):
         'account_cohorts': account_cohorts,
     })
 
-    with open(args.output, 'w') as f:
-        json.dump(data, f, indent=2)
+    save_report(data, args.output)
 
     print(f"\n✅ Saved to {args.output}")
     print(f"   Revenue WoW: ${dcr_revenue_wow.get('dollar_change', 0):,.0f} ({dcr_revenue_wow.get('pct_change', 0)}%)")
     print(f"   QTD vs Plan: ${dcr_qtd.get('delta_to_plan', 0):,.0f} ({dcr_qtd.get('pct_variance', 0)}%)")
     print(f"   {len(partner_edges)} partner edges, {len(top_customers_credits)} top credit customers")
+    if trace:
+        print(f"   Query trace: {', '.join(trace.write(args.output))}")
+        stop_trace()
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--week-end', required=True, help='Week end date (YYYY-MM-DD, Sunday)')
-    parser.add_argument('--output', required=True, help='Output JSON path')
+    parser.add_argument('--output', required=True, help='Output path (.json, .json.gz or .json.zst; see report_store.py)')
+    parser.add_argument('--trace', action='store_true', help='Write a per-query timing trace next to the output')
     args = parser.parse_args()
     main(args)
@@ -4,16 +4,19 @@ dcr_generate_report.py - Generate interactive HTML report for DCR weekly metrics
 """
 
 import argparse
-import json
 from datetime import datetime
 from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader
 
+try:
+    from .report_store import load_report
+except ImportError:  # run as a script: python scripts/<name>.py
+    from report_store import load_report
+
 
 def load_data(data_path: str) -> dict:
-    with open(data_path, "r") as f:
-        return json.load(f)
+    return load_report(data_path)
 
 
 def prepare_chart_data(data: dict) -> dict:
@@ -109,7 +112,7 @@ def generate_report(data_path: str, output_path: str):
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--data", required=True, help="Path to JSON data file")
+    parser.add_argument("--data", required=True, help="Path to the data file")
     parser.add_argument("--output", required=True, help="Output HTML file path")
     args = parser.parse_args()
     
@@ -0,0 +1,199 @@
+"""
+report_store.py - Compact Report Files
+
+Collectors used to write their results as indent=2 JSON: about half of the
+bytes were indentation and every table repeated its column names on each
+row, so the files were large and slow to parse. A report file's format is
+now chosen by its suffix:
+
+    .json       indent=2 JSON, as before (readable, diffable); also any
+                name without a registered suffix
+    .json.gz    packed JSON, gzip'd (standard library only)
+    .json.zst   packed JSON, zstd-compressed via pyarrow (smallest, fastest)
+
+Packed JSON is compact JSON in which every list of two or more dicts with
+the same keys in the same order (the rows of a query result) is written as
+{"~cols": [keys], "~rows": [[values], ...]}; load_report() turns them back
+into row dicts while parsing (object_hook), so loaders get exactly the
+structure that was saved. Other formats can be added with register_format().
+
+Only .json.zst needs pyarrow, and only when such a file is read or written.
+
+Vendored: install.sh copies each skill directory on its own, so a skill can
+only import from itself. L1_Streamlit/scripts/report_store.py is the canonical copy;
+change it there and copy it over the weekly-metrics-report and
+dcr-weekly-report ones. L1_Streamlit/tests/test_vendored.py fails when the
+copies differ.
+
+USAGE:
+    save_report(data, 'output/data.json.zst')       # atomic
+    data = load_report('output/data.json.zst')      # same dict as saved
+    convert_report('cache/old.json', 'cache/old.json.zst')
+
+    python -m scripts.report_store cache/*.json [--to .json.zst] [--remove]
+"""
+
+import argparse
+import gzip
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+_COLUMNS, _ROWS = "~cols", "~rows"
+
+# suffix -> (encode(obj) -> bytes, decode(bytes) -> obj)
+Codec = Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]
+FORMATS: Dict[str, Codec] = {}
+
+
+def register_format(suffix: str, encode: Callable[[Any], bytes], decode: Callable[[bytes], Any]) -> None:
+    """Make save_report/load_report handle files ending in suffix."""
+    FORMATS[suffix] = (encode, decode)
+
+
+def format_of(path: str) -> Optional[str]:
+    """The registered suffix path ends with (the longest, so .json.gz beats .json), or None."""
+    matches = [suffix for suffix in FORMATS if path.endswith(suffix)]
+    return max(matches, key=len) if matches else None
+
+
+def strip_format(path: str) -> str:
+    """path without its format suffix."""
+    suffix = format_of(path)
+    return path[:-len(suffix)] if suffix else path
+
+
+# =============================================================================
+# PACKED JSON
+# =============================================================================
+
+def pack(obj: Any) -> Any:
+    """obj with every list of same-keyed dicts turned into a {~cols, ~rows} table."""
+    if isinstance(obj, dict):
+        return {key: pack(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        if len(obj) > 1 and isinstance(obj[0], dict):
+            keys = list(obj[0])
+            if all(isinstance(row, dict) and list(row) == keys for row in obj):
+                return {_COLUMNS: keys, _ROWS: [[pack(row[key]) for key in keys] for row in obj]}
+        return [pack(value) for value in obj]
+    return obj
+
+
+def _unpack_hook(obj: Dict[str, Any]) -> Any:
+    if _COLUMNS in obj and _ROWS in obj and len(obj) == 2:
+        keys = obj[_COLUMNS]
+        return [dict(zip(keys, row)) for row in obj[_ROWS]]
+    return obj
+
+
+def encode_packed(obj: Any) -> bytes:
+    return json.dumps(pack(obj), separators=(',', ':'), default=str).encode()
+
+
+def decode_packed(payload: bytes) -> Any:
+    return json.loads(payload, object_hook=_unpack_hook)
+
+
+# =============================================================================
+# CODECS
+# =============================================================================
+
+def _encode_json(obj: Any) -> bytes:
+    return json.dumps(obj, indent=2, default=str).encode()
+
+
+def _encode_gzip(obj: Any) -> bytes:
+    return gzip.compress(encode_packed(obj), 6, mtime=0)
+
+
+def _decode_gzip(payload: bytes) -> Any:
+    return decode_packed(gzip.decompress(payload))
+
+
+def _encode_zstd(obj: Any) -> bytes:
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    with pa.CompressedOutputStream(sink, "zstd") as out:
+        out.write(encode_packed(obj))
+    return sink.getvalue().to_pybytes()
+
+
+def _decode_zstd(payload: bytes) -> Any:
+    import pyarrow as pa
+
+    with pa.CompressedInputStream(pa.BufferReader(payload), "zstd") as stream:
+        return decode_packed(stream.read())
+
+
+register_format(".json", _encode_json, json.loads)
+register_format(".json.gz", _encode_gzip, _decode_gzip)
+register_format(".json.zst", _encode_zstd, _decode_zstd)
+
+
+# =============================================================================
+# FILES
+# =============================================================================
+
+def _codec(path: str) -> Codec:
+    return FORMATS[format_of(path) or ".json"]
+
+
+def save_report(data: Any, path: str) -> int:
+    """Write data in the format of path's suffix, atomically; returns bytes written."""
+    payload = _codec(path)[0](data)
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return len(payload)
+
+
+def load_report(path: str) -> Any:
+    """Read a report file written in any registered format."""
+    decode = _codec(path)[1]
+    with open(path, 'rb') as f:
+        return decode(f.read())
+
+
+def find_report(base: str) -> Optional[str]:
+    """The existing file base + <suffix> for any registered format, or None (.json last)."""
+    for suffix in sorted(FORMATS, key=lambda s: s == ".json"):
+        if os.path.isfile(base + suffix):
+            return base + suffix
+    return None
+
+
+def convert_report(source: str, target: str) -> Tuple[int, int]:
+    """Rewrite a report file in target's format; returns (source bytes, target bytes)."""
+    return os.path.getsize(source), save_report(load_report(source), target)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Convert report files between formats")
+    parser.add_argument("files", nargs="+", help="Report files to convert")
+    parser.add_argument("--to", default=".json.zst", choices=sorted(FORMATS), help="Target format")
+    parser.add_argument("--remove", action="store_true", help="Delete each source file once converted")
+    args = parser.parse_args(argv)
+
+    for source in args.files:
+        target = strip_format(source) + args.to
+        if target == source:
+            print(f"{source}: already {args.to}")
+            continue
+        try:
+            before, after = convert_report(source, target)
+        except (OSError, ValueError) as e:
+            print(f"ERROR: {source}: {e}")
+            continue
+        print(f"{source} -> {target}: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+        if args.remove:
+            os.remove(source)
+
+
+if __name__ == "__main__":
+    main()
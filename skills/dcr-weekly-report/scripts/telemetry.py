@@ -0,0 +1,219 @@
+"""
+telemetry.py - Query Telemetry and Timing Report
+
+Records every query a collector runs: wall time, rows returned, Snowflake
+query id, bytes scanned (looked up from QUERY_HISTORY afterwards, where the
+role can see it) and the context it ran in (analysis, node). The trace is
+written next to the output JSON as <output>.trace.jsonl, one line per query,
+plus <output>.trace.txt with the totals sorted by cumulative time.
+
+Tracing is off until start_trace() is called; execute_query then reports
+each query through timed_query(). Context labels set with query_context()
+apply to every query run inside the block on the same thread.
+
+Every collector produces the same trace format. Vendored: install.sh copies
+each skill directory on its own, so a skill can only import from itself.
+L1_Streamlit/scripts/telemetry.py is the canonical copy; change it there and
+copy it over the weekly-metrics-report and dcr-weekly-report ones.
+L1_Streamlit/tests/test_vendored.py fails when the copies differ.
+
+USAGE:
+    trace = start_trace()
+    with query_context(analysis='summary_kpis', node='Analytics / BI'):
+        execute_query(conn, query, "Summary KPIs")
+    trace.fetch_bytes_scanned(conn)
+    trace.write('output/data.json')     # output/data.trace.jsonl + .trace.txt
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+
+_labels: contextvars.ContextVar = contextvars.ContextVar("query_labels", default={})
+
+# Labels of the most recently entered query_context on any thread (progress display)
+_latest_labels: Dict[str, Any] = {}
+
+# QUERY_HISTORY lookups are chunked to keep the IN list reasonable
+BYTES_SCANNED_CHUNK = 500
+
+
+class QueryTimer:
+    """Filled in by the caller of timed_query() while the query runs."""
+
+    def __init__(self, description: str):
+        self.description = description
+        self.rows: Optional[int] = None
+        self.query_id: Optional[str] = None
+        self.cached = False
+
+
+class QueryTrace:
+    """
+    Per-query records of one collection.
+
+    Thread-safe: queries are recorded from the collector's worker threads.
+    """
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, timer: QueryTimer, started_at: datetime, seconds: float, error: Optional[str] = None) -> None:
+        entry = {
+            'description': timer.description,
+            **_labels.get(),
+            'started_at': started_at.isoformat(),
+            'seconds': round(seconds, 4),
+            'rows': timer.rows,
+            'query_id': timer.query_id,
+            'bytes_scanned': None,
+            'cached': timer.cached,
+            'error': error,
+        }
+        with self._lock:
+            self.records.append(entry)
+
+    def fetch_bytes_scanned(self, conn) -> None:
+        """Fill in bytes_scanned from INFORMATION_SCHEMA.QUERY_HISTORY (best effort)."""
+        by_id = {r['query_id']: r for r in self.records if r['query_id']}
+        ids = list(by_id)
+        try:
+            for i in range(0, len(ids), BYTES_SCANNED_CHUNK):
+                in_list = ", ".join(f"'{q}'" for q in ids[i:i + BYTES_SCANNED_CHUNK])
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(f"""
+                    SELECT query_id, bytes_scanned
+                    FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY(RESULT_LIMIT => 10000))
+                    WHERE query_id IN ({in_list})
+                    """)
+                    for query_id, bytes_scanned in cursor.fetchall():
+                        by_id[query_id]['bytes_scanned'] = bytes_scanned
+                finally:
+                    cursor.close()
+        except Exception as e:
+            print(f"WARNING: Bytes scanned unavailable: {e}")
+
+    def summary(self, by: str = 'analysis') -> List[Dict[str, Any]]:
+        """
+        Totals per `by` label, sorted by cumulative seconds, slowest first.
+        Unlabeled queries are grouped by their description in the analysis table.
+        bytes_scanned stays None unless QUERY_HISTORY reported it.
+        """
+        groups: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            records = list(self.records)
+        for r in records:
+            name = r.get(by) or (r['description'] if by == 'analysis' else '') or '(unlabeled)'
+            g = groups.setdefault(name, {
+                by: name, 'queries': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                'rows': 0, 'bytes_scanned': None, 'cached': 0, 'errors': 0,
+            })
+            g['queries'] += 1
+            g['seconds'] += r['seconds']
+            g['max_seconds'] = max(g['max_seconds'], r['seconds'])
+            g['rows'] += r['rows'] or 0
+            if r['bytes_scanned'] is not None:
+                g['bytes_scanned'] = (g['bytes_scanned'] or 0) + r['bytes_scanned']
+            g['cached'] += int(r['cached'])
+            g['errors'] += int(r['error'] is not None)
+        return sorted(groups.values(), key=lambda g: g['seconds'], reverse=True)
+
+    def format_summary(self) -> str:
+        """Plain-text timing tables: per analysis, then per node if nodes were labeled."""
+        total = sum(r['seconds'] for r in self.records)
+        lines = [f"{len(self.records)} queries, {total:.1f}s cumulative query time", ""]
+        for by in ('analysis', 'node'):
+            if by == 'node' and not any(r.get('node') for r in self.records):
+                continue
+            rows = self.summary(by)
+            width = max([len(by)] + [len(str(g[by])) for g in rows])
+            lines.append(f"{by:<{width}}  {'queries':>7}  {'seconds':>9}  {'share':>6}  "
+                         f"{'max s':>7}  {'rows':>10}  {'MB scanned':>10}  {'cached':>6}  {'errors':>6}")
+            for g in rows:
+                share = g['seconds'] / total * 100 if total else 0
+                scanned = '-' if g['bytes_scanned'] is None else f"{g['bytes_scanned'] / 1e6:.1f}"
+                lines.append(f"{str(g[by]):<{width}}  {g['queries']:>7}  {g['seconds']:>9.2f}  {share:>5.1f}%  "
+                             f"{g['max_seconds']:>7.2f}  {g['rows']:>10,}  {scanned:>10}  "
+                             f"{g['cached']:>6}  {g['errors']:>6}")
+            lines.append("")
+        return "\n".join(lines)
+
+    def write(self, output_path: str) -> List[str]:
+        """Write <output>.trace.jsonl and <output>.trace.txt next to the output JSON."""
+        base, ext = os.path.splitext(output_path)
+        if ext in ('.gz', '.zst'):  # compressed report_store files: data.json.gz
+            base = os.path.splitext(base)[0]
+        jsonl_path, summary_path = f"{base}.trace.jsonl", f"{base}.trace.txt"
+        with open(jsonl_path, 'w') as f:
+            for r in self.records:
+                f.write(json.dumps(r, default=str) + '\n')
+        with open(summary_path, 'w') as f:
+            f.write(self.format_summary())
+        return [jsonl_path, summary_path]
+
+
+_trace: Optional[QueryTrace] = None
+
+
+def start_trace() -> QueryTrace:
+    """Start recording every query; returns the new trace."""
+    global _trace
+    _trace = QueryTrace()
+    return _trace
+
+
+def stop_trace() -> Optional[QueryTrace]:
+    """Stop recording; returns the finished trace, if there was one."""
+    global _trace
+    trace, _trace = _trace, None
+    return trace
+
+
+def get_trace() -> Optional[QueryTrace]:
+    """The active trace, or None if tracing is off."""
+    return _trace
+
+
+def latest_labels() -> Dict[str, Any]:
+    """Labels of the last query_context entered on any thread, e.g. the analysis now running."""
+    return dict(_latest_labels)
+
+
+@contextmanager
+def query_context(**labels: Any) -> Iterator[None]:
+    """Attach labels (analysis=..., node=...) to the queries run inside the block."""
+    global _latest_labels
+    token = _labels.set({**_labels.get(), **labels})
+    _latest_labels = _labels.get()
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+@contextmanager
+def timed_query(description: str = "") -> Iterator[QueryTimer]:
+    """Time one query; the caller sets rows/query_id/cached on the yielded timer."""
+    timer = QueryTimer(description)
+    trace = _trace
+    if trace is None:
+        yield timer
+        return
+    started_at = datetime.now()
+    start = time.perf_counter()
+    error = None
+    try:
+        yield timer
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        trace.record(timer, started_at, time.perf_counter() - start, error)
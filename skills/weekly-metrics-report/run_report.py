@@ -3,7 +3,7 @@
 Weekly Product Category Report Generator
 
 USAGE:
-    python run_report.py --week-end YYYY-MM-DD
+    python run_report.py --week-end YYYY-MM-DD [--trace]
 
 EXAMPLE:
     python run_report.py --week-end 2026-01-19
@@ -23,6 +23,7 @@ from scripts.generate_html_report import generate_report
 def main():
     parser = argparse.ArgumentParser(description='Generate Weekly Product Category Report')
     parser.add_argument('--week-end', required=True, help='Week ending date (Sunday, YYYY-MM-DD)')
+    parser.add_argument('--trace', action='store_true', help='Write a per-query timing trace next to the data JSON')
     args = parser.parse_args()
     
     week_end = args.week_end
@@ -32,13 +33,13 @@ def main():
     output_dir = os.path.join(os.path.dirname(__file__), 'output')
     os.makedirs(output_dir, exist_ok=True)
     
-    data_file = os.path.join(output_dir, f'data_{week_end}.json')
+    data_file = os.path.join(output_dir, f'data_{week_end}.json.gz')
     html_file = os.path.join(output_dir, f'report_{week_end}.html')
     
     print(f"Week: {week_start} to {week_end}")
     
     print("Collecting data...")
-    collect_all_data(week_start, week_end, data_file)
+    collect_all_data(week_start, week_end, data_file, trace_queries=args.trace)
     
     print("Generating HTML...")
     generate_report(data_file, html_file, week_start, week_end)
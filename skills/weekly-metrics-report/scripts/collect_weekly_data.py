@@ -10,12 +10,22 @@ DATA SOURCES:
 """
 
 import argparse
-import json
 import os
 from datetime import datetime, timedelta
 from collections import defaultdict
 import snowflake.connector
 
+try:
+    from .telemetry import start_trace, stop_trace, timed_query
+    from . import fiscal_calendar
+    from .fiscal_calendar import load_calendar, sql_date
+    from .report_store import save_report
+except ImportError:  # run as a script: python scripts/<name>.py
+    from telemetry import start_trace, stop_trace, timed_query
+    import fiscal_calendar
+    from fiscal_calendar import load_calendar, sql_date
+    from report_store import save_report
+
 
 def get_connection():
     return snowflake.connector.connect(
@@ -24,16 +34,9 @@ def get_connection():
 
 
 def get_fiscal_dates(conn):
-    query = """
-    SELECT fiscal_quarter_start, fiscal_quarter_end
-    FROM finance.stg_utils.stg_fiscal_calendar
-    WHERE _date = CURRENT_DATE() LIMIT 1
-    """
-    cursor = conn.cursor()
-    cursor.execute(query)
-    row = cursor.fetchone()
-    cursor.close()
-    return (row[0], row[1]) if row else (None, None)
+    """Start and end of the fiscal quarter containing today (from the cached calendar)."""
+    quarter = load_calendar(conn).quarter_of(fiscal_calendar.today())
+    return (quarter.start, quarter.end) if quarter else (None, None)
 
 
 def calculate_week_dates(reference_date=None):
@@ -53,14 +56,45 @@ def calculate_week_dates(reference_date=None):
 
 
 def execute_query(conn, query, desc=""):
-    cursor = conn.cursor()
-    cursor.execute(query)
-    columns = [d[0].lower() for d in cursor.description]
-    rows = cursor.fetchall()
-    cursor.close()
+    with timed_query(desc) as timer:
+        cursor = conn.cursor()
+        cursor.execute(query)
+        timer.query_id = getattr(cursor, "sfqid", None)
+        columns = [d[0].lower() for d in cursor.description]
+        rows = cursor.fetchall()
+        timer.rows = len(rows)
+        cursor.close()
     return [dict(zip(columns, row)) for row in rows]
 
 
+def execute_query_columns(conn, query, desc=""):
+    """Column-oriented execute_query: {column: [values]} without a dict per row.
+
+    Uses the connector's Arrow fetch when available (pyarrow installed, Arrow
+    result format) and transposes fetchall() rows otherwise.
+    """
+    with timed_query(desc) as timer:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query)
+            timer.query_id = getattr(cursor, "sfqid", None)
+            columns = [d[0].lower() for d in cursor.description]
+            try:
+                table = cursor.fetch_arrow_all()  # None for an empty result
+            except (AttributeError, snowflake.connector.errors.NotSupportedError,
+                    snowflake.connector.errors.MissingDependencyError):
+                table = None
+            if table is not None:
+                timer.rows = table.num_rows
+                return {c: table.column(i).to_pylist() for i, c in enumerate(columns)}
+            rows = cursor.fetchall()
+            timer.rows = len(rows)
+        finally:
+            cursor.close()
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    return {c: list(v) for c, v in zip(columns, values)}
+
+
 def get_category_wow(conn, current_start, current_end, prior_start, prior_end):
     """Category WoW using actuals table with revenue + product_led_revenue."""
     query = f"""
@@ -92,26 +126,22 @@ def get_category_wow(conn, current_start, current_end, prior_start, prior_end):
     CROSS JOIN totals t
     ORDER BY ABS(COALESCE(c.current_rev, 0) - COALESCE(p.prior_rev, 0)) DESC
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "Category WoW")
 
 
-def get_qtd_vs_plan(conn, week_end):
+def get_qtd_vs_plan(conn, week_end, quarter_start):
     """QTD actuals vs plan at category level using feature-level plan table."""
     query = f"""
-    WITH fiscal_context AS (
-        SELECT fiscal_quarter_start FROM finance.stg_utils.stg_fiscal_calendar
-        WHERE _date = '{week_end}' LIMIT 1
-    ),
-    qtd_actuals AS (
+    WITH qtd_actuals AS (
         SELECT product_category, SUM(revenue + product_led_revenue) AS qtd_actual
         FROM finance.customer.fy26_product_category_revenue
-        WHERE ds >= (SELECT fiscal_quarter_start FROM fiscal_context) AND ds <= '{week_end}'
+        WHERE ds >= {sql_date(quarter_start)} AND ds <= '{week_end}'
         GROUP BY 1
     ),
     qtd_plan AS (
         SELECT product_category, SUM(revenue) AS qtd_plan
         FROM finance.customer.temp_product_category_revenue_plan
-        WHERE general_date >= (SELECT fiscal_quarter_start FROM fiscal_context) 
+        WHERE general_date >= {sql_date(quarter_start)} 
           AND general_date <= '{week_end}'
         GROUP BY 1
     )
@@ -121,26 +151,22 @@ def get_qtd_vs_plan(conn, week_end):
     FROM qtd_actuals a JOIN qtd_plan p ON a.product_category = p.product_category
     ORDER BY ABS(a.qtd_actual - p.qtd_plan) DESC
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "QTD vs plan")
 
 
-def get_qtd_plan_by_use_case(conn, week_end):
+def get_qtd_plan_by_use_case(conn, week_end, quarter_start):
     """QTD plan at use case level using feature-level plan table."""
     query = f"""
-    WITH fiscal_context AS (
-        SELECT fiscal_quarter_start FROM finance.stg_utils.stg_fiscal_calendar
-        WHERE _date = '{week_end}' LIMIT 1
-    ),
-    qtd_actuals AS (
+    WITH qtd_actuals AS (
         SELECT product_category, use_case, SUM(revenue + product_led_revenue) AS qtd_actual
         FROM finance.customer.fy26_product_category_revenue
-        WHERE ds >= (SELECT fiscal_quarter_start FROM fiscal_context) AND ds <= '{week_end}'
+        WHERE ds >= {sql_date(quarter_start)} AND ds <= '{week_end}'
         GROUP BY 1, 2
     ),
     qtd_plan AS (
         SELECT product_category, use_case, SUM(revenue) AS qtd_plan
         FROM finance.customer.temp_product_category_revenue_plan
-        WHERE general_date >= (SELECT fiscal_quarter_start FROM fiscal_context) 
+        WHERE general_date >= {sql_date(quarter_start)} 
           AND general_date <= '{week_end}'
         GROUP BY 1, 2
     )
@@ -151,7 +177,7 @@ def get_qtd_plan_by_use_case(conn, week_end):
     FROM qtd_actuals a FULL OUTER JOIN qtd_plan p 
         ON a.product_category = p.product_category AND a.use_case = p.use_case
     """
-    results = execute_query(conn, query)
+    results = execute_query(conn, query, "QTD plan by use case")
     lookup = {}
     for r in results:
         key = (r['product_category'], r['use_case'])
@@ -159,23 +185,19 @@ def get_qtd_plan_by_use_case(conn, week_end):
     return lookup
 
 
-def get_qtd_plan_by_feature(conn, week_end):
+def get_qtd_plan_by_feature(conn, week_end, quarter_start):
     """QTD plan at feature level using feature-level plan table."""
     query = f"""
-    WITH fiscal_context AS (
-        SELECT fiscal_quarter_start FROM finance.stg_utils.stg_fiscal_calendar
-        WHERE _date = '{week_end}' LIMIT 1
-    ),
-    qtd_actuals AS (
+    WITH qtd_actuals AS (
         SELECT product_category, use_case, feature, SUM(revenue + product_led_revenue) AS qtd_actual
         FROM finance.customer.fy26_product_category_revenue
-        WHERE ds >= (SELECT fiscal_quarter_start FROM fiscal_context) AND ds <= '{week_end}'
+        WHERE ds >= {sql_date(quarter_start)} AND ds <= '{week_end}'
         GROUP BY 1, 2, 3
     ),
     qtd_plan AS (
         SELECT product_category, use_case, feature, SUM(revenue) AS qtd_plan
         FROM finance.customer.temp_product_category_revenue_plan
-        WHERE general_date >= (SELECT fiscal_quarter_start FROM fiscal_context) 
+        WHERE general_date >= {sql_date(quarter_start)} 
           AND general_date <= '{week_end}'
         GROUP BY 1, 2, 3
     )
@@ -187,7 +209,7 @@ def get_qtd_plan_by_feature(conn, week_end):
     FROM qtd_actuals a FULL OUTER JOIN qtd_plan p 
         ON a.product_category = p.product_category AND a.use_case = p.use_case AND a.feature = p.feature
     """
-    results = execute_query(conn, query)
+    results = execute_query(conn, query, "QTD plan by feature")
     lookup = {}
     for r in results:
         lookup[r['feature']] = {'delta': r['delta_to_plan'], 'pct': r['pct_variance']}
@@ -230,7 +252,7 @@ def get_use_cases(conn, current_start, current_end, prior_start, prior_end, uc_p
     FROM use_case_wow uw JOIN category_totals ct ON uw.product_category = ct.product_category
     ORDER BY uw.product_category, ABS(uw.dollar_change) DESC
     """
-    results = execute_query(conn, query)
+    results = execute_query(conn, query, "Use cases")
     by_category = defaultdict(list)
     for row in results:
         key = (row['product_category'], row['use_case'])
@@ -279,7 +301,7 @@ def get_features(conn, current_start, current_end, prior_start, prior_end, feat_
     FROM feature_wow fw JOIN use_case_totals uct ON fw.product_category = uct.product_category AND fw.use_case = uct.use_case
     ORDER BY fw.product_category, fw.use_case, ABS(fw.dollar_change) DESC
     """
-    results = execute_query(conn, query)
+    results = execute_query(conn, query, "Features")
     by_category = defaultdict(list)
     for row in results:
         plan_data = feat_plan_lookup.get(row['feature'], {})
@@ -289,23 +311,19 @@ def get_features(conn, current_start, current_end, prior_start, prior_end, feat_
     return dict(by_category)
 
 
-def get_qtd_plan_by_customer(conn, week_end):
+def get_qtd_plan_by_customer(conn, week_end, quarter_start):
     """QTD plan at customer level using account-level RFMA plan table."""
     query = f"""
-    WITH fiscal_context AS (
-        SELECT fiscal_quarter_start FROM finance.stg_utils.stg_fiscal_calendar
-        WHERE _date = '{week_end}' LIMIT 1
-    ),
-    qtd_actuals AS (
+    WITH qtd_actuals AS (
         SELECT feature, latest_salesforce_account_name as customer, SUM(revenue + product_led_revenue) AS qtd_actual
         FROM finance.customer.fy26_product_category_revenue
-        WHERE ds >= (SELECT fiscal_quarter_start FROM fiscal_context) AND ds <= '{week_end}'
+        WHERE ds >= {sql_date(quarter_start)} AND ds <= '{week_end}'
         GROUP BY 1, 2
     ),
     qtd_plan AS (
         SELECT feature, salesforce_account_name as customer, SUM(plan_revenue) AS qtd_plan
         FROM finance.customer.product_category_most_recent_plan
-        WHERE ds >= (SELECT fiscal_quarter_start FROM fiscal_context) AND ds <= '{week_end}'
+        WHERE ds >= {sql_date(quarter_start)} AND ds <= '{week_end}'
         GROUP BY 1, 2
     )
     SELECT COALESCE(a.feature, p.feature) as feature,
@@ -315,7 +333,7 @@ def get_qtd_plan_by_customer(conn, week_end):
     FROM qtd_actuals a FULL OUTER JOIN qtd_plan p 
         ON a.feature = p.feature AND a.customer = p.customer
     """
-    results = execute_query(conn, query)
+    results = execute_query(conn, query, "QTD plan by customer")
     lookup = {}
     for r in results:
         key = (r['feature'], r['customer'])
@@ -365,14 +383,14 @@ def get_customers(conn, current_start, current_end, prior_start, prior_end, cust
     SELECT product_category, use_case, feature, customer, current_rev, prior_rev, dollar_change, pct_change, mix_pct, contribution_pct
     FROM ranked WHERE rn <= 10 ORDER BY product_category, feature, contribution_pct DESC
     """
-    results = execute_query(conn, query)
+    cols = execute_query_columns(conn, query, "Customers")
+    plan = [cust_plan_lookup.get(key, {}) for key in zip(cols['feature'], cols['customer'])]
+    cols['delta_to_plan'] = [p.get('delta', None) for p in plan]
+    cols['pct_to_plan'] = [p.get('pct', None) for p in plan]
+    names = list(cols)
     by_category = defaultdict(list)
-    for row in results:
-        key = (row['feature'], row['customer'])
-        plan_data = cust_plan_lookup.get(key, {})
-        row['delta_to_plan'] = plan_data.get('delta', None)
-        row['pct_to_plan'] = plan_data.get('pct', None)
-        by_category[row['product_category']].append(row)
+    for category, values in zip(cols['product_category'], zip(*cols.values())):
+        by_category[category].append(dict(zip(names, values)))
     return dict(by_category)
 
 
@@ -496,7 +514,7 @@ def get_forecast_evolution(conn):
     SELECT run_date, 'Total' AS product_category, ROUND(yoy_growth * 100, 2) AS yoy_growth_pct FROM total_prep WHERE fy_fq = 'FY2026-Q4'
     ORDER BY 1, 2
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "Forecast evolution")
 
 
 def get_top_gainers(conn, current_start, current_end, prior_start, prior_end):
@@ -573,7 +591,7 @@ def get_top_gainers(conn, current_start, current_end, prior_start, prior_end):
     ORDER BY c.wow_change DESC
     LIMIT 15
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "Top gainers")
 
 
 def get_top_contractors(conn, current_start, current_end, prior_start, prior_end):
@@ -650,7 +668,7 @@ def get_top_contractors(conn, current_start, current_end, prior_start, prior_end
     ORDER BY c.wow_change ASC
     LIMIT 15
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "Top contractors")
 
 
 def get_customer_feature_breakdown(conn, current_start, current_end, prior_start, prior_end):
@@ -686,7 +704,7 @@ def get_customer_feature_breakdown(conn, current_start, current_end, prior_start
     WHERE ABS(wow_change) > 0
     ORDER BY customer, ABS(wow_change) DESC
     """
-    results = execute_query(conn, query)
+    results = execute_query(conn, query, "Customer feature breakdown")
     by_customer = defaultdict(list)
     for row in results:
         by_customer[row['customer']].append(row)
@@ -726,7 +744,7 @@ def get_fq_forecast_vs_plan_target(conn, qtd_start):
     LEFT JOIN fq_target t ON f.product_category = t.product_category
     ORDER BY f.full_quarter_revenue DESC NULLS LAST
     """
-    return execute_query(conn, query)
+    return execute_query(conn, query, "FQ forecast vs plan vs target")
 
 
 def get_top_25_customers(conn, current_start, current_end, prior_start, prior_end):
@@ -808,28 +826,28 @@ def get_top_25_customers(conn, current_start, current_end, prior_start, prior_en
     WHERE ct.customer IN (SELECT customer FROM top_25)
     ORDER BY ct.current_rev DESC, ct.customer, fr.rn
     """
-    results = execute_query(conn, query)
+    cols = execute_query_columns(conn, query, "Top 25 customers")
     
+    # One row per (customer, feature); customer-level columns repeat on each row
     customers = {}
-    for row in results:
-        cust = row['customer']
+    for i, cust in enumerate(cols['customer']):
         if cust not in customers:
             customers[cust] = {
                 'customer': cust,
-                'current_rev': row['current_rev'],
-                'prior_rev': row['prior_rev'],
-                'wow_change': row['wow_change'],
-                'wow_pct': row['wow_pct'],
-                'mix_pct': row['mix_pct'],
-                'contribution_pct': row['contribution_pct'],
+                'current_rev': cols['current_rev'][i],
+                'prior_rev': cols['prior_rev'][i],
+                'wow_change': cols['wow_change'][i],
+                'wow_pct': cols['wow_pct'][i],
+                'mix_pct': cols['mix_pct'][i],
+                'contribution_pct': cols['contribution_pct'][i],
                 'top_features': []
             }
         customers[cust]['top_features'].append({
-            'feature': row['feature'],
-            'current_rev': row['feat_current'],
-            'prior_rev': row['feat_prior'],
-            'wow_change': row['feat_change'],
-            'contribution_pct': row['feat_contribution']
+            'feature': cols['feature'][i],
+            'current_rev': cols['feat_current'][i],
+            'prior_rev': cols['feat_prior'][i],
+            'wow_change': cols['feat_change'][i],
+            'contribution_pct': cols['feat_contribution'][i]
         })
     
     return list(customers.values())
@@ -852,6 +870,7 @@ def convert_to_json_safe(obj):
 
 def main(args):
     output_path = args.output
+    trace = start_trace() if getattr(args, 'trace', False) else None
 
     conn = get_connection()
     
@@ -871,6 +890,9 @@ def main(args):
         prior_end = dates['prior_week_end'].strftime('%Y-%m-%d')
 
     qtd_start, _ = get_fiscal_dates(conn)
+    # QTD plan comparisons run from the start of the week's own quarter
+    week_quarter = load_calendar(conn).quarter_of(current_end)
+    week_quarter_start = week_quarter.start if week_quarter else None
     
     print(f"Week: {current_start} to {current_end} | Prior: {prior_start} to {prior_end} | QTD: {qtd_start}")
 
@@ -878,11 +900,11 @@ def main(args):
     category_wow = get_category_wow(conn, current_start, current_end, prior_start, prior_end)
     
     print("2/13 QTD vs Plan (category)...")
-    qtd_vs_plan = get_qtd_vs_plan(conn, current_end)
+    qtd_vs_plan = get_qtd_vs_plan(conn, current_end, week_quarter_start)
     
     print("3/13 QTD Plan by use case & feature...")
-    uc_plan_lookup = get_qtd_plan_by_use_case(conn, current_end)
-    feat_plan_lookup = get_qtd_plan_by_feature(conn, current_end)
+    uc_plan_lookup = get_qtd_plan_by_use_case(conn, current_end, week_quarter_start)
+    feat_plan_lookup = get_qtd_plan_by_feature(conn, current_end, week_quarter_start)
     
     print("4/13 Use cases...")
     use_cases = get_use_cases(conn, current_start, current_end, prior_start, prior_end, uc_plan_lookup)
@@ -891,7 +913,7 @@ def main(args):
     features = get_features(conn, current_start, current_end, prior_start, prior_end, feat_plan_lookup)
     
     print("6/13 QTD Plan by customer...") 
-    cust_plan_lookup = get_qtd_plan_by_customer(conn, current_end)
+    cust_plan_lookup = get_qtd_plan_by_customer(conn, current_end, week_quarter_start)
     
     print("7/13 Customers (top 10 per feature)...")
     customers = get_customers(conn, current_start, current_end, prior_start, prior_end, cust_plan_lookup)
@@ -914,6 +936,8 @@ def main(args):
     print("13/13 Top 25 customers with feature breakdown...")
     top_25_customers = get_top_25_customers(conn, current_start, current_end, prior_start, prior_end)
     
+    if trace:
+        trace.fetch_bytes_scanned(conn)
     conn.close()
 
     data = convert_to_json_safe({
@@ -936,21 +960,24 @@ def main(args):
         'top_25_customers': top_25_customers,
     })
 
-    with open(output_path, 'w') as f:
-        json.dump(data, f, indent=2)
+    save_report(data, output_path)
 
     print(f"\n✅ Saved to {output_path}")
     print(f"   {len(category_wow)} categories, {sum(len(uc) for uc in use_cases.values())} use cases")
     print(f"   {len(top_gainers)} gainers, {len(top_contractors)} contractors")
     print(f"   {len(forecast_evolution)} forecast data points")
+    if trace:
+        print(f"   Query trace: {', '.join(trace.write(output_path))}")
+        stop_trace()
 
 
-def collect_all_data(week_start, week_end, output_path):
-    """Entry point for programmatic use."""
+def collect_all_data(week_start, week_end, output_path, trace_queries=False):
+    """Entry point for programmatic use. trace_queries also writes a query timing trace."""
     class Args:
         current_week_start = week_start
         current_week_end = week_end
         output = output_path
+        trace = trace_queries
     main(Args())
 
 
@@ -959,6 +986,7 @@ def main_cli():
     parser.add_argument('--current-week-start')
     parser.add_argument('--current-week-end')
     parser.add_argument('--output', required=True)
+    parser.add_argument('--trace', action='store_true', help='Write a per-query timing trace next to the output')
     args = parser.parse_args()
     main(args)
 
@@ -4,18 +4,21 @@ generate_html_report.py - Generate interactive HTML report for weekly metrics
 """
 
 import argparse
-import json
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
 
 from jinja2 import Environment, FileSystemLoader
 
+try:
+    from .report_store import load_report
+except ImportError:  # run as a script: python scripts/<name>.py
+    from report_store import load_report
+
 
 def load_data(data_path: str) -> dict:
-    """Load query results from JSON file."""
-    with open(data_path, "r") as f:
-        return json.load(f)
+    """Load query results from the data file (.json, .json.gz or .json.zst)."""
+    return load_report(data_path)
 
 
 def calculate_totals(data: dict) -> dict:
@@ -235,7 +238,7 @@ def generate_report(data_path_or_dict, output_path: str, week_start: str, week_e
 
 def main():
     parser = argparse.ArgumentParser(description="Generate HTML weekly metrics report")
-    parser.add_argument("--data", required=True, help="Path to JSON data file")
+    parser.add_argument("--data", required=True, help="Path to the data file")
     parser.add_argument("--output", required=True, help="Output HTML file path")
     parser.add_argument("--week-start", required=True, help="Current week start date")
     parser.add_argument("--week-end", required=True, help="Current week end date")